@@ -971,6 +971,29 @@ UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 CACHE_DIR = DATA_DIR / "cache"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
+# Local copies of S3/GCS/Azure files, evicted least recently used first once
+# they exceed STORAGE_CACHE_MAX_SIZE_MB (0 disables the cache). A copy is
+# reused without asking the object store for STORAGE_CACHE_TTL seconds, then
+# revalidated against the object's ETag/generation.
+try:
+    STORAGE_CACHE_MAX_SIZE_MB = int(os.environ.get("STORAGE_CACHE_MAX_SIZE_MB", "2048"))
+except Exception:
+    STORAGE_CACHE_MAX_SIZE_MB = 2048
+
+try:
+    STORAGE_CACHE_TTL = int(os.environ.get("STORAGE_CACHE_TTL", "300"))
+except Exception:
+    STORAGE_CACHE_TTL = 300
+
+# Range requests (e.g. seeking in media) only copy objects up to this size to
+# the storage cache; larger ones are cached by full downloads alone.
+try:
+    STORAGE_CACHE_RANGE_FILL_MAX_SIZE_MB = int(
+        os.environ.get("STORAGE_CACHE_RANGE_FILL_MAX_SIZE_MB", "64")
+    )
+except Exception:
+    STORAGE_CACHE_RANGE_FILL_MAX_SIZE_MB = 64
+
 
 ####################################
 # DIRECT CONNECTIONS
@@ -2750,6 +2773,75 @@ ENABLE_RAG_HYBRID_SEARCH_ENRICHED_TEXTS = PersistentConfig(
     == "true",
 )
 
+# Persistent per-collection BM25 index used by hybrid search instead of rebuilding
+# an in-memory index from the full collection on every query. Each host keeps its
+# own index files; with several hosts, set REDIS_URL so that every host can tell
+# when another one has written to a collection and rebuild its index.
+ENABLE_RAG_BM25_INDEX = (
+    os.environ.get("ENABLE_RAG_BM25_INDEX", "False").lower() == "true"
+)
+RAG_BM25_INDEX_DIR = os.environ.get("RAG_BM25_INDEX_DIR", f"{CACHE_DIR}/bm25")
+
+# Content-hash cache of chunk embeddings so re-ingesting unchanged text is free
+ENABLE_RAG_EMBEDDING_CACHE = (
+    os.environ.get("ENABLE_RAG_EMBEDDING_CACHE", "True").lower() == "true"
+)
+RAG_EMBEDDING_CACHE_PATH = os.environ.get(
+    "RAG_EMBEDDING_CACHE_PATH", f"{CACHE_DIR}/embeddings/cache.sqlite"
+)
+RAG_EMBEDDING_CACHE_DTYPE = os.environ.get("RAG_EMBEDDING_CACHE_DTYPE", "float32")
+
+try:
+    RAG_EMBEDDING_CACHE_MAX_SIZE_MB = int(
+        os.environ.get("RAG_EMBEDDING_CACHE_MAX_SIZE_MB", "1024")
+    )
+except Exception:
+    RAG_EMBEDDING_CACHE_MAX_SIZE_MB = 1024
+
+# In-process cache of query embeddings and vector search results, invalidated
+# through per-collection version counters shared by all workers
+ENABLE_RAG_QUERY_CACHE = (
+    os.environ.get("ENABLE_RAG_QUERY_CACHE", "True").lower() == "true"
+)
+RAG_QUERY_CACHE_DIR = os.environ.get("RAG_QUERY_CACHE_DIR", f"{CACHE_DIR}/query")
+
+try:
+    RAG_QUERY_EMBEDDING_CACHE_SIZE = int(
+        os.environ.get("RAG_QUERY_EMBEDDING_CACHE_SIZE", "2048")
+    )
+except Exception:
+    RAG_QUERY_EMBEDDING_CACHE_SIZE = 2048
+
+try:
+    RAG_QUERY_RESULT_CACHE_SIZE = int(
+        os.environ.get("RAG_QUERY_RESULT_CACHE_SIZE", "1024")
+    )
+except Exception:
+    RAG_QUERY_RESULT_CACHE_SIZE = 1024
+
+try:
+    RAG_QUERY_CACHE_TTL = int(os.environ.get("RAG_QUERY_CACHE_TTL", "3600"))
+except Exception:
+    RAG_QUERY_CACHE_TTL = 3600
+
+# Ingestion parses, embeds and writes documents concurrently in batches of
+# chunks, with at most RAG_INGESTION_QUEUE_SIZE batches buffered between stages
+try:
+    RAG_INGESTION_BATCH_SIZE = int(os.environ.get("RAG_INGESTION_BATCH_SIZE", "128"))
+except Exception:
+    RAG_INGESTION_BATCH_SIZE = 128
+
+try:
+    RAG_INGESTION_QUEUE_SIZE = int(os.environ.get("RAG_INGESTION_QUEUE_SIZE", "2"))
+except Exception:
+    RAG_INGESTION_QUEUE_SIZE = 2
+
+# Vector searches of all requests share one pool of this many threads
+try:
+    RAG_RETRIEVAL_MAX_WORKERS = int(os.environ.get("RAG_RETRIEVAL_MAX_WORKERS", "16"))
+except Exception:
+    RAG_RETRIEVAL_MAX_WORKERS = 16
+
 RAG_FULL_CONTEXT = PersistentConfig(
     "RAG_FULL_CONTEXT",
     "rag.full_context",
@@ -2882,6 +2974,33 @@ RAG_RERANKING_MODEL_TRUST_REMOTE_CODE = (
     os.environ.get("RAG_RERANKING_MODEL_TRUST_REMOTE_CODE", "True").lower() == "true"
 )
 
+# Dynamic int8 quantization of local torch rerankers (CrossEncoder, ColBERT)
+# when they run on CPU. For ONNX/OpenVINO cross-encoders use
+# SENTENCE_TRANSFORMERS_CROSS_ENCODER_BACKEND instead.
+RAG_RERANKING_MODEL_QUANTIZE = (
+    os.environ.get("RAG_RERANKING_MODEL_QUANTIZE", "False").lower() == "true"
+)
+
+# Reranking requests arriving within RAG_RERANKING_BATCH_WAIT_MS of each other
+# are scored together in model calls of up to RAG_RERANKING_BATCH_SIZE pairs
+try:
+    RAG_RERANKING_BATCH_SIZE = int(os.environ.get("RAG_RERANKING_BATCH_SIZE", "32"))
+except Exception:
+    RAG_RERANKING_BATCH_SIZE = 32
+
+try:
+    RAG_RERANKING_BATCH_WAIT_MS = int(
+        os.environ.get("RAG_RERANKING_BATCH_WAIT_MS", "5")
+    )
+except Exception:
+    RAG_RERANKING_BATCH_WAIT_MS = 5
+
+# (query, chunk) scores kept in memory; 0 disables the cache
+try:
+    RAG_RERANKING_CACHE_SIZE = int(os.environ.get("RAG_RERANKING_CACHE_SIZE", "10000"))
+except Exception:
+    RAG_RERANKING_CACHE_SIZE = 10000
+
 RAG_EXTERNAL_RERANKER_URL = PersistentConfig(
     "RAG_EXTERNAL_RERANKER_URL",
     "rag.external_reranker_url",
@@ -121,6 +121,11 @@ INSTANCE_ID = os.environ.get("INSTANCE_ID", str(uuid4()))
 
 ENABLE_DB_MIGRATIONS = os.environ.get("ENABLE_DB_MIGRATIONS", "True").lower() == "true"
 
+# Defer the vector DB client and local embedding/reranking models until first
+# use to shorten cold starts (e.g. dyno restarts). All routers are still
+# registered at startup, so the OpenAPI schema is complete.
+ENABLE_LAZY_STARTUP = os.environ.get("ENABLE_LAZY_STARTUP", "False").lower() == "true"
+
 
 # Function to parse each section
 def parse_section(section):
@@ -351,6 +356,94 @@ DATABASE_ENABLE_SESSION_SHARING = (
     os.environ.get("DATABASE_ENABLE_SESSION_SHARING", "False").lower() == "true"
 )
 
+# Async engine (aiosqlite / asyncpg) used by the hot research endpoints; falls back
+# to the sync engine on a worker thread when disabled or no async driver is available.
+# Off by default: on SQLite the async driver measured slower than the sync path.
+ENABLE_ASYNC_DB = os.environ.get("ENABLE_ASYNC_DB", "False").lower() == "true"
+
+# Per-endpoint query counts, DB time, pool wait histograms and N+1 detection,
+# served from /api/v1/utils/db/metrics and exported over OpenTelemetry
+ENABLE_DB_METRICS = os.environ.get("ENABLE_DB_METRICS", "False").lower() == "true"
+
+DB_SLOW_QUERY_THRESHOLD_MS = os.environ.get("DB_SLOW_QUERY_THRESHOLD_MS", "500")
+try:
+    DB_SLOW_QUERY_THRESHOLD_MS = float(DB_SLOW_QUERY_THRESHOLD_MS)
+except Exception:
+    DB_SLOW_QUERY_THRESHOLD_MS = 500.0
+
+# Same statement executed this many times in one request is reported as N+1
+DB_N_PLUS_ONE_THRESHOLD = os.environ.get("DB_N_PLUS_ONE_THRESHOLD", "10")
+try:
+    DB_N_PLUS_ONE_THRESHOLD = int(DB_N_PLUS_ONE_THRESHOLD)
+except Exception:
+    DB_N_PLUS_ONE_THRESHOLD = 10
+
+# Grow/shrink the pool overflow from observed checkout wait (QueuePool only)
+DATABASE_POOL_ADAPTIVE = (
+    os.environ.get("DATABASE_POOL_ADAPTIVE", "False").lower() == "true"
+)
+
+DATABASE_POOL_ADAPTIVE_MAX_OVERFLOW = os.environ.get(
+    "DATABASE_POOL_ADAPTIVE_MAX_OVERFLOW", "40"
+)
+try:
+    DATABASE_POOL_ADAPTIVE_MAX_OVERFLOW = int(DATABASE_POOL_ADAPTIVE_MAX_OVERFLOW)
+except Exception:
+    DATABASE_POOL_ADAPTIVE_MAX_OVERFLOW = 40
+
+DATABASE_POOL_ADAPTIVE_TARGET_WAIT_MS = os.environ.get(
+    "DATABASE_POOL_ADAPTIVE_TARGET_WAIT_MS", "50"
+)
+try:
+    DATABASE_POOL_ADAPTIVE_TARGET_WAIT_MS = float(DATABASE_POOL_ADAPTIVE_TARGET_WAIT_MS)
+except Exception:
+    DATABASE_POOL_ADAPTIVE_TARGET_WAIT_MS = 50.0
+
+# Durable file ingestion queue drained by `python -m open_webui.retrieval.ingestion`;
+# when disabled, uploads are processed in the web process via BackgroundTasks
+ENABLE_INGESTION_QUEUE = (
+    os.environ.get("ENABLE_INGESTION_QUEUE", "False").lower() == "true"
+)
+
+INGESTION_WORKER_CONCURRENCY = os.environ.get("INGESTION_WORKER_CONCURRENCY", "2")
+try:
+    INGESTION_WORKER_CONCURRENCY = max(int(INGESTION_WORKER_CONCURRENCY), 1)
+except Exception:
+    INGESTION_WORKER_CONCURRENCY = 2
+
+# Processes used to parse documents; 0 parses on the job thread
+INGESTION_WORKER_PROCESSES = os.environ.get("INGESTION_WORKER_PROCESSES", "2")
+try:
+    INGESTION_WORKER_PROCESSES = max(int(INGESTION_WORKER_PROCESSES), 0)
+except Exception:
+    INGESTION_WORKER_PROCESSES = 2
+
+INGESTION_WORKER_POLL_INTERVAL = os.environ.get("INGESTION_WORKER_POLL_INTERVAL", "2")
+try:
+    INGESTION_WORKER_POLL_INTERVAL = float(INGESTION_WORKER_POLL_INTERVAL)
+except Exception:
+    INGESTION_WORKER_POLL_INTERVAL = 2.0
+
+INGESTION_JOB_MAX_ATTEMPTS = os.environ.get("INGESTION_JOB_MAX_ATTEMPTS", "3")
+try:
+    INGESTION_JOB_MAX_ATTEMPTS = max(int(INGESTION_JOB_MAX_ATTEMPTS), 1)
+except Exception:
+    INGESTION_JOB_MAX_ATTEMPTS = 3
+
+# Base delay in seconds before a failed job is retried, doubled on every attempt
+INGESTION_JOB_RETRY_DELAY = os.environ.get("INGESTION_JOB_RETRY_DELAY", "30")
+try:
+    INGESTION_JOB_RETRY_DELAY = int(INGESTION_JOB_RETRY_DELAY)
+except Exception:
+    INGESTION_JOB_RETRY_DELAY = 30
+
+# Running jobs without a heartbeat for this long are requeued (e.g. after a restart)
+INGESTION_JOB_TIMEOUT = os.environ.get("INGESTION_JOB_TIMEOUT", "1800")
+try:
+    INGESTION_JOB_TIMEOUT = int(INGESTION_JOB_TIMEOUT)
+except Exception:
+    INGESTION_JOB_TIMEOUT = 1800
+
 # Enable public visibility of active user count (when disabled, only admins can see it)
 ENABLE_PUBLIC_ACTIVE_USERS_COUNT = (
     os.environ.get("ENABLE_PUBLIC_ACTIVE_USERS_COUNT", "True").lower() == "true"
@@ -578,6 +671,45 @@ else:
     except Exception:
         MODELS_CACHE_TTL = 1
 
+# Per-connection cache of direct OpenAI `/models` responses. Entries older than
+# the TTL are served stale while a background refresh runs, until they exceed
+# the stale TTL, at which point the next caller fetches inline.
+MODELS_CONNECTION_CACHE_TTL = os.environ.get("MODELS_CONNECTION_CACHE_TTL", "300")
+try:
+    MODELS_CONNECTION_CACHE_TTL = int(MODELS_CONNECTION_CACHE_TTL)
+except Exception:
+    MODELS_CONNECTION_CACHE_TTL = 300
+
+MODELS_CONNECTION_CACHE_STALE_TTL = os.environ.get(
+    "MODELS_CONNECTION_CACHE_STALE_TTL", "3600"
+)
+try:
+    MODELS_CONNECTION_CACHE_STALE_TTL = int(MODELS_CONNECTION_CACHE_STALE_TTL)
+except Exception:
+    MODELS_CONNECTION_CACHE_STALE_TTL = 3600
+
+# Upper bound on cached `/models` responses. With ENABLE_FORWARD_USER_INFO_HEADERS
+# every user gets their own entry per connection, so the least recently used
+# entries are dropped beyond this many.
+MODELS_CONNECTION_CACHE_MAX_ENTRIES = os.environ.get(
+    "MODELS_CONNECTION_CACHE_MAX_ENTRIES", "1000"
+)
+try:
+    MODELS_CONNECTION_CACHE_MAX_ENTRIES = int(MODELS_CONNECTION_CACHE_MAX_ENTRIES)
+except Exception:
+    MODELS_CONNECTION_CACHE_MAX_ENTRIES = 1000
+
+# How long a worker trusts its cached group memberships and resource access
+# snapshots before reloading them. Writes made through this worker invalidate
+# them immediately, and with REDIS_URL set so do writes made by other workers.
+# Without Redis, a write (e.g. a revoked grant) made by another worker can go
+# unseen here for up to this many seconds.
+ACCESS_INDEX_TTL = os.environ.get("ACCESS_INDEX_TTL", "10")
+try:
+    ACCESS_INDEX_TTL = int(ACCESS_INDEX_TTL)
+except Exception:
+    ACCESS_INDEX_TTL = 10
+
 
 ####################################
 # CHAT
@@ -603,6 +735,20 @@ else:
         CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE = 1
 
 
+# Send the full message content instead of a delta every N streamed events,
+# so clients that missed an event recover; 0 always sends the full content
+CHAT_RESPONSE_STREAM_CHECKPOINT_INTERVAL = os.environ.get(
+    "CHAT_RESPONSE_STREAM_CHECKPOINT_INTERVAL", "50"
+)
+
+try:
+    CHAT_RESPONSE_STREAM_CHECKPOINT_INTERVAL = int(
+        CHAT_RESPONSE_STREAM_CHECKPOINT_INTERVAL
+    )
+except Exception:
+    CHAT_RESPONSE_STREAM_CHECKPOINT_INTERVAL = 50
+
+
 CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES = os.environ.get(
     "CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES", "30"
 )
@@ -615,6 +761,31 @@ else:
     except Exception:
         CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES = 30
 
+# Tool calls of a turn that run at the same time
+CHAT_RESPONSE_TOOL_CALL_CONCURRENCY = os.environ.get(
+    "CHAT_RESPONSE_TOOL_CALL_CONCURRENCY", "8"
+)
+
+try:
+    CHAT_RESPONSE_TOOL_CALL_CONCURRENCY = max(
+        int(CHAT_RESPONSE_TOOL_CALL_CONCURRENCY), 1
+    )
+except Exception:
+    CHAT_RESPONSE_TOOL_CALL_CONCURRENCY = 8
+
+# Seconds a single tool call may run before it is abandoned (empty for no limit)
+CHAT_RESPONSE_TOOL_CALL_TIMEOUT = os.environ.get(
+    "CHAT_RESPONSE_TOOL_CALL_TIMEOUT", "300"
+)
+
+if CHAT_RESPONSE_TOOL_CALL_TIMEOUT == "":
+    CHAT_RESPONSE_TOOL_CALL_TIMEOUT = None
+else:
+    try:
+        CHAT_RESPONSE_TOOL_CALL_TIMEOUT = float(CHAT_RESPONSE_TOOL_CALL_TIMEOUT)
+    except Exception:
+        CHAT_RESPONSE_TOOL_CALL_TIMEOUT = 300
+
 
 CHAT_STREAM_RESPONSE_CHUNK_MAX_BUFFER_SIZE = os.environ.get(
     "CHAT_STREAM_RESPONSE_CHUNK_MAX_BUFFER_SIZE", ""
@@ -692,6 +863,35 @@ try:
 except ValueError:
     WEBSOCKET_SERVER_PING_INTERVAL = 25
 
+# Yjs updates of a collaborative document are merged into a snapshot once
+# this many have accumulated (0 disables compaction)
+YDOC_COMPACTION_THRESHOLD = os.environ.get("YDOC_COMPACTION_THRESHOLD", "100")
+try:
+    YDOC_COMPACTION_THRESHOLD = int(YDOC_COMPACTION_THRESHOLD)
+except ValueError:
+    YDOC_COMPACTION_THRESHOLD = 100
+
+# Saves of collaborative notes are written this long after the last edit, and
+# at most NOTE_SAVE_MAX_DELAY_MS after the first unwritten one
+NOTE_SAVE_DEBOUNCE_MS = os.environ.get("NOTE_SAVE_DEBOUNCE_MS", "500")
+try:
+    NOTE_SAVE_DEBOUNCE_MS = int(NOTE_SAVE_DEBOUNCE_MS)
+except ValueError:
+    NOTE_SAVE_DEBOUNCE_MS = 500
+
+NOTE_SAVE_MAX_DELAY_MS = os.environ.get("NOTE_SAVE_MAX_DELAY_MS", "5000")
+try:
+    NOTE_SAVE_MAX_DELAY_MS = int(NOTE_SAVE_MAX_DELAY_MS)
+except ValueError:
+    NOTE_SAVE_MAX_DELAY_MS = 5000
+
+# Seconds a note access decision is reused for saves of the same user
+NOTE_SAVE_ACCESS_TTL = os.environ.get("NOTE_SAVE_ACCESS_TTL", "60")
+try:
+    NOTE_SAVE_ACCESS_TTL = int(NOTE_SAVE_ACCESS_TTL)
+except ValueError:
+    NOTE_SAVE_ACCESS_TTL = 60
+
 
 REQUESTS_VERIFY = os.environ.get("REQUESTS_VERIFY", "True").lower() == "true"
 
@@ -743,6 +943,15 @@ AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL = (
     os.environ.get("AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL", "True").lower() == "true"
 )
 
+# Seconds before the OpenAPI specs of tool servers are revalidated in the
+# background (0 to keep them until the tool server connections change)
+TOOL_SERVER_SPEC_CACHE_TTL = os.environ.get("TOOL_SERVER_SPEC_CACHE_TTL", "300")
+
+try:
+    TOOL_SERVER_SPEC_CACHE_TTL = int(TOOL_SERVER_SPEC_CACHE_TTL)
+except ValueError:
+    TOOL_SERVER_SPEC_CACHE_TTL = 300
+
 
 ####################################
 # SENTENCE TRANSFORMERS
@@ -923,6 +1132,82 @@ OTEL_LOGS_OTLP_SPAN_EXPORTER = os.environ.get(
 PIP_OPTIONS = os.getenv("PIP_OPTIONS", "").split()
 PIP_PACKAGE_INDEX_OPTIONS = os.getenv("PIP_PACKAGE_INDEX_OPTIONS", "").split()
 
+####################################
+# LOCAL CODE INTERPRETER
+####################################
+
+# The "local" engine runs code on the server itself, so it stays disabled until
+# an operator opts in, even if it is selected in the admin settings
+ENABLE_CODE_INTERPRETER_LOCAL_ENGINE = (
+    os.environ.get("ENABLE_CODE_INTERPRETER_LOCAL_ENGINE", "False").lower() == "true"
+)
+
+# How local workers are confined: "bwrap" runs them under bubblewrap with no
+# network and none of the server's files; "none" runs them as the server's user
+# with access to everything it can read, for trusted single-user setups only
+CODE_INTERPRETER_LOCAL_SANDBOX = os.environ.get(
+    "CODE_INTERPRETER_LOCAL_SANDBOX", "bwrap"
+).lower()
+
+# Python worker processes kept warm for the "local" code execution engine
+CODE_INTERPRETER_LOCAL_WORKERS = os.environ.get("CODE_INTERPRETER_LOCAL_WORKERS", "2")
+
+try:
+    CODE_INTERPRETER_LOCAL_WORKERS = max(int(CODE_INTERPRETER_LOCAL_WORKERS), 1)
+except ValueError:
+    CODE_INTERPRETER_LOCAL_WORKERS = 2
+
+# Seconds of wall and CPU time an execution may take
+CODE_INTERPRETER_LOCAL_TIMEOUT = os.environ.get("CODE_INTERPRETER_LOCAL_TIMEOUT", "60")
+
+try:
+    CODE_INTERPRETER_LOCAL_TIMEOUT = int(CODE_INTERPRETER_LOCAL_TIMEOUT)
+except ValueError:
+    CODE_INTERPRETER_LOCAL_TIMEOUT = 60
+
+# Address space limit of a worker in MB (0 for no limit)
+CODE_INTERPRETER_LOCAL_MEMORY_LIMIT_MB = os.environ.get(
+    "CODE_INTERPRETER_LOCAL_MEMORY_LIMIT_MB", "1024"
+)
+
+try:
+    CODE_INTERPRETER_LOCAL_MEMORY_LIMIT_MB = int(CODE_INTERPRETER_LOCAL_MEMORY_LIMIT_MB)
+except ValueError:
+    CODE_INTERPRETER_LOCAL_MEMORY_LIMIT_MB = 1024
+
+# Executions a worker serves before it is replaced by a fresh one
+CODE_INTERPRETER_LOCAL_MAX_JOBS_PER_WORKER = os.environ.get(
+    "CODE_INTERPRETER_LOCAL_MAX_JOBS_PER_WORKER", "50"
+)
+
+try:
+    CODE_INTERPRETER_LOCAL_MAX_JOBS_PER_WORKER = max(
+        int(CODE_INTERPRETER_LOCAL_MAX_JOBS_PER_WORKER), 1
+    )
+except ValueError:
+    CODE_INTERPRETER_LOCAL_MAX_JOBS_PER_WORKER = 50
+
+# Executions a single user may have waiting for a worker
+CODE_INTERPRETER_LOCAL_MAX_QUEUED_PER_USER = os.environ.get(
+    "CODE_INTERPRETER_LOCAL_MAX_QUEUED_PER_USER", "4"
+)
+
+try:
+    CODE_INTERPRETER_LOCAL_MAX_QUEUED_PER_USER = max(
+        int(CODE_INTERPRETER_LOCAL_MAX_QUEUED_PER_USER), 1
+    )
+except ValueError:
+    CODE_INTERPRETER_LOCAL_MAX_QUEUED_PER_USER = 4
+
+# Modules imported by each worker before it takes executions, e.g. "numpy,pandas"
+CODE_INTERPRETER_LOCAL_PRELOAD_MODULES = [
+    module.strip()
+    for module in os.environ.get("CODE_INTERPRETER_LOCAL_PRELOAD_MODULES", "").split(
+        ","
+    )
+    if module.strip()
+]
+
 
 ####################################
 # PROGRESSIVE WEB APP OPTIONS
@@ -1,7 +1,7 @@
 import os
 import json
 import logging
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 from typing import Any, Optional
 
 from open_webui.internal.wrappers import register_connection
@@ -15,14 +15,18 @@ from open_webui.env import (
     DATABASE_POOL_TIMEOUT,
     DATABASE_ENABLE_SQLITE_WAL,
     DATABASE_ENABLE_SESSION_SHARING,
+    DATABASE_POOL_ADAPTIVE,
+    ENABLE_ASYNC_DB,
+    ENABLE_DB_METRICS,
     ENABLE_DB_MIGRATIONS,
 )
 
 # Peewee migrations removed - using Alembic only
 from sqlalchemy import Dialect, create_engine, MetaData, event, types
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker, Session
-from sqlalchemy.pool import QueuePool, NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, NullPool
 from sqlalchemy.sql.type_api import _T
 from typing_extensions import Self
 
@@ -150,3 +154,89 @@ def get_db_context(db: Optional[Session] = None):
     else:
         with get_db() as session:
             yield session
+
+
+####################
+# Async engine
+####################
+
+
+def get_async_database_url(url: str) -> Optional[str]:
+    """Map a sync DATABASE_URL onto its async driver, or None if there is none."""
+    if url.startswith("sqlite:///"):
+        return url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        # libpq query options (sslmode, ...) are not understood by asyncpg
+        if "?" in url:
+            return None
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    return None
+
+
+def create_async_db_engine(url: str):
+    if "sqlite" in url:
+        async_engine = create_async_engine(url)
+
+        def on_async_connect(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            if DATABASE_ENABLE_SQLITE_WAL:
+                cursor.execute("PRAGMA journal_mode=WAL")
+            else:
+                cursor.execute("PRAGMA journal_mode=DELETE")
+            cursor.close()
+
+        event.listen(async_engine.sync_engine, "connect", on_async_connect)
+        return async_engine
+
+    connect_args = {}
+    if DATABASE_SCHEMA:
+        connect_args["server_settings"] = {"search_path": DATABASE_SCHEMA}
+
+    if isinstance(DATABASE_POOL_SIZE, int):
+        if DATABASE_POOL_SIZE > 0:
+            return create_async_engine(
+                url,
+                pool_size=DATABASE_POOL_SIZE,
+                max_overflow=DATABASE_POOL_MAX_OVERFLOW,
+                pool_timeout=DATABASE_POOL_TIMEOUT,
+                pool_recycle=DATABASE_POOL_RECYCLE,
+                pool_pre_ping=True,
+                poolclass=AsyncAdaptedQueuePool,
+                connect_args=connect_args,
+            )
+        return create_async_engine(
+            url, pool_pre_ping=True, poolclass=NullPool, connect_args=connect_args
+        )
+    return create_async_engine(url, pool_pre_ping=True, connect_args=connect_args)
+
+
+async_engine = None
+AsyncSessionLocal = None
+
+ASYNC_DATABASE_URL = get_async_database_url(SQLALCHEMY_DATABASE_URL)
+if ENABLE_ASYNC_DB and ASYNC_DATABASE_URL:
+    try:
+        async_engine = create_async_db_engine(ASYNC_DATABASE_URL)
+        AsyncSessionLocal = async_sessionmaker(
+            bind=async_engine,
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    except ImportError as e:
+        log.warning(f"Async database driver not available, using sync engine: {e}")
+
+ASYNC_DB_ENABLED = AsyncSessionLocal is not None
+
+if ENABLE_DB_METRICS or DATABASE_POOL_ADAPTIVE:
+    from open_webui.internal.db_metrics import DB_METRICS
+
+    DB_METRICS.instrument(engine, "sync")
+    if async_engine is not None:
+        DB_METRICS.instrument(async_engine.sync_engine, "async")
+
+
+@asynccontextmanager
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,441 @@
+import asyncio
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import Pool, QueuePool
+
+from open_webui.env import (
+    DATABASE_POOL_ADAPTIVE_MAX_OVERFLOW,
+    DATABASE_POOL_ADAPTIVE_TARGET_WAIT_MS,
+    DB_N_PLUS_ONE_THRESHOLD,
+    DB_SLOW_QUERY_THRESHOLD_MS,
+)
+
+log = logging.getLogger(__name__)
+
+
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class Histogram:
+    """Fixed-bucket histogram; the last bucket collects everything above the top bound."""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float, counts: Optional[list[int]] = None) -> float:
+        """Upper bound of the bucket holding the q-quantile (inf for the overflow bucket)."""
+        counts = counts if counts is not None else self.counts
+        total = sum(counts)
+        if total == 0:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for idx, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[idx] if idx < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        labels = [f"le_{b}" for b in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+@dataclass
+class RequestDBStats:
+    query_count: int = 0
+    db_time_ms: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+
+@dataclass
+class EndpointDBStats:
+    requests: int = 0
+    queries: int = 0
+    db_time_ms: float = 0.0
+    max_queries: int = 0
+    n_plus_one: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "queries_per_request": round(self.queries / max(self.requests, 1), 2),
+            "db_time_ms": round(self.db_time_ms, 3),
+            "db_time_per_request_ms": round(self.db_time_ms / max(self.requests, 1), 3),
+            "max_queries": self.max_queries,
+            "n_plus_one": self.n_plus_one,
+        }
+
+
+_request_stats: ContextVar[Optional[RequestDBStats]] = ContextVar(
+    "db_request_stats", default=None
+)
+
+
+class DBMetrics:
+    """
+    Collects query and connection-pool statistics from SQLAlchemy events.
+
+    Queries are attributed to the HTTP endpoint through a context variable set
+    by `DBMetricsMiddleware`; sync table methods running in the threadpool
+    inherit it because the threadpool copies the request context.
+    """
+
+    def __init__(
+        self,
+        slow_query_ms: float = DB_SLOW_QUERY_THRESHOLD_MS,
+        n_plus_one_threshold: int = DB_N_PLUS_ONE_THRESHOLD,
+    ):
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+        self._lock = threading.Lock()
+        self.query_time = Histogram(QUERY_BUCKETS_MS)
+        self.endpoints: dict[str, EndpointDBStats] = {}
+        self.pools: dict[str, Pool] = {}
+        self.pool_waits: dict[str, Histogram] = {}
+        self.pool_peaks: dict[str, int] = {}
+        self.slow_queries: deque = deque(maxlen=50)
+        self.n_plus_one_reports: deque = deque(maxlen=50)
+        self._otel: Optional[dict] = None
+
+    ####################
+    # Instrumentation
+    ####################
+
+    def instrument(self, engine: Engine, name: str = "default") -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+        pool = engine.pool
+        self.pools[name] = pool
+        self.pool_waits[name] = Histogram(WAIT_BUCKETS_MS)
+        self.pool_peaks[name] = 0
+
+        # Pools have no "checkout requested" event, so time the call that
+        # blocks on the queue (or opens a new connection) directly.
+        do_get = pool._do_get
+
+        def timed_do_get():
+            start = time.perf_counter()
+            try:
+                return do_get()
+            finally:
+                self.record_pool_wait(name, (time.perf_counter() - start) * 1000)
+
+        pool._do_get = timed_do_get
+
+        if isinstance(pool, QueuePool):
+
+            def on_checkout(dbapi_connection, connection_record, connection_proxy):
+                checked_out = pool.checkedout()
+                if checked_out > self.pool_peaks[name]:
+                    self.pool_peaks[name] = checked_out
+
+            event.listen(pool, "checkout", on_checkout)
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        starts = conn.info.get("query_start_time")
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+        with self._lock:
+            self.query_time.observe(elapsed_ms)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.query_count += 1
+            stats.db_time_ms += elapsed_ms
+            stats.statements[statement] += 1
+
+        if elapsed_ms >= self.slow_query_ms:
+            log.warning(f"Slow query ({elapsed_ms:.0f}ms): {statement[:500]}")
+            self.slow_queries.append(
+                {
+                    "timestamp": int(time.time()),
+                    "duration_ms": round(elapsed_ms, 3),
+                    "statement": statement[:500],
+                }
+            )
+
+        if self._otel is not None:
+            self._otel["query_duration"].record(elapsed_ms)
+
+    def record_pool_wait(self, name: str, wait_ms: float) -> None:
+        with self._lock:
+            self.pool_waits[name].observe(wait_ms)
+        if self._otel is not None:
+            self._otel["pool_wait"].record(wait_ms, {"db.pool": name})
+
+    ####################
+    # Requests
+    ####################
+
+    def start_request(self):
+        return _request_stats.set(RequestDBStats())
+
+    def finish_request(self, token, endpoint: str) -> None:
+        stats = _request_stats.get()
+        _request_stats.reset(token)
+        if stats is None:
+            return
+
+        repeated = [
+            (statement, count)
+            for statement, count in stats.statements.items()
+            if count >= self.n_plus_one_threshold
+        ]
+        for statement, count in repeated:
+            log.warning(
+                f"Possible N+1 on {endpoint}: statement ran {count} times: "
+                f"{statement[:300]}"
+            )
+            self.n_plus_one_reports.append(
+                {
+                    "timestamp": int(time.time()),
+                    "endpoint": endpoint,
+                    "count": count,
+                    "statement": statement[:500],
+                }
+            )
+
+        with self._lock:
+            entry = self.endpoints.setdefault(endpoint, EndpointDBStats())
+            entry.requests += 1
+            entry.queries += stats.query_count
+            entry.db_time_ms += stats.db_time_ms
+            entry.max_queries = max(entry.max_queries, stats.query_count)
+            entry.n_plus_one += len(repeated)
+
+        if self._otel is not None:
+            attrs = {"http.route": endpoint}
+            self._otel["request_queries"].record(stats.query_count, attrs)
+            self._otel["request_db_time"].record(stats.db_time_ms, attrs)
+            if repeated:
+                self._otel["n_plus_one"].add(len(repeated), attrs)
+
+    ####################
+    # Export
+    ####################
+
+    def get_pool_stats(self, name: str) -> dict:
+        pool = self.pools[name]
+        stats = {"class": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            stats.update(
+                {
+                    "size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "overflow": pool.overflow(),
+                    "max_overflow": pool._max_overflow,
+                    "peak_checked_out": self.pool_peaks[name],
+                }
+            )
+        stats["wait"] = self.pool_waits[name].to_dict()
+        return stats
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            endpoints = {
+                endpoint: entry.to_dict()
+                for endpoint, entry in sorted(
+                    self.endpoints.items(), key=lambda item: -item[1].db_time_ms
+                )
+            }
+            query_time = self.query_time.to_dict()
+        return {
+            "pools": {name: self.get_pool_stats(name) for name in self.pools},
+            "queries": query_time,
+            "endpoints": endpoints,
+            "slow_queries": list(self.slow_queries),
+            "n_plus_one": list(self.n_plus_one_reports),
+        }
+
+    def bind_meter(self, meter) -> None:
+        """Export through an OpenTelemetry meter as well as the admin endpoint."""
+        from opentelemetry import metrics
+
+        self._otel = {
+            "query_duration": meter.create_histogram(
+                name="db.client.query.duration",
+                description="Database query duration",
+                unit="ms",
+            ),
+            "pool_wait": meter.create_histogram(
+                name="db.client.pool.wait",
+                description="Time spent waiting for a pooled connection",
+                unit="ms",
+            ),
+            "request_queries": meter.create_histogram(
+                name="db.client.request.queries",
+                description="Database queries issued per HTTP request",
+                unit="1",
+            ),
+            "request_db_time": meter.create_histogram(
+                name="db.client.request.duration",
+                description="Database time per HTTP request",
+                unit="ms",
+            ),
+            "n_plus_one": meter.create_counter(
+                name="db.client.n_plus_one",
+                description="Requests repeating one statement past the N+1 threshold",
+                unit="1",
+            ),
+        }
+
+        def observe_pools(key: str):
+            def callback(options: metrics.CallbackOptions):
+                return [
+                    metrics.Observation(value=stats[key], attributes={"db.pool": name})
+                    for name in self.pools
+                    if key in (stats := self.get_pool_stats(name))
+                ]
+
+            return callback
+
+        for key in ("checked_out", "overflow", "max_overflow"):
+            meter.create_observable_gauge(
+                name=f"db.client.pool.{key}",
+                description=f"Connection pool {key.replace('_', ' ')}",
+                unit="connections",
+                callbacks=[observe_pools(key)],
+            )
+
+    ####################
+    # Adaptive sizing
+    ####################
+
+    async def run_pool_tuner(
+        self,
+        interval: float = 30.0,
+        target_wait_ms: float = DATABASE_POOL_ADAPTIVE_TARGET_WAIT_MS,
+        max_overflow: int = DATABASE_POOL_ADAPTIVE_MAX_OVERFLOW,
+    ) -> None:
+        tuners = [
+            PoolTuner(self, name, target_wait_ms, max_overflow)
+            for name, pool in self.pools.items()
+            if isinstance(pool, QueuePool) and pool._max_overflow >= 0
+        ]
+        while True:
+            await asyncio.sleep(interval)
+            for tuner in tuners:
+                try:
+                    tuner.step()
+                except Exception as e:
+                    log.warning(f"Pool tuner for {tuner.name} failed: {e}")
+
+
+class PoolTuner:
+    """
+    Adjusts a QueuePool's overflow limit from the p95 checkout wait seen since
+    the previous step: grow while waits exceed the target, shrink back towards
+    the configured overflow once the pool is idle enough.
+
+    QueuePool cannot be resized after creation, so this changes its private
+    `_max_overflow`; overflow connections above the new limit are closed as
+    they are checked back in.
+    """
+
+    def __init__(
+        self,
+        metrics: DBMetrics,
+        name: str,
+        target_wait_ms: float,
+        max_overflow: int,
+    ):
+        self.metrics = metrics
+        self.name = name
+        self.pool: QueuePool = metrics.pools[name]
+        self.target_wait_ms = target_wait_ms
+        self.min_overflow = self.pool._max_overflow
+        self.max_overflow = max(max_overflow, self.min_overflow)
+        self._last_counts = list(metrics.pool_waits[name].counts)
+
+    def step(self) -> Optional[int]:
+        histogram = self.metrics.pool_waits[self.name]
+        counts = list(histogram.counts)
+        window = [now - last for now, last in zip(counts, self._last_counts)]
+        self._last_counts = counts
+
+        peak = self.metrics.pool_peaks[self.name]
+        self.metrics.pool_peaks[self.name] = self.pool.checkedout()
+
+        if sum(window) == 0:
+            return None
+
+        p95 = histogram.quantile(0.95, window)
+        current = self.pool._max_overflow
+        capacity = self.pool.size() + current
+
+        if p95 > self.target_wait_ms and current < self.max_overflow:
+            new = min(self.max_overflow, current + max(1, self.pool.size() // 2))
+        elif (
+            p95 <= self.target_wait_ms / 4
+            and current > self.min_overflow
+            and peak < capacity // 2
+        ):
+            new = max(self.min_overflow, current - 1)
+        else:
+            return None
+
+        self.pool._max_overflow = new
+        log.info(
+            f"Pool {self.name}: max_overflow {current} -> {new} "
+            f"(p95 wait {p95}ms, peak checked out {peak}/{capacity})"
+        )
+        return new
+
+
+DB_METRICS = DBMetrics()
+
+
+class DBMetricsMiddleware:
+    """ASGI middleware that attributes database work to the matched route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = DB_METRICS.start_request()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "other"
+            DB_METRICS.finish_request(token, f"{scope['method']} {path}")
@@ -107,10 +107,11 @@ from open_webui.routers.retrieval import (
     get_ef,
     get_rf,
 )
+from open_webui.retrieval.query_cache import get_query_cached_embedding_function
 
 
 from sqlalchemy.orm import Session
-from open_webui.internal.db import ScopedSession, engine, get_session
+from open_webui.internal.db import ScopedSession, async_engine, engine, get_session
 
 from open_webui.models.functions import Functions
 from open_webui.models.models import Models
@@ -494,6 +495,9 @@ from open_webui.env import (
     AIOHTTP_CLIENT_SESSION_SSL,
     ENABLE_STAR_SESSIONS_MIDDLEWARE,
     ENABLE_PUBLIC_ACTIVE_USERS_COUNT,
+    ENABLE_LAZY_STARTUP,
+    ENABLE_DB_METRICS,
+    DATABASE_POOL_ADAPTIVE,
     # Admin Account Runtime Creation
     WEBUI_ADMIN_EMAIL,
     WEBUI_ADMIN_PASSWORD,
@@ -515,6 +519,7 @@ from open_webui.utils.chat import (
 from open_webui.utils.embeddings import generate_embeddings
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
 from open_webui.utils.access_control import has_access
+from open_webui.utils.lazy import LazyObject
 
 from open_webui.utils.auth import (
     get_license_data,
@@ -525,6 +530,12 @@ from open_webui.utils.auth import (
     create_admin_user,
 )
 from open_webui.utils.plugin import install_tool_and_function_dependencies
+from open_webui.utils.tools import periodic_tool_servers_refresh
+from open_webui.utils.code_interpreter import (
+    close_code_worker_pool,
+    get_code_worker_pool,
+    get_local_engine_error,
+)
 from open_webui.utils.oauth import (
     get_oauth_client_info_with_dynamic_client_registration,
     encrypt_data,
@@ -616,11 +627,13 @@ async def lifespan(app: FastAPI):
 
     # This should be blocking (sync) so functions are not deactivated on first /get_models calls
     # when the first user lands on the / route.
-    try:
-        log.info("Installing external dependencies of functions and tools...")
-        install_tool_and_function_dependencies()
-    except Exception as e:
-        log.warning(f"Failed to install tool dependencies: {e}")
+    # Under ENABLE_LAZY_STARTUP, requirements are resolved when a plugin is first loaded instead.
+    if not ENABLE_LAZY_STARTUP:
+        try:
+            log.info("Installing external dependencies of functions and tools...")
+            install_tool_and_function_dependencies()
+        except Exception as e:
+            log.warning(f"Failed to install tool dependencies: {e}")
 
     try:
         app.state.redis = get_redis_connection(
@@ -640,12 +653,33 @@ async def lifespan(app: FastAPI):
         log.warning(f"Failed to initialize Redis: {e}")
         app.state.redis = None
 
+    if DATABASE_POOL_ADAPTIVE:
+        from open_webui.internal.db_metrics import DB_METRICS
+
+        app.state.db_pool_tuner = asyncio.create_task(DB_METRICS.run_pool_tuner())
+
     if THREAD_POOL_SIZE and THREAD_POOL_SIZE > 0:
         limiter = anyio.to_thread.current_default_thread_limiter()
         limiter.total_tokens = THREAD_POOL_SIZE
 
     asyncio.create_task(periodic_usage_pool_cleanup())
 
+    if "local" in (
+        app.state.config.CODE_EXECUTION_ENGINE,
+        app.state.config.CODE_INTERPRETER_ENGINE,
+    ):
+        error = get_local_engine_error()
+        if error:
+            log.warning(error)
+        else:
+            # Warm up the code workers before the first execution
+            get_code_worker_pool()
+
+    # Fetch the tool server specs now and keep them fresh in the background
+    app.state.tool_servers_refresher = asyncio.create_task(
+        periodic_tool_servers_refresh(app)
+    )
+
     if app.state.config.ENABLE_BASE_MODELS_CACHE:
         try:
             await get_all_models(
@@ -675,6 +709,17 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
 
+    if hasattr(app.state, "db_pool_tuner"):
+        app.state.db_pool_tuner.cancel()
+
+    if hasattr(app.state, "tool_servers_refresher"):
+        app.state.tool_servers_refresher.cancel()
+
+    await close_code_worker_pool()
+
+    if async_engine is not None:
+        await async_engine.dispose()
+
 
 app = FastAPI(
     title="Open WebUI",
@@ -1059,26 +1104,48 @@ app.state.rf = None
 app.state.YOUTUBE_LOADER_TRANSLATION = None
 
 
-try:
-    app.state.ef = get_ef(
-        app.state.config.RAG_EMBEDDING_ENGINE, app.state.config.RAG_EMBEDDING_MODEL
+def load_reranking_model():
+    return get_rf(
+        app.state.config.RAG_RERANKING_ENGINE,
+        app.state.config.RAG_RERANKING_MODEL,
+        app.state.config.RAG_EXTERNAL_RERANKER_URL,
+        app.state.config.RAG_EXTERNAL_RERANKER_API_KEY,
+        app.state.config.RAG_EXTERNAL_RERANKER_TIMEOUT,
     )
+
+
+enable_reranking = (
+    app.state.config.ENABLE_RAG_HYBRID_SEARCH
+    and not app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL
+)
+
+if ENABLE_LAZY_STARTUP:
+    # Build local models on first use instead of at import time
     if (
-        app.state.config.ENABLE_RAG_HYBRID_SEARCH
-        and not app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL
+        app.state.config.RAG_EMBEDDING_ENGINE == ""
+        and app.state.config.RAG_EMBEDDING_MODEL
     ):
-        app.state.rf = get_rf(
-            app.state.config.RAG_RERANKING_ENGINE,
-            app.state.config.RAG_RERANKING_MODEL,
-            app.state.config.RAG_EXTERNAL_RERANKER_URL,
-            app.state.config.RAG_EXTERNAL_RERANKER_API_KEY,
-            app.state.config.RAG_EXTERNAL_RERANKER_TIMEOUT,
+        app.state.ef = LazyObject(
+            lambda: get_ef(
+                app.state.config.RAG_EMBEDDING_ENGINE,
+                app.state.config.RAG_EMBEDDING_MODEL,
+            ),
+            name="embedding model",
         )
-    else:
-        app.state.rf = None
-except Exception as e:
-    log.error(f"Error updating models: {e}")
-    pass
+    if enable_reranking and app.state.config.RAG_RERANKING_MODEL:
+        app.state.rf = LazyObject(load_reranking_model, name="reranking model")
+else:
+    try:
+        app.state.ef = get_ef(
+            app.state.config.RAG_EMBEDDING_ENGINE, app.state.config.RAG_EMBEDDING_MODEL
+        )
+        if enable_reranking:
+            app.state.rf = load_reranking_model()
+        else:
+            app.state.rf = None
+    except Exception as e:
+        log.error(f"Error updating models: {e}")
+        pass
 
 
 app.state.EMBEDDING_FUNCTION = get_embedding_function(
@@ -1111,6 +1178,11 @@ app.state.EMBEDDING_FUNCTION = get_embedding_function(
     ),
     enable_async=app.state.config.ENABLE_ASYNC_EMBEDDING,
 )
+app.state.EMBEDDING_FUNCTION = get_query_cached_embedding_function(
+    app.state.EMBEDDING_FUNCTION,
+    app.state.config.RAG_EMBEDDING_ENGINE,
+    app.state.config.RAG_EMBEDDING_MODEL,
+)
 
 app.state.RERANKING_FUNCTION = get_reranking_function(
     app.state.config.RAG_RERANKING_ENGINE,
@@ -1429,12 +1501,19 @@ async def inspect_websocket(request: Request, call_next):
     return await call_next(request)
 
 
+if ENABLE_DB_METRICS:
+    from open_webui.internal.db_metrics import DBMetricsMiddleware
+
+    app.add_middleware(DBMetricsMiddleware)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ALLOW_ORIGIN,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
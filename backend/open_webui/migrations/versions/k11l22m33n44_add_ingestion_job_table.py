@@ -0,0 +1,55 @@
+"""Add ingestion_job table
+
+Revision ID: k11l22m33n44
+Revises: j00k11l22m33
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "k11l22m33n44"
+down_revision: Union[str, None] = "j00k11l22m33"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ingestion_job",
+        sa.Column("id", sa.Text(), primary_key=True, nullable=False, unique=True),
+        sa.Column("file_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("status", sa.Text(), nullable=False),
+        sa.Column("stage", sa.Text(), nullable=True),
+        sa.Column("priority", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("available_at", sa.BigInteger(), nullable=False),
+        sa.Column("locked_by", sa.Text(), nullable=True),
+        sa.Column("locked_at", sa.BigInteger(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.BigInteger(), nullable=False),
+    )
+
+    op.create_index(
+        "idx_ingestion_job_status_available",
+        "ingestion_job",
+        ["status", "available_at"],
+    )
+    op.create_index("idx_ingestion_job_file_id", "ingestion_job", ["file_id"])
+    op.create_index(
+        "idx_ingestion_job_user_status", "ingestion_job", ["user_id", "status"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_ingestion_job_user_status", table_name="ingestion_job")
+    op.drop_index("idx_ingestion_job_file_id", table_name="ingestion_job")
+    op.drop_index("idx_ingestion_job_status_available", table_name="ingestion_job")
+    op.drop_table("ingestion_job")
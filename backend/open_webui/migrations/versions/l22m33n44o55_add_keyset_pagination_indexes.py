@@ -0,0 +1,53 @@
+"""Add keyset pagination indexes
+
+Revision ID: l22m33n44o55
+Revises: k11l22m33n44
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision: str = "l22m33n44o55"
+down_revision: Union[str, None] = "k11l22m33n44"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    (
+        "message_channel_parent_created_at_id_idx",
+        "message",
+        ["channel_id", "parent_id", "created_at", "id"],
+    ),
+    ("user_id_updated_at_id_idx", "chat", ["user_id", "updated_at", "id"]),
+    ("note_updated_at_id_idx", "note", ["updated_at", "id"]),
+    ("knowledge_updated_at_id_idx", "knowledge", ["updated_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    inspector = Inspector.from_engine(op.get_bind())
+    existing_tables = inspector.get_table_names()
+
+    for idx_name, table, columns in INDEXES:
+        if table not in existing_tables:
+            continue
+        existing_indexes = [idx["name"] for idx in inspector.get_indexes(table)]
+        if idx_name not in existing_indexes:
+            op.create_index(idx_name, table, columns)
+
+
+def downgrade() -> None:
+    inspector = Inspector.from_engine(op.get_bind())
+    existing_tables = inspector.get_table_names()
+
+    for idx_name, table, _ in reversed(INDEXES):
+        if table not in existing_tables:
+            continue
+        existing_indexes = [idx["name"] for idx in inspector.get_indexes(table)]
+        if idx_name in existing_indexes:
+            op.drop_index(idx_name, table_name=table)
@@ -631,6 +631,22 @@ class ChannelTable:
                 for membership in memberships
             ]
 
+    def get_members_by_channel_ids(
+        self, channel_ids: list[str], db: Optional[Session] = None
+    ) -> list[ChannelMemberModel]:
+        if not channel_ids:
+            return []
+        with get_db_context(db) as db:
+            memberships = (
+                db.query(ChannelMember)
+                .filter(ChannelMember.channel_id.in_(channel_ids))
+                .all()
+            )
+            return [
+                ChannelMemberModel.model_validate(membership)
+                for membership in memberships
+            ]
+
     def pin_channel(
         self,
         channel_id: str,
@@ -998,6 +1014,19 @@ class ChannelTable:
             )
             return ChannelWebhookModel.model_validate(webhook) if webhook else None
 
+    def get_webhooks_by_ids(
+        self, webhook_ids: list[str], db: Optional[Session] = None
+    ) -> list[ChannelWebhookModel]:
+        if not webhook_ids:
+            return []
+        with get_db_context(db) as db:
+            webhooks = (
+                db.query(ChannelWebhook)
+                .filter(ChannelWebhook.id.in_(webhook_ids))
+                .all()
+            )
+            return [ChannelWebhookModel.model_validate(webhook) for webhook in webhooks]
+
     def get_webhook_by_id_and_token(
         self, webhook_id: str, token: str, db: Optional[Session] = None
     ) -> Optional[ChannelWebhookModel]:
@@ -9,6 +9,7 @@ from open_webui.internal.db import Base, JSONField, get_db, get_db_context
 from open_webui.models.tags import TagModel, Tag, Tags
 from open_webui.models.folders import Folders
 from open_webui.utils.misc import sanitize_data_for_db, sanitize_text_for_db
+from open_webui.utils.pagination import apply_cursor
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import (
@@ -61,6 +62,8 @@ class Chat(Base):
         Index("user_id_archived_idx", "user_id", "archived"),
         # WHERE user_id = ... ORDER BY updated_at DESC
         Index("updated_at_user_id_idx", "updated_at", "user_id"),
+        # WHERE user_id = ... ORDER BY updated_at DESC, id DESC (keyset pagination)
+        Index("user_id_updated_at_id_idx", "user_id", "updated_at", "id"),
         # WHERE folder_id = ... AND user_id = ...
         Index("folder_id_user_id_idx", "folder_id", "user_id"),
     )
@@ -640,6 +643,7 @@ class ChatTable:
         filter: Optional[dict] = None,
         skip: int = 0,
         limit: int = 50,
+        cursor: Optional[str] = None,
         db: Optional[Session] = None,
     ) -> list[ChatModel]:
 
@@ -664,10 +668,13 @@ class ChatTable:
                         query = query.order_by(getattr(Chat, order_by).desc())
                     else:
                         raise ValueError("Invalid direction for ordering")
+                    cursor = None  # cursors only follow the default order
+                else:
+                    query = apply_cursor(query, [Chat.updated_at, Chat.id], cursor)
             else:
-                query = query.order_by(Chat.updated_at.desc())
+                query = apply_cursor(query, [Chat.updated_at, Chat.id], cursor)
 
-            if skip:
+            if skip and not cursor:
                 query = query.offset(skip)
             if limit:
                 query = query.limit(limit)
@@ -682,6 +689,7 @@ class ChatTable:
         filter: Optional[dict] = None,
         skip: int = 0,
         limit: int = 50,
+        cursor: Optional[str] = None,
         db: Optional[Session] = None,
     ) -> list[ChatModel]:
         with get_db_context(db) as db:
@@ -704,10 +712,13 @@ class ChatTable:
                         query = query.order_by(getattr(Chat, order_by).desc())
                     else:
                         raise ValueError("Invalid direction for ordering")
+                    cursor = None  # cursors only follow the default order
+                else:
+                    query = apply_cursor(query, [Chat.updated_at, Chat.id], cursor)
             else:
-                query = query.order_by(Chat.updated_at.desc())
+                query = apply_cursor(query, [Chat.updated_at, Chat.id], cursor)
 
-            if skip:
+            if skip and not cursor:
                 query = query.offset(skip)
             if limit:
                 query = query.limit(limit)
@@ -723,6 +734,7 @@ class ChatTable:
         include_pinned: bool = False,
         skip: Optional[int] = None,
         limit: Optional[int] = None,
+        cursor: Optional[str] = None,
         db: Optional[Session] = None,
     ) -> list[ChatTitleIdResponse]:
         with get_db_context(db) as db:
@@ -737,11 +749,11 @@ class ChatTable:
             if not include_archived:
                 query = query.filter_by(archived=False)
 
-            query = query.order_by(Chat.updated_at.desc()).with_entities(
-                Chat.id, Chat.title, Chat.updated_at, Chat.created_at
-            )
+            query = apply_cursor(
+                query, [Chat.updated_at, Chat.id], cursor
+            ).with_entities(Chat.id, Chat.title, Chat.updated_at, Chat.created_at)
 
-            if skip:
+            if skip and not cursor:
                 query = query.offset(skip)
             if limit:
                 query = query.limit(limit)
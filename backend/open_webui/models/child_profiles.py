@@ -14,7 +14,9 @@ from sqlalchemy import (
     Boolean,
     Integer,
     inspect,
+    select,
 )
+from sqlalchemy.ext.asyncio import AsyncSession
 from open_webui.internal.db import JSONField
 
 log = logging.getLogger(__name__)
@@ -256,6 +258,18 @@ class ChildProfileTable:
 
             return ChildProfileModel.model_validate(profile) if profile else None
 
+    async def get_child_profile_by_id_async(
+        self, db: AsyncSession, profile_id: str, user_id: str
+    ) -> Optional[ChildProfileModel]:
+        profile = (
+            await db.execute(
+                select(ChildProfile)
+                .where(ChildProfile.id == profile_id, ChildProfile.user_id == user_id)
+                .limit(1)
+            )
+        ).scalar()
+        return ChildProfileModel.model_validate(profile) if profile else None
+
     def update_child_profile_by_id(
         self, profile_id: str, user_id: str, updated: ChildProfileForm
     ) -> Optional[ChildProfileModel]:
@@ -351,6 +365,19 @@ class ChildProfileTable:
             )
             return ChildProfileModel.model_validate(profile) if profile else None
 
+    async def get_latest_child_profile_any_async(
+        self, db: AsyncSession, user_id: str
+    ) -> Optional[ChildProfileModel]:
+        profile = (
+            await db.execute(
+                select(ChildProfile)
+                .where(ChildProfile.user_id == user_id)
+                .order_by(ChildProfile.updated_at.desc())
+                .limit(1)
+            )
+        ).scalar()
+        return ChildProfileModel.model_validate(profile) if profile else None
+
     def clone_current_profile_for_session(
         self, user_id: str, new_session_id: str
     ) -> Optional[ChildProfileModel]:
@@ -73,6 +73,8 @@ class LeaderboardFeedbackData(BaseModel):
 
     id: str
     data: Optional[dict] = None
+    created_at: Optional[int] = None
+    updated_at: Optional[int] = None
 
 
 class RatingData(BaseModel):
@@ -290,15 +292,33 @@ class FeedbackTable:
             ]
 
     def get_feedbacks_for_leaderboard(
-        self, db: Optional[Session] = None
+        self, updated_since: Optional[int] = None, db: Optional[Session] = None
     ) -> list[LeaderboardFeedbackData]:
-        """Fetch only id and data for leaderboard computation (excludes snapshot/meta)."""
+        """
+        Fetch only id, data and timestamps for leaderboard computation (excludes
+        snapshot/meta) in creation order, optionally only rows updated at or
+        after updated_since.
+        """
         with get_db_context(db) as db:
+            query = db.query(
+                Feedback.id, Feedback.data, Feedback.created_at, Feedback.updated_at
+            )
+            if updated_since is not None:
+                query = query.filter(Feedback.updated_at >= updated_since)
             return [
-                LeaderboardFeedbackData(id=row.id, data=row.data)
-                for row in db.query(Feedback.id, Feedback.data).all()
+                LeaderboardFeedbackData(
+                    id=row.id,
+                    data=row.data,
+                    created_at=row.created_at,
+                    updated_at=row.updated_at,
+                )
+                for row in query.order_by(Feedback.created_at).all()
             ]
 
+    def get_feedback_count(self, db: Optional[Session] = None) -> int:
+        with get_db_context(db) as db:
+            return db.query(Feedback).count()
+
     def get_model_evaluation_history(
         self, model_id: str, days: int = 30, db: Optional[Session] = None
     ) -> list[ModelHistoryEntry]:
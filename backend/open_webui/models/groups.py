@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from open_webui.internal.db import Base, JSONField, get_db, get_db_context
 
 from open_webui.models.files import FileMetadataResponse
+from open_webui.utils.access_index import ACCESS_INDEX
 
 
 from pydantic import BaseModel, ConfigDict
@@ -270,6 +271,17 @@ class GroupTable:
                 .all()
             ]
 
+    def get_group_ids_by_member_id(
+        self, user_id: str, db: Optional[Session] = None
+    ) -> list[str]:
+        with get_db_context(db) as db:
+            return [
+                group_id
+                for (group_id,) in db.query(GroupMember.group_id)
+                .filter(GroupMember.user_id == user_id)
+                .all()
+            ]
+
     def get_groups_by_member_ids(
         self, user_ids: list[str], db: Optional[Session] = None
     ) -> dict[str, list[GroupModel]]:
@@ -355,6 +367,7 @@ class GroupTable:
 
             db.add_all(new_members)
             db.commit()
+            ACCESS_INDEX.invalidate_user_groups()
 
     def get_group_member_count_by_id(
         self, id: str, db: Optional[Session] = None
@@ -393,6 +406,7 @@ class GroupTable:
             with get_db_context(db) as db:
                 db.query(Group).filter_by(id=id).delete()
                 db.commit()
+                ACCESS_INDEX.invalidate_user_groups()
                 return True
         except Exception:
             return False
@@ -402,6 +416,7 @@ class GroupTable:
             try:
                 db.query(Group).delete()
                 db.commit()
+                ACCESS_INDEX.invalidate_user_groups()
 
                 return True
             except Exception:
@@ -431,6 +446,7 @@ class GroupTable:
                     )
 
                 db.commit()
+                ACCESS_INDEX.invalidate_user_groups([user_id])
                 return True
 
             except Exception:
@@ -524,6 +540,7 @@ class GroupTable:
                     )
 
                 db.commit()
+                ACCESS_INDEX.invalidate_user_groups([user_id])
                 return True
 
             except Exception as e:
@@ -565,6 +582,7 @@ class GroupTable:
                 group.updated_at = now
                 db.commit()
                 db.refresh(group)
+                ACCESS_INDEX.invalidate_user_groups(user_ids or [])
 
                 return GroupModel.model_validate(group)
 
@@ -598,6 +616,7 @@ class GroupTable:
 
                 db.commit()
                 db.refresh(group)
+                ACCESS_INDEX.invalidate_user_groups(user_ids)
                 return GroupModel.model_validate(group)
 
         except Exception as e:
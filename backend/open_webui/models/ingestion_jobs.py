@@ -0,0 +1,394 @@
+import logging
+import time
+import uuid
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Index, Integer, Text, func
+from sqlalchemy.orm import Session
+
+from open_webui.internal.db import Base, get_db_context
+
+log = logging.getLogger(__name__)
+
+STALE_JOB_ERROR = "Worker stopped while processing the file"
+
+####################
+# DB MODEL
+####################
+
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_job"
+
+    id = Column(Text, primary_key=True, unique=True)
+    file_id = Column(Text, nullable=False)
+    user_id = Column(Text, nullable=False)
+
+    # queued -> running -> completed | failed (running -> queued on retry)
+    status = Column(Text, nullable=False)
+    # Progress within a running job: parsing, embedding
+    stage = Column(Text, nullable=True)
+    priority = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    error = Column(Text, nullable=True)
+
+    available_at = Column(BigInteger, nullable=False)
+    locked_by = Column(Text, nullable=True)
+    locked_at = Column(BigInteger, nullable=True)
+
+    created_at = Column(BigInteger, nullable=False)
+    updated_at = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        Index("idx_ingestion_job_status_available", "status", "available_at"),
+        Index("idx_ingestion_job_file_id", "file_id"),
+        Index("idx_ingestion_job_user_status", "user_id", "status"),
+    )
+
+
+class IngestionJobModel(BaseModel):
+    id: str
+    file_id: str
+    user_id: str
+    status: str
+    stage: Optional[str] = None
+    priority: int = 0
+    attempts: int = 0
+    max_attempts: int
+    error: Optional[str] = None
+
+    available_at: int  # timestamp in epoch
+    locked_by: Optional[str] = None
+    locked_at: Optional[int] = None  # timestamp in epoch
+
+    created_at: int  # timestamp in epoch (ns), orders jobs within a priority
+    updated_at: int  # timestamp in epoch (ns)
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+####################
+# Forms
+####################
+
+
+class IngestionJobProgress(BaseModel):
+    status: str
+    stage: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    position: Optional[int] = None
+
+
+class IngestionJobTable:
+    def enqueue(
+        self,
+        file_id: str,
+        user_id: str,
+        max_attempts: int,
+        priority: int = 0,
+        db: Optional[Session] = None,
+    ) -> IngestionJobModel:
+        with get_db_context(db) as db:
+            now = int(time.time())
+            job = IngestionJob(
+                id=str(uuid.uuid4()),
+                file_id=file_id,
+                user_id=user_id,
+                status="queued",
+                priority=priority,
+                attempts=0,
+                max_attempts=max_attempts,
+                available_at=now,
+                created_at=time.time_ns(),
+                updated_at=time.time_ns(),
+            )
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            return IngestionJobModel.model_validate(job)
+
+    def claim_next(
+        self, worker_id: str, db: Optional[Session] = None
+    ) -> Optional[IngestionJobModel]:
+        """
+        Lock the next job for a worker.
+
+        Higher priorities go first. Within a priority, the user with the fewest
+        running jobs, then the one served least recently, is picked, so one
+        user's bulk upload cannot starve everybody else. Claims are a
+        conditional UPDATE, so concurrent workers never run the same job.
+        """
+        with get_db_context(db) as db:
+            now = int(time.time())
+            available = db.query(IngestionJob).filter(
+                IngestionJob.status == "queued", IngestionJob.available_at <= now
+            )
+
+            for _ in range(5):
+                priority = available.with_entities(
+                    func.max(IngestionJob.priority)
+                ).scalar()
+                if priority is None:
+                    return None
+
+                oldest_by_user = dict(
+                    available.filter(IngestionJob.priority == priority)
+                    .with_entities(
+                        IngestionJob.user_id, func.min(IngestionJob.created_at)
+                    )
+                    .group_by(IngestionJob.user_id)
+                    .all()
+                )
+                user_ids = list(oldest_by_user.keys())
+                running = dict(
+                    db.query(IngestionJob.user_id, func.count(IngestionJob.id))
+                    .filter(
+                        IngestionJob.status == "running",
+                        IngestionJob.user_id.in_(user_ids),
+                    )
+                    .group_by(IngestionJob.user_id)
+                    .all()
+                )
+                last_served = dict(
+                    db.query(IngestionJob.user_id, func.max(IngestionJob.locked_at))
+                    .filter(IngestionJob.user_id.in_(user_ids))
+                    .group_by(IngestionJob.user_id)
+                    .all()
+                )
+                user_id = min(
+                    user_ids,
+                    key=lambda u: (
+                        running.get(u, 0),
+                        last_served.get(u) or 0,
+                        oldest_by_user[u],
+                    ),
+                )
+
+                job = (
+                    available.filter(
+                        IngestionJob.priority == priority,
+                        IngestionJob.user_id == user_id,
+                    )
+                    .order_by(IngestionJob.created_at)
+                    .first()
+                )
+                if job is None:
+                    continue
+
+                claimed = (
+                    db.query(IngestionJob)
+                    .filter(IngestionJob.id == job.id, IngestionJob.status == "queued")
+                    .update(
+                        {
+                            "status": "running",
+                            "stage": None,
+                            "attempts": IngestionJob.attempts + 1,
+                            "locked_by": worker_id,
+                            "locked_at": now,
+                            "updated_at": time.time_ns(),
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+                if claimed:
+                    return self.get_job_by_id(job.id, db=db)
+
+            return None
+
+    def get_job_by_id(
+        self, id: str, db: Optional[Session] = None
+    ) -> Optional[IngestionJobModel]:
+        with get_db_context(db) as db:
+            job = db.query(IngestionJob).filter_by(id=id).first()
+            return IngestionJobModel.model_validate(job) if job else None
+
+    def get_latest_job_by_file_id(
+        self, file_id: str, db: Optional[Session] = None
+    ) -> Optional[IngestionJobModel]:
+        with get_db_context(db) as db:
+            job = (
+                db.query(IngestionJob)
+                .filter_by(file_id=file_id)
+                .order_by(IngestionJob.created_at.desc())
+                .first()
+            )
+            return IngestionJobModel.model_validate(job) if job else None
+
+    def get_progress_by_file_id(
+        self, file_id: str, db: Optional[Session] = None
+    ) -> Optional[IngestionJobProgress]:
+        with get_db_context(db) as db:
+            job = self.get_latest_job_by_file_id(file_id, db=db)
+            if job is None:
+                return None
+
+            position = None
+            if job.status == "queued":
+                # Approximate: fairness may reorder jobs of different users
+                position = (
+                    db.query(func.count(IngestionJob.id))
+                    .filter(
+                        IngestionJob.status == "queued",
+                        (IngestionJob.priority > job.priority)
+                        | (
+                            (IngestionJob.priority == job.priority)
+                            & (IngestionJob.created_at < job.created_at)
+                        ),
+                    )
+                    .scalar()
+                )
+            return IngestionJobProgress(
+                status=job.status,
+                stage=job.stage,
+                attempts=job.attempts,
+                max_attempts=job.max_attempts,
+                position=position,
+            )
+
+    def update_stage(self, id: str, stage: str, db: Optional[Session] = None) -> None:
+        """Record progress; also serves as the worker heartbeat."""
+        with get_db_context(db) as db:
+            now = int(time.time())
+            db.query(IngestionJob).filter_by(id=id).update(
+                {"stage": stage, "locked_at": now, "updated_at": time.time_ns()}
+            )
+            db.commit()
+
+    def heartbeat(self, id: str, worker_id: str, db: Optional[Session] = None) -> bool:
+        """
+        Keep a running job locked by its worker. Returns False once the job is
+        no longer held by this worker, e.g. after it was requeued.
+        """
+        with get_db_context(db) as db:
+            updated = (
+                db.query(IngestionJob)
+                .filter(
+                    IngestionJob.id == id,
+                    IngestionJob.status == "running",
+                    IngestionJob.locked_by == worker_id,
+                )
+                .update({"locked_at": int(time.time())}, synchronize_session=False)
+            )
+            db.commit()
+            return bool(updated)
+
+    def complete(self, id: str, worker_id: str, db: Optional[Session] = None) -> bool:
+        """
+        Mark a job completed. Returns False, leaving the job untouched, if it is
+        no longer held by this worker.
+        """
+        with get_db_context(db) as db:
+            updated = (
+                db.query(IngestionJob)
+                .filter(
+                    IngestionJob.id == id,
+                    IngestionJob.status == "running",
+                    IngestionJob.locked_by == worker_id,
+                )
+                .update(
+                    {
+                        "status": "completed",
+                        "stage": None,
+                        "error": None,
+                        "locked_by": None,
+                        "updated_at": time.time_ns(),
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return bool(updated)
+
+    def fail(
+        self,
+        id: str,
+        worker_id: str,
+        error: str,
+        retry_delay: int,
+        retry: bool = True,
+        db: Optional[Session] = None,
+    ) -> Optional[IngestionJobModel]:
+        """
+        Requeue with exponential backoff, or mark failed once attempts run out.
+        Returns None if the job is no longer held by this worker.
+        """
+        with get_db_context(db) as db:
+            job = (
+                db.query(IngestionJob)
+                .filter(
+                    IngestionJob.id == id,
+                    IngestionJob.status == "running",
+                    IngestionJob.locked_by == worker_id,
+                )
+                .first()
+            )
+            if job is None:
+                return None
+
+            now = int(time.time())
+            if retry and job.attempts < job.max_attempts:
+                job.status = "queued"
+                job.available_at = now + retry_delay * 2 ** (job.attempts - 1)
+            else:
+                job.status = "failed"
+            job.stage = None
+            job.error = error
+            job.locked_by = None
+            job.updated_at = time.time_ns()
+            db.commit()
+            db.refresh(job)
+            return IngestionJobModel.model_validate(job)
+
+    def requeue_stale(
+        self, timeout: int, db: Optional[Session] = None
+    ) -> tuple[int, list[str]]:
+        """
+        Return running jobs whose worker stopped heartbeating to the queue.
+
+        Returns the number of requeued jobs and the file ids of the jobs that
+        were marked failed instead, having no attempts left.
+        """
+        with get_db_context(db) as db:
+            now = int(time.time())
+            stale = db.query(IngestionJob).filter(
+                IngestionJob.status == "running",
+                IngestionJob.locked_at < now - timeout,
+            )
+
+            # A job that keeps killing its worker must not loop forever
+            exhausted = stale.filter(IngestionJob.attempts >= IngestionJob.max_attempts)
+            failed = exhausted.with_entities(
+                IngestionJob.id, IngestionJob.file_id
+            ).all()
+            if failed:
+                stale.filter(IngestionJob.id.in_([id for id, _ in failed])).update(
+                    {
+                        "status": "failed",
+                        "stage": None,
+                        "error": STALE_JOB_ERROR,
+                        "locked_by": None,
+                        "updated_at": time.time_ns(),
+                    },
+                    synchronize_session=False,
+                )
+            count = stale.filter(
+                IngestionJob.attempts < IngestionJob.max_attempts
+            ).update(
+                {
+                    "status": "queued",
+                    "stage": None,
+                    "locked_by": None,
+                    "available_at": now,
+                    "updated_at": time.time_ns(),
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+            return count, [file_id for _, file_id in failed]
+
+
+IngestionJobs = IngestionJobTable()
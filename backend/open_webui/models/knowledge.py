@@ -22,6 +22,7 @@ from sqlalchemy import (
     BigInteger,
     Column,
     ForeignKey,
+    Index,
     String,
     Text,
     JSON,
@@ -30,7 +31,9 @@ from sqlalchemy import (
 )
 
 from open_webui.utils.access_control import has_access
+from open_webui.utils.access_index import ACCESS_INDEX
 from open_webui.utils.db.access_control import has_permission
+from open_webui.utils.pagination import apply_cursor, get_next_cursor
 
 log = logging.getLogger(__name__)
 
@@ -69,6 +72,11 @@ class Knowledge(Base):
     created_at = Column(BigInteger)
     updated_at = Column(BigInteger)
 
+    __table_args__ = (
+        # ORDER BY updated_at DESC, id DESC (keyset pagination)
+        Index("knowledge_updated_at_id_idx", "updated_at", "id"),
+    )
+
 
 class KnowledgeModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -148,6 +156,7 @@ class FileUserResponse(FileModelResponse):
 class KnowledgeListResponse(BaseModel):
     items: list[KnowledgeUserModel]
     total: int
+    next_cursor: Optional[str] = None
 
 
 class KnowledgeFileListResponse(BaseModel):
@@ -175,6 +184,7 @@ class KnowledgeTable:
                 db.add(result)
                 db.commit()
                 db.refresh(result)
+                ACCESS_INDEX.invalidate_resource("knowledge")
                 if result:
                     return KnowledgeModel.model_validate(result)
                 else:
@@ -213,6 +223,7 @@ class KnowledgeTable:
         filter: dict,
         skip: int = 0,
         limit: int = 30,
+        cursor: Optional[str] = None,
         db: Optional[Session] = None,
     ) -> KnowledgeListResponse:
         try:
@@ -239,10 +250,11 @@ class KnowledgeTable:
 
                     query = has_permission(db, Knowledge, query, filter)
 
-                query = query.order_by(Knowledge.updated_at.desc())
-
                 total = query.count()
-                if skip:
+                query = apply_cursor(
+                    query, [Knowledge.updated_at, Knowledge.id], cursor
+                )
+                if skip and not cursor:
                     query = query.offset(skip)
                 if limit:
                     query = query.limit(limit)
@@ -266,7 +278,16 @@ class KnowledgeTable:
                         )
                     )
 
-                return KnowledgeListResponse(items=knowledge_bases, total=total)
+                return KnowledgeListResponse(
+                    items=knowledge_bases,
+                    total=total,
+                    next_cursor=get_next_cursor(
+                        knowledge_bases, ["updated_at", "id"], limit
+                    ),
+                )
+        except ValueError:
+            # An invalid cursor, which the routers report as a bad request
+            raise
         except Exception as e:
             print(e)
             return KnowledgeListResponse(items=[], total=0)
@@ -352,16 +373,13 @@ class KnowledgeTable:
         self, user_id: str, permission: str = "write", db: Optional[Session] = None
     ) -> list[KnowledgeUserModel]:
         knowledge_bases = self.get_knowledge_bases(db=db)
-        user_group_ids = {
-            group.id for group in Groups.get_groups_by_member_id(user_id, db=db)
-        }
+        accessible_ids = ACCESS_INDEX.get_accessible_ids(
+            "knowledge", user_id, permission, db=db
+        )
         return [
             knowledge_base
             for knowledge_base in knowledge_bases
-            if knowledge_base.user_id == user_id
-            or has_access(
-                user_id, permission, knowledge_base.access_control, user_group_ids
-            )
+            if knowledge_base.id in accessible_ids
         ]
 
     def get_knowledge_by_id(
@@ -599,6 +617,7 @@ class KnowledgeTable:
                     }
                 )
                 db.commit()
+                ACCESS_INDEX.invalidate_resource("knowledge")
                 return self.get_knowledge_by_id(id=id, db=db)
         except Exception as e:
             log.exception(e)
@@ -627,6 +646,7 @@ class KnowledgeTable:
             with get_db_context(db) as db:
                 db.query(Knowledge).filter_by(id=id).delete()
                 db.commit()
+                ACCESS_INDEX.invalidate_resource("knowledge")
                 return True
         except Exception:
             return False
@@ -636,6 +656,7 @@ class KnowledgeTable:
             try:
                 db.query(Knowledge).delete()
                 db.commit()
+                ACCESS_INDEX.invalidate_resource("knowledge")
 
                 return True
             except Exception:
@@ -643,3 +664,10 @@ class KnowledgeTable:
 
 
 Knowledges = KnowledgeTable()
+
+ACCESS_INDEX.register(
+    "knowledge",
+    lambda db: db.query(
+        Knowledge.id, Knowledge.user_id, Knowledge.access_control
+    ).all(),
+)
@@ -8,10 +8,11 @@ from open_webui.internal.db import Base, JSONField, get_db, get_db_context
 from open_webui.models.tags import TagModel, Tag, Tags
 from open_webui.models.users import Users, User, UserNameResponse
 from open_webui.models.channels import Channels, ChannelMember
+from open_webui.utils.pagination import apply_cursor
 
 
 from pydantic import BaseModel, ConfigDict, field_validator
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Boolean, Column, Index, String, Text, JSON
 from sqlalchemy import or_, func, select, and_, text
 from sqlalchemy.sql import exists
 
@@ -61,6 +62,17 @@ class Message(Base):
     created_at = Column(BigInteger)  # time_ns
     updated_at = Column(BigInteger)  # time_ns
 
+    __table_args__ = (
+        # WHERE channel_id = ... AND parent_id = ... ORDER BY created_at, id
+        Index(
+            "message_channel_parent_created_at_id_idx",
+            "channel_id",
+            "parent_id",
+            "created_at",
+            "id",
+        ),
+    )
+
 
 class MessageModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -174,6 +186,93 @@ class MessageTable:
             db.refresh(result)
             return MessageModel.model_validate(result) if result else None
 
+    def _get_webhook_user_info(
+        self, message: Message, webhooks: dict
+    ) -> Optional[dict]:
+        # Webhook info in meta takes precedence over the message's user_id
+        webhook_info = message.meta.get("webhook") if message.meta else None
+        if not (webhook_info and webhook_info.get("id")):
+            return None
+
+        webhook = webhooks.get(webhook_info.get("id"))
+        if webhook:
+            return {"id": webhook.id, "name": webhook.name, "role": "webhook"}
+        # Webhook was deleted, use placeholder
+        return {
+            "id": webhook_info.get("id"),
+            "name": "Deleted Webhook",
+            "role": "webhook",
+        }
+
+    def _to_reply_to_responses(
+        self, messages: list[Message], db: Session
+    ) -> list[MessageReplyToResponse]:
+        """
+        Build responses for a page of messages. The messages they reply to,
+        the authors of those and all webhooks are fetched in one query each.
+        """
+        reply_to_ids = {message.reply_to_id for message in messages}
+        reply_to_ids.discard(None)
+        reply_to_messages = (
+            {
+                message.id: message
+                for message in db.query(Message)
+                .filter(Message.id.in_(reply_to_ids))
+                .all()
+            }
+            if reply_to_ids
+            else {}
+        )
+
+        webhook_ids = {
+            message.meta["webhook"].get("id")
+            for message in [*messages, *reply_to_messages.values()]
+            if message.meta and message.meta.get("webhook")
+        }
+        webhook_ids.discard(None)
+        webhooks = (
+            {
+                webhook.id: webhook
+                for webhook in Channels.get_webhooks_by_ids(list(webhook_ids), db=db)
+            }
+            if webhook_ids
+            else {}
+        )
+
+        reply_to_user_ids = {message.user_id for message in reply_to_messages.values()}
+        users = (
+            {
+                user.id: user
+                for user in Users.get_users_by_user_ids(list(reply_to_user_ids), db=db)
+            }
+            if reply_to_user_ids
+            else {}
+        )
+
+        def reply_to(message: Message) -> Optional[dict]:
+            reply_to_message = reply_to_messages.get(message.reply_to_id)
+            if reply_to_message is None:
+                return None
+
+            user_info = self._get_webhook_user_info(reply_to_message, webhooks)
+            if user_info is None and reply_to_message.user_id in users:
+                user_info = users[reply_to_message.user_id].model_dump()
+            return {
+                **MessageModel.model_validate(reply_to_message).model_dump(),
+                "user": user_info,
+            }
+
+        return [
+            MessageReplyToResponse.model_validate(
+                {
+                    **MessageModel.model_validate(message).model_dump(),
+                    "user": self._get_webhook_user_info(message, webhooks),
+                    "reply_to_message": reply_to(message),
+                }
+            )
+            for message in messages
+        ]
+
     def get_message_by_id(
         self,
         id: str,
@@ -185,54 +284,25 @@ class MessageTable:
             if not message:
                 return None
 
-            reply_to_message = (
-                self.get_message_by_id(
-                    message.reply_to_id, include_thread_replies=False, db=db
+            response = self._to_reply_to_responses([message], db=db)[0]
+            if response.user is None:
+                user = Users.get_user_by_id(message.user_id, db=db)
+                response.user = (
+                    UserNameResponse.model_validate(user.model_dump()) if user else None
                 )
-                if message.reply_to_id
-                else None
-            )
-
-            reactions = self.get_reactions_by_message_id(id, db=db)
 
-            thread_replies = []
+            thread_stats = {}
             if include_thread_replies:
-                thread_replies = self.get_thread_replies_by_message_id(id, db=db)
-
-            # Check if message was sent by webhook (webhook info in meta takes precedence)
-            webhook_info = message.meta.get("webhook") if message.meta else None
-            if webhook_info and webhook_info.get("id"):
-                # Look up webhook by ID to get current name
-                webhook = Channels.get_webhook_by_id(webhook_info.get("id"), db=db)
-                if webhook:
-                    user_info = {
-                        "id": webhook.id,
-                        "name": webhook.name,
-                        "role": "webhook",
-                    }
-                else:
-                    # Webhook was deleted, use placeholder
-                    user_info = {
-                        "id": webhook_info.get("id"),
-                        "name": "Deleted Webhook",
-                        "role": "webhook",
-                    }
-            else:
-                user = Users.get_user_by_id(message.user_id, db=db)
-                user_info = user.model_dump() if user else None
+                thread_stats = self.get_thread_reply_stats_by_message_ids(
+                    [id], db=db
+                ).get(id, {})
 
             return MessageResponse.model_validate(
                 {
-                    **MessageModel.model_validate(message).model_dump(),
-                    "user": user_info,
-                    "reply_to_message": (
-                        reply_to_message.model_dump() if reply_to_message else None
-                    ),
-                    "latest_reply_at": (
-                        thread_replies[0].created_at if thread_replies else None
-                    ),
-                    "reply_count": len(thread_replies),
-                    "reactions": reactions,
+                    **response.model_dump(),
+                    "latest_reply_at": thread_stats.get("latest_reply_at"),
+                    "reply_count": thread_stats.get("reply_count", 0),
+                    "reactions": self.get_reactions_by_message_id(id, db=db),
                 }
             )
 
@@ -247,47 +317,29 @@ class MessageTable:
                 .all()
             )
 
-            messages = []
-            for message in all_messages:
-                reply_to_message = (
-                    self.get_message_by_id(
-                        message.reply_to_id, include_thread_replies=False, db=db
-                    )
-                    if message.reply_to_id
-                    else None
-                )
+            return self._to_reply_to_responses(all_messages, db=db)
 
-                webhook_info = message.meta.get("webhook") if message.meta else None
-                user_info = None
-                if webhook_info and webhook_info.get("id"):
-                    webhook = Channels.get_webhook_by_id(webhook_info.get("id"), db=db)
-                    if webhook:
-                        user_info = {
-                            "id": webhook.id,
-                            "name": webhook.name,
-                            "role": "webhook",
-                        }
-                    else:
-                        user_info = {
-                            "id": webhook_info.get("id"),
-                            "name": "Deleted Webhook",
-                            "role": "webhook",
-                        }
-
-                messages.append(
-                    MessageReplyToResponse.model_validate(
-                        {
-                            **MessageModel.model_validate(message).model_dump(),
-                            "user": user_info,
-                            "reply_to_message": (
-                                reply_to_message.model_dump()
-                                if reply_to_message
-                                else None
-                            ),
-                        }
-                    )
+    def get_thread_reply_stats_by_message_ids(
+        self, ids: list[str], db: Optional[Session] = None
+    ) -> dict[str, dict]:
+        """Return reply_count and latest_reply_at of each message with replies."""
+        if not ids:
+            return {}
+        with get_db_context(db) as db:
+            results = (
+                db.query(
+                    Message.parent_id,
+                    func.count(Message.id),
+                    func.max(Message.created_at),
                 )
-            return messages
+                .filter(Message.parent_id.in_(ids))
+                .group_by(Message.parent_id)
+                .all()
+            )
+            return {
+                parent_id: {"reply_count": count, "latest_reply_at": latest_reply_at}
+                for parent_id, count, latest_reply_at in results
+            }
 
     def get_reply_user_ids_by_message_id(
         self, id: str, db: Optional[Session] = None
@@ -303,59 +355,20 @@ class MessageTable:
         channel_id: str,
         skip: int = 0,
         limit: int = 50,
+        cursor: Optional[str] = None,
         db: Optional[Session] = None,
     ) -> list[MessageReplyToResponse]:
         with get_db_context(db) as db:
-            all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=None)
-                .order_by(Message.created_at.desc())
-                .offset(skip)
-                .limit(limit)
-                .all()
+            query = apply_cursor(
+                db.query(Message).filter_by(channel_id=channel_id, parent_id=None),
+                [Message.created_at, Message.id],
+                cursor,
             )
+            if not cursor:
+                query = query.offset(skip)
+            all_messages = query.limit(limit).all()
 
-            messages = []
-            for message in all_messages:
-                reply_to_message = (
-                    self.get_message_by_id(
-                        message.reply_to_id, include_thread_replies=False, db=db
-                    )
-                    if message.reply_to_id
-                    else None
-                )
-
-                webhook_info = message.meta.get("webhook") if message.meta else None
-                user_info = None
-                if webhook_info and webhook_info.get("id"):
-                    webhook = Channels.get_webhook_by_id(webhook_info.get("id"), db=db)
-                    if webhook:
-                        user_info = {
-                            "id": webhook.id,
-                            "name": webhook.name,
-                            "role": "webhook",
-                        }
-                    else:
-                        user_info = {
-                            "id": webhook_info.get("id"),
-                            "name": "Deleted Webhook",
-                            "role": "webhook",
-                        }
-
-                messages.append(
-                    MessageReplyToResponse.model_validate(
-                        {
-                            **MessageModel.model_validate(message).model_dump(),
-                            "user": user_info,
-                            "reply_to_message": (
-                                reply_to_message.model_dump()
-                                if reply_to_message
-                                else None
-                            ),
-                        }
-                    )
-                )
-            return messages
+            return self._to_reply_to_responses(all_messages, db=db)
 
     def get_messages_by_parent_id(
         self,
@@ -384,47 +397,7 @@ class MessageTable:
             if len(all_messages) < limit:
                 all_messages.append(message)
 
-            messages = []
-            for message in all_messages:
-                reply_to_message = (
-                    self.get_message_by_id(
-                        message.reply_to_id, include_thread_replies=False, db=db
-                    )
-                    if message.reply_to_id
-                    else None
-                )
-
-                webhook_info = message.meta.get("webhook") if message.meta else None
-                user_info = None
-                if webhook_info and webhook_info.get("id"):
-                    webhook = Channels.get_webhook_by_id(webhook_info.get("id"), db=db)
-                    if webhook:
-                        user_info = {
-                            "id": webhook.id,
-                            "name": webhook.name,
-                            "role": "webhook",
-                        }
-                    else:
-                        user_info = {
-                            "id": webhook_info.get("id"),
-                            "name": "Deleted Webhook",
-                            "role": "webhook",
-                        }
-
-                messages.append(
-                    MessageReplyToResponse.model_validate(
-                        {
-                            **MessageModel.model_validate(message).model_dump(),
-                            "user": user_info,
-                            "reply_to_message": (
-                                reply_to_message.model_dump()
-                                if reply_to_message
-                                else None
-                            ),
-                        }
-                    )
-                )
-            return messages
+            return self._to_reply_to_responses(all_messages, db=db)
 
     def get_last_message_by_channel_id(
         self, channel_id: str, db: Optional[Session] = None
@@ -438,6 +411,20 @@ class MessageTable:
             )
             return MessageModel.model_validate(message) if message else None
 
+    def get_last_message_at_by_channel_ids(
+        self, channel_ids: list[str], db: Optional[Session] = None
+    ) -> dict[str, int]:
+        if not channel_ids:
+            return {}
+        with get_db_context(db) as db:
+            results = (
+                db.query(Message.channel_id, func.max(Message.created_at))
+                .filter(Message.channel_id.in_(channel_ids))
+                .group_by(Message.channel_id)
+                .all()
+            )
+            return {channel_id: created_at for channel_id, created_at in results}
+
     def get_pinned_messages_by_channel_id(
         self,
         channel_id: str,
@@ -508,6 +495,36 @@ class MessageTable:
                 query = query.filter(Message.user_id != user_id)
             return query.count()
 
+    def get_unread_message_counts_by_channel_ids(
+        self, channel_ids: list[str], user_id: str, db: Optional[Session] = None
+    ) -> dict[str, int]:
+        """
+        Count the messages of others posted since the user last read each
+        channel. Channels the user is not a member of are omitted.
+        """
+        if not channel_ids:
+            return {}
+        with get_db_context(db) as db:
+            results = (
+                db.query(Message.channel_id, func.count(Message.id))
+                .join(
+                    ChannelMember,
+                    and_(
+                        ChannelMember.channel_id == Message.channel_id,
+                        ChannelMember.user_id == user_id,
+                    ),
+                )
+                .filter(
+                    Message.channel_id.in_(channel_ids),
+                    Message.parent_id == None,  # only count top-level messages
+                    Message.created_at > func.coalesce(ChannelMember.last_read_at, 0),
+                    Message.user_id != user_id,
+                )
+                .group_by(Message.channel_id)
+                .all()
+            )
+            return {channel_id: count for channel_id, count in results}
+
     def add_reaction_to_message(
         self, id: str, user_id: str, name: str, db: Optional[Session] = None
     ) -> Optional[MessageReactionModel]:
@@ -538,34 +555,45 @@ class MessageTable:
     def get_reactions_by_message_id(
         self, id: str, db: Optional[Session] = None
     ) -> list[Reactions]:
+        return self.get_reactions_by_message_ids([id], db=db).get(id, [])
+
+    def get_reactions_by_message_ids(
+        self, ids: list[str], db: Optional[Session] = None
+    ) -> dict[str, list[Reactions]]:
+        if not ids:
+            return {}
         with get_db_context(db) as db:
             # JOIN User so all user info is fetched in one query
             results = (
                 db.query(MessageReaction, User)
                 .join(User, MessageReaction.user_id == User.id)
-                .filter(MessageReaction.message_id == id)
+                .filter(MessageReaction.message_id.in_(ids))
                 .all()
             )
 
             reactions = {}
 
             for reaction, user in results:
-                if reaction.name not in reactions:
-                    reactions[reaction.name] = {
+                message_reactions = reactions.setdefault(reaction.message_id, {})
+                if reaction.name not in message_reactions:
+                    message_reactions[reaction.name] = {
                         "name": reaction.name,
                         "users": [],
                         "count": 0,
                     }
 
-                reactions[reaction.name]["users"].append(
+                message_reactions[reaction.name]["users"].append(
                     {
                         "id": user.id,
                         "name": user.name,
                     }
                 )
-                reactions[reaction.name]["count"] += 1
+                message_reactions[reaction.name]["count"] += 1
 
-            return [Reactions(**reaction) for reaction in reactions.values()]
+            return {
+                message_id: [Reactions(**reaction) for reaction in by_name.values()]
+                for message_id, by_name in reactions.items()
+            }
 
     def remove_reaction_by_id_and_user_id_and_name(
         self, id: str, user_id: str, name: str, db: Optional[Session] = None
@@ -19,6 +19,7 @@ from sqlalchemy import BigInteger, Column, Text, JSON, Boolean
 
 
 from open_webui.utils.access_control import has_access
+from open_webui.utils.access_index import ACCESS_INDEX
 
 log = logging.getLogger(__name__)
 
@@ -175,6 +176,7 @@ class ModelsTable:
                 db.add(result)
                 db.commit()
                 db.refresh(result)
+                ACCESS_INDEX.invalidate_resource("model")
 
                 if result:
                     return ModelModel.model_validate(result)
@@ -221,15 +223,10 @@ class ModelsTable:
         self, user_id: str, permission: str = "write", db: Optional[Session] = None
     ) -> list[ModelUserResponse]:
         models = self.get_models(db=db)
-        user_group_ids = {
-            group.id for group in Groups.get_groups_by_member_id(user_id, db=db)
-        }
-        return [
-            model
-            for model in models
-            if model.user_id == user_id
-            or has_access(user_id, permission, model.access_control, user_group_ids)
-        ]
+        accessible_ids = ACCESS_INDEX.get_accessible_ids(
+            "model", user_id, permission, db=db
+        )
+        return [model for model in models if model.id in accessible_ids]
 
     def _has_permission(self, db, query, filter: dict, permission: str = "read"):
         group_ids = filter.get("group_ids", [])
@@ -399,6 +396,7 @@ class ModelsTable:
                     }
                 )
                 db.commit()
+                ACCESS_INDEX.invalidate_resource("model")
 
                 return self.get_model_by_id(id, db=db)
             except Exception:
@@ -414,6 +412,7 @@ class ModelsTable:
                 result = db.query(Model).filter_by(id=id).update(data)
 
                 db.commit()
+                ACCESS_INDEX.invalidate_resource("model")
 
                 model = db.get(Model, id)
                 db.refresh(model)
@@ -427,6 +426,7 @@ class ModelsTable:
             with get_db_context(db) as db:
                 db.query(Model).filter_by(id=id).delete()
                 db.commit()
+                ACCESS_INDEX.invalidate_resource("model")
 
                 return True
         except Exception:
@@ -437,6 +437,7 @@ class ModelsTable:
             with get_db_context(db) as db:
                 db.query(Model).delete()
                 db.commit()
+                ACCESS_INDEX.invalidate_resource("model")
 
                 return True
         except Exception:
@@ -480,6 +481,7 @@ class ModelsTable:
                         db.delete(model)
 
                 db.commit()
+                ACCESS_INDEX.invalidate_resource("model")
 
                 return [
                     ModelModel.model_validate(model) for model in db.query(Model).all()
@@ -490,3 +492,7 @@ class ModelsTable:
 
 
 Models = ModelsTable()
+
+ACCESS_INDEX.register(
+    "model", lambda db: db.query(Model.id, Model.user_id, Model.access_control).all()
+)
@@ -2,10 +2,17 @@ import time
 import uuid
 from typing import Dict, Optional, List
 
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, Text, Index, Boolean, Integer
-
-from open_webui.internal.db import Base, JSONField, get_db
+from sqlalchemy import BigInteger, Column, Text, Index, Boolean, Integer, select, update
+
+from open_webui.internal.db import (
+    ASYNC_DB_ENABLED,
+    Base,
+    JSONField,
+    get_async_db,
+    get_db,
+)
 from open_webui.models.users import Users
 
 
@@ -160,6 +167,144 @@ class ModerationSessionForm(BaseModel):
     session_metadata: Optional[dict] = None
 
 
+def _normalize_highlighted_texts(highlighted_texts: Optional[list]) -> Optional[list]:
+    """
+    Rename start_offset/end_offset -> start/end, and convert plain strings to
+    {text, start, end} dicts for notebook compatibility.
+    """
+    if not highlighted_texts:
+        return highlighted_texts
+    normalized: list = []
+    for ht in highlighted_texts:
+        if isinstance(ht, str):
+            normalized.append({"text": ht, "start": -1, "end": -1})
+        elif isinstance(ht, dict):
+            entry = dict(ht)
+            if "start_offset" in entry and "start" not in entry:
+                entry["start"] = entry.pop("start_offset")
+            if "end_offset" in entry and "end" not in entry:
+                entry["end"] = entry.pop("end_offset")
+            normalized.append(entry)
+        else:
+            normalized.append(ht)
+    return normalized
+
+
+def _apply_session_form(
+    obj: ModerationSession,
+    form: ModerationSessionForm,
+    resolved_session_id: str,
+    ts: int,
+) -> None:
+    """Copy the form onto an existing version row (everything but scenario_id)."""
+    obj.scenario_prompt = form.scenario_prompt
+    obj.original_response = form.original_response
+
+    # apply rest of form fields
+    obj.initial_decision = form.initial_decision
+    obj.concern_level = form.concern_level
+    obj.concern_reason = form.concern_reason
+    obj.realism_level = form.realism_level
+    obj.satisfaction_level = form.satisfaction_level
+    obj.satisfaction_reason = form.satisfaction_reason
+    obj.next_action = form.next_action
+    obj.decided_at = form.decided_at
+    obj.highlights_saved_at = form.highlights_saved_at
+    obj.saved_at = form.saved_at
+    # Note: would_show_child column was removed (migration 84b2215f7772)
+    obj.strategies = form.strategies
+    obj.custom_instructions = form.custom_instructions
+    obj.highlighted_texts = form.highlighted_texts
+    obj.refactored_response = form.refactored_response
+    # Only overwrite HTML columns if a new non-None value is provided.
+    # This prevents a later save (e.g. completeStep2) with an empty variable
+    # from overwriting the HTML that was correctly saved by an earlier step.
+    if form.response_highlighted_html is not None:
+        obj.response_highlighted_html = form.response_highlighted_html
+    if form.prompt_highlighted_html is not None:
+        obj.prompt_highlighted_html = form.prompt_highlighted_html
+    obj.is_final_version = bool(form.is_final_version)
+    # Merge session_metadata instead of replacing it to preserve data from previous steps
+    if form.session_metadata:
+        if obj.session_metadata:
+            # Merge existing metadata with new metadata (new values take precedence)
+            merged_metadata = {
+                **obj.session_metadata,
+                **form.session_metadata,
+            }
+            obj.session_metadata = merged_metadata
+        else:
+            obj.session_metadata = form.session_metadata
+    # Ensure session_id remains consistent for this update
+    obj.session_id = resolved_session_id
+    obj.updated_at = ts
+
+
+def _new_session_row(
+    form: ModerationSessionForm, resolved_session_id: str, ts: int
+) -> ModerationSession:
+    """Create a new row for this version; a fresh id avoids overwriting prior versions."""
+    # derive a fallback scenario_id if none was submitted
+    effective_scenario_id = (
+        form.scenario_id
+        if form.scenario_id is not None
+        else f"scenario_{form.scenario_index}"
+    )
+    return ModerationSession(
+        id=str(uuid.uuid4()),
+        user_id=form.user_id,
+        child_id=form.child_id,
+        scenario_index=form.scenario_index,
+        attempt_number=form.attempt_number,
+        version_number=form.version_number,
+        session_id=resolved_session_id,
+        scenario_id=effective_scenario_id,
+        scenario_prompt=form.scenario_prompt,
+        original_response=form.original_response,
+        initial_decision=form.initial_decision,
+        concern_level=form.concern_level,
+        concern_reason=form.concern_reason,
+        realism_level=form.realism_level,
+        satisfaction_level=form.satisfaction_level,
+        satisfaction_reason=form.satisfaction_reason,
+        next_action=form.next_action,
+        decided_at=form.decided_at,
+        highlights_saved_at=form.highlights_saved_at,
+        saved_at=form.saved_at,
+        is_final_version=bool(form.is_final_version),
+        strategies=form.strategies,
+        custom_instructions=form.custom_instructions,
+        highlighted_texts=form.highlighted_texts,
+        refactored_response=form.refactored_response,
+        response_highlighted_html=form.response_highlighted_html,
+        prompt_highlighted_html=form.prompt_highlighted_html,
+        session_metadata=form.session_metadata,
+        created_at=ts,
+        updated_at=ts,
+    )
+
+
+def _session_version_filter(form: ModerationSessionForm, resolved_session_id: str):
+    return (
+        ModerationSession.user_id == form.user_id,
+        ModerationSession.child_id == form.child_id,
+        ModerationSession.scenario_index == form.scenario_index,
+        ModerationSession.attempt_number == form.attempt_number,
+        ModerationSession.version_number == form.version_number,
+        ModerationSession.session_id == resolved_session_id,
+    )
+
+
+def _other_finals_filter(form: ModerationSessionForm, obj_id: str):
+    return (
+        ModerationSession.user_id == form.user_id,
+        ModerationSession.child_id == form.child_id,
+        ModerationSession.scenario_index == form.scenario_index,
+        ModerationSession.attempt_number == form.attempt_number,
+        ModerationSession.id != obj_id,
+    )
+
+
 class ModerationSessionTable:
     def upsert(self, form: ModerationSessionForm) -> ModerationSessionModel:
         """
@@ -208,34 +353,13 @@ class ModerationSessionTable:
             # Try to find an existing row for this specific version within the same session
             obj = (
                 db.query(ModerationSession)
-                .filter(
-                    ModerationSession.user_id == form.user_id,
-                    ModerationSession.child_id == form.child_id,
-                    ModerationSession.scenario_index == form.scenario_index,
-                    ModerationSession.attempt_number == form.attempt_number,
-                    ModerationSession.version_number == form.version_number,
-                    ModerationSession.session_id == resolved_session_id,
-                )
+                .filter(*_session_version_filter(form, resolved_session_id))
                 .first()
             )
 
-            # Normalize highlighted_texts: rename start_offset/end_offset -> start/end,
-            # and convert plain strings to {text, start, end} dicts for notebook compatibility.
-            if form.highlighted_texts:
-                normalized: list = []
-                for ht in form.highlighted_texts:
-                    if isinstance(ht, str):
-                        normalized.append({"text": ht, "start": -1, "end": -1})
-                    elif isinstance(ht, dict):
-                        entry = dict(ht)
-                        if "start_offset" in entry and "start" not in entry:
-                            entry["start"] = entry.pop("start_offset")
-                        if "end_offset" in entry and "end" not in entry:
-                            entry["end"] = entry.pop("end_offset")
-                        normalized.append(entry)
-                    else:
-                        normalized.append(ht)
-                form.highlighted_texts = normalized
+            form.highlighted_texts = _normalize_highlighted_texts(
+                form.highlighted_texts
+            )
 
             if obj:
                 # Update this exact version row
@@ -276,100 +400,16 @@ class ModerationSessionTable:
                         except Exception:
                             obj.scenario_id = f"scenario_{form.scenario_index}"
                     # otherwise keep whatever is already stored
-                obj.scenario_prompt = form.scenario_prompt
-                obj.original_response = form.original_response
-
-                # apply rest of form fields
-                obj.initial_decision = form.initial_decision
-                obj.concern_level = form.concern_level
-                obj.concern_reason = form.concern_reason
-                obj.realism_level = form.realism_level
-                obj.satisfaction_level = form.satisfaction_level
-                obj.satisfaction_reason = form.satisfaction_reason
-                obj.next_action = form.next_action
-                obj.decided_at = form.decided_at
-                obj.highlights_saved_at = form.highlights_saved_at
-                obj.saved_at = form.saved_at
-                # Note: would_show_child column was removed (migration 84b2215f7772)
-                obj.strategies = form.strategies
-                obj.custom_instructions = form.custom_instructions
-                obj.highlighted_texts = form.highlighted_texts
-                obj.refactored_response = form.refactored_response
-                # Only overwrite HTML columns if a new non-None value is provided.
-                # This prevents a later save (e.g. completeStep2) with an empty variable
-                # from overwriting the HTML that was correctly saved by an earlier step.
-                if form.response_highlighted_html is not None:
-                    obj.response_highlighted_html = form.response_highlighted_html
-                if form.prompt_highlighted_html is not None:
-                    obj.prompt_highlighted_html = form.prompt_highlighted_html
-                obj.is_final_version = bool(form.is_final_version)
-                # Merge session_metadata instead of replacing it to preserve data from previous steps
-                if form.session_metadata:
-                    if obj.session_metadata:
-                        # Merge existing metadata with new metadata (new values take precedence)
-                        merged_metadata = {
-                            **obj.session_metadata,
-                            **form.session_metadata,
-                        }
-                        obj.session_metadata = merged_metadata
-                    else:
-                        obj.session_metadata = form.session_metadata
-                # Ensure session_id remains consistent for this update
-                obj.session_id = resolved_session_id
-                obj.updated_at = ts
+                _apply_session_form(obj, form, resolved_session_id, ts)
             else:
-                # Create a new row for this version; generate a fresh id to avoid overwriting prior versions
-                # derive a fallback scenario_id if none was submitted
-                effective_scenario_id = (
-                    form.scenario_id
-                    if form.scenario_id is not None
-                    else f"scenario_{form.scenario_index}"
-                )
-                obj = ModerationSession(
-                    id=str(uuid.uuid4()),
-                    user_id=form.user_id,
-                    child_id=form.child_id,
-                    scenario_index=form.scenario_index,
-                    attempt_number=form.attempt_number,
-                    version_number=form.version_number,
-                    session_id=resolved_session_id,
-                    scenario_id=effective_scenario_id,
-                    scenario_prompt=form.scenario_prompt,
-                    original_response=form.original_response,
-                    initial_decision=form.initial_decision,
-                    concern_level=form.concern_level,
-                    concern_reason=form.concern_reason,
-                    realism_level=form.realism_level,
-                    satisfaction_level=form.satisfaction_level,
-                    satisfaction_reason=form.satisfaction_reason,
-                    next_action=form.next_action,
-                    decided_at=form.decided_at,
-                    highlights_saved_at=form.highlights_saved_at,
-                    saved_at=form.saved_at,
-                    is_final_version=bool(form.is_final_version),
-                    strategies=form.strategies,
-                    custom_instructions=form.custom_instructions,
-                    highlighted_texts=form.highlighted_texts,
-                    refactored_response=form.refactored_response,
-                    response_highlighted_html=form.response_highlighted_html,
-                    prompt_highlighted_html=form.prompt_highlighted_html,
-                    session_metadata=form.session_metadata,
-                    created_at=ts,
-                    updated_at=ts,
-                )
+                obj = _new_session_row(form, resolved_session_id, ts)
                 db.add(obj)
 
             # If marking a final version, clear previous finals for this scenario/attempt
             if form.is_final_version:
                 (
                     db.query(ModerationSession)
-                    .filter(
-                        ModerationSession.user_id == form.user_id,
-                        ModerationSession.child_id == form.child_id,
-                        ModerationSession.scenario_index == form.scenario_index,
-                        ModerationSession.attempt_number == form.attempt_number,
-                        ModerationSession.id != obj.id,
-                    )
+                    .filter(*_other_finals_filter(form, obj.id))
                     .update({"is_final_version": False})
                 )
 
@@ -377,6 +417,78 @@ class ModerationSessionTable:
             db.refresh(obj)
             return ModerationSessionModel.model_validate(obj)
 
+    async def upsert_async(self, form: ModerationSessionForm) -> ModerationSessionModel:
+        """Async variant of `upsert`, run on the async engine."""
+        if not ASYNC_DB_ENABLED:
+            return await run_in_threadpool(self.upsert, form)
+
+        from open_webui.models.scenarios import ScenarioAssignment
+        from open_webui.models.users import User
+
+        async with get_async_db() as db:
+            ts = int(time.time() * 1000)
+
+            user = await db.get(User, form.user_id)
+            resolved_session_id = (
+                form.session_id
+                or (getattr(user, "current_session_id", None) if user else None)
+                or "unknown"
+            )
+
+            if not form.scenario_id:
+                try:
+                    form.scenario_id = (
+                        await db.execute(
+                            select(ScenarioAssignment.scenario_id)
+                            .where(
+                                ScenarioAssignment.participant_id == form.user_id,
+                                ScenarioAssignment.assignment_position
+                                == form.scenario_index,
+                                ScenarioAssignment.attempt_number
+                                == form.attempt_number,
+                            )
+                            .limit(1)
+                        )
+                    ).scalar() or None
+                except Exception:
+                    pass
+
+            obj = (
+                await db.execute(
+                    select(ModerationSession)
+                    .where(*_session_version_filter(form, resolved_session_id))
+                    .limit(1)
+                )
+            ).scalar()
+
+            form.highlighted_texts = _normalize_highlighted_texts(
+                form.highlighted_texts
+            )
+
+            if obj:
+                if form.scenario_id is not None:
+                    obj.scenario_id = form.scenario_id
+                elif obj.scenario_id is None or obj.scenario_id.startswith("scenario_"):
+                    # The assignment lookup above already came back empty
+                    obj.scenario_id = f"scenario_{form.scenario_index}"
+                _apply_session_form(obj, form, resolved_session_id, ts)
+            else:
+                obj = _new_session_row(form, resolved_session_id, ts)
+                db.add(obj)
+
+            if form.is_final_version:
+                await db.flush()
+                await db.execute(
+                    update(ModerationSession)
+                    .where(*_other_finals_filter(form, obj.id))
+                    .values(is_final_version=False)
+                    .execution_options(synchronize_session=False)
+                )
+
+            await db.commit()
+            await db.refresh(obj)
+            return ModerationSessionModel.model_validate(obj)
+
     def get_sessions_by_user(
         self,
         user_id: str,
@@ -395,6 +507,30 @@ class ModerationSessionTable:
             rows = query.order_by(ModerationSession.created_at.desc()).all()
             return [ModerationSessionModel.model_validate(row) for row in rows]
 
+    async def get_sessions_by_user_async(
+        self,
+        user_id: str,
+        child_id: Optional[str] = None,
+        attempt_number: Optional[int] = None,
+    ) -> List[ModerationSessionModel]:
+        if not ASYNC_DB_ENABLED:
+            return await run_in_threadpool(
+                self.get_sessions_by_user, user_id, child_id, attempt_number
+            )
+
+        async with get_async_db() as db:
+            query = select(ModerationSession).where(
+                ModerationSession.user_id == user_id
+            )
+            if child_id:
+                query = query.where(ModerationSession.child_id == child_id)
+            if attempt_number is not None:
+                query = query.where(ModerationSession.attempt_number == attempt_number)
+            rows = (
+                await db.execute(query.order_by(ModerationSession.created_at.desc()))
+            ).scalars()
+            return [ModerationSessionModel.model_validate(row) for row in rows]
+
     def get_session_by_id(
         self, session_id: str, user_id: str
     ) -> Optional[ModerationSessionModel]:
@@ -526,6 +662,45 @@ class ModerationSessionActivityTable:
             db.refresh(obj)
             return ModerationSessionActivityModel.model_validate(obj)
 
+    async def add_activity_async(
+        self, form: ModerationSessionActivityForm
+    ) -> ModerationSessionActivityModel:
+        """Async variant of `add_activity`, run on the async engine."""
+        if not ASYNC_DB_ENABLED:
+            return await run_in_threadpool(self.add_activity, form)
+
+        async with get_async_db() as db:
+            ts = int(time.time() * 1000)
+            attempt = form.attempt_number or 1
+            last_cum = (
+                await db.execute(
+                    select(ModerationSessionActivity.cumulative_ms)
+                    .where(
+                        ModerationSessionActivity.user_id == form.user_id,
+                        ModerationSessionActivity.child_id == form.child_id,
+                        ModerationSessionActivity.session_id == form.session_id,
+                        ModerationSessionActivity.attempt_number == attempt,
+                    )
+                    .order_by(ModerationSessionActivity.created_at.desc())
+                    .limit(1)
+                )
+            ).scalar()
+            incoming = max(0, int(form.active_ms_cumulative))
+            delta = max(0, incoming - int(last_cum or 0))
+            obj = ModerationSessionActivity(
+                id=str(uuid.uuid4()),
+                user_id=form.user_id,
+                child_id=form.child_id,
+                session_id=form.session_id,
+                attempt_number=attempt,
+                active_ms_delta=delta,
+                cumulative_ms=incoming,
+                created_at=ts,
+            )
+            db.add(obj)
+            await db.commit()
+            return ModerationSessionActivityModel.model_validate(obj)
+
 
 ModerationSessionActivities = ModerationSessionActivityTable()
 
@@ -8,11 +8,12 @@ from sqlalchemy.orm import Session
 from open_webui.internal.db import Base, get_db, get_db_context
 from open_webui.models.groups import Groups
 from open_webui.utils.access_control import has_access
+from open_webui.utils.pagination import apply_cursor
 from open_webui.models.users import User, UserModel, Users, UserResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Boolean, Column, Index, String, Text, JSON
 from sqlalchemy.dialects.postgresql import JSONB
 
 
@@ -39,6 +40,11 @@ class Note(Base):
     created_at = Column(BigInteger)
     updated_at = Column(BigInteger)
 
+    __table_args__ = (
+        # ORDER BY updated_at DESC, id DESC (keyset pagination)
+        Index("note_updated_at_id_idx", "updated_at", "id"),
+    )
+
 
 class NoteModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -347,6 +353,7 @@ class NoteTable:
         permission: str = "read",
         skip: int = 0,
         limit: int = 50,
+        cursor: Optional[str] = None,
         db: Optional[Session] = None,
     ) -> list[NoteModel]:
         with get_db_context(db) as db:
@@ -354,12 +361,12 @@ class NoteTable:
                 group.id for group in Groups.get_groups_by_member_id(user_id, db=db)
             ]
 
-            query = db.query(Note).order_by(Note.updated_at.desc())
+            query = apply_cursor(db.query(Note), [Note.updated_at, Note.id], cursor)
             query = self._has_permission(
                 db, query, {"user_id": user_id, "group_ids": user_group_ids}, permission
             )
 
-            if skip is not None:
+            if skip is not None and not cursor:
                 query = query.offset(skip)
             if limit is not None:
                 query = query.limit(limit)
@@ -10,6 +10,7 @@ from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
 
 from open_webui.utils.access_control import has_access
+from open_webui.utils.access_index import ACCESS_INDEX
 
 ####################
 # Prompts DB Schema
@@ -92,6 +93,7 @@ class PromptsTable:
                 db.add(result)
                 db.commit()
                 db.refresh(result)
+                ACCESS_INDEX.invalidate_resource("prompt")
                 if result:
                     return PromptModel.model_validate(result)
                 else:
@@ -136,16 +138,11 @@ class PromptsTable:
         self, user_id: str, permission: str = "write", db: Optional[Session] = None
     ) -> list[PromptUserResponse]:
         prompts = self.get_prompts(db=db)
-        user_group_ids = {
-            group.id for group in Groups.get_groups_by_member_id(user_id, db=db)
-        }
+        accessible_commands = ACCESS_INDEX.get_accessible_ids(
+            "prompt", user_id, permission, db=db
+        )
 
-        return [
-            prompt
-            for prompt in prompts
-            if prompt.user_id == user_id
-            or has_access(user_id, permission, prompt.access_control, user_group_ids)
-        ]
+        return [prompt for prompt in prompts if prompt.command in accessible_commands]
 
     def update_prompt_by_command(
         self, command: str, form_data: PromptForm, db: Optional[Session] = None
@@ -158,6 +155,7 @@ class PromptsTable:
                 prompt.access_control = form_data.access_control
                 prompt.timestamp = int(time.time())
                 db.commit()
+                ACCESS_INDEX.invalidate_resource("prompt")
                 return PromptModel.model_validate(prompt)
         except Exception:
             return None
@@ -169,6 +167,7 @@ class PromptsTable:
             with get_db_context(db) as db:
                 db.query(Prompt).filter_by(command=command).delete()
                 db.commit()
+                ACCESS_INDEX.invalidate_resource("prompt")
 
                 return True
         except Exception:
@@ -176,3 +175,8 @@ class PromptsTable:
 
 
 Prompts = PromptsTable()
+
+ACCESS_INDEX.register(
+    "prompt",
+    lambda db: db.query(Prompt.command, Prompt.user_id, Prompt.access_control).all(),
+)
@@ -18,10 +18,14 @@ from sqlalchemy import (
     Float,
     ForeignKey,
     func,
+    select,
     UniqueConstraint,
 )
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import relationship, Session
 
+from fastapi.concurrency import run_in_threadpool
+
 from open_webui.internal.db import Base, get_db
 import logging
 
@@ -270,6 +274,90 @@ class ScenarioAssignmentForm(BaseModel):
     alpha: Optional[float] = 1.0  # Default alpha for weighted sampling
 
 
+def _bump_counter(obj: Scenario, counter_name: str) -> bool:
+    """Increment a counter (n_assigned, n_completed, n_skipped, n_abandoned)"""
+    if counter_name == "n_assigned":
+        obj.n_assigned += 1
+    elif counter_name == "n_completed":
+        obj.n_completed += 1
+    elif counter_name == "n_skipped":
+        obj.n_skipped += 1
+    elif counter_name == "n_abandoned":
+        obj.n_abandoned += 1
+    else:
+        return False
+
+    obj.updated_at = int(time.time() * 1000)
+    return True
+
+
+def _sample_from_eligible(
+    eligible: List[Tuple[ScenarioModel, float]], alpha: float
+) -> Optional[Tuple[ScenarioModel, Dict]]:
+    """
+    Weighted random choice over (scenario, n_assigned) pairs.
+
+    Formula: p(s) ∝ 1/(n_s + 1)^α
+    """
+    if not eligible:
+        return None
+
+    eligible_pool_size = len(eligible)
+
+    # Calculate weights: weight = 1 / (n_assigned + 1)^alpha
+    weights = []
+    for scenario, n_assigned in eligible:
+        weight = 1.0 / math.pow(n_assigned + 1, alpha)
+        weights.append(weight)
+
+    # Calculate total weight for normalization
+    total_weight = sum(weights)
+
+    if total_weight == 0:
+        return None
+
+    # Sample using weighted random selection
+    # Use a more robust approach to handle floating point precision
+    rand_val = random.random() * total_weight
+    cumulative = 0.0
+    selected_idx = None
+
+    for i, weight in enumerate(weights):
+        # Check if rand_val falls within this weight's range [cumulative, cumulative + weight)
+        # For the last item, use <= to handle edge case where rand_val equals total_weight
+        # (shouldn't happen with random.random() but could due to floating point precision)
+        if i == len(weights) - 1:
+            # Last item: use <= to ensure we always select something
+            if rand_val <= cumulative + weight:
+                selected_idx = i
+                break
+        else:
+            # Not last item: use < for half-open interval
+            if rand_val < cumulative + weight:
+                selected_idx = i
+                break
+        cumulative += weight
+
+    # Safety check: ensure we selected a valid index
+    # This should never trigger, but provides a fallback if floating point errors occur
+    if selected_idx is None or selected_idx >= len(eligible):
+        selected_idx = len(eligible) - 1
+
+    selected_scenario, n_assigned_before = eligible[selected_idx]
+    selected_weight = weights[selected_idx]
+    sampling_prob = selected_weight / total_weight
+
+    # Build sampling audit dict
+    sampling_audit = {
+        "eligible_pool_size": eligible_pool_size,
+        "n_assigned_before": n_assigned_before,
+        "weight": selected_weight,
+        "sampling_prob": sampling_prob,
+    }
+
+    return (selected_scenario, sampling_audit)
+
+
 class ScenarioTable:
     def upsert(self, form: ScenarioForm) -> ScenarioModel:
         """Create or update a scenario. Generates scenario_id from content hash if not provided."""
@@ -370,23 +458,26 @@ class ScenarioTable:
 
         db = db_session
         obj = db.query(Scenario).filter(Scenario.scenario_id == scenario_id).first()
-        if not obj:
+        if not obj or not _bump_counter(obj, counter_name):
             return False
 
-        if counter_name == "n_assigned":
-            obj.n_assigned += 1
-        elif counter_name == "n_completed":
-            obj.n_completed += 1
-        elif counter_name == "n_skipped":
-            obj.n_skipped += 1
-        elif counter_name == "n_abandoned":
-            obj.n_abandoned += 1
-        else:
+        if commit:
+            db.commit()
+        return True
+
+    async def increment_counter_async(
+        self,
+        db: AsyncSession,
+        scenario_id: str,
+        counter_name: str,
+        commit: bool = True,
+    ) -> bool:
+        obj = await db.get(Scenario, scenario_id)
+        if not obj or not _bump_counter(obj, counter_name):
             return False
 
-        obj.updated_at = int(time.time() * 1000)
         if commit:
-            db.commit()
+            await db.commit()
         return True
 
     def deactivate_by_set_name(self, set_name: str) -> int:
@@ -504,64 +595,79 @@ class ScenarioTable:
             Tuple of (ScenarioModel, sampling_audit_dict) or None if no eligible scenarios
         """
         eligible = self.get_eligible_scenarios(participant_id, is_active, set_name)
+        return _sample_from_eligible(eligible, alpha)
 
-        if not eligible:
-            return None
-
-        eligible_pool_size = len(eligible)
-
-        # Calculate weights: weight = 1 / (n_assigned + 1)^alpha
-        weights = []
-        for scenario, n_assigned in eligible:
-            weight = 1.0 / math.pow(n_assigned + 1, alpha)
-            weights.append(weight)
-
-        # Calculate total weight for normalization
-        total_weight = sum(weights)
-
-        if total_weight == 0:
-            return None
-
-        # Sample using weighted random selection
-        # Use a more robust approach to handle floating point precision
-        rand_val = random.random() * total_weight
-        cumulative = 0.0
-        selected_idx = None
-
-        for i, weight in enumerate(weights):
-            # Check if rand_val falls within this weight's range [cumulative, cumulative + weight)
-            # For the last item, use <= to handle edge case where rand_val equals total_weight
-            # (shouldn't happen with random.random() but could due to floating point precision)
-            if i == len(weights) - 1:
-                # Last item: use <= to ensure we always select something
-                if rand_val <= cumulative + weight:
-                    selected_idx = i
-                    break
-            else:
-                # Not last item: use < for half-open interval
-                if rand_val < cumulative + weight:
-                    selected_idx = i
-                    break
-            cumulative += weight
-
-        # Safety check: ensure we selected a valid index
-        # This should never trigger, but provides a fallback if floating point errors occur
-        if selected_idx is None or selected_idx >= len(eligible):
-            selected_idx = len(eligible) - 1
+    async def get_eligible_scenarios_async(
+        self,
+        db: AsyncSession,
+        participant_id: str,
+        is_active: bool = True,
+        set_name: Optional[str] = None,
+    ) -> List[Tuple[ScenarioModel, float]]:
+        """Async variant of `get_eligible_scenarios` on the given async session."""
+        excluded_scenario_ids = (
+            await ScenarioAssignments.get_completed_or_skipped_scenario_ids_async(
+                db, participant_id
+            )
+        )
 
-        selected_scenario, n_assigned_before = eligible[selected_idx]
-        selected_weight = weights[selected_idx]
-        sampling_prob = selected_weight / total_weight
+        query = select(Scenario).where(Scenario.is_active == is_active)
+        if set_name:
+            query = query.where(Scenario.set_name == set_name)
+        if excluded_scenario_ids:
+            query = query.where(~Scenario.scenario_id.in_(excluded_scenario_ids))
 
-        # Build sampling audit dict
-        sampling_audit = {
-            "eligible_pool_size": eligible_pool_size,
-            "n_assigned_before": n_assigned_before,
-            "weight": selected_weight,
-            "sampling_prob": sampling_prob,
-        }
+        scenarios = (await db.execute(query)).scalars()
+        return [
+            (ScenarioModel.model_validate(scenario), scenario.n_assigned)
+            for scenario in scenarios
+        ]
 
-        return (selected_scenario, sampling_audit)
+    async def weighted_sample_async(
+        self,
+        db: AsyncSession,
+        participant_id: str,
+        alpha: float = 1.0,
+        is_active: bool = True,
+        set_name: Optional[str] = None,
+    ) -> Optional[Tuple[ScenarioModel, Dict]]:
+        eligible = await self.get_eligible_scenarios_async(
+            db, participant_id, is_active, set_name
+        )
+        return _sample_from_eligible(eligible, alpha)
+
+
+def _new_assignment_row(
+    form: ScenarioAssignmentForm,
+    scenario_id: str,
+    sampling_audit: Optional[dict],
+    attempt_number: int,
+) -> ScenarioAssignment:
+    return ScenarioAssignment(
+        assignment_id=str(uuid.uuid4()),
+        participant_id=form.participant_id,
+        scenario_id=scenario_id,
+        child_profile_id=form.child_profile_id,
+        attempt_number=attempt_number,
+        status=AssignmentStatus.ASSIGNED.value,
+        assigned_at=int(time.time() * 1000),
+        started_at=None,
+        ended_at=None,
+        alpha=form.alpha,
+        eligible_pool_size=(
+            sampling_audit.get("eligible_pool_size") if sampling_audit else None
+        ),
+        n_assigned_before=(
+            sampling_audit.get("n_assigned_before") if sampling_audit else None
+        ),
+        weight=sampling_audit.get("weight") if sampling_audit else None,
+        sampling_prob=(sampling_audit.get("sampling_prob") if sampling_audit else None),
+        assignment_position=form.assignment_position,
+        issue_any=None,
+        skip_stage=None,
+        skip_reason=None,
+        skip_reason_text=None,
+    )
 
 
 class ScenarioAssignmentTable:
@@ -585,41 +691,12 @@ class ScenarioAssignmentTable:
                 )
 
         db = db_session
-        ts = int(time.time() * 1000)
-        assignment_id = str(uuid.uuid4())
-
         # Get attempt_number from form or compute from user's current attempt
         attempt_number = form.attempt_number
         if attempt_number is None:
             attempt_number = _get_current_attempt_number(form.participant_id)
 
-        obj = ScenarioAssignment(
-            assignment_id=assignment_id,
-            participant_id=form.participant_id,
-            scenario_id=scenario_id,
-            child_profile_id=form.child_profile_id,
-            attempt_number=attempt_number,
-            status=AssignmentStatus.ASSIGNED.value,
-            assigned_at=ts,
-            started_at=None,
-            ended_at=None,
-            alpha=form.alpha,
-            eligible_pool_size=(
-                sampling_audit.get("eligible_pool_size") if sampling_audit else None
-            ),
-            n_assigned_before=(
-                sampling_audit.get("n_assigned_before") if sampling_audit else None
-            ),
-            weight=sampling_audit.get("weight") if sampling_audit else None,
-            sampling_prob=(
-                sampling_audit.get("sampling_prob") if sampling_audit else None
-            ),
-            assignment_position=form.assignment_position,
-            issue_any=None,
-            skip_stage=None,
-            skip_reason=None,
-            skip_reason_text=None,
-        )
+        obj = _new_assignment_row(form, scenario_id, sampling_audit, attempt_number)
         db.add(obj)
 
         if commit:
@@ -630,6 +707,32 @@ class ScenarioAssignmentTable:
         db.refresh(obj)
         return ScenarioAssignmentModel.model_validate(obj)
 
+    async def create_async(
+        self,
+        db: AsyncSession,
+        form: ScenarioAssignmentForm,
+        scenario_id: str,
+        sampling_audit: Optional[dict] = None,
+        commit: bool = True,
+    ) -> ScenarioAssignmentModel:
+        """Async variant of `create` on the given async session."""
+        attempt_number = form.attempt_number
+        if attempt_number is None:
+            attempt_number = await run_in_threadpool(
+                _get_current_attempt_number, form.participant_id
+            )
+
+        obj = _new_assignment_row(form, scenario_id, sampling_audit, attempt_number)
+        db.add(obj)
+
+        if commit:
+            await db.commit()
+        else:
+            await db.flush()
+
+        await db.refresh(obj)
+        return ScenarioAssignmentModel.model_validate(obj)
+
     def update_status(
         self,
         assignment_id: str,
@@ -783,6 +886,26 @@ class ScenarioAssignmentTable:
             )
             return [row[0] for row in rows]
 
+    async def get_completed_or_skipped_scenario_ids_async(
+        self, db: AsyncSession, participant_id: str
+    ) -> List[str]:
+        rows = await db.execute(
+            select(ScenarioAssignment.scenario_id)
+            .where(
+                ScenarioAssignment.participant_id == participant_id,
+                ScenarioAssignment.status.in_(
+                    [
+                        AssignmentStatus.COMPLETED.value,
+                        AssignmentStatus.SKIPPED.value,
+                        AssignmentStatus.ASSIGNED.value,
+                        AssignmentStatus.STARTED.value,
+                    ]
+                ),
+            )
+            .distinct()
+        )
+        return list(rows.scalars())
+
     def get_assignments_by_child(
         self,
         child_profile_id: str,
@@ -804,6 +927,24 @@ class ScenarioAssignmentTable:
             rows = query.order_by(ScenarioAssignment.assignment_position.asc()).all()
             return [ScenarioAssignmentModel.model_validate(row) for row in rows]
 
+    async def get_assignments_by_child_async(
+        self,
+        db: AsyncSession,
+        child_profile_id: str,
+        attempt_number: Optional[int] = None,
+    ) -> List[ScenarioAssignmentModel]:
+        query = select(ScenarioAssignment).where(
+            ScenarioAssignment.child_profile_id == child_profile_id
+        )
+        if attempt_number is not None:
+            query = query.where(ScenarioAssignment.attempt_number == attempt_number)
+        rows = (
+            await db.execute(
+                query.order_by(ScenarioAssignment.assignment_position.asc())
+            )
+        ).scalars()
+        return [ScenarioAssignmentModel.model_validate(row) for row in rows]
+
 
 # Global instances
 Scenarios = ScenarioTable()
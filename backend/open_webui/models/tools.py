@@ -11,6 +11,7 @@ from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
 
 from open_webui.utils.access_control import has_access
+from open_webui.utils.access_index import ACCESS_INDEX
 
 log = logging.getLogger(__name__)
 
@@ -136,6 +137,7 @@ class ToolsTable:
                 db.add(result)
                 db.commit()
                 db.refresh(result)
+                ACCESS_INDEX.invalidate_resource("tool")
                 if result:
                     return ToolModel.model_validate(result)
                 else:
@@ -180,16 +182,11 @@ class ToolsTable:
         self, user_id: str, permission: str = "write", db: Optional[Session] = None
     ) -> list[ToolUserModel]:
         tools = self.get_tools(db=db)
-        user_group_ids = {
-            group.id for group in Groups.get_groups_by_member_id(user_id, db=db)
-        }
+        accessible_ids = ACCESS_INDEX.get_accessible_ids(
+            "tool", user_id, permission, db=db
+        )
 
-        return [
-            tool
-            for tool in tools
-            if tool.user_id == user_id
-            or has_access(user_id, permission, tool.access_control, user_group_ids)
-        ]
+        return [tool for tool in tools if tool.id in accessible_ids]
 
     def get_tool_valves_by_id(
         self, id: str, db: Optional[Session] = None
@@ -269,6 +266,7 @@ class ToolsTable:
                     {**updated, "updated_at": int(time.time())}
                 )
                 db.commit()
+                ACCESS_INDEX.invalidate_resource("tool")
 
                 tool = db.query(Tool).get(id)
                 db.refresh(tool)
@@ -281,6 +279,7 @@ class ToolsTable:
             with get_db_context(db) as db:
                 db.query(Tool).filter_by(id=id).delete()
                 db.commit()
+                ACCESS_INDEX.invalidate_resource("tool")
 
                 return True
         except Exception:
@@ -288,3 +287,7 @@ class ToolsTable:
 
 
 Tools = ToolsTable()
+
+ACCESS_INDEX.register(
+    "tool", lambda db: db.query(Tool.id, Tool.user_id, Tool.access_control).all()
+)
@@ -829,5 +829,20 @@ class UsersTable:
                 return user.last_active_at >= three_minutes_ago
             return False
 
+    def get_active_user_ids(
+        self, user_ids: list[str], db: Optional[Session] = None
+    ) -> set[str]:
+        if not user_ids:
+            return set()
+        with get_db_context(db) as db:
+            three_minutes_ago = int(time.time()) - 180
+            return {
+                user_id
+                for (user_id,) in db.query(User.id).filter(
+                    User.id.in_(user_ids),
+                    User.last_active_at >= three_minutes_ago,
+                )
+            }
+
 
 Users = UsersTable()
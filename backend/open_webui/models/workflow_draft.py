@@ -6,7 +6,8 @@ from typing import Any, Optional
 
 from open_webui.internal.db import Base, get_db
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, JSON, Text
+from sqlalchemy import BigInteger, Column, JSON, Text, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class WorkflowDraft(Base):
@@ -47,6 +48,23 @@ def get_draft(
         return WorkflowDraftModel.model_validate(row) if row else None
 
 
+async def get_draft_async(
+    db: AsyncSession, user_id: str, child_id: str, draft_type: str
+) -> Optional[WorkflowDraftModel]:
+    row = (
+        await db.execute(
+            select(WorkflowDraft)
+            .where(
+                WorkflowDraft.user_id == user_id,
+                WorkflowDraft.child_id == child_id,
+                WorkflowDraft.draft_type == draft_type,
+            )
+            .limit(1)
+        )
+    ).scalar()
+    return WorkflowDraftModel.model_validate(row) if row else None
+
+
 def save_draft(
     user_id: str, child_id: str, draft_type: str, data: dict
 ) -> WorkflowDraftModel:
@@ -0,0 +1,613 @@
+import hashlib
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import tempfile
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from open_webui.retrieval.vector.main import GetResult, VectorDBBase, VectorItem
+from open_webui.retrieval.versions import CollectionVersions, Version
+
+log = logging.getLogger(__name__)
+
+# Okapi BM25 parameters. k1 and b are rank_bm25's defaults, but terms are
+# lowercased \w+ tokens and idf is Lucene's, which never goes negative, so
+# scores differ from rank_bm25's. Collections without an index are ranked by
+# InMemoryBM25Index, which scores the same way.
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Map up to 256 MiB of each index file so postings are served from the page cache
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+# SQLite host parameter limit is 999 on older builds
+SQLITE_MAX_PARAMS = 900
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def get_enriched_metadata_text(metadata: Optional[dict]) -> str:
+    """Metadata fields appended to a chunk's text when enriched hybrid search is on."""
+    metadata = metadata or {}
+    metadata_parts = []
+
+    # Add filename (repeat twice for extra weight in BM25 scoring)
+    if metadata.get("name"):
+        filename = metadata["name"]
+        filename_tokens = filename.replace("_", " ").replace("-", " ").replace(".", " ")
+        metadata_parts.append(
+            f"Filename: {filename} {filename_tokens} {filename_tokens}"
+        )
+
+    # Add title if available
+    if metadata.get("title"):
+        metadata_parts.append(f"Title: {metadata['title']}")
+
+    # Add document section headings if available (from markdown splitter)
+    if metadata.get("headings") and isinstance(metadata["headings"], list):
+        headings = " > ".join(str(h) for h in metadata["headings"])
+        metadata_parts.append(f"Section: {headings}")
+
+    # Add source URL/path if available
+    if metadata.get("source"):
+        metadata_parts.append(f"Source: {metadata['source']}")
+
+    # Add snippet for web search results
+    if metadata.get("snippet"):
+        metadata_parts.append(f"Snippet: {metadata['snippet']}")
+
+    return " ".join(metadata_parts)
+
+
+def get_bm25_scores(
+    matches: dict[str, list], n_docs: int, avg_length: float
+) -> dict[str, float]:
+    """BM25 score per document from term -> [(doc_id, tf, doc_length)]."""
+    scores: dict[str, float] = defaultdict(float)
+    for postings in matches.values():
+        df = len(postings)
+        idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        for doc_id, tf, length in postings:
+            scores[doc_id] += idf * (
+                tf
+                * (BM25_K1 + 1)
+                / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length))
+            )
+    return scores
+
+
+def _chunks(values: list, size: int = SQLITE_MAX_PARAMS):
+    for idx in range(0, len(values), size):
+        yield values[idx : idx + size]
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    metadata TEXT,
+    length_text INTEGER NOT NULL,
+    length_meta INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    tf_text INTEGER NOT NULL,
+    tf_meta INTEGER NOT NULL,
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_doc_id ON postings (doc_id);
+CREATE TABLE IF NOT EXISTS stats (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats (key, value) VALUES
+    ('n_docs', 0), ('sum_length_text', 0), ('sum_length_meta', 0),
+    ('epoch', -1), ('version', -1);
+"""
+
+
+class BM25Index:
+    """
+    Sparse BM25 index for one collection, stored in its own SQLite file.
+
+    Postings keep the chunk-text and metadata term frequencies apart so the
+    same index serves both plain and enriched hybrid search. A query only
+    reads the postings of its own terms, so its cost grows with the number
+    of matching chunks rather than with the size of the collection.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @contextmanager
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+            yield conn
+        finally:
+            conn.close()
+
+    def initialize(self) -> None:
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(SCHEMA)
+            conn.commit()
+
+    ####################
+    # Writes
+    ####################
+
+    def add(self, items: Iterable[Any]) -> None:
+        """Insert or replace chunks given as VectorItems or dicts with id, text and metadata."""
+        docs = []
+        postings = []
+        for item in items:
+            if not isinstance(item, dict):
+                item = item.model_dump() if hasattr(item, "model_dump") else vars(item)
+            doc_id = str(item["id"])
+            text = item.get("text") or ""
+            metadata = item.get("metadata") or {}
+
+            text_tf = Counter(tokenize(text))
+            meta_tf = Counter(tokenize(get_enriched_metadata_text(metadata)))
+            docs.append(
+                (
+                    doc_id,
+                    text,
+                    json.dumps(metadata, default=str),
+                    sum(text_tf.values()),
+                    sum(meta_tf.values()),
+                )
+            )
+            postings.extend(
+                (term, doc_id, text_tf.get(term, 0), meta_tf.get(term, 0))
+                for term in text_tf.keys() | meta_tf.keys()
+            )
+
+        if not docs:
+            return
+
+        with self.connect() as conn:
+            # Later duplicates of an id win, as with an upsert
+            unique_docs = list({doc[0]: doc for doc in docs}.values())
+            self._delete_ids(conn, [doc[0] for doc in unique_docs])
+            conn.executemany(
+                "INSERT INTO docs (id, text, metadata, length_text, length_meta) "
+                "VALUES (?, ?, ?, ?, ?)",
+                unique_docs,
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO postings (term, doc_id, tf_text, tf_meta) "
+                "VALUES (?, ?, ?, ?)",
+                postings,
+            )
+            self._update_stats(
+                conn,
+                len(unique_docs),
+                sum(doc[3] for doc in unique_docs),
+                sum(doc[4] for doc in unique_docs),
+            )
+            conn.commit()
+
+    def delete(
+        self, ids: Optional[List[str]] = None, filter: Optional[Dict] = None
+    ) -> bool:
+        """
+        Delete chunks by id or by metadata equality filter.
+
+        Returns False if the filter cannot be expressed here, in which case
+        the caller should drop the index so it is rebuilt from the vector DB.
+        """
+        with self.connect() as conn:
+            if ids:
+                self._delete_ids(conn, [str(i) for i in ids])
+            if filter:
+                if not all(
+                    re.fullmatch(r"[A-Za-z0-9_]+", key)
+                    and isinstance(value, (str, int, float, bool))
+                    for key, value in filter.items()
+                ):
+                    return False
+                clauses = " AND ".join(
+                    f"json_extract(metadata, '$.{key}') = ?" for key in filter
+                )
+                matched = [
+                    row[0]
+                    for row in conn.execute(
+                        f"SELECT id FROM docs WHERE {clauses}", list(filter.values())
+                    )
+                ]
+                self._delete_ids(conn, matched)
+            conn.commit()
+        return True
+
+    def _delete_ids(self, conn: sqlite3.Connection, ids: list[str]) -> None:
+        for chunk in _chunks(ids):
+            placeholders = ",".join("?" * len(chunk))
+            n_docs, length_text, length_meta = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length_text), 0), "
+                f"COALESCE(SUM(length_meta), 0) FROM docs WHERE id IN ({placeholders})",
+                chunk,
+            ).fetchone()
+            if not n_docs:
+                continue
+            conn.execute(
+                f"DELETE FROM postings WHERE doc_id IN ({placeholders})", chunk
+            )
+            conn.execute(f"DELETE FROM docs WHERE id IN ({placeholders})", chunk)
+            self._update_stats(conn, -n_docs, -length_text, -length_meta)
+
+    def _update_stats(self, conn, n_docs: int, length_text: int, length_meta: int):
+        conn.executemany(
+            "UPDATE stats SET value = value + ? WHERE key = ?",
+            [
+                (n_docs, "n_docs"),
+                (length_text, "sum_length_text"),
+                (length_meta, "sum_length_meta"),
+            ],
+        )
+
+    ####################
+    # Reads
+    ####################
+
+    def count(self) -> int:
+        with self.connect() as conn:
+            return conn.execute(
+                "SELECT value FROM stats WHERE key = 'n_docs'"
+            ).fetchone()[0]
+
+    def get_version(self) -> Optional[Version]:
+        """Collection version the index reflects, None if it was never stamped."""
+        with self.connect() as conn:
+            stats = dict(
+                conn.execute(
+                    "SELECT key, value FROM stats WHERE key IN ('epoch', 'version')"
+                )
+            )
+        if stats.get("version", -1) < 0:
+            return None
+        return stats["epoch"], stats["version"]
+
+    def set_version(self, version: Version) -> None:
+        with self.connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO stats (key, value) VALUES (?, ?)",
+                [("epoch", version[0]), ("version", version[1])],
+            )
+            conn.commit()
+
+    def search(self, query: str, k: int, enriched: bool = False) -> list[dict]:
+        """Top-k chunks by BM25 score as dicts with id, score, text and metadata."""
+        terms = list(set(tokenize(query)))
+        if not terms or k <= 0:
+            return []
+
+        with self.connect() as conn:
+            stats = dict(conn.execute("SELECT key, value FROM stats"))
+            n_docs = stats["n_docs"]
+            if n_docs <= 0:
+                return []
+            total_length = stats["sum_length_text"] + (
+                stats["sum_length_meta"] if enriched else 0
+            )
+            avg_length = max(total_length / n_docs, 1e-9)
+
+            # term -> [(doc_id, tf, doc_length)]
+            matches: dict[str, list] = defaultdict(list)
+            for chunk in _chunks(terms):
+                placeholders = ",".join("?" * len(chunk))
+                for (
+                    term,
+                    doc_id,
+                    tf_text,
+                    tf_meta,
+                    length_text,
+                    length_meta,
+                ) in conn.execute(
+                    "SELECT p.term, p.doc_id, p.tf_text, p.tf_meta, "
+                    "d.length_text, d.length_meta "
+                    "FROM postings p JOIN docs d ON d.id = p.doc_id "
+                    f"WHERE p.term IN ({placeholders})",
+                    chunk,
+                ):
+                    tf = tf_text + tf_meta if enriched else tf_text
+                    if tf:
+                        length = length_text + length_meta if enriched else length_text
+                        matches[term].append((doc_id, tf, length))
+
+            scores = get_bm25_scores(matches, n_docs, avg_length)
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            if not top:
+                return []
+
+            top_ids = [doc_id for doc_id, _ in top]
+            placeholders = ",".join("?" * len(top_ids))
+            rows = {
+                doc_id: (text, metadata)
+                for doc_id, text, metadata in conn.execute(
+                    f"SELECT id, text, metadata FROM docs WHERE id IN ({placeholders})",
+                    top_ids,
+                )
+            }
+
+        return [
+            {
+                "id": doc_id,
+                "score": score,
+                "text": rows[doc_id][0],
+                "metadata": json.loads(rows[doc_id][1]) if rows[doc_id][1] else {},
+            }
+            for doc_id, score in top
+            if doc_id in rows
+        ]
+
+
+class InMemoryBM25Index:
+    """
+    The chunks of a GetResult, searched like a BM25Index without writing one.
+
+    Used for hybrid search on collections that have no persisted index, so
+    that both paths tokenize and score a collection the same way.
+    """
+
+    def __init__(self, result: GetResult):
+        # id -> (text, metadata, text term frequencies, metadata term frequencies)
+        self.docs: dict[str, tuple] = {}
+        for doc_id, text, metadata in zip(
+            result.ids[0], result.documents[0], result.metadatas[0]
+        ):
+            self.docs[str(doc_id)] = (
+                text or "",
+                metadata or {},
+                Counter(tokenize(text or "")),
+                Counter(tokenize(get_enriched_metadata_text(metadata))),
+            )
+
+    def search(self, query: str, k: int, enriched: bool = False) -> list[dict]:
+        terms = set(tokenize(query))
+        if not terms or k <= 0 or not self.docs:
+            return []
+
+        lengths = {
+            doc_id: sum(text_tf.values()) + (sum(meta_tf.values()) if enriched else 0)
+            for doc_id, (_, _, text_tf, meta_tf) in self.docs.items()
+        }
+        avg_length = max(sum(lengths.values()) / len(self.docs), 1e-9)
+
+        matches: dict[str, list] = defaultdict(list)
+        for doc_id, (_, _, text_tf, meta_tf) in self.docs.items():
+            for term in terms:
+                tf = text_tf.get(term, 0) + (meta_tf.get(term, 0) if enriched else 0)
+                if tf:
+                    matches[term].append((doc_id, tf, lengths[doc_id]))
+
+        scores = get_bm25_scores(matches, len(self.docs), avg_length)
+        return [
+            {
+                "id": doc_id,
+                "score": score,
+                "text": self.docs[doc_id][0],
+                "metadata": self.docs[doc_id][1],
+            }
+            for doc_id, score in heapq.nlargest(
+                k, scores.items(), key=lambda item: item[1]
+            )
+        ]
+
+
+class BM25IndexStore:
+    """
+    Directory of per-collection BM25 index files shared by every worker on the host.
+
+    Each index is stamped with the collection version it reflects. Writes bump
+    the version in `versions`, which is shared across hosts when Redis is
+    configured, so an index that missed a write made elsewhere no longer
+    matches and is rebuilt from the vector DB instead of being served.
+    """
+
+    def __init__(self, directory: str, versions: CollectionVersions):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.versions = versions
+
+    def _path(self, collection_name: str) -> Path:
+        digest = hashlib.sha256(collection_name.encode()).hexdigest()
+        return self.directory / f"{digest}.sqlite"
+
+    def get(self, collection_name: str) -> Optional[BM25Index]:
+        """The collection's index, if it exists and is current."""
+        path = self._path(collection_name)
+        if not path.exists():
+            return None
+        try:
+            index = BM25Index(path)
+            if index.get_version() != self.versions.get(collection_name):
+                return None
+            return index
+        except Exception as e:
+            log.warning(f"Failed to check BM25 index for {collection_name}: {e}")
+            return None
+
+    def create(self, collection_name: str) -> BM25Index:
+        index = BM25Index(self._path(collection_name))
+        index.initialize()
+        return index
+
+    def build(
+        self, collection_name: str, result: Optional[GetResult], version: Version
+    ) -> BM25Index:
+        """
+        Build a complete index from a full collection fetch and swap it in
+        atomically. `version` must be read before the fetch, so that a write
+        racing with it leaves the index stale rather than stamped as current.
+        """
+        items = []
+        if result and result.ids:
+            for doc_id, text, metadata in zip(
+                result.ids[0], result.documents[0], result.metadatas[0]
+            ):
+                items.append({"id": doc_id, "text": text, "metadata": metadata})
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            index = BM25Index(Path(tmp_path))
+            index.initialize()
+            index.add(items)
+            index.set_version(version)
+            with index.connect() as conn:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            path = self._path(collection_name)
+            os.replace(tmp_path, path)
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(tmp_path + suffix):
+                    os.remove(tmp_path + suffix)
+
+        log.info(f"Built BM25 index for {collection_name} ({len(items)} chunks)")
+        return BM25Index(path)
+
+    def drop(self, collection_name: str) -> None:
+        path = str(self._path(collection_name))
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    def reset(self) -> None:
+        for path in self.directory.glob("*.sqlite*"):
+            path.unlink(missing_ok=True)
+        self.versions.bump_all()
+
+
+class BM25IndexedVectorDB(VectorDBBase):
+    """
+    Vector DB client wrapper that mirrors every write into the BM25 index store.
+
+    An index is only created alongside a brand new collection; collections
+    that predate it are indexed on their first hybrid query instead. Every
+    write bumps the collection version; the index is stamped with the new one
+    only if it was current before the write. Any write the index cannot
+    follow drops it so it is rebuilt from the vector DB.
+    """
+
+    def __init__(self, client: VectorDBBase, store: BM25IndexStore):
+        self._client = client
+        self._store = store
+
+    def __getattr__(self, name):
+        # Backend-specific attributes are served by the wrapped client
+        if name.startswith("__") or name in ("_client", "_store"):
+            raise AttributeError(name)
+        return getattr(self._client, name)
+
+    def _bump(self, collection_name: str) -> Optional[Version]:
+        try:
+            return self._store.versions.bump(collection_name)
+        except Exception as e:
+            log.warning(f"Failed to bump collection version of {collection_name}: {e}")
+            return None
+
+    def _mirror(
+        self,
+        collection_name: str,
+        index: Optional[BM25Index],
+        previous: Optional[Version],
+        fn,
+    ) -> None:
+        """Bump the collection version after a write, then follow it in the index."""
+        version = self._bump(collection_name)
+        if index is None:
+            return
+        try:
+            if (
+                version is None
+                or fn() is False
+                or version != (previous[0], previous[1] + 1)
+            ):
+                # The index cannot follow the write, or missed another one
+                self._store.drop(collection_name)
+            else:
+                index.set_version(version)
+        except Exception as e:
+            log.warning(f"Dropping BM25 index for {collection_name}: {e}")
+            self._store.drop(collection_name)
+
+    def _write(self, method: str, collection_name: str, items: List[VectorItem]):
+        index = self._store.get(collection_name)
+        previous = None
+        if index is not None:
+            previous = index.get_version()
+        elif not self._client.has_collection(collection_name=collection_name):
+            # A brand new collection starts with an empty index
+            previous = self._store.versions.get(collection_name)
+            index = self._store.create(collection_name)
+            index.set_version(previous)
+
+        try:
+            getattr(self._client, method)(collection_name=collection_name, items=items)
+        except Exception:
+            # The write may have partially applied, leave the index stale
+            self._bump(collection_name)
+            raise
+        self._mirror(collection_name, index, previous, lambda: index.add(items))
+
+    def has_collection(self, collection_name: str) -> bool:
+        return self._client.has_collection(collection_name=collection_name)
+
+    def delete_collection(self, collection_name: str) -> None:
+        try:
+            self._client.delete_collection(collection_name=collection_name)
+        finally:
+            self._bump(collection_name)
+            self._store.drop(collection_name)
+
+    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        self._write("insert", collection_name, items)
+
+    def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        self._write("upsert", collection_name, items)
+
+    def search(self, collection_name, vectors, filter=None, limit=10):
+        return self._client.search(
+            collection_name=collection_name, vectors=vectors, filter=filter, limit=limit
+        )
+
+    def query(self, collection_name, filter, limit=None):
+        return self._client.query(
+            collection_name=collection_name, filter=filter, limit=limit
+        )
+
+    def get(self, collection_name: str) -> Optional[GetResult]:
+        return self._client.get(collection_name=collection_name)
+
+    def delete(self, collection_name, ids=None, filter=None) -> None:
+        index = self._store.get(collection_name)
+        previous = index.get_version() if index is not None else None
+        try:
+            self._client.delete(collection_name=collection_name, ids=ids, filter=filter)
+        except Exception:
+            self._bump(collection_name)
+            raise
+        self._mirror(
+            collection_name,
+            index,
+            previous,
+            lambda: index.delete(ids=ids, filter=filter),
+        )
+
+    def reset(self) -> None:
+        self._client.reset()
+        self._store.reset()
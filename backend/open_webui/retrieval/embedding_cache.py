@@ -0,0 +1,277 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from open_webui.config import (
+    ENABLE_RAG_EMBEDDING_CACHE,
+    RAG_EMBEDDING_CACHE_DTYPE,
+    RAG_EMBEDDING_CACHE_MAX_SIZE_MB,
+    RAG_EMBEDDING_CACHE_PATH,
+)
+
+log = logging.getLogger(__name__)
+
+# struct format characters for the supported on-disk layouts
+VECTOR_FORMATS = {"float16": "e", "float32": "f"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key BLOB PRIMARY KEY,
+    dtype TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used);
+CREATE TABLE IF NOT EXISTS stats (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Keep the stored size in step with the embeddings table, so eviction reads a
+# single row instead of summing every vector
+SIZE_TRIGGERS = """
+INSERT OR IGNORE INTO stats (key, value)
+    SELECT 'size_bytes', COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings;
+CREATE TRIGGER IF NOT EXISTS embeddings_size_insert AFTER INSERT ON embeddings
+BEGIN
+    UPDATE stats SET value = value + LENGTH(NEW.vector) WHERE key = 'size_bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS embeddings_size_delete AFTER DELETE ON embeddings
+BEGIN
+    UPDATE stats SET value = value - LENGTH(OLD.vector) WHERE key = 'size_bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS embeddings_size_update AFTER UPDATE OF vector ON embeddings
+BEGIN
+    UPDATE stats
+    SET value = value - LENGTH(OLD.vector) + LENGTH(NEW.vector)
+    WHERE key = 'size_bytes';
+END;
+"""
+
+# SQLite host parameter limit is 999 on older builds
+SQLITE_MAX_PARAMS = 900
+
+
+def get_embedding_cache_key(
+    engine: str, model: str, prefix: Optional[str], text: str, url: str = ""
+) -> bytes:
+    return hashlib.sha256(
+        "\0".join((engine or "", url or "", model or "", prefix or "", text)).encode()
+    ).digest()
+
+
+def pack_vector(vector: list[float], dtype: str) -> bytes:
+    return struct.pack(f"<{len(vector)}{VECTOR_FORMATS[dtype]}", *vector)
+
+
+def unpack_vector(blob: bytes, dtype: str, dim: int) -> list[float]:
+    return list(struct.unpack(f"<{dim}{VECTOR_FORMATS[dtype]}", blob))
+
+
+class EmbeddingCache:
+    """
+    Disk-backed LRU cache of chunk embeddings keyed on
+    (engine, base URL, model, prefix, sha256(text)).
+
+    Vectors are stored as packed float16 or float32 arrays in a single
+    SQLite file shared by all workers. Once the stored vectors exceed
+    max_size_bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str, max_size_bytes: int, dtype: str = "float32"):
+        if dtype not in VECTOR_FORMATS:
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_bytes
+        self.dtype = dtype
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(SCHEMA)
+            conn.executescript(SIZE_TRIGGERS)
+            conn.commit()
+
+    @contextmanager
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, list[float]]:
+        found = {}
+        now = time.time()
+        with self.connect() as conn:
+            for idx in range(0, len(keys), SQLITE_MAX_PARAMS):
+                chunk = keys[idx : idx + SQLITE_MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                for key, dtype, dim, vector in conn.execute(
+                    "SELECT key, dtype, dim, vector FROM embeddings "
+                    f"WHERE key IN ({placeholders})",
+                    chunk,
+                ):
+                    found[bytes(key)] = unpack_vector(vector, dtype, dim)
+                conn.execute(
+                    f"UPDATE embeddings SET last_used = ? WHERE key IN ({placeholders})",
+                    [now, *chunk],
+                )
+            conn.commit()
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def set_many(self, entries: dict[bytes, list[float]]) -> None:
+        if not entries:
+            return
+
+        now = time.time()
+        with self.connect() as conn:
+            conn.executemany(
+                # An upsert rather than INSERT OR REPLACE, whose implicit
+                # deletes would not fire the size trigger
+                "INSERT INTO embeddings (key, dtype, dim, vector, last_used) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                "dtype = excluded.dtype, dim = excluded.dim, "
+                "vector = excluded.vector, last_used = excluded.last_used",
+                [
+                    (key, self.dtype, len(vector), pack_vector(vector, self.dtype), now)
+                    for key, vector in entries.items()
+                ],
+            )
+            conn.commit()
+            self._evict(conn)
+
+    def _get_size(self, conn: sqlite3.Connection) -> int:
+        return conn.execute(
+            "SELECT value FROM stats WHERE key = 'size_bytes'"
+        ).fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        size = self._get_size(conn)
+        if size <= self.max_size_bytes:
+            return
+
+        # Evict down to 90% so eviction is not triggered by every insert
+        target = size - int(self.max_size_bytes * 0.9)
+        evicted = 0
+        freed = 0
+        while freed < target:
+            rows = conn.execute(
+                "SELECT key, LENGTH(vector) FROM embeddings "
+                "ORDER BY last_used LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for key, length in rows:
+                if freed >= target:
+                    break
+                victims.append((key,))
+                freed += length
+            conn.executemany("DELETE FROM embeddings WHERE key = ?", victims)
+            evicted += len(victims)
+        conn.commit()
+
+        with self._lock:
+            self.evictions += evicted
+        log.debug(f"Evicted {evicted} embeddings ({freed} bytes) from cache")
+
+    def stats(self) -> dict:
+        with self.connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            size = self._get_size(conn)
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "size_bytes": size,
+            "max_size_bytes": self.max_size_bytes,
+            "dtype": self.dtype,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def clear(self) -> None:
+        with self.connect() as conn:
+            conn.execute("DELETE FROM embeddings")
+            conn.commit()
+
+
+EMBEDDING_CACHE = (
+    EmbeddingCache(
+        RAG_EMBEDDING_CACHE_PATH,
+        max_size_bytes=RAG_EMBEDDING_CACHE_MAX_SIZE_MB * 1024 * 1024,
+        dtype=RAG_EMBEDDING_CACHE_DTYPE,
+    )
+    if ENABLE_RAG_EMBEDDING_CACHE
+    else None
+)
+
+
+def get_cached_embedding_function(
+    embedding_function: Callable[..., Awaitable],
+    engine: str,
+    model: str,
+    url: str = "",
+    cache: Optional[EmbeddingCache] = EMBEDDING_CACHE,
+) -> Callable[..., Awaitable]:
+    """
+    Wrap an embedding function from get_embedding_function so only texts
+    missing from the cache are sent to the embedding engine.
+    """
+    if cache is None:
+        return embedding_function
+
+    async def cached_embedding_function(query, prefix=None, user=None):
+        if not isinstance(query, list):
+            return await embedding_function(query, prefix=prefix, user=user)
+
+        keys = [
+            get_embedding_cache_key(engine, model, prefix, text, url=url)
+            for text in query
+        ]
+        found = await asyncio.to_thread(cache.get_many, keys)
+
+        missing = {}
+        for key, text in zip(keys, query):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        if missing:
+            embeddings = await embedding_function(
+                list(missing.values()), prefix=prefix, user=user
+            )
+            if len(embeddings) != len(missing):
+                raise ValueError(
+                    f"Expected {len(missing)} embeddings, got {len(embeddings)}"
+                )
+            computed = dict(zip(missing.keys(), embeddings))
+            await asyncio.to_thread(cache.set_many, computed)
+            found.update(computed)
+
+        log.info(
+            f"embedding cache: {len(query) - len(missing)}/{len(query)} chunks cached"
+        )
+        return [found[key] for key in keys]
+
+    return cached_embedding_function
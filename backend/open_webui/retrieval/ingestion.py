@@ -0,0 +1,301 @@
+"""
+Durable background ingestion of uploaded files.
+
+With ENABLE_INGESTION_QUEUE, uploads are recorded in the ingestion_job table
+instead of being processed by the web process. The queue is drained by a
+separate worker:
+
+    python -m open_webui.retrieval.ingestion
+
+Documents are parsed in a process pool so large PDFs never hold the GIL of the
+embedding threads. Failed jobs are retried with exponential backoff, jobs of a
+worker that died are requeued, and when Redis is configured workers are woken
+as soon as a job is enqueued instead of on the next poll.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from types import SimpleNamespace
+
+from open_webui.env import (
+    GLOBAL_LOG_LEVEL,
+    INGESTION_JOB_MAX_ATTEMPTS,
+    INGESTION_JOB_RETRY_DELAY,
+    INGESTION_JOB_TIMEOUT,
+    INGESTION_WORKER_CONCURRENCY,
+    INGESTION_WORKER_POLL_INTERVAL,
+    INGESTION_WORKER_PROCESSES,
+    REDIS_KEY_PREFIX,
+)
+from open_webui.models.files import Files
+from open_webui.models.ingestion_jobs import (
+    STALE_JOB_ERROR,
+    IngestionJobModel,
+    IngestionJobs,
+)
+from open_webui.utils.redis import get_redis_client
+
+logging.basicConfig(stream=sys.stdout, level=GLOBAL_LOG_LEVEL)
+log = logging.getLogger(__name__)
+
+QUEUE_WAKE_KEY = f"{REDIS_KEY_PREFIX}:ingestion:wake"
+# Wake tokens only need to outnumber idle workers
+QUEUE_WAKE_MAX_TOKENS = 100
+STALE_JOB_CHECK_INTERVAL = 60
+# Running jobs refresh their lock this often, well within INGESTION_JOB_TIMEOUT
+JOB_HEARTBEAT_INTERVAL = max(min(INGESTION_JOB_TIMEOUT / 4, 60), 1)
+
+
+class PermanentIngestionError(Exception):
+    """A job failure that retrying cannot fix, e.g. an unsupported file type."""
+
+
+def enqueue_file_ingestion(
+    file_id: str, user_id: str, priority: int = 0, db=None
+) -> IngestionJobModel:
+    job = IngestionJobs.enqueue(
+        file_id,
+        user_id,
+        max_attempts=INGESTION_JOB_MAX_ATTEMPTS,
+        priority=priority,
+        db=db,
+    )
+
+    redis = get_redis_client()
+    if redis is not None:
+        try:
+            redis.lpush(QUEUE_WAKE_KEY, job.id)
+            redis.ltrim(QUEUE_WAKE_KEY, 0, QUEUE_WAKE_MAX_TOKENS - 1)
+        except Exception as e:
+            log.debug(f"Failed to wake ingestion workers: {e}")
+
+    return job
+
+
+class IngestionWorker:
+    def __init__(
+        self,
+        app,
+        concurrency: int = INGESTION_WORKER_CONCURRENCY,
+        processes: int = INGESTION_WORKER_PROCESSES,
+        poll_interval: float = INGESTION_WORKER_POLL_INTERVAL,
+    ):
+        # Processing code only reads request.app
+        self.request = SimpleNamespace(app=app)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.redis = get_redis_client()
+        self.stopping = threading.Event()
+
+        # spawn: the worker process holds DB pools and threads that must not be forked
+        self.parser_pool = (
+            ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=50,
+            )
+            if processes > 0
+            else None
+        )
+
+    def stop(self, *args) -> None:
+        log.info("Ingestion worker stopping after running jobs finish")
+        self.stopping.set()
+
+    def _wait_for_jobs(self) -> None:
+        if self.redis is not None:
+            try:
+                self.redis.blpop(
+                    QUEUE_WAKE_KEY, timeout=max(int(self.poll_interval), 1)
+                )
+                return
+            except Exception as e:
+                log.debug(f"Redis wait failed, polling instead: {e}")
+        self.stopping.wait(self.poll_interval)
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        log.info(
+            f"Ingestion worker {self.worker_id} started "
+            f"(concurrency={self.concurrency}, redis={self.redis is not None})"
+        )
+
+        running: set[Future] = set()
+        last_stale_check = 0.0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while not self.stopping.is_set():
+                if time.monotonic() - last_stale_check > STALE_JOB_CHECK_INTERVAL:
+                    requeued, failed_file_ids = IngestionJobs.requeue_stale(
+                        INGESTION_JOB_TIMEOUT
+                    )
+                    if requeued:
+                        log.warning(f"Requeued {requeued} stale ingestion jobs")
+                    for file_id in failed_file_ids:
+                        Files.update_file_data_by_id(
+                            file_id, {"status": "failed", "error": STALE_JOB_ERROR}
+                        )
+                    last_stale_check = time.monotonic()
+
+                running = {future for future in running if not future.done()}
+                while len(running) < self.concurrency:
+                    job = IngestionJobs.claim_next(self.worker_id)
+                    if job is None:
+                        break
+                    running.add(executor.submit(self.process_job, job))
+
+                if len(running) >= self.concurrency:
+                    wait(
+                        running,
+                        timeout=self.poll_interval,
+                        return_when=FIRST_COMPLETED,
+                    )
+                else:
+                    self._wait_for_jobs()
+
+        if self.parser_pool is not None:
+            self.parser_pool.shutdown()
+
+    def _heartbeat(self, job: IngestionJobModel, done: threading.Event) -> None:
+        # Stages can run far longer than INGESTION_JOB_TIMEOUT (e.g. embedding
+        # a large PDF), so the lock is refreshed on a timer rather than per stage
+        while not done.wait(JOB_HEARTBEAT_INTERVAL):
+            try:
+                if not IngestionJobs.heartbeat(job.id, self.worker_id):
+                    log.warning(f"Lost the lock on ingestion job {job.id}")
+                    return
+            except Exception as e:
+                log.warning(f"Ingestion job heartbeat failed: {e}")
+
+    def process_job(self, job: IngestionJobModel) -> None:
+        log.info(f"Processing file {job.file_id} (attempt {job.attempts})")
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job, done), daemon=True
+        )
+        heartbeat.start()
+        try:
+            self._process(job)
+            if not IngestionJobs.complete(job.id, self.worker_id):
+                log.warning(f"Ingestion job {job.id} was taken over, not completing it")
+        except Exception as e:
+            log.exception(f"Ingestion of file {job.file_id} failed: {e}")
+            error = str(e.detail) if hasattr(e, "detail") else str(e)
+            failed_job = IngestionJobs.fail(
+                job.id,
+                self.worker_id,
+                error,
+                retry_delay=INGESTION_JOB_RETRY_DELAY,
+                retry=not isinstance(e, PermanentIngestionError),
+            )
+            if failed_job is None:
+                # Requeued as stale meanwhile; the job's current owner decides
+                log.warning(f"Ingestion job {job.id} was taken over, not failing it")
+            elif failed_job.status == "failed":
+                Files.update_file_data_by_id(
+                    job.file_id, {"status": "failed", "error": error}
+                )
+            else:
+                # Will be retried; process_file may already have marked it failed
+                Files.update_file_data_by_id(job.file_id, {"status": "pending"})
+        finally:
+            done.set()
+
+    def _process(self, job: IngestionJobModel) -> None:
+        # Imported here: the retrieval router pulls in the whole app config
+        from open_webui.models.users import Users
+        from open_webui.routers.retrieval import (
+            ProcessFileForm,
+            get_loader_config,
+            iter_file_docs,
+            load_file_docs,
+            process_file,
+            save_file_docs,
+        )
+        from open_webui.storage.provider import Storage
+        from open_webui.utils.misc import strict_match_mime_type
+
+        file = Files.get_file_by_id(job.file_id)
+        user = Users.get_user_by_id(job.user_id)
+        if file is None or user is None:
+            raise PermanentIngestionError("File or owner no longer exists")
+
+        config = self.request.app.state.config
+        content_type = file.meta.get("content_type")
+
+        if content_type and strict_match_mime_type(
+            getattr(config, "STT_SUPPORTED_CONTENT_TYPES", []), content_type
+        ):
+            from open_webui.routers.audio import transcribe
+
+            IngestionJobs.update_stage(job.id, "transcribing")
+            result = transcribe(
+                self.request,
+                Storage.get_file(file.path),
+                file.meta.get("data", {}),
+                user,
+            )
+            IngestionJobs.update_stage(job.id, "embedding")
+            process_file(
+                self.request,
+                ProcessFileForm(file_id=file.id, content=result.get("text", "")),
+                user=user,
+            )
+            return
+
+        if (
+            content_type
+            and content_type.startswith(("image/", "video/"))
+            and config.CONTENT_EXTRACTION_ENGINE != "external"
+        ):
+            raise PermanentIngestionError(
+                f"File type {content_type} is not supported for processing"
+            )
+
+        IngestionJobs.update_stage(job.id, "parsing")
+        file_path = Storage.get_file(file.path)
+        loader_config = get_loader_config(self.request)
+        if self.parser_pool is not None:
+            # Documents cannot stream back from another process
+            docs = self.parser_pool.submit(
+                load_file_docs, file, file_path, loader_config, user
+            ).result()
+            text_content = " ".join([doc.page_content for doc in docs])
+            IngestionJobs.update_stage(job.id, "embedding")
+        else:
+            # Parsing overlaps embedding, so both happen in the "parsing" stage
+            docs = iter_file_docs(file, file_path, loader_config, user)
+            text_content = None
+
+        save_file_docs(
+            self.request,
+            file,
+            docs,
+            text_content,
+            collection_name=f"file-{file.id}",
+            user=user,
+        )
+
+
+def main():
+    from open_webui.main import app
+
+    IngestionWorker(app).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import logging
 import ftfy
 import sys
 import json
+from typing import Iterator
 
 try:
     from azure.identity import DefaultAzureCredential
@@ -196,15 +197,20 @@ class Loader:
     def load(
         self, filename: str, file_content_type: str, file_path: str
     ) -> list[Document]:
+        return list(self.lazy_load(filename, file_content_type, file_path))
+
+    def lazy_load(
+        self, filename: str, file_content_type: str, file_path: str
+    ) -> Iterator[Document]:
+        """Yield documents as the loader produces them, e.g. page by page for PDFs."""
         loader = self._get_loader(filename, file_content_type, file_path)
-        docs = loader.load()
+        # Loaders that only implement load() still work, without streaming
+        docs = loader.lazy_load() if hasattr(loader, "lazy_load") else loader.load()
 
-        return [
-            Document(
+        for doc in docs:
+            yield Document(
                 page_content=ftfy.fix_text(doc.page_content), metadata=doc.metadata
             )
-            for doc in docs
-        ]
 
     def _is_text_file(self, file_ext: str, file_content_type: str) -> bool:
         return file_ext in known_source_ext or (
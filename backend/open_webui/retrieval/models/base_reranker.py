@@ -3,6 +3,9 @@ from typing import Optional, List, Tuple
 
 
 class BaseReranker(ABC):
+    # True when a pair's score depends on the other documents of the call
+    listwise: bool = False
+
     @abstractmethod
     def predict(self, sentences: List[Tuple[str, str]]) -> Optional[List[float]]:
         pass
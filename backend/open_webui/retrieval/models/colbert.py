@@ -12,6 +12,9 @@ log = logging.getLogger(__name__)
 
 
 class ColBERT(BaseReranker):
+    # Scores are softmax-normalized over the documents of each call
+    listwise = True
+
     def __init__(self, name, **kwargs) -> None:
         log.info("ColBERT: Loading model", name)
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -33,7 +36,12 @@ class ColBERT(BaseReranker):
             name,
             colbert_config=ColBERTConfig(model_name=name),
         ).to(self.device)
-        pass
+
+        if kwargs.get("quantize") and self.device == "cpu":
+            log.info("ColBERT: Quantizing linear layers to int8")
+            torch.quantization.quantize_dynamic(
+                self.ckpt, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
 
     def calculate_similarity_scores(self, query_embeddings, document_embeddings):
 
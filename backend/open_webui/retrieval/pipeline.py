@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Iterable, Iterator, Optional
+
+from langchain_core.documents import Document
+
+from open_webui.config import RAG_INGESTION_BATCH_SIZE, RAG_INGESTION_QUEUE_SIZE
+
+log = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def _next_chunks(
+    docs: Iterator[Document], split: Optional[Callable[[Document], list[Document]]]
+):
+    doc = next(docs, _DONE)
+    if doc is _DONE:
+        return _DONE
+    return split(doc) if split else [doc]
+
+
+async def run_ingestion_pipeline(
+    docs: Iterable[Document],
+    embed: Callable[[list[Document]], Awaitable[list]],
+    write: Callable[[list[Document], list], None],
+    split: Optional[Callable[[Document], list[Document]]] = None,
+    batch_size: int = RAG_INGESTION_BATCH_SIZE,
+    queue_size: int = RAG_INGESTION_QUEUE_SIZE,
+) -> int:
+    """
+    Stream documents through split -> embed -> write and return the number of
+    chunks written.
+
+    Documents are pulled from the (possibly lazy) loader iterator and split in
+    a thread, embedded in batches of batch_size chunks and written in a thread,
+    so parsing the next pages overlaps embedding and writing the previous ones.
+    The queues between stages hold at most queue_size batches, which bounds
+    memory regardless of the document size.
+    """
+    batch_size = max(batch_size, 1)
+    to_embed: asyncio.Queue = asyncio.Queue(maxsize=max(queue_size, 1))
+    to_write: asyncio.Queue = asyncio.Queue(maxsize=max(queue_size, 1))
+    written = 0
+
+    async def produce():
+        iterator = iter(docs)
+        batch = []
+        while True:
+            chunks = await asyncio.to_thread(_next_chunks, iterator, split)
+            if chunks is _DONE:
+                break
+            batch.extend(chunks)
+            while len(batch) >= batch_size:
+                await to_embed.put(batch[:batch_size])
+                batch = batch[batch_size:]
+        if batch:
+            await to_embed.put(batch)
+        await to_embed.put(_DONE)
+
+    async def embed_batches():
+        while (batch := await to_embed.get()) is not _DONE:
+            await to_write.put((batch, await embed(batch)))
+        await to_write.put(_DONE)
+
+    async def write_batches():
+        nonlocal written
+        while (item := await to_write.get()) is not _DONE:
+            batch, embeddings = item
+            await asyncio.to_thread(write, batch, embeddings)
+            written += len(batch)
+            log.debug(f"ingestion pipeline wrote {written} chunks")
+
+    tasks = [
+        asyncio.create_task(stage())
+        for stage in (produce, embed_batches, write_batches)
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # A failed stage would leave the others blocked on a full or empty queue
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    return written
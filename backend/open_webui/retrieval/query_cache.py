@@ -0,0 +1,238 @@
+import hashlib
+import logging
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, List, Optional
+
+from open_webui.config import (
+    ENABLE_RAG_QUERY_CACHE,
+    RAG_QUERY_CACHE_DIR,
+    RAG_QUERY_CACHE_TTL,
+    RAG_QUERY_EMBEDDING_CACHE_SIZE,
+    RAG_QUERY_RESULT_CACHE_SIZE,
+)
+from open_webui.env import REDIS_KEY_PREFIX
+from open_webui.retrieval.vector.main import GetResult, VectorDBBase, VectorItem
+from open_webui.retrieval.versions import CollectionVersions
+from open_webui.utils.redis import get_redis_client
+
+log = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with an optional TTL and hit/miss counters."""
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                self.ttl is None or time.monotonic() - entry[0] < self.ttl
+            ):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class QueryCache:
+    """
+    Two-level cache for RAG queries: query text to embedding, and
+    (collection, collection version, query embedding hash, k) to search result.
+
+    Collection versions are shared through Redis when it is configured, so a
+    write on any host invalidates the results cached on every other one.
+    Cached results are copied on the way in and out, since callers modify them.
+    """
+
+    def __init__(
+        self,
+        versions: CollectionVersions,
+        embedding_cache_size: int,
+        result_cache_size: int,
+        ttl: Optional[float] = None,
+    ):
+        self.versions = versions
+        self.embeddings = LRUCache(embedding_cache_size, ttl)
+        self.results = LRUCache(result_cache_size, ttl)
+
+    @staticmethod
+    def hash_embedding(embedding: list[float]) -> str:
+        return hashlib.sha256(
+            struct.pack(f"<{len(embedding)}d", *embedding)
+        ).hexdigest()
+
+    def get_result_key(self, collection_name: str, embedding: list[float], k: int):
+        return (
+            collection_name,
+            self.versions.get(collection_name),
+            self.hash_embedding(embedding),
+            k,
+        )
+
+    def get_result(self, key) -> Optional[GetResult]:
+        result = self.results.get(key)
+        return result.model_copy(deep=True) if result is not None else None
+
+    def set_result(self, key, result: GetResult) -> None:
+        self.results.set(key, result.model_copy(deep=True))
+
+    def stats(self) -> dict:
+        return {"embeddings": self.embeddings.stats(), "results": self.results.stats()}
+
+
+QUERY_CACHE = (
+    QueryCache(
+        CollectionVersions(
+            f"{RAG_QUERY_CACHE_DIR}/versions.sqlite",
+            redis=get_redis_client(),
+            key_prefix=f"{REDIS_KEY_PREFIX}:query_cache:version",
+        ),
+        embedding_cache_size=RAG_QUERY_EMBEDDING_CACHE_SIZE,
+        result_cache_size=RAG_QUERY_RESULT_CACHE_SIZE,
+        ttl=RAG_QUERY_CACHE_TTL or None,
+    )
+    if ENABLE_RAG_QUERY_CACHE
+    else None
+)
+
+
+def get_query_cached_embedding_function(
+    embedding_function: Callable[..., Awaitable],
+    engine: str,
+    model: str,
+    cache: Optional[QueryCache] = QUERY_CACHE,
+) -> Callable[..., Awaitable]:
+    """
+    Wrap an embedding function from get_embedding_function so repeated query
+    texts are embedded once per model.
+    """
+    if cache is None or embedding_function is None:
+        return embedding_function
+
+    async def cached_embedding_function(query, prefix=None, user=None):
+        texts = query if isinstance(query, list) else [query]
+        keys = [(engine, model, prefix, text) for text in texts]
+
+        embeddings = [cache.embeddings.get(key) for key in keys]
+        missing = list(
+            dict.fromkeys(
+                text for text, embedding in zip(texts, embeddings) if embedding is None
+            )
+        )
+        if missing:
+            computed = await embedding_function(missing, prefix=prefix, user=user)
+            computed = dict(zip(missing, computed))
+            for text, embedding in computed.items():
+                cache.embeddings.set((engine, model, prefix, text), embedding)
+            embeddings = [
+                embedding if embedding is not None else computed[text]
+                for text, embedding in zip(texts, embeddings)
+            ]
+
+        return embeddings if isinstance(query, list) else embeddings[0]
+
+    return cached_embedding_function
+
+
+class VersionedVectorDB(VectorDBBase):
+    """Vector DB client wrapper that bumps a collection's version on every write."""
+
+    def __init__(self, client: VectorDBBase, versions: CollectionVersions):
+        self._client = client
+        self._versions = versions
+
+    def __getattr__(self, name):
+        # Backend-specific attributes are served by the wrapped client
+        if name.startswith("__") or name in ("_client", "_versions"):
+            raise AttributeError(name)
+        return getattr(self._client, name)
+
+    def _bump(self, collection_name: Optional[str] = None) -> None:
+        try:
+            if collection_name is None:
+                self._versions.bump_all()
+            else:
+                self._versions.bump(collection_name)
+        except Exception as e:
+            # Results cached for this collection stay until RAG_QUERY_CACHE_TTL
+            log.warning(f"Failed to bump collection version of {collection_name}: {e}")
+
+    def has_collection(self, collection_name: str) -> bool:
+        return self._client.has_collection(collection_name=collection_name)
+
+    def delete_collection(self, collection_name: str) -> None:
+        try:
+            self._client.delete_collection(collection_name=collection_name)
+        finally:
+            self._bump(collection_name)
+
+    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        try:
+            self._client.insert(collection_name=collection_name, items=items)
+        finally:
+            self._bump(collection_name)
+
+    def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        try:
+            self._client.upsert(collection_name=collection_name, items=items)
+        finally:
+            self._bump(collection_name)
+
+    def search(self, collection_name, vectors, filter=None, limit=10):
+        return self._client.search(
+            collection_name=collection_name, vectors=vectors, filter=filter, limit=limit
+        )
+
+    def query(self, collection_name, filter, limit=None):
+        return self._client.query(
+            collection_name=collection_name, filter=filter, limit=limit
+        )
+
+    def get(self, collection_name: str) -> Optional[GetResult]:
+        return self._client.get(collection_name=collection_name)
+
+    def delete(self, collection_name, ids=None, filter=None) -> None:
+        try:
+            self._client.delete(collection_name=collection_name, ids=ids, filter=filter)
+        finally:
+            self._bump(collection_name)
+
+    def reset(self) -> None:
+        try:
+            self._client.reset()
+        finally:
+            self._bump()
@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import logging
+import weakref
+from typing import Any, Optional
+
+from open_webui.config import (
+    RAG_RERANKING_BATCH_SIZE,
+    RAG_RERANKING_BATCH_WAIT_MS,
+    RAG_RERANKING_CACHE_SIZE,
+)
+from open_webui.retrieval.query_cache import LRUCache
+
+log = logging.getLogger(__name__)
+
+
+RERANK_SCORE_CACHE = (
+    LRUCache(RAG_RERANKING_CACHE_SIZE) if RAG_RERANKING_CACHE_SIZE > 0 else None
+)
+
+
+class RerankService:
+    """
+    Scores (query, chunk) pairs with a reranking model (CrossEncoder, ColBERT
+    or ExternalReranker).
+
+    Pairs from all rerank calls made within batch_wait_ms of each other, i.e.
+    every collection and query of a hybrid search, are deduplicated and scored
+    together in model calls of at most batch_size pairs, and their scores are
+    cached. Listwise models, whose scores depend on the other documents of the
+    call, are scored per call and not cached.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        engine: str,
+        model_name: str,
+        batch_size: int = RAG_RERANKING_BATCH_SIZE,
+        batch_wait_ms: int = RAG_RERANKING_BATCH_WAIT_MS,
+        cache: Optional[LRUCache] = RERANK_SCORE_CACHE,
+    ):
+        self.model = model
+        self.engine = engine
+        self.model_name = model_name
+        self.batch_size = max(batch_size, 1)
+        self.batch_wait = max(batch_wait_ms, 0) / 1000
+        self.cache = cache
+        # Pairs waiting for the next model call, per event loop
+        self._pending: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._flushes: set[asyncio.Task] = set()
+
+    def _key(self, query: str, text: str) -> tuple:
+        return (
+            self.engine,
+            self.model_name,
+            query,
+            hashlib.sha256(text.encode()).hexdigest(),
+        )
+
+    def _predict(self, pairs: list[tuple[str, str]], user=None):
+        if self.engine == "external":
+            return self.model.predict(pairs, user=user)
+        return self.model.predict(pairs)
+
+    async def rerank(self, query: str, documents, user=None) -> Optional[list[float]]:
+        texts = [doc.page_content for doc in documents]
+        if not texts:
+            return []
+
+        if getattr(self.model, "listwise", False):
+            return await asyncio.to_thread(
+                self._predict, [(query, text) for text in texts], user
+            )
+
+        keys = [self._key(query, text) for text in texts]
+        scores = {}
+        if self.cache is not None:
+            for key in keys:
+                score = self.cache.get(key)
+                if score is not None:
+                    scores[key] = score
+
+        if len(scores) == len(keys):
+            return [scores[key] for key in keys]
+
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(loop)
+        if pending is None:
+            pending = self._pending[loop] = {}
+            flush = loop.create_task(self._flush(loop))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+
+        futures = {}
+        for key, text in zip(keys, texts):
+            if key in scores or key in futures:
+                continue
+            # A chunk found in several collections is scored once
+            if key not in pending:
+                pending[key] = (query, text, user, loop.create_future())
+            futures[key] = pending[key][3]
+
+        for key, future in futures.items():
+            scores[key] = await future
+
+        result = [scores[key] for key in keys]
+        return None if any(score is None for score in result) else result
+
+    def _batches(self, items: list) -> list[list]:
+        if self.engine == "external":
+            # The rerank API takes a single query per request
+            groups = {}
+            for item in items:
+                query, _, user, _ = item[1]
+                groups.setdefault((query, getattr(user, "id", None)), []).append(item)
+            groups = list(groups.values())
+        else:
+            groups = [items]
+
+        return [
+            group[idx : idx + self.batch_size]
+            for group in groups
+            for idx in range(0, len(group), self.batch_size)
+        ]
+
+    async def _score_batch(self, batch: list) -> None:
+        pairs = [(query, text) for _, (query, text, _, _) in batch]
+        user = batch[0][1][2]
+        batch_scores = await asyncio.to_thread(self._predict, pairs, user)
+
+        for idx, (key, (_, _, _, future)) in enumerate(batch):
+            score = None if batch_scores is None else float(batch_scores[idx])
+            if score is not None and self.cache is not None:
+                self.cache.set(key, score)
+            if not future.done():
+                future.set_result(score)
+
+    async def _flush(self, loop) -> None:
+        await asyncio.sleep(self.batch_wait)
+        items = list(self._pending.pop(loop).items())
+        batches = self._batches(items)
+        log.debug(
+            f"RerankService: scoring {len(items)} pairs in {len(batches)} model calls"
+        )
+
+        try:
+            if self.engine == "external":
+                await asyncio.gather(*[self._score_batch(batch) for batch in batches])
+            else:
+                # Local models already use every core for one batch
+                for batch in batches:
+                    await self._score_batch(batch)
+        except Exception as e:
+            for _, (_, _, _, future) in items:
+                if not future.done():
+                    future.set_exception(e)
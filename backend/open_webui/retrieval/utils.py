@@ -5,7 +5,10 @@ from typing import Awaitable, Optional, Union
 import requests
 import aiohttp
 import asyncio
+import functools
 import hashlib
+import heapq
+import inspect
 from concurrent.futures import ThreadPoolExecutor
 import time
 import re
@@ -26,20 +29,36 @@ def _get_langchain_imports():
         ContextualCompressionRetriever,
         EnsembleRetriever,
     )
-    from langchain_community.retrievers import BM25Retriever
     from langchain_core.documents import Document
 
-    return ContextualCompressionRetriever, EnsembleRetriever, BM25Retriever, Document
+    return ContextualCompressionRetriever, EnsembleRetriever, Document
 
 
 # Will be set on first use
 ContextualCompressionRetriever = None
 EnsembleRetriever = None
-BM25Retriever = None
 Document = None
 
+
+def _ensure_langchain_imports():
+    global ContextualCompressionRetriever, EnsembleRetriever, Document
+    if Document is None:
+        (
+            ContextualCompressionRetriever,
+            EnsembleRetriever,
+            Document,
+        ) = _get_langchain_imports()
+
+
 from open_webui.config import VECTOR_DB
-from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25_index import (
+    BM25Index,
+    InMemoryBM25Index,
+    get_enriched_metadata_text,
+)
+from open_webui.retrieval.query_cache import QUERY_CACHE
+from open_webui.retrieval.reranker import RerankService
+from open_webui.retrieval.vector.factory import BM25_INDEX_STORE, VECTOR_DB_CLIENT
 
 
 from open_webui.models.users import UserModel
@@ -54,9 +73,6 @@ from open_webui.utils.access_control import has_access
 from open_webui.utils.headers import include_user_info_headers
 from open_webui.utils.misc import get_message_list
 
-from open_webui.retrieval.web.utils import get_web_loader
-from open_webui.retrieval.loaders.youtube import YoutubeLoader
-
 
 from open_webui.env import (
     AIOHTTP_CLIENT_TIMEOUT,
@@ -68,10 +84,17 @@ from open_webui.config import (
     RAG_EMBEDDING_QUERY_PREFIX,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_PREFIX_FIELD_NAME,
+    RAG_RETRIEVAL_MAX_WORKERS,
 )
 
 log = logging.getLogger(__name__)
 
+# Vector DB clients are blocking; searches of all requests run in this pool so
+# they neither stall the event loop nor open unbounded threads per request
+RETRIEVAL_EXECUTOR = ThreadPoolExecutor(
+    max_workers=RAG_RETRIEVAL_MAX_WORKERS, thread_name_prefix="retrieval"
+)
+
 
 from typing import Any
 
@@ -109,6 +132,10 @@ def is_youtube_url(url: str) -> bool:
 
 
 def get_loader(request, url: str):
+    # Imported here: the web loader pulls in langchain_community document loaders
+    from open_webui.retrieval.loaders.youtube import YoutubeLoader
+    from open_webui.retrieval.web.utils import get_web_loader
+
     if is_youtube_url(url):
         return YoutubeLoader(
             url,
@@ -159,11 +186,12 @@ if BaseRetriever is not None:
             *,
             run_manager: CallbackManagerForRetrieverRun,
         ) -> list[Document]:
+            _ensure_langchain_imports()
             embedding = await self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
-            result = VECTOR_DB_CLIENT.search(
+            result = await aquery_doc(
                 collection_name=self.collection_name,
-                vectors=[embedding],
-                limit=self.top_k,
+                query_embedding=embedding,
+                k=self.top_k,
             )
 
             ids = result.ids[0]
@@ -180,6 +208,20 @@ if BaseRetriever is not None:
                 )
             return results
 
+    class BM25IndexRetriever(BaseRetriever):
+        index: Any
+        top_k: int
+        enriched: bool = False
+
+        def _get_relevant_documents(
+            self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+        ) -> list[Document]:
+            _ensure_langchain_imports()
+            return [
+                Document(metadata=hit["metadata"], page_content=hit["text"])
+                for hit in self.index.search(query, self.top_k, enriched=self.enriched)
+            ]
+
 else:
     # Create a dummy class if BaseRetriever is not available
     class VectorSearchRetriever:
@@ -188,12 +230,28 @@ else:
                 "langchain_core.retrievers.BaseRetriever is not available. Please install langchain-core."
             )
 
+    BM25IndexRetriever = VectorSearchRetriever
+
 
 def query_doc(
     collection_name: str, query_embedding: list[float], k: int, user: UserModel = None
 ):
     try:
         log.debug(f"query_doc:doc {collection_name}")
+        cache_key = None
+        if QUERY_CACHE is not None:
+            try:
+                cache_key = QUERY_CACHE.get_result_key(
+                    collection_name, query_embedding, k
+                )
+            except Exception as e:
+                log.warning(f"query_doc:cache_unavailable {collection_name}: {e}")
+        if cache_key is not None:
+            result = QUERY_CACHE.get_result(cache_key)
+            if result is not None:
+                log.debug(f"query_doc:cache_hit {collection_name}")
+                return result
+
         result = VECTOR_DB_CLIENT.search(
             collection_name=collection_name,
             vectors=[query_embedding],
@@ -202,6 +260,8 @@ def query_doc(
 
         if result:
             log.info(f"query_doc:result {result.ids} {result.metadatas}")
+            if cache_key is not None:
+                QUERY_CACHE.set_result(cache_key, result)
 
         return result
     except Exception as e:
@@ -209,6 +269,21 @@ def query_doc(
         raise e
 
 
+async def aquery_doc(
+    collection_name: str, query_embedding: list[float], k: int, user: UserModel = None
+):
+    return await asyncio.get_running_loop().run_in_executor(
+        RETRIEVAL_EXECUTOR,
+        functools.partial(
+            query_doc,
+            collection_name=collection_name,
+            query_embedding=query_embedding,
+            k=k,
+            user=user,
+        ),
+    )
+
+
 def get_doc(collection_name: str, user: UserModel = None):
     try:
         log.debug(f"get_doc:doc {collection_name}")
@@ -223,47 +298,31 @@ def get_doc(collection_name: str, user: UserModel = None):
         raise e
 
 
-def get_enriched_texts(collection_result: GetResult) -> list[str]:
-    enriched_texts = []
-    for idx, text in enumerate(collection_result.documents[0]):
-        metadata = collection_result.metadatas[0][idx]
-        metadata_parts = [text]
-
-        # Add filename (repeat twice for extra weight in BM25 scoring)
-        if metadata.get("name"):
-            filename = metadata["name"]
-            filename_tokens = (
-                filename.replace("_", " ").replace("-", " ").replace(".", " ")
-            )
-            metadata_parts.append(
-                f"Filename: {filename} {filename_tokens} {filename_tokens}"
-            )
-
-        # Add title if available
-        if metadata.get("title"):
-            metadata_parts.append(f"Title: {metadata['title']}")
-
-        # Add document section headings if available (from markdown splitter)
-        if metadata.get("headings") and isinstance(metadata["headings"], list):
-            headings = " > ".join(str(h) for h in metadata["headings"])
-            metadata_parts.append(f"Section: {headings}")
-
-        # Add source URL/path if available
-        if metadata.get("source"):
-            metadata_parts.append(f"Source: {metadata['source']}")
-
-        # Add snippet for web search results
-        if metadata.get("snippet"):
-            metadata_parts.append(f"Snippet: {metadata['snippet']}")
-
-        enriched_texts.append(" ".join(metadata_parts))
+def get_bm25_index(collection_name: str) -> Optional[BM25Index]:
+    """
+    Open the collection's BM25 index, (re)building it from the vector DB when
+    it is missing or behind the collection's shared version.
+    """
+    if BM25_INDEX_STORE is None:
+        return None
 
-    return enriched_texts
+    index = BM25_INDEX_STORE.get(collection_name)
+    if index is None:
+        try:
+            version = BM25_INDEX_STORE.versions.get(collection_name)
+        except Exception as e:
+            log.warning(f"Failed to read collection version of {collection_name}: {e}")
+            return None
+        collection_result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+        if collection_result is None:
+            return None
+        index = BM25_INDEX_STORE.build(collection_name, collection_result, version)
+    return index
 
 
 async def query_doc_with_hybrid_search(
     collection_name: str,
-    collection_result: GetResult,
+    collection_result: Optional[GetResult],
     query: str,
     embedding_function,
     k: int,
@@ -274,8 +333,21 @@ async def query_doc_with_hybrid_search(
     enable_enriched_texts: bool = False,
 ) -> dict:
     try:
+        _ensure_langchain_imports()
+
+        # With the persistent index, callers skip the full collection fetch;
+        # it is only needed here if the index cannot be used
+        bm25_index = get_bm25_index(collection_name)
+        if bm25_index is None and collection_result is None:
+            collection_result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+
+        if bm25_index is not None:
+            if bm25_index.count() == 0:
+                log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
+                return {"documents": [], "metadatas": [], "distances": []}
+
         # First check if collection_result has the required attributes
-        if (
+        elif (
             not collection_result
             or not hasattr(collection_result, "documents")
             or not hasattr(collection_result, "metadatas")
@@ -284,7 +356,7 @@ async def query_doc_with_hybrid_search(
             return {"documents": [], "metadatas": [], "distances": []}
 
         # Now safely check the documents content after confirming attributes exist
-        if (
+        elif (
             not collection_result.documents
             or len(collection_result.documents) == 0
             or not collection_result.documents[0]
@@ -294,12 +366,6 @@ async def query_doc_with_hybrid_search(
 
         log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
 
-        bm25_texts = (
-            get_enriched_texts(collection_result)
-            if enable_enriched_texts
-            else collection_result.documents[0]
-        )
-
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
             embedding_function=embedding_function,
@@ -311,11 +377,15 @@ async def query_doc_with_hybrid_search(
                 retrievers=[vector_search_retriever], weights=[1.0]
             )
         else:
-            bm25_retriever = BM25Retriever.from_texts(
-                texts=bm25_texts,
-                metadatas=collection_result.metadatas[0],
+            bm25_retriever = BM25IndexRetriever(
+                index=(
+                    bm25_index
+                    if bm25_index is not None
+                    else InMemoryBM25Index(collection_result)
+                ),
+                top_k=k,
+                enriched=enable_enriched_texts,
             )
-            bm25_retriever.k = k
             if hybrid_bm25_weight >= 1:
                 ensemble_retriever = EnsembleRetriever(
                     retrievers=[bm25_retriever], weights=[1.0]
@@ -422,13 +492,10 @@ def merge_and_sort_query_results(query_results: list[dict], k: int) -> dict:
                 if distance > combined[doc_hash][0]:
                     combined[doc_hash] = (distance, document, metadata)
 
-    combined = list(combined.values())
-    # Sort the list based on distances
-    combined.sort(key=lambda x: x[0], reverse=True)
-
-    # Slice to keep only the top k elements
+    # Keep only the top k elements by distance, without sorting everything
+    combined = heapq.nlargest(k, combined.values(), key=lambda x: x[0])
     sorted_distances, sorted_documents, sorted_metadatas = (
-        zip(*combined[:k]) if combined else ([], [], [])
+        zip(*combined) if combined else ([], [], [])
     )
 
     # Create and return the output dictionary
@@ -461,14 +528,15 @@ async def query_collection(
     queries: list[str],
     embedding_function,
     k: int,
+    query_embeddings: Optional[list[list[float]]] = None,
 ) -> dict:
     results = []
     error = False
 
-    def process_query_collection(collection_name, query_embedding):
+    async def process_query_collection(collection_name, query_embedding):
         try:
             if collection_name:
-                result = query_doc(
+                result = await aquery_doc(
                     collection_name=collection_name,
                     k=k,
                     query_embedding=query_embedding,
@@ -480,23 +548,22 @@ async def query_collection(
             log.exception(f"Error when querying the collection: {e}")
             return None, e
 
-    # Generate all query embeddings (in one call)
-    query_embeddings = await embedding_function(
-        queries, prefix=RAG_EMBEDDING_QUERY_PREFIX
-    )
+    # Generate all query embeddings (in one call), unless the caller batched them
+    if query_embeddings is None:
+        query_embeddings = await embedding_function(
+            queries, prefix=RAG_EMBEDDING_QUERY_PREFIX
+        )
     log.debug(
         f"query_collection: processing {len(queries)} queries across {len(collection_names)} collections"
     )
 
-    with ThreadPoolExecutor() as executor:
-        future_results = []
-        for query_embedding in query_embeddings:
-            for collection_name in collection_names:
-                result = executor.submit(
-                    process_query_collection, collection_name, query_embedding
-                )
-                future_results.append(result)
-        task_results = [future.result() for future in future_results]
+    task_results = await asyncio.gather(
+        *[
+            process_query_collection(collection_name, query_embedding)
+            for query_embedding in query_embeddings
+            for collection_name in collection_names
+        ]
+    )
 
     for result, err in task_results:
         if err is not None:
@@ -523,20 +590,53 @@ async def query_collection_with_hybrid_search(
 ) -> dict:
     results = []
     error = False
-    # Fetch collection data once per collection sequentially
+    # Fetch collection data once per collection, concurrently
     # Avoid fetching the same data multiple times later
+    # With the BM25 index, collections are searched without fetching them at all
     collection_results = {}
-    for collection_name in collection_names:
+    failed_collections = set()
+
+    def fetch_collection(collection_name):
         try:
             log.debug(
                 f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
             )
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=collection_name
-            )
+            return VECTOR_DB_CLIENT.get(collection_name=collection_name)
         except Exception as e:
             log.exception(f"Failed to fetch collection {collection_name}: {e}")
+            return None
+
+    to_fetch = []
+    for collection_name in collection_names:
+        if BM25_INDEX_STORE is not None:
             collection_results[collection_name] = None
+        else:
+            to_fetch.append(collection_name)
+
+    loop = asyncio.get_running_loop()
+    if BM25_INDEX_STORE is not None:
+        # Rebuild missing or outdated indexes once per collection up front,
+        # rather than in every query that searches it
+        await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    RETRIEVAL_EXECUTOR, get_bm25_index, collection_name
+                )
+                for collection_name in collection_names
+            ],
+            return_exceptions=True,
+        )
+
+    fetched = await asyncio.gather(
+        *[
+            loop.run_in_executor(RETRIEVAL_EXECUTOR, fetch_collection, collection_name)
+            for collection_name in to_fetch
+        ]
+    )
+    for collection_name, collection_result in zip(to_fetch, fetched):
+        collection_results[collection_name] = collection_result
+        if collection_result is None:
+            failed_collections.add(collection_name)
 
     log.info(
         f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
@@ -562,11 +662,11 @@ async def query_collection_with_hybrid_search(
             return None, e
 
     # Prepare tasks for all collections and queries
-    # Avoid running any tasks for collections that failed to fetch data (have assigned None)
+    # Avoid running any tasks for collections that failed to fetch data
     tasks = [
         (collection_name, query)
         for collection_name in collection_names
-        if collection_results[collection_name] is not None
+        if collection_name not in failed_collections
         for query in queries
     ]
 
@@ -975,14 +1075,27 @@ async def generate_embeddings(
 def get_reranking_function(reranking_engine, reranking_model, reranking_function):
     if reranking_function is None:
         return None
-    if reranking_engine == "external":
-        return lambda query, documents, user=None: reranking_function.predict(
-            [(query, doc.page_content) for doc in documents], user=user
-        )
-    else:
-        return lambda query, documents, user=None: reranking_function.predict(
-            [(query, doc.page_content) for doc in documents]
-        )
+    return RerankService(reranking_function, reranking_engine, reranking_model).rerank
+
+
+def get_precomputed_embedding_function(
+    embedding_function, queries: list[str], query_embeddings: list
+):
+    """
+    Serve already computed query embeddings to the retrievers of every item;
+    anything else is passed through to embedding_function.
+    """
+    known = dict(zip(queries, query_embeddings))
+
+    async def precomputed_embedding_function(query, prefix=None):
+        if prefix == RAG_EMBEDDING_QUERY_PREFIX:
+            texts = query if isinstance(query, list) else [query]
+            if all(text in known for text in texts):
+                embeddings = [known[text] for text in texts]
+                return embeddings if isinstance(query, list) else embeddings[0]
+        return await embedding_function(query, prefix=prefix)
+
+    return precomputed_embedding_function
 
 
 async def get_sources_from_items(
@@ -1004,7 +1117,8 @@ async def get_sources_from_items(
     )
 
     extracted_collections = []
-    query_results = []
+    # (item, query_result, collection_names to search when query_result is None)
+    planned_items = []
 
     for item in items:
         query_result = None
@@ -1201,42 +1315,80 @@ async def get_sources_from_items(
             if not collection_names:
                 log.debug(f"skipping {item} as it has already been extracted")
                 continue
+            extracted_collections.extend(collection_names)
 
-            try:
-                if full_context:
-                    query_result = get_all_items_from_collections(collection_names)
-                else:
-                    query_result = None  # Initialize to None
-                    if hybrid_search:
-                        try:
-                            query_result = await query_collection_with_hybrid_search(
-                                collection_names=collection_names,
-                                queries=queries,
-                                embedding_function=embedding_function,
-                                k=k,
-                                reranking_function=reranking_function,
-                                k_reranker=k_reranker,
-                                r=r,
-                                hybrid_bm25_weight=hybrid_bm25_weight,
-                                enable_enriched_texts=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH_ENRICHED_TEXTS,
-                            )
-                        except Exception as e:
-                            log.debug(
-                                "Error when using hybrid search, using non hybrid search as fallback."
-                            )
+        planned_items.append((item, query_result, collection_names))
 
-                    # fallback to non-hybrid search
-                    if not hybrid_search and query_result is None:
-                        query_result = await query_collection(
+    # Embed the queries once for all items, instead of once per searched item
+    searches = [
+        collection_names
+        for _, query_result, collection_names in planned_items
+        if query_result is None and collection_names
+    ]
+    query_embeddings = None
+    if searches and queries and not full_context:
+        try:
+            query_embeddings = await embedding_function(
+                queries, prefix=RAG_EMBEDDING_QUERY_PREFIX
+            )
+            embedding_function = get_precomputed_embedding_function(
+                embedding_function, queries, query_embeddings
+            )
+        except Exception as e:
+            log.exception(e)
+
+    async def search_collections(collection_names):
+        query_result = None
+        try:
+            if full_context:
+                query_result = await asyncio.get_running_loop().run_in_executor(
+                    RETRIEVAL_EXECUTOR,
+                    get_all_items_from_collections,
+                    collection_names,
+                )
+            else:
+                if hybrid_search:
+                    try:
+                        query_result = await query_collection_with_hybrid_search(
                             collection_names=collection_names,
                             queries=queries,
                             embedding_function=embedding_function,
                             k=k,
+                            reranking_function=reranking_function,
+                            k_reranker=k_reranker,
+                            r=r,
+                            hybrid_bm25_weight=hybrid_bm25_weight,
+                            enable_enriched_texts=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH_ENRICHED_TEXTS,
+                        )
+                    except Exception as e:
+                        log.debug(
+                            "Error when using hybrid search, using non hybrid search as fallback."
                         )
-            except Exception as e:
-                log.exception(e)
 
-            extracted_collections.extend(collection_names)
+                # fallback to non-hybrid search
+                if not hybrid_search and query_result is None:
+                    query_result = await query_collection(
+                        collection_names=collection_names,
+                        queries=queries,
+                        embedding_function=embedding_function,
+                        k=k,
+                        query_embeddings=query_embeddings,
+                    )
+        except Exception as e:
+            log.exception(e)
+        return query_result
+
+    # Search the collections of all items concurrently
+    search_results = iter(
+        await asyncio.gather(
+            *[search_collections(collection_names) for collection_names in searches]
+        )
+    )
+
+    query_results = []
+    for item, query_result, collection_names in planned_items:
+        if query_result is None and collection_names:
+            query_result = next(search_results)
 
         if query_result:
             if "data" in item:
@@ -1369,9 +1521,10 @@ if BaseDocumentCompressor is not None:
 
             scores = None
             if reranking:
-                scores = await asyncio.to_thread(
-                    self.reranking_function, query, documents
-                )
+                # Reranking functions from get_reranking_function are async
+                scores = self.reranking_function(query, documents)
+                if inspect.isawaitable(scores):
+                    scores = await scores
             else:
                 from sentence_transformers import util
 
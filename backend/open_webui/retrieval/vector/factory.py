@@ -1,7 +1,15 @@
 from open_webui.retrieval.vector.main import VectorDBBase
 from open_webui.retrieval.vector.type import VectorType
+from open_webui.env import ENABLE_LAZY_STARTUP, REDIS_KEY_PREFIX
+from open_webui.utils.lazy import LazyObject
+from open_webui.retrieval.bm25_index import BM25IndexedVectorDB, BM25IndexStore
+from open_webui.retrieval.query_cache import QUERY_CACHE, VersionedVectorDB
+from open_webui.retrieval.versions import CollectionVersions
+from open_webui.utils.redis import get_redis_client
 from open_webui.config import (
     VECTOR_DB,
+    ENABLE_RAG_BM25_INDEX,
+    RAG_BM25_INDEX_DIR,
     ENABLE_QDRANT_MULTITENANCY_MODE,
     ENABLE_MILVUS_MULTITENANCY_MODE,
 )
@@ -79,4 +87,32 @@ class Vector:
                 raise ValueError(f"Unsupported vector type: {vector_type}")
 
 
-VECTOR_DB_CLIENT = Vector.get_vector(VECTOR_DB)
+BM25_INDEX_STORE = (
+    BM25IndexStore(
+        RAG_BM25_INDEX_DIR,
+        CollectionVersions(
+            f"{RAG_BM25_INDEX_DIR}/versions.db",
+            redis=get_redis_client(),
+            key_prefix=f"{REDIS_KEY_PREFIX}:bm25:version",
+        ),
+    )
+    if ENABLE_RAG_BM25_INDEX
+    else None
+)
+
+
+def get_vector_db_client() -> VectorDBBase:
+    client = Vector.get_vector(VECTOR_DB)
+    if BM25_INDEX_STORE is not None:
+        client = BM25IndexedVectorDB(client, BM25_INDEX_STORE)
+    if QUERY_CACHE is not None:
+        client = VersionedVectorDB(client, QUERY_CACHE.versions)
+    return client
+
+
+if ENABLE_LAZY_STARTUP:
+    VECTOR_DB_CLIENT = LazyObject(
+        get_vector_db_client, name=f"{VECTOR_DB} vector client"
+    )
+else:
+    VECTOR_DB_CLIENT = get_vector_db_client()
@@ -0,0 +1,98 @@
+import logging
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+# (global epoch, collection version)
+Version = tuple[int, int]
+
+
+class CollectionVersions:
+    """
+    Per-collection write counters used to tell whether derived data (a BM25
+    index, a cached search result) still matches a collection.
+
+    With Redis the counters are shared by every worker and host. Without it
+    they live in a SQLite file shared by the workers of this host only, which
+    is enough for single-host deployments. A reset bumps a global epoch
+    instead of clearing the counters, so versions never repeat.
+    """
+
+    GLOBAL_KEY = ""
+
+    def __init__(self, path: str, redis=None, key_prefix: str = ""):
+        self.redis = redis
+        self.key_prefix = key_prefix
+        self.path = Path(path)
+        if self.redis is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.connect() as conn:
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS versions "
+                    "(collection TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+                )
+                conn.commit()
+
+    @contextmanager
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _get_redis_key(self, collection_name: str) -> str:
+        if collection_name == self.GLOBAL_KEY:
+            return self.key_prefix
+        return f"{self.key_prefix}:{collection_name}"
+
+    def get(self, collection_name: str) -> Version:
+        if self.redis is not None:
+            epoch, version = self.redis.mget(
+                self._get_redis_key(self.GLOBAL_KEY),
+                self._get_redis_key(collection_name),
+            )
+            return int(epoch or 0), int(version or 0)
+
+        with self.connect() as conn:
+            versions = dict(
+                conn.execute(
+                    "SELECT collection, version FROM versions WHERE collection IN (?, ?)",
+                    (self.GLOBAL_KEY, collection_name),
+                )
+            )
+        return versions.get(self.GLOBAL_KEY, 0), versions.get(collection_name, 0)
+
+    def bump(self, collection_name: str) -> Version:
+        """Increment the collection's version and return the new one."""
+        if self.redis is not None:
+            pipe = self.redis.pipeline()
+            pipe.get(self._get_redis_key(self.GLOBAL_KEY))
+            pipe.incr(self._get_redis_key(collection_name))
+            epoch, version = pipe.execute()
+            return int(epoch or 0), int(version)
+
+        with self.connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO versions (collection, version) VALUES (?, 1) "
+                "ON CONFLICT(collection) DO UPDATE SET version = version + 1",
+                (collection_name,),
+            )
+            versions = dict(
+                conn.execute(
+                    "SELECT collection, version FROM versions WHERE collection IN (?, ?)",
+                    (self.GLOBAL_KEY, collection_name),
+                )
+            )
+            conn.commit()
+        return versions.get(self.GLOBAL_KEY, 0), versions[collection_name]
+
+    def bump_all(self) -> None:
+        if self.redis is not None:
+            self.redis.incr(self._get_redis_key(self.GLOBAL_KEY))
+        else:
+            self.bump(self.GLOBAL_KEY)
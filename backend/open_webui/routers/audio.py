@@ -6,8 +6,6 @@ import uuid
 import html
 import base64
 from functools import lru_cache
-from pydub import AudioSegment
-from pydub.silence import split_on_silence
 from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
@@ -77,14 +75,13 @@ SPEECH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 #
 ##########################################
 
-from pydub import AudioSegment
-from pydub.utils import mediainfo
-
 
 def is_audio_conversion_required(file_path):
     """
     Check if the given audio file needs conversion to mp3.
     """
+    from pydub.utils import mediainfo
+
     SUPPORTED_FORMATS = {"flac", "m4a", "mp3", "mp4", "mpeg", "wav", "webm"}
 
     if not os.path.isfile(file_path):
@@ -113,6 +110,8 @@ def is_audio_conversion_required(file_path):
 
 def convert_audio_to_mp3(file_path):
     """Convert audio file to mp3 format."""
+    from pydub import AudioSegment
+
     try:
         output_path = os.path.splitext(file_path)[0] + ".mp3"
         audio = AudioSegment.from_file(file_path)
@@ -1106,6 +1105,8 @@ def compress_audio(file_path):
         ]  # Handles names with multiple dots
         file_dir = os.path.dirname(file_path)
 
+        from pydub import AudioSegment
+
         audio = AudioSegment.from_file(file_path)
         audio = audio.set_frame_rate(16000).set_channels(1)  # Compress audio
 
@@ -1127,6 +1128,8 @@ def split_audio(file_path, max_bytes, format="mp3", bitrate="32k"):
     if file_size <= max_bytes:
         return [file_path]  # Nothing to split
 
+    from pydub import AudioSegment
+
     audio = AudioSegment.from_file(file_path)
     duration_ms = len(audio)
     orig_size = file_size
@@ -67,6 +67,7 @@ from open_webui.utils.access_control import (
 )
 from open_webui.utils.webhook import post_webhook
 from open_webui.utils.channels import extract_mentions, replace_mentions
+from open_webui.utils.pagination import get_next_cursor
 from open_webui.internal.db import get_session
 from sqlalchemy.orm import Session
 
@@ -118,37 +119,39 @@ async def get_channels(
         )
 
     channels = Channels.get_channels_by_user_id(user.id, db=db)
-    channel_list = []
-    for channel in channels:
-        last_message = Messages.get_last_message_by_channel_id(channel.id, db=db)
-        last_message_at = last_message.created_at if last_message else None
+    channel_ids = [channel.id for channel in channels]
 
-        channel_member = Channels.get_member_by_channel_and_user_id(
-            channel.id, user.id, db=db
-        )
-        unread_count = (
-            Messages.get_unread_message_count(
-                channel.id, user.id, channel_member.last_read_at, db=db
-            )
-            if channel_member
-            else 0
-        )
+    # Aggregates for all channels in a constant number of grouped queries
+    last_message_at = Messages.get_last_message_at_by_channel_ids(channel_ids, db=db)
+    unread_counts = Messages.get_unread_message_counts_by_channel_ids(
+        channel_ids, user.id, db=db
+    )
 
+    dm_user_ids = {}
+    for member in Channels.get_members_by_channel_ids(
+        [channel.id for channel in channels if channel.type == "dm"], db=db
+    ):
+        dm_user_ids.setdefault(member.channel_id, []).append(member.user_id)
+
+    all_dm_user_ids = list({id for ids in dm_user_ids.values() for id in ids})
+    dm_users = {u.id: u for u in Users.get_users_by_user_ids(all_dm_user_ids, db=db)}
+    active_user_ids = Users.get_active_user_ids(all_dm_user_ids, db=db)
+
+    channel_list = []
+    for channel in channels:
         user_ids = None
         users = None
         if channel.type == "dm":
-            user_ids = [
-                member.user_id
-                for member in Channels.get_members_by_channel_id(channel.id, db=db)
-            ]
+            user_ids = dm_user_ids.get(channel.id, [])
             users = [
                 UserIdNameStatusResponse(
                     **{
-                        **user.model_dump(),
-                        "is_active": Users.is_user_active(user.id, db=db),
+                        **dm_users[user_id].model_dump(),
+                        "is_active": user_id in active_user_ids,
                     }
                 )
-                for user in Users.get_users_by_user_ids(user_ids, db=db)
+                for user_id in user_ids
+                if user_id in dm_users
             ]
 
         channel_list.append(
@@ -156,8 +159,8 @@ async def get_channels(
                 **channel.model_dump(),
                 user_ids=user_ids,
                 users=users,
-                last_message_at=last_message_at,
-                unread_count=unread_count,
+                last_message_at=last_message_at.get(channel.id),
+                unread_count=unread_counts.get(channel.id, 0),
             )
         )
 
@@ -494,10 +497,11 @@ async def get_channel_members_by_id(
         users = Users.get_users_by_user_ids(user_ids, db=db)
         total = len(users)
 
+        active_user_ids = Users.get_active_user_ids([u.id for u in users], db=db)
         return {
             "users": [
                 UserModelResponse(
-                    **user.model_dump(), is_active=Users.is_user_active(user.id, db=db)
+                    **user.model_dump(), is_active=user.id in active_user_ids
                 )
                 for user in users
             ],
@@ -529,10 +533,11 @@ async def get_channel_members_by_id(
         users = result["users"]
         total = result["total"]
 
+        active_user_ids = Users.get_active_user_ids([u.id for u in users], db=db)
         return {
             "users": [
                 UserModelResponse(
-                    **user.model_dump(), is_active=Users.is_user_active(user.id, db=db)
+                    **user.model_dump(), is_active=user.id in active_user_ids
                 )
                 for user in users
             ],
@@ -782,9 +787,11 @@ class MessageUserResponse(MessageResponse):
 @router.get("/{id}/messages", response_model=list[MessageUserResponse])
 async def get_channel_messages(
     request: Request,
+    response: Response,
     id: str,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = None,
     user=Depends(get_verified_user),
     db: Session = Depends(get_session),
 ):
@@ -812,36 +819,44 @@ async def get_channel_messages(
             id, user.id, db=db
         )  # Ensure user is a member of the channel
 
-    message_list = Messages.get_messages_by_channel_id(id, skip, limit, db=db)
+    try:
+        message_list = Messages.get_messages_by_channel_id(
+            id, skip, limit, cursor=cursor, db=db
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     if not message_list:
         return []
 
+    # Clients scrolling back pass this instead of skip
+    next_cursor = get_next_cursor(message_list, ["created_at", "id"], limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
     # Batch fetch all users in a single query (fixes N+1 problem)
     user_ids = list(set(m.user_id for m in message_list))
     users = {u.id: u for u in Users.get_users_by_user_ids(user_ids, db=db)}
 
+    message_ids = [m.id for m in message_list]
+    thread_stats = Messages.get_thread_reply_stats_by_message_ids(message_ids, db=db)
+    reactions = Messages.get_reactions_by_message_ids(message_ids, db=db)
+
     messages = []
     for message in message_list:
-        thread_replies = Messages.get_thread_replies_by_message_id(message.id, db=db)
-        latest_thread_reply_at = (
-            thread_replies[0].created_at if thread_replies else None
-        )
-
         # Use message.user if present (for webhooks), otherwise look up by user_id
         user_info = message.user
         if user_info is None and message.user_id in users:
             user_info = UserNameResponse(**users[message.user_id].model_dump())
 
+        stats = thread_stats.get(message.id, {})
         messages.append(
             MessageUserResponse(
                 **{
                     **message.model_dump(),
-                    "reply_count": len(thread_replies),
-                    "latest_reply_at": latest_thread_reply_at,
-                    "reactions": Messages.get_reactions_by_message_id(
-                        message.id, db=db
-                    ),
+                    "reply_count": stats.get("reply_count", 0),
+                    "latest_reply_at": stats.get("latest_reply_at"),
+                    "reactions": reactions.get(message.id, []),
                     "user": user_info,
                 }
             )
@@ -898,6 +913,10 @@ async def get_pinned_channel_messages(
     user_ids = list(set(m.user_id for m in message_list))
     users = {u.id: u for u in Users.get_users_by_user_ids(user_ids, db=db)}
 
+    reactions = Messages.get_reactions_by_message_ids(
+        [m.id for m in message_list], db=db
+    )
+
     messages = []
     for message in message_list:
         # Check for webhook identity in meta
@@ -917,9 +936,7 @@ async def get_pinned_channel_messages(
             MessageWithReactionsResponse(
                 **{
                     **message.model_dump(),
-                    "reactions": Messages.get_reactions_by_message_id(
-                        message.id, db=db
-                    ),
+                    "reactions": reactions.get(message.id, []),
                     "user": user_info,
                 }
             )
@@ -1500,6 +1517,10 @@ async def get_channel_thread_messages(
     user_ids = list(set(m.user_id for m in message_list))
     users = {u.id: u for u in Users.get_users_by_user_ids(user_ids, db=db)}
 
+    reactions = Messages.get_reactions_by_message_ids(
+        [m.id for m in message_list], db=db
+    )
+
     messages = []
     for message in message_list:
         # Use message.user if present (for webhooks), otherwise look up by user_id
@@ -1513,9 +1534,7 @@ async def get_channel_thread_messages(
                     **message.model_dump(),
                     "reply_count": 0,
                     "latest_reply_at": None,
-                    "reactions": Messages.get_reactions_by_message_id(
-                        message.id, db=db
-                    ),
+                    "reactions": reactions.get(message.id, []),
                     "user": user_info,
                 }
             )
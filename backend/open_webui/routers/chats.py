@@ -7,6 +7,7 @@ from fastapi.responses import StreamingResponse
 
 
 from open_webui.utils.misc import get_message_list
+from open_webui.utils.pagination import get_next_cursor
 from open_webui.socket.main import get_event_emitter
 from open_webui.models.chats import (
     ChatForm,
@@ -28,7 +29,7 @@ from open_webui.internal.db import get_session
 
 from open_webui.config import ENABLE_ADMIN_CHAT_ACCESS, ENABLE_ADMIN_EXPORT
 from open_webui.constants import ERROR_MESSAGES
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel
 
 
@@ -47,25 +48,34 @@ router = APIRouter()
 @router.get("/", response_model=list[ChatTitleIdResponse])
 @router.get("/list", response_model=list[ChatTitleIdResponse])
 def get_session_user_chat_list(
+    response: Response,
     user=Depends(get_verified_user),
     page: Optional[int] = None,
+    cursor: Optional[str] = None,
     include_pinned: Optional[bool] = False,
     include_folders: Optional[bool] = False,
     db: Session = Depends(get_session),
 ):
     try:
-        if page is not None:
+        if page is not None or cursor is not None:
             limit = 60
-            skip = (page - 1) * limit
+            skip = (page - 1) * limit if page is not None else None
 
-            return Chats.get_chat_title_id_list_by_user_id(
+            chats = Chats.get_chat_title_id_list_by_user_id(
                 user.id,
                 include_folders=include_folders,
                 include_pinned=include_pinned,
                 skip=skip,
                 limit=limit,
+                cursor=cursor,
                 db=db,
             )
+
+            # Clients scrolling down pass this instead of page
+            next_cursor = get_next_cursor(chats, ["updated_at", "id"], limit)
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+            return chats
         else:
             return Chats.get_chat_title_id_list_by_user_id(
                 user.id,
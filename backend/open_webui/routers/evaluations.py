@@ -50,12 +50,16 @@ router = APIRouter()
 #    This gives topic-specific leaderboards without needing separate data.
 
 import os
+import threading
+from collections import defaultdict
 
 EMBEDDING_MODEL_NAME = os.environ.get(
     "AUXILIARY_EMBEDDING_MODEL", "TaylorAI/bge-micro-v2"
 )
 _embedding_model = None
 
+K_FACTOR = 32  # Standard Elo K-factor for rating volatility
+
 
 def _get_embedding_model():
     global _embedding_model
@@ -69,81 +73,231 @@ def _get_embedding_model():
     return _embedding_model
 
 
-def _calculate_elo(
-    feedbacks: list[LeaderboardFeedbackData], similarities: dict = None
-) -> dict:
+def _update_elo(
+    model_stats: dict,
+    winner_id: str,
+    opponent_ids: list[str],
+    won: bool,
+    weight: float = 1.0,
+) -> None:
     """
-    Calculate Elo ratings for models based on user feedback.
-
-    Each feedback represents a comparison where a user rated one model
-    against its opponents (sibling_model_ids). Rating=1 means the model won,
-    rating=-1 means it lost.
+    Apply one feedback to the Elo ratings in model_stats.
 
-    The Elo system adjusts ratings based on:
+    A feedback represents a comparison where a user rated one model against
+    its opponents (sibling_model_ids). The adjustment depends on:
     - Current rating difference (upsets cause bigger swings)
-    - Optional similarity weights (for query-based filtering)
+    - Optional similarity weight (for query-based filtering)
+
+    model_stats: {model_id: {"rating": float, "won": int, "lost": int}}
+    """
+    for opponent_id in opponent_ids:
+        winner = model_stats.setdefault(
+            winner_id, {"rating": 1000.0, "won": 0, "lost": 0}
+        )
+        opponent = model_stats.setdefault(
+            opponent_id, {"rating": 1000.0, "won": 0, "lost": 0}
+        )
+        expected = 1 / (1 + 10 ** ((opponent["rating"] - winner["rating"]) / 400))
 
-    Returns: {model_id: {"rating": float, "won": int, "lost": int}}
+        winner["rating"] += K_FACTOR * ((1 if won else 0) - expected) * weight
+        opponent["rating"] += K_FACTOR * ((0 if won else 1) - (1 - expected)) * weight
+
+        if won:
+            winner["won"] += 1
+            opponent["lost"] += 1
+        else:
+            winner["lost"] += 1
+            opponent["won"] += 1
+
+
+class Leaderboard:
     """
-    K_FACTOR = 32  # Standard Elo K-factor for rating volatility
-    model_stats = {}
+    Elo ratings and tag counts over all feedback, kept up to date instead of
+    being recomputed from every feedback row on each request.
+
+    New feedback is applied as it is created (create_feedback) or, when it was
+    created by another worker, when the next leaderboard request finds rows
+    it has not seen yet. Edited or deleted feedback changes past matches, so
+    it makes the next request rebuild everything from the database: the
+    handlers that edit or delete feedback invalidate the leaderboard, and
+    other workers notice changed timestamps or row counts when they sync.
+
+    Tag embeddings are computed once per distinct tag and kept as rows of a
+    normalized matrix, so a query costs one query embedding and one matmul
+    before the similarity-weighted ratings are replayed from memory.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._reset()
+
+        self.tag_index: dict[str, int] = {}
+        self.tag_matrix = None  # normalized tag embeddings, one row per tag
 
-    def get_or_create_stats(model_id):
-        if model_id not in model_stats:
-            model_stats[model_id] = {"rating": 1000.0, "won": 0, "lost": 0}
-        return model_stats[model_id]
+    def _reset(self) -> None:
+        self.loaded = False
+        self.model_stats: dict = {}
+        self.tag_counts = defaultdict(lambda: defaultdict(int))
+        # (winner_id, opponent_ids, won, tags) per rated feedback, in order
+        self.matches: list[tuple[str, list[str], bool, list[str]]] = []
+        self.updated_at: dict[str, int] = {}  # feedback id -> updated_at
+        self.watermark: Optional[int] = None
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self._reset()
+
+    def _apply(self, feedback: LeaderboardFeedbackData) -> None:
+        self.updated_at[feedback.id] = feedback.updated_at or 0
+        self.watermark = max(self.watermark or 0, feedback.updated_at or 0)
 
-    for feedback in feedbacks:
         data = feedback.data or {}
         winner_id = data.get("model_id")
+        if winner_id:
+            for tag in data.get("tags", []):
+                self.tag_counts[winner_id][tag] += 1
+
         rating_value = str(data.get("rating", ""))
         if not winner_id or rating_value not in ("1", "-1"):
-            continue
-
-        won = rating_value == "1"
-        weight = similarities.get(feedback.id, 1.0) if similarities else 1.0
+            return
 
-        for opponent_id in data.get("sibling_model_ids") or []:
-            winner = get_or_create_stats(winner_id)
-            opponent = get_or_create_stats(opponent_id)
-            expected = 1 / (1 + 10 ** ((opponent["rating"] - winner["rating"]) / 400))
+        match = (
+            winner_id,
+            list(data.get("sibling_model_ids") or []),
+            rating_value == "1",
+            list(data.get("tags", [])),
+        )
+        self.matches.append(match)
+        _update_elo(self.model_stats, *match[:3])
+
+    def add_feedback(self, feedback: FeedbackModel) -> None:
+        """Apply a newly created feedback if the leaderboard is loaded."""
+        with self.lock:
+            if self.loaded and feedback.id not in self.updated_at:
+                self._apply(
+                    LeaderboardFeedbackData(
+                        id=feedback.id,
+                        data=feedback.data,
+                        created_at=feedback.created_at,
+                        updated_at=feedback.updated_at,
+                    )
+                )
+
+    def sync(self, db: Optional[Session] = None) -> None:
+        """Catch up with feedback written since the last sync, rebuilding if needed."""
+        with self.lock:
+            if self.loaded:
+                # Timestamps have second resolution, so re-read the last second
+                rows = Feedbacks.get_feedbacks_for_leaderboard(
+                    updated_since=self.watermark, db=db
+                )
+                new_rows = [row for row in rows if row.id not in self.updated_at]
+                changed = any(
+                    row.updated_at != self.updated_at[row.id]
+                    for row in rows
+                    if row.id in self.updated_at
+                )
+                if not changed and Feedbacks.get_feedback_count(db=db) == len(
+                    self.updated_at
+                ) + len(new_rows):
+                    for row in new_rows:
+                        self._apply(row)
+                    return
+
+                log.debug("Feedback was edited or deleted, rebuilding leaderboard")
+                self._reset()
+
+            for row in Feedbacks.get_feedbacks_for_leaderboard(db=db):
+                self._apply(row)
+            self.loaded = True
+
+    def _embed_tags(self, embedding_model, tags: list[str]) -> None:
+        import numpy as np
+
+        new_tags = [tag for tag in dict.fromkeys(tags) if tag not in self.tag_index]
+        if not new_tags:
+            return
+
+        embeddings = np.asarray(embedding_model.encode(new_tags), dtype=np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-9
+        self.tag_matrix = (
+            embeddings
+            if self.tag_matrix is None
+            else np.vstack([self.tag_matrix, embeddings])
+        )
+        for tag in new_tags:
+            self.tag_index[tag] = len(self.tag_index)
+
+    def _similarities(self, query: str):
+        """
+        How relevant each match is to the query: the highest cosine similarity
+        between the query and the match's tags (0 without tags). Returns None
+        when no similarities can be computed, which leaves matches unweighted.
+        """
+        import numpy as np
+
+        embedding_model = _get_embedding_model()
+        tags = [tag for match in self.matches for tag in match[3]]
+        if not embedding_model or not tags:
+            return None
 
-            winner["rating"] += K_FACTOR * ((1 if won else 0) - expected) * weight
-            opponent["rating"] += (
-                K_FACTOR * ((0 if won else 1) - (1 - expected)) * weight
+        try:
+            self._embed_tags(embedding_model, tags)
+            query_embedding = np.asarray(
+                embedding_model.encode([query])[0], dtype=np.float32
             )
-
-            if won:
-                winner["won"] += 1
-                opponent["lost"] += 1
+        except Exception as e:
+            log.error(f"Embedding error: {e}")
+            return None
+
+        query_embedding /= np.linalg.norm(query_embedding) + 1e-9
+        # An extra -inf at index -1 pads the tag lists of the matches
+        tag_similarities = np.append(self.tag_matrix @ query_embedding, -np.inf)
+
+        width = max(len(match[3]) for match in self.matches)
+        tag_ids = np.full((len(self.matches), width), -1)
+        for row, match in enumerate(self.matches):
+            tag_ids[row, : len(match[3])] = [self.tag_index[tag] for tag in match[3]]
+        similarities = tag_similarities[tag_ids].max(axis=1)
+        similarities[np.isneginf(similarities)] = 0.0
+        return similarities
+
+    def get_stats(self, query: Optional[str] = None) -> tuple[dict, dict]:
+        """
+        Return the Elo stats ({model_id: {"rating", "won", "lost"}}) and the
+        tag counts per model, with ratings weighted by relevance to query.
+        """
+        with self.lock:
+            tag_counts = {
+                model_id: dict(tags) for model_id, tags in self.tag_counts.items()
+            }
+            weights = self._similarities(query) if query else None
+            if weights is None:
+                model_stats = {
+                    model_id: dict(stats)
+                    for model_id, stats in self.model_stats.items()
+                }
             else:
-                winner["lost"] += 1
-                opponent["won"] += 1
+                model_stats = {}
+                for match, weight in zip(self.matches, weights.tolist()):
+                    _update_elo(model_stats, *match[:3], weight=weight)
+
+        return model_stats, tag_counts
 
-    return model_stats
 
+LEADERBOARD = Leaderboard()
 
-def _get_top_tags(feedbacks: list[LeaderboardFeedbackData], limit: int = 5) -> dict:
+
+def _get_top_tags(tag_counts: dict, limit: int = 5) -> dict:
     """
-    Count tag occurrences per model and return the most frequent ones.
+    Return the most frequent tags per model.
 
     Each feedback can have tags describing the conversation topic.
-    This aggregates those tags per model to show what topics each model
-    is commonly used for.
+    The counts aggregate those tags per model to show what topics each
+    model is commonly used for.
 
     Returns: {model_id: [{"tag": str, "count": int}, ...]}
     """
-    from collections import defaultdict
-
-    tag_counts = defaultdict(lambda: defaultdict(int))
-
-    for feedback in feedbacks:
-        data = feedback.data or {}
-        model_id = data.get("model_id")
-        if model_id:
-            for tag in data.get("tags", []):
-                tag_counts[model_id][tag] += 1
-
     return {
         model_id: [
             {"tag": tag, "count": count}
@@ -153,63 +307,6 @@ def _get_top_tags(feedbacks: list[LeaderboardFeedbackData], limit: int = 5) -> d
     }
 
 
-def _compute_similarities(feedbacks: list[LeaderboardFeedbackData], query: str) -> dict:
-    """
-    Compute how relevant each feedback is to a search query.
-
-    Uses embeddings to find semantic similarity between the query and
-    each feedback's tags. Higher similarity means the feedback is more
-    relevant to what the user searched for.
-
-    This is used to weight Elo calculations - feedbacks matching the
-    query have more influence on the final rankings.
-
-    Returns: {feedback_id: similarity_score (0-1)}
-    """
-    import numpy as np
-
-    embedding_model = _get_embedding_model()
-    if not embedding_model:
-        return {}
-
-    all_tags = list(
-        {
-            tag
-            for feedback in feedbacks
-            if feedback.data
-            for tag in feedback.data.get("tags", [])
-        }
-    )
-    if not all_tags:
-        return {}
-
-    try:
-        tag_embeddings = embedding_model.encode(all_tags)
-        query_embedding = embedding_model.encode([query])[0]
-    except Exception as e:
-        log.error(f"Embedding error: {e}")
-        return {}
-
-    # Vectorized cosine similarity
-    tag_norms = np.linalg.norm(tag_embeddings, axis=1)
-    query_norm = np.linalg.norm(query_embedding)
-    similarities = np.dot(tag_embeddings, query_embedding) / (
-        tag_norms * query_norm + 1e-9
-    )
-    tag_similarity_map = dict(zip(all_tags, similarities.tolist()))
-
-    return {
-        feedback.id: max(
-            (
-                tag_similarity_map.get(tag, 0)
-                for tag in (feedback.data or {}).get("tags", [])
-            ),
-            default=0,
-        )
-        for feedback in feedbacks
-    }
-
-
 class LeaderboardEntry(BaseModel):
     model_id: str
     rating: int
@@ -230,16 +327,12 @@ async def get_leaderboard(
     db: Session = Depends(get_session),
 ):
     """Get model leaderboard with Elo ratings. Query filters by tag similarity."""
-    feedbacks = Feedbacks.get_feedbacks_for_leaderboard(db=db)
+    LEADERBOARD.sync(db=db)
 
-    similarities = None
-    if query and query.strip():
-        similarities = await run_in_threadpool(
-            _compute_similarities, feedbacks, query.strip()
-        )
-
-    elo_stats = _calculate_elo(feedbacks, similarities)
-    tags_by_model = _get_top_tags(feedbacks)
+    elo_stats, tag_counts = await run_in_threadpool(
+        LEADERBOARD.get_stats, query.strip() if query and query.strip() else None
+    )
+    tags_by_model = _get_top_tags(tag_counts)
 
     entries = sorted(
         [
@@ -334,6 +427,7 @@ async def delete_all_feedbacks(
     user=Depends(get_admin_user), db: Session = Depends(get_session)
 ):
     success = Feedbacks.delete_all_feedbacks(db=db)
+    LEADERBOARD.invalidate()
     return success
 
 
@@ -358,6 +452,7 @@ async def delete_feedbacks(
     user=Depends(get_verified_user), db: Session = Depends(get_session)
 ):
     success = Feedbacks.delete_feedbacks_by_user_id(user.id, db=db)
+    LEADERBOARD.invalidate()
     return success
 
 
@@ -403,6 +498,7 @@ async def create_feedback(
             detail=ERROR_MESSAGES.DEFAULT(),
         )
 
+    LEADERBOARD.add_feedback(feedback)
     return feedback
 
 
@@ -444,6 +540,7 @@ async def update_feedback_by_id(
             status_code=status.HTTP_404_NOT_FOUND, detail=ERROR_MESSAGES.NOT_FOUND
         )
 
+    LEADERBOARD.invalidate()
     return feedback
 
 
@@ -463,4 +560,5 @@ async def delete_feedback_by_id(
             status_code=status.HTTP_404_NOT_FOUND, detail=ERROR_MESSAGES.NOT_FOUND
         )
 
+    LEADERBOARD.invalidate()
     return success
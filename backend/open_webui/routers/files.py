@@ -1,4 +1,5 @@
 import logging
+import mimetypes
 import os
 import uuid
 import json
@@ -20,11 +21,14 @@ from fastapi import (
     Query,
 )
 
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 from open_webui.internal.db import get_session, SessionLocal
 
+from open_webui.config import STORAGE_CACHE_RANGE_FILL_MAX_SIZE_MB
 from open_webui.constants import ERROR_MESSAGES
+from open_webui.env import ENABLE_INGESTION_QUEUE
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
 
 from open_webui.models.channels import Channels
@@ -38,17 +42,18 @@ from open_webui.models.files import (
 from open_webui.models.chats import Chats
 from open_webui.models.knowledge import Knowledges
 from open_webui.models.groups import Groups
+from open_webui.models.ingestion_jobs import IngestionJobs
 
 
 from open_webui.routers.retrieval import ProcessFileForm, process_file
-from open_webui.routers.audio import transcribe
+from open_webui.retrieval.ingestion import enqueue_file_ingestion
 
 from open_webui.storage.provider import Storage
 
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access
-from open_webui.utils.misc import strict_match_mime_type
+from open_webui.utils.misc import parse_range_header, strict_match_mime_type
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -134,6 +139,8 @@ def process_uploaded_file(
                 if strict_match_mime_type(
                     stt_supported_content_types, file.content_type
                 ):
+                    from open_webui.routers.audio import transcribe
+
                     file_path_processed = Storage.get_file(file_path)
                     result = transcribe(
                         request, file_path_processed, file_metadata, user
@@ -259,7 +266,7 @@ def upload_file_handler(
         id = str(uuid.uuid4())
         name = filename
         filename = f"{id}_{filename}"
-        contents, file_path = Storage.upload_file(
+        size, file_path = Storage.upload_file(
             file.file,
             filename,
             {
@@ -283,7 +290,7 @@ def upload_file_handler(
                     "meta": {
                         "name": name,
                         "content_type": file.content_type,
-                        "size": len(contents),
+                        "size": size,
                         "data": file_metadata,
                     },
                 }
@@ -302,15 +309,19 @@ def upload_file_handler(
 
         if process:
             if background_tasks and process_in_background:
-                background_tasks.add_task(
-                    process_uploaded_file,
-                    request,
-                    file,
-                    file_path,
-                    file_item,
-                    file_metadata,
-                    user,
-                )
+                if ENABLE_INGESTION_QUEUE:
+                    # Processed by the ingestion worker, not this web process
+                    enqueue_file_ingestion(file_item.id, user.id, db=db)
+                else:
+                    background_tasks.add_task(
+                        process_uploaded_file,
+                        request,
+                        file,
+                        file_path,
+                        file_item,
+                        file_metadata,
+                        user,
+                    )
                 return {"status": True, **file_item.model_dump()}
             else:
                 process_uploaded_file(
@@ -509,6 +520,12 @@ async def get_file_process_status(
                             event = {"status": status}
                             if status == "failed":
                                 event["error"] = data.get("error")
+                            if ENABLE_INGESTION_QUEUE and status == "pending":
+                                progress = IngestionJobs.get_progress_by_file_id(
+                                    file_id
+                                )
+                                if progress:
+                                    event["job"] = progress.model_dump()
 
                             yield f"data: {json.dumps(event)}\n\n"
                             if status in ("completed", "failed"):
@@ -527,7 +544,12 @@ async def get_file_process_status(
                 media_type="text/event-stream",
             )
         else:
-            return {"status": file.data.get("status", "pending")}
+            response = {"status": file.data.get("status", "pending")}
+            if ENABLE_INGESTION_QUEUE and response["status"] == "pending":
+                progress = IngestionJobs.get_progress_by_file_id(id, db=db)
+                if progress:
+                    response["job"] = progress.model_dump()
+            return response
     else:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -614,6 +636,77 @@ async def update_file_data_content_by_id(
         )
 
 
+def fill_storage_cache(file_path: str) -> None:
+    # Waiting for a download already under way would only hold a thread
+    if Storage.cache.is_downloading(file_path):
+        return
+    Storage.get_file(file_path)
+
+
+def get_file_response(
+    request: Request,
+    file_path: str,
+    headers: Optional[dict] = None,
+    media_type: Optional[str] = None,
+) -> Response:
+    """
+    Serve a stored file, honouring single-range Range requests.
+
+    Files on local disk (local storage, or a current copy in the storage cache)
+    are served by FileResponse. Files in object storage are streamed to the
+    client as they are read, fetching only the requested range, and are copied
+    to the storage cache in the background for the next request. Range requests
+    do so only for objects up to STORAGE_CACHE_RANGE_FILL_MAX_SIZE_MB, and no
+    copy is started while one of the same object is running.
+    """
+    local_path = Storage.get_cached_file(file_path)
+    if local_path is not None:
+        if not os.path.isfile(local_path):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=ERROR_MESSAGES.NOT_FOUND,
+            )
+        return FileResponse(local_path, headers=headers, media_type=media_type)
+
+    size = Storage.get_file_size(file_path)
+    headers = {**(headers or {}), "Accept-Ranges": "bytes"}
+    try:
+        byte_range = parse_range_header(request.headers.get("range"), size)
+    except ValueError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+
+    if byte_range is None:
+        start, end = 0, None
+        status_code = status.HTTP_200_OK
+        headers["Content-Length"] = str(size)
+    else:
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+
+    return StreamingResponse(
+        Storage.iter_file(file_path, start, end),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type
+        or mimetypes.guess_type(file_path)[0]
+        or "application/octet-stream",
+        background=(
+            BackgroundTask(fill_storage_cache, file_path)
+            if Storage.cache is not None
+            and (
+                byte_range is None
+                or size <= STORAGE_CACHE_RANGE_FILL_MAX_SIZE_MB * 1024 * 1024
+            )
+            else None
+        ),
+    )
+
+
 ############################
 # Get File Content By Id
 ############################
@@ -621,6 +714,7 @@ async def update_file_data_content_by_id(
 
 @router.get("/{id}/content")
 async def get_file_content_by_id(
+    request: Request,
     id: str,
     user=Depends(get_verified_user),
     attachment: bool = Query(False),
@@ -640,44 +734,33 @@ async def get_file_content_by_id(
         or has_access_to_file(id, "read", user, db=db)
     ):
         try:
-            file_path = Storage.get_file(file.path)
-            file_path = Path(file_path)
-
-            # Check if the file already exists in the cache
-            if file_path.is_file():
-                # Handle Unicode filenames
-                filename = file.meta.get("name", file.filename)
-                encoded_filename = quote(filename)  # RFC5987 encoding
+            # Handle Unicode filenames
+            filename = file.meta.get("name", file.filename)
+            encoded_filename = quote(filename)  # RFC5987 encoding
 
-                content_type = file.meta.get("content_type")
-                filename = file.meta.get("name", file.filename)
-                encoded_filename = quote(filename)
-                headers = {}
+            content_type = file.meta.get("content_type")
+            headers = {}
 
-                if attachment:
+            if attachment:
+                headers["Content-Disposition"] = (
+                    f"attachment; filename*=UTF-8''{encoded_filename}"
+                )
+            else:
+                if content_type == "application/pdf" or filename.lower().endswith(
+                    ".pdf"
+                ):
+                    headers["Content-Disposition"] = (
+                        f"inline; filename*=UTF-8''{encoded_filename}"
+                    )
+                    content_type = "application/pdf"
+                elif content_type != "text/plain":
                     headers["Content-Disposition"] = (
                         f"attachment; filename*=UTF-8''{encoded_filename}"
                     )
-                else:
-                    if content_type == "application/pdf" or filename.lower().endswith(
-                        ".pdf"
-                    ):
-                        headers["Content-Disposition"] = (
-                            f"inline; filename*=UTF-8''{encoded_filename}"
-                        )
-                        content_type = "application/pdf"
-                    elif content_type != "text/plain":
-                        headers["Content-Disposition"] = (
-                            f"attachment; filename*=UTF-8''{encoded_filename}"
-                        )
-
-                return FileResponse(file_path, headers=headers, media_type=content_type)
 
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=ERROR_MESSAGES.NOT_FOUND,
-                )
+            return get_file_response(
+                request, file.path, headers=headers, media_type=content_type
+            )
         except Exception as e:
             log.exception(e)
             log.error("Error getting file content")
@@ -694,7 +777,10 @@ async def get_file_content_by_id(
 
 @router.get("/{id}/content/html")
 async def get_html_file_content_by_id(
-    id: str, user=Depends(get_verified_user), db: Session = Depends(get_session)
+    request: Request,
+    id: str,
+    user=Depends(get_verified_user),
+    db: Session = Depends(get_session),
 ):
     file = Files.get_file_by_id(id, db=db)
 
@@ -717,18 +803,8 @@ async def get_html_file_content_by_id(
         or has_access_to_file(id, "read", user, db=db)
     ):
         try:
-            file_path = Storage.get_file(file.path)
-            file_path = Path(file_path)
-
-            # Check if the file already exists in the cache
-            if file_path.is_file():
-                log.info(f"file_path: {file_path}")
-                return FileResponse(file_path)
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=ERROR_MESSAGES.NOT_FOUND,
-                )
+            log.info(f"file_path: {file.path}")
+            return get_file_response(request, file.path)
         except Exception as e:
             log.exception(e)
             log.error("Error getting file content")
@@ -745,7 +821,10 @@ async def get_html_file_content_by_id(
 
 @router.get("/{id}/content/{file_name}")
 async def get_file_content_by_id(
-    id: str, user=Depends(get_verified_user), db: Session = Depends(get_session)
+    request: Request,
+    id: str,
+    user=Depends(get_verified_user),
+    db: Session = Depends(get_session),
 ):
     file = Files.get_file_by_id(id, db=db)
 
@@ -770,17 +849,7 @@ async def get_file_content_by_id(
         }
 
         if file_path:
-            file_path = Storage.get_file(file_path)
-            file_path = Path(file_path)
-
-            # Check if the file already exists in the cache
-            if file_path.is_file():
-                return FileResponse(file_path, headers=headers)
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=ERROR_MESSAGES.NOT_FOUND,
-                )
+            return get_file_response(request, file_path, headers=headers)
         else:
             # File path doesn’t exist, return the content as .txt if possible
             file_content = file.content.get("content", "")
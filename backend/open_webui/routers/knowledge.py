@@ -30,6 +30,7 @@ from open_webui.storage.provider import Storage
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.utils.auth import get_verified_user, get_admin_user
 from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.access_index import ACCESS_INDEX
 
 
 from open_webui.config import BYPASS_ADMIN_ACCESS_CONTROL
@@ -101,11 +102,13 @@ class KnowledgeAccessResponse(KnowledgeUserResponse):
 class KnowledgeAccessListResponse(BaseModel):
     items: list[KnowledgeAccessResponse]
     total: int
+    next_cursor: Optional[str] = None
 
 
 @router.get("/", response_model=KnowledgeAccessListResponse)
 async def get_knowledge_bases(
     page: Optional[int] = 1,
+    cursor: Optional[str] = None,
     user=Depends(get_verified_user),
     db: Session = Depends(get_session),
 ):
@@ -115,31 +118,33 @@ async def get_knowledge_bases(
 
     filter = {}
     if not user.role == "admin" or not BYPASS_ADMIN_ACCESS_CONTROL:
-        groups = Groups.get_groups_by_member_id(user.id, db=db)
-        if groups:
-            filter["group_ids"] = [group.id for group in groups]
+        group_ids = ACCESS_INDEX.get_user_group_ids(user.id, db=db)
+        if group_ids:
+            filter["group_ids"] = list(group_ids)
 
         filter["user_id"] = user.id
 
-    result = Knowledges.search_knowledge_bases(
-        user.id, filter=filter, skip=skip, limit=limit, db=db
-    )
+    try:
+        result = Knowledges.search_knowledge_bases(
+            user.id, filter=filter, skip=skip, limit=limit, cursor=cursor, db=db
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+    writable_ids = ACCESS_INDEX.get_accessible_ids("knowledge", user.id, "write", db=db)
     return KnowledgeAccessListResponse(
         items=[
             KnowledgeAccessResponse(
                 **knowledge_base.model_dump(),
                 write_access=(
-                    user.id == knowledge_base.user_id
-                    or (user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL)
-                    or has_access(
-                        user.id, "write", knowledge_base.access_control, db=db
-                    )
+                    (user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL)
+                    or knowledge_base.id in writable_ids
                 ),
             )
             for knowledge_base in result.items
         ],
         total=result.total,
+        next_cursor=result.next_cursor,
     )
 
 
@@ -148,6 +153,7 @@ async def search_knowledge_bases(
     query: Optional[str] = None,
     view_option: Optional[str] = None,
     page: Optional[int] = 1,
+    cursor: Optional[str] = None,
     user=Depends(get_verified_user),
     db: Session = Depends(get_session),
 ):
@@ -162,31 +168,33 @@ async def search_knowledge_bases(
         filter["view_option"] = view_option
 
     if not user.role == "admin" or not BYPASS_ADMIN_ACCESS_CONTROL:
-        groups = Groups.get_groups_by_member_id(user.id, db=db)
-        if groups:
-            filter["group_ids"] = [group.id for group in groups]
+        group_ids = ACCESS_INDEX.get_user_group_ids(user.id, db=db)
+        if group_ids:
+            filter["group_ids"] = list(group_ids)
 
         filter["user_id"] = user.id
 
-    result = Knowledges.search_knowledge_bases(
-        user.id, filter=filter, skip=skip, limit=limit, db=db
-    )
+    try:
+        result = Knowledges.search_knowledge_bases(
+            user.id, filter=filter, skip=skip, limit=limit, cursor=cursor, db=db
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+    writable_ids = ACCESS_INDEX.get_accessible_ids("knowledge", user.id, "write", db=db)
     return KnowledgeAccessListResponse(
         items=[
             KnowledgeAccessResponse(
                 **knowledge_base.model_dump(),
                 write_access=(
-                    user.id == knowledge_base.user_id
-                    or (user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL)
-                    or has_access(
-                        user.id, "write", knowledge_base.access_control, db=db
-                    )
+                    (user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL)
+                    or knowledge_base.id in writable_ids
                 ),
             )
             for knowledge_base in result.items
         ],
         total=result.total,
+        next_cursor=result.next_cursor,
     )
 
 
@@ -205,9 +213,9 @@ async def search_knowledge_files(
     if query:
         filter["query"] = query
 
-    groups = Groups.get_groups_by_member_id(user.id, db=db)
-    if groups:
-        filter["group_ids"] = [group.id for group in groups]
+    group_ids = ACCESS_INDEX.get_user_group_ids(user.id, db=db)
+    if group_ids:
+        filter["group_ids"] = list(group_ids)
 
     filter["user_id"] = user.id
 
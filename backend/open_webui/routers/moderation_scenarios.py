@@ -6,11 +6,15 @@ import uuid
 from typing import Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 from open_webui.utils.auth import get_verified_user, get_admin_user
 from open_webui.models.users import UserModel
-from open_webui.routers.workflow import get_current_attempt_number
+from open_webui.routers.workflow import (
+    get_current_attempt_number,
+    get_current_attempt_number_async,
+)
 from open_webui.models.moderation import (
     ModerationSessions,
     ModerationSessionForm,
@@ -34,7 +38,7 @@ from open_webui.models.scenarios import (
     AssignmentStatus,
     Scenario,
 )
-from open_webui.internal.db import get_db
+from open_webui.internal.db import ASYNC_DB_ENABLED, get_async_db, get_db
 from sqlalchemy.exc import IntegrityError
 
 log = logging.getLogger(__name__)
@@ -112,7 +116,7 @@ async def create_or_update_session(
             session_metadata=form_data.session_metadata,
         )
 
-        result = ModerationSessions.upsert(form)
+        result = await ModerationSessions.upsert_async(form)
         return result
     except HTTPException:
         raise
@@ -190,24 +194,80 @@ class ScenarioAssignResponse(BaseModel):
     sampling_audit: Optional[dict] = None
 
 
-@router.post("/moderation/scenarios/assign", response_model=ScenarioAssignResponse)
-async def assign_scenario(
+def _assign_scenario(
     request: ScenarioAssignRequest,
-    user: UserModel = Depends(get_verified_user),
-):
-    """
-    Assign a scenario to a participant using weighted sampling.
-    Atomically creates assignment and increments n_assigned counter.
-    """
-    try:
-        if user.id != request.participant_id:
-            raise HTTPException(status_code=403, detail="Forbidden")
+) -> Optional[ScenarioAssignResponse]:
+    """Sample and record an assignment; None if every retry lost a race."""
+    attempt_number = get_current_attempt_number(request.participant_id)
+
+    # Retry a few times in case a concurrent request wins the same scenario_id.
+    for _ in range(5):
+        result = Scenarios.weighted_sample(
+            participant_id=request.participant_id,
+            alpha=request.alpha or 1.0,
+            is_active=True,
+        )
+
+        if not result:
+            raise HTTPException(
+                status_code=404, detail="No eligible scenarios available"
+            )
+
+        selected_scenario, sampling_audit = result
+
+        with get_db() as db:
+            try:
+                form = ScenarioAssignmentForm(
+                    participant_id=request.participant_id,
+                    child_profile_id=request.child_profile_id,
+                    assignment_position=request.assignment_position,
+                    attempt_number=attempt_number,
+                    alpha=request.alpha,
+                )
+                assignment = ScenarioAssignments.create(
+                    form,
+                    selected_scenario.scenario_id,
+                    sampling_audit,
+                    db_session=db,
+                    commit=False,
+                )
+
+                Scenarios.increment_counter(
+                    selected_scenario.scenario_id,
+                    "n_assigned",
+                    db_session=db,
+                    commit=False,
+                )
+
+                db.commit()
+
+                return ScenarioAssignResponse(
+                    assignment_id=assignment.assignment_id,
+                    scenario_id=selected_scenario.scenario_id,
+                    prompt_text=selected_scenario.prompt_text,
+                    response_text=selected_scenario.response_text,
+                    assignment_position=assignment.assignment_position,
+                    sampling_audit=sampling_audit,
+                )
+            except IntegrityError:
+                db.rollback()
+                continue
+
+    return None
 
-        attempt_number = get_current_attempt_number(request.participant_id)
 
-        # Retry a few times in case a concurrent request wins the same scenario_id.
+async def _assign_scenario_async(
+    request: ScenarioAssignRequest,
+) -> Optional[ScenarioAssignResponse]:
+    """Async variant of `_assign_scenario` on the async engine."""
+    async with get_async_db() as db:
+        attempt_number = await get_current_attempt_number_async(
+            db, request.participant_id
+        )
+
         for _ in range(5):
-            result = Scenarios.weighted_sample(
+            result = await Scenarios.weighted_sample_async(
+                db,
                 participant_id=request.participant_id,
                 alpha=request.alpha or 1.0,
                 is_active=True,
@@ -220,43 +280,62 @@ async def assign_scenario(
 
             selected_scenario, sampling_audit = result
 
-            with get_db() as db:
-                try:
-                    form = ScenarioAssignmentForm(
-                        participant_id=request.participant_id,
-                        child_profile_id=request.child_profile_id,
-                        assignment_position=request.assignment_position,
-                        attempt_number=attempt_number,
-                        alpha=request.alpha,
-                    )
-                    assignment = ScenarioAssignments.create(
-                        form,
-                        selected_scenario.scenario_id,
-                        sampling_audit,
-                        db_session=db,
-                        commit=False,
-                    )
+            try:
+                form = ScenarioAssignmentForm(
+                    participant_id=request.participant_id,
+                    child_profile_id=request.child_profile_id,
+                    assignment_position=request.assignment_position,
+                    attempt_number=attempt_number,
+                    alpha=request.alpha,
+                )
+                assignment = await ScenarioAssignments.create_async(
+                    db,
+                    form,
+                    selected_scenario.scenario_id,
+                    sampling_audit,
+                    commit=False,
+                )
 
-                    Scenarios.increment_counter(
-                        selected_scenario.scenario_id,
-                        "n_assigned",
-                        db_session=db,
-                        commit=False,
-                    )
+                await Scenarios.increment_counter_async(
+                    db, selected_scenario.scenario_id, "n_assigned", commit=False
+                )
 
-                    db.commit()
+                await db.commit()
 
-                    return ScenarioAssignResponse(
-                        assignment_id=assignment.assignment_id,
-                        scenario_id=selected_scenario.scenario_id,
-                        prompt_text=selected_scenario.prompt_text,
-                        response_text=selected_scenario.response_text,
-                        assignment_position=assignment.assignment_position,
-                        sampling_audit=sampling_audit,
-                    )
-                except IntegrityError:
-                    db.rollback()
-                    continue
+                return ScenarioAssignResponse(
+                    assignment_id=assignment.assignment_id,
+                    scenario_id=selected_scenario.scenario_id,
+                    prompt_text=selected_scenario.prompt_text,
+                    response_text=selected_scenario.response_text,
+                    assignment_position=assignment.assignment_position,
+                    sampling_audit=sampling_audit,
+                )
+            except IntegrityError:
+                await db.rollback()
+                continue
+
+    return None
+
+
+@router.post("/moderation/scenarios/assign", response_model=ScenarioAssignResponse)
+async def assign_scenario(
+    request: ScenarioAssignRequest,
+    user: UserModel = Depends(get_verified_user),
+):
+    """
+    Assign a scenario to a participant using weighted sampling.
+    Atomically creates assignment and increments n_assigned counter.
+    """
+    try:
+        if user.id != request.participant_id:
+            raise HTTPException(status_code=403, detail="Forbidden")
+
+        if ASYNC_DB_ENABLED:
+            response = await _assign_scenario_async(request)
+        else:
+            response = await run_in_threadpool(_assign_scenario, request)
+        if response is not None:
+            return response
 
         raise HTTPException(
             status_code=409,
@@ -1044,7 +1123,7 @@ async def post_session_activity(
             attempt_number=payload.attempt_number or 1,
             active_ms_cumulative=max(0, int(payload.active_ms_cumulative)),
         )
-        return ModerationSessionActivities.add_activity(form)
+        return await ModerationSessionActivities.add_activity_async(form)
     except HTTPException:
         raise
     except Exception as e:
@@ -3,10 +3,18 @@ import logging
 from typing import Optional
 
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status, BackgroundTasks
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    status,
+    BackgroundTasks,
+)
 from pydantic import BaseModel
 
-from open_webui.socket.main import sio
+from open_webui.socket.main import sio, NOTE_SAVES
 
 from open_webui.models.groups import Groups
 from open_webui.models.users import Users, UserResponse
@@ -28,6 +36,7 @@ from open_webui.constants import ERROR_MESSAGES
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.pagination import get_next_cursor
 from open_webui.internal.db import get_session
 from sqlalchemy.orm import Session
 
@@ -52,7 +61,9 @@ class NoteItemResponse(BaseModel):
 @router.get("/", response_model=list[NoteItemResponse])
 async def get_notes(
     request: Request,
+    response: Response,
     page: Optional[int] = None,
+    cursor: Optional[str] = None,
     user=Depends(get_verified_user),
     db: Session = Depends(get_session),
 ):
@@ -66,14 +77,24 @@ async def get_notes(
 
     limit = None
     skip = None
-    if page is not None:
+    if page is not None or cursor is not None:
         limit = 60
-        skip = (page - 1) * limit
+        skip = (page - 1) * limit if page is not None else None
 
-    notes = Notes.get_notes_by_user_id(user.id, "read", skip=skip, limit=limit, db=db)
+    try:
+        notes = Notes.get_notes_by_user_id(
+            user.id, "read", skip=skip, limit=limit, cursor=cursor, db=db
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     if not notes:
         return []
 
+    # Clients scrolling down pass this instead of page
+    next_cursor = get_next_cursor(notes, ["updated_at", "id"], limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
     user_ids = list(set(note.user_id for note in notes))
     users = {user.id: user for user in Users.get_users_by_user_ids(user_ids, db=db)}
 
@@ -137,6 +158,16 @@ async def search_notes(
     return Notes.search_notes(user.id, filter, skip=skip, limit=limit, db=db)
 
 
+############################
+# GetNoteSaveStats
+############################
+
+
+@router.get("/saves/stats")
+async def get_note_save_stats(user=Depends(get_admin_user)):
+    return NOTE_SAVES.stats()
+
+
 ############################
 # CreateNewNote
 ############################
@@ -276,6 +307,7 @@ async def update_note_by_id(
 
     try:
         note = Notes.update_note_by_id(id, form_data, db=db)
+        await NOTE_SAVES.invalidate(id)
         await sio.emit(
             "note-events",
             note.model_dump(),
@@ -328,6 +360,7 @@ async def delete_note_by_id(
 
     try:
         note = Notes.delete_note_by_id(id, db=db)
+        await NOTE_SAVES.invalidate(id)
         return True
     except Exception as e:
         log.exception(e)
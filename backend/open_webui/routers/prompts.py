@@ -11,6 +11,7 @@ from open_webui.models.prompts import (
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.access_index import ACCESS_INDEX
 from open_webui.config import BYPASS_ADMIN_ACCESS_CONTROL
 from open_webui.internal.db import get_session
 from sqlalchemy.orm import Session
@@ -43,13 +44,15 @@ async def get_prompt_list(
     else:
         prompts = Prompts.get_prompts_by_user_id(user.id, "read", db=db)
 
+    writable_commands = ACCESS_INDEX.get_accessible_ids(
+        "prompt", user.id, "write", db=db
+    )
     return [
         PromptAccessResponse(
             **prompt.model_dump(),
             write_access=(
                 (user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL)
-                or user.id == prompt.user_id
-                or has_access(user.id, "write", prompt.access_control, db=db)
+                or prompt.command in writable_commands
             ),
         )
         for prompt in prompts
@@ -6,10 +6,11 @@ import shutil
 import asyncio
 
 import re
+import hashlib
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Iterator, List, Optional, Sequence, Union
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Union
 
 from fastapi import (
     Depends,
@@ -26,14 +27,8 @@ from fastapi import (
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import tiktoken
 
 
-from langchain_text_splitters import (
-    RecursiveCharacterTextSplitter,
-    TokenTextSplitter,
-    MarkdownHeaderTextSplitter,
-)
 from langchain_core.documents import Document
 
 from open_webui.models.files import FileModel, FileUpdateForm, Files
@@ -43,15 +38,22 @@ from open_webui.internal.db import get_session
 from sqlalchemy.orm import Session
 
 
-from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.vector.factory import BM25_INDEX_STORE, VECTOR_DB_CLIENT
+from open_webui.retrieval.embedding_cache import (
+    EMBEDDING_CACHE,
+    get_cached_embedding_function,
+)
+from open_webui.retrieval.pipeline import run_ingestion_pipeline
+from open_webui.retrieval.query_cache import (
+    QUERY_CACHE,
+    get_query_cached_embedding_function,
+)
 
-# Document loaders
-from open_webui.retrieval.loaders.main import Loader
-from open_webui.retrieval.loaders.youtube import YoutubeLoader
+# Document loaders, text splitters and the web loader are imported where they
+# are used: they pull in most of langchain_community and tiktoken.
 
 # Web search engines
 from open_webui.retrieval.web.main import SearchResult
-from open_webui.retrieval.web.utils import get_web_loader
 from open_webui.retrieval.web.ollama import search_ollama_cloud
 from open_webui.retrieval.web.perplexity_search import search_perplexity_search
 from open_webui.retrieval.web.brave import search_brave
@@ -100,6 +102,7 @@ from open_webui.config import (
     RAG_EMBEDDING_MODEL_AUTO_UPDATE,
     RAG_EMBEDDING_MODEL_TRUST_REMOTE_CODE,
     RAG_RERANKING_MODEL_AUTO_UPDATE,
+    RAG_RERANKING_MODEL_QUANTIZE,
     RAG_RERANKING_MODEL_TRUST_REMOTE_CODE,
     UPLOAD_DIR,
     DEFAULT_LOCALE,
@@ -171,6 +174,7 @@ def get_rf(
                 rf = ColBERT(
                     get_model_path(reranking_model, auto_update),
                     env="docker" if DOCKER else None,
+                    quantize=RAG_RERANKING_MODEL_QUANTIZE,
                 )
 
             except Exception as e:
@@ -231,6 +235,16 @@ def get_rf(
                 except Exception as e2:
                     log.warning(f"Failed to adjust pad_token_id on CrossEncoder: {e2}")
 
+                if (
+                    RAG_RERANKING_MODEL_QUANTIZE
+                    and DEVICE_TYPE == "cpu"
+                    and SENTENCE_TRANSFORMERS_CROSS_ENCODER_BACKEND == "torch"
+                ):
+                    log.info("CrossEncoder: Quantizing linear layers to int8")
+                    torch.quantization.quantize_dynamic(
+                        rf.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+                    )
+
     return rf
 
 
@@ -295,6 +309,20 @@ async def get_embedding_config(request: Request, user=Depends(get_admin_user)):
     }
 
 
+@router.get("/embedding/cache")
+async def get_embedding_cache_stats(user=Depends(get_admin_user)):
+    if EMBEDDING_CACHE is None:
+        return {"enabled": False}
+    return {"enabled": True, **EMBEDDING_CACHE.stats()}
+
+
+@router.get("/query/cache")
+async def get_query_cache_stats(user=Depends(get_admin_user)):
+    if QUERY_CACHE is None:
+        return {"enabled": False}
+    return {"enabled": True, **QUERY_CACHE.stats()}
+
+
 class OpenAIConfigForm(BaseModel):
     url: str
     key: str
@@ -421,6 +449,11 @@ async def update_embedding_config(
             ),
             enable_async=request.app.state.config.ENABLE_ASYNC_EMBEDDING,
         )
+        request.app.state.EMBEDDING_FUNCTION = get_query_cached_embedding_function(
+            request.app.state.EMBEDDING_FUNCTION,
+            request.app.state.config.RAG_EMBEDDING_ENGINE,
+            request.app.state.config.RAG_EMBEDDING_MODEL,
+        )
 
         return {
             "status": True,
@@ -1330,6 +1363,8 @@ def merge_docs_to_target_size(
 
     measure_chunk_size = len
     if request.app.state.config.TEXT_SPLITTER == "token":
+        import tiktoken
+
         encoding = tiktoken.get_encoding(
             str(request.app.state.config.TIKTOKEN_ENCODING_NAME)
         )
@@ -1386,7 +1421,23 @@ def save_docs_to_vector_db(
     split: bool = True,
     add: bool = False,
     user=None,
+    get_hash: Optional[Callable[[], str]] = None,
 ) -> bool:
+    """
+    Split, embed and insert documents into a collection.
+
+    docs may be a lazy iterator (see Loader.lazy_load); it is then consumed
+    by the ingestion pipeline as it is parsed instead of being held in memory.
+    The content hash of such a stream is only known once it has been written,
+    so get_hash is called then and the duplicate check runs afterwards.
+    """
+    import tiktoken
+    from langchain_text_splitters import (
+        RecursiveCharacterTextSplitter,
+        TokenTextSplitter,
+        MarkdownHeaderTextSplitter,
+    )
+
     def _get_docs_info(docs: list[Document]) -> str:
         docs_info = set()
 
@@ -1404,63 +1455,34 @@ def save_docs_to_vector_db(
         return ", ".join(docs_info)
 
     log.debug(
-        f"save_docs_to_vector_db: document {_get_docs_info(docs)} {collection_name}"
+        f"save_docs_to_vector_db: document {_get_docs_info(docs) if isinstance(docs, list) else '(streamed)'} {collection_name}"
     )
 
-    # Check if entries with the same hash (metadata.hash) already exist
-    if metadata and "hash" in metadata:
+    def has_duplicate(hash: str) -> bool:
+        # Check if entries with the same hash (metadata.hash) already exist
         result = VECTOR_DB_CLIENT.query(
             collection_name=collection_name,
-            filter={"hash": metadata["hash"]},
+            filter={"hash": hash},
         )
 
         if result is not None and result.ids and len(result.ids) > 0:
             existing_doc_ids = result.ids[0]
             if existing_doc_ids:
-                log.info(f"Document with hash {metadata['hash']} already exists")
-                raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
-
-    if split:
-        if request.app.state.config.ENABLE_MARKDOWN_HEADER_TEXT_SPLITTER:
-            log.info("Using markdown header text splitter")
-            # Define headers to split on - covering most common markdown header levels
-            markdown_splitter = MarkdownHeaderTextSplitter(
-                headers_to_split_on=[
-                    ("#", "Header 1"),
-                    ("##", "Header 2"),
-                    ("###", "Header 3"),
-                    ("####", "Header 4"),
-                    ("#####", "Header 5"),
-                    ("######", "Header 6"),
-                ],
-                strip_headers=False,  # Keep headers in content for context
-            )
-
-            split_docs = []
-            for doc in docs:
-                split_docs.extend(
-                    [
-                        Document(
-                            page_content=split_chunk.page_content,
-                            metadata={**doc.metadata},
-                        )
-                        for split_chunk in markdown_splitter.split_text(
-                            doc.page_content
-                        )
-                    ]
-                )
+                log.info(f"Document with hash {hash} already exists")
+                return True
+        return False
 
-            docs = split_docs
-            if request.app.state.config.CHUNK_MIN_SIZE_TARGET > 0:
-                docs = merge_docs_to_target_size(request, docs)
+    if metadata and "hash" in metadata and has_duplicate(metadata["hash"]):
+        raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
 
+    split_doc = None
+    if split:
         if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
             text_splitter = RecursiveCharacterTextSplitter(
                 chunk_size=request.app.state.config.CHUNK_SIZE,
                 chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
                 add_start_index=True,
             )
-            docs = text_splitter.split_documents(docs)
         elif request.app.state.config.TEXT_SPLITTER == "token":
             log.info(
                 f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
@@ -1473,33 +1495,64 @@ def save_docs_to_vector_db(
                 chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
                 add_start_index=True,
             )
-            docs = text_splitter.split_documents(docs)
         else:
             raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
 
-    if len(docs) == 0:
-        raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        markdown_splitter = None
+        if request.app.state.config.ENABLE_MARKDOWN_HEADER_TEXT_SPLITTER:
+            log.info("Using markdown header text splitter")
+            # Define headers to split on - covering most common markdown header levels
+            markdown_splitter = MarkdownHeaderTextSplitter(
+                headers_to_split_on=[
+                    ("#", "Header 1"),
+                    ("##", "Header 2"),
+                    ("###", "Header 3"),
+                    ("####", "Header 4"),
+                    ("#####", "Header 5"),
+                    ("######", "Header 6"),
+                ],
+                strip_headers=False,  # Keep headers in content for context
+            )
+
+        def markdown_split(doc: Document) -> list[Document]:
+            return [
+                Document(
+                    page_content=split_chunk.page_content,
+                    metadata={**doc.metadata},
+                )
+                for split_chunk in markdown_splitter.split_text(doc.page_content)
+            ]
 
-    texts = [sanitize_text_for_db(doc.page_content) for doc in docs]
-    metadatas = [
-        {
-            **doc.metadata,
-            **(metadata if metadata else {}),
-            "embedding_config": {
-                "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
-                "model": request.app.state.config.RAG_EMBEDDING_MODEL,
-            },
-        }
-        for doc in docs
-    ]
+        if (
+            markdown_splitter is not None
+            and request.app.state.config.CHUNK_MIN_SIZE_TARGET > 0
+        ):
+            # Merging looks across document boundaries, so it cannot be streamed
+            docs = merge_docs_to_target_size(
+                request, [chunk for doc in docs for chunk in markdown_split(doc)]
+            )
+            split_doc = lambda doc: text_splitter.split_documents([doc])
+        elif markdown_splitter is not None:
+            split_doc = lambda doc: text_splitter.split_documents(markdown_split(doc))
+        else:
+            split_doc = lambda doc: text_splitter.split_documents([doc])
+
+    embedding_config = {
+        "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+        "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+    }
 
     try:
-        if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+        collection_exists = VECTOR_DB_CLIENT.has_collection(
+            collection_name=collection_name
+        )
+        if collection_exists:
             log.info(f"collection {collection_name} already exists")
 
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
                 log.info(f"deleting existing collection {collection_name}")
+                collection_exists = False
             elif add is False:
                 log.info(
                     f"collection {collection_name} already exists, overwrite is False and add is False"
@@ -1507,19 +1560,20 @@ def save_docs_to_vector_db(
                 return True
 
         log.info(f"generating embeddings for {collection_name}")
+        embedding_url = (
+            request.app.state.config.RAG_OPENAI_API_BASE_URL
+            if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+            else (
+                request.app.state.config.RAG_OLLAMA_BASE_URL
+                if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
+                else request.app.state.config.RAG_AZURE_OPENAI_BASE_URL
+            )
+        )
         embedding_function = get_embedding_function(
             request.app.state.config.RAG_EMBEDDING_ENGINE,
             request.app.state.config.RAG_EMBEDDING_MODEL,
             request.app.state.ef,
-            (
-                request.app.state.config.RAG_OPENAI_API_BASE_URL
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else (
-                    request.app.state.config.RAG_OLLAMA_BASE_URL
-                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
-                    else request.app.state.config.RAG_AZURE_OPENAI_BASE_URL
-                )
-            ),
+            embedding_url,
             (
                 request.app.state.config.RAG_OPENAI_API_KEY
                 if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
@@ -1537,34 +1591,77 @@ def save_docs_to_vector_db(
             ),
             enable_async=request.app.state.config.ENABLE_ASYNC_EMBEDDING,
         )
+        embedding_function = get_cached_embedding_function(
+            embedding_function,
+            request.app.state.config.RAG_EMBEDDING_ENGINE,
+            request.app.state.config.RAG_EMBEDDING_MODEL,
+            # The same model name can be served by different endpoints
+            url=(
+                embedding_url
+                if request.app.state.config.RAG_EMBEDDING_ENGINE != ""
+                else ""
+            ),
+        )
 
-        # Run async embedding in sync context
-        embeddings = asyncio.run(
-            embedding_function(
-                list(map(lambda x: x.replace("\n", " "), texts)),
+        async def embed(chunks: list[Document]) -> list:
+            return await embedding_function(
+                [
+                    sanitize_text_for_db(chunk.page_content).replace("\n", " ")
+                    for chunk in chunks
+                ],
                 prefix=RAG_EMBEDDING_CONTENT_PREFIX,
                 user=user,
             )
-        )
-        log.info(f"embeddings generated {len(embeddings)} for {len(texts)} items")
 
-        items = [
-            {
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "vector": embeddings[idx],
-                "metadata": metadatas[idx],
-            }
-            for idx, text in enumerate(texts)
-        ]
+        written_ids = []
+
+        def write(chunks: list[Document], embeddings: list) -> None:
+            items = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "text": sanitize_text_for_db(chunk.page_content),
+                    "vector": embeddings[idx],
+                    "metadata": {
+                        **chunk.metadata,
+                        **(metadata if metadata else {}),
+                        "embedding_config": embedding_config,
+                    },
+                }
+                for idx, chunk in enumerate(chunks)
+            ]
+            VECTOR_DB_CLIENT.insert(collection_name=collection_name, items=items)
+            written_ids.extend(item["id"] for item in items)
 
-        log.info(f"adding to collection {collection_name}")
-        VECTOR_DB_CLIENT.insert(
-            collection_name=collection_name,
-            items=items,
-        )
+        def discard() -> None:
+            # Do not leave a partially ingested document behind
+            try:
+                if not collection_exists:
+                    VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                elif written_ids:
+                    VECTOR_DB_CLIENT.delete(
+                        collection_name=collection_name, ids=written_ids
+                    )
+            except Exception as e:
+                log.warning(f"Failed to clean up {collection_name}: {e}")
+
+        # Run async embedding in sync context
+        try:
+            count = asyncio.run(
+                run_ingestion_pipeline(docs, embed=embed, write=write, split=split_doc)
+            )
+        except BaseException:
+            discard()
+            raise
+
+        # Streamed chunks carry no hash, so any match is another document
+        if get_hash is not None and has_duplicate(get_hash()):
+            discard()
+            raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
 
-        log.info(f"added {len(items)} items to collection {collection_name}")
+        if count == 0:
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+
+        log.info(f"added {count} items to collection {collection_name}")
         return True
     except Exception as e:
         log.exception(e)
@@ -1577,6 +1674,196 @@ class ProcessFileForm(BaseModel):
     collection_name: Optional[str] = None
 
 
+def get_loader_config(request: Request) -> dict:
+    """Loader keyword arguments from the app config, picklable for worker processes."""
+    config = request.app.state.config
+    return {
+        "engine": config.CONTENT_EXTRACTION_ENGINE,
+        "DATALAB_MARKER_API_KEY": config.DATALAB_MARKER_API_KEY,
+        "DATALAB_MARKER_API_BASE_URL": config.DATALAB_MARKER_API_BASE_URL,
+        "DATALAB_MARKER_ADDITIONAL_CONFIG": config.DATALAB_MARKER_ADDITIONAL_CONFIG,
+        "DATALAB_MARKER_SKIP_CACHE": config.DATALAB_MARKER_SKIP_CACHE,
+        "DATALAB_MARKER_FORCE_OCR": config.DATALAB_MARKER_FORCE_OCR,
+        "DATALAB_MARKER_PAGINATE": config.DATALAB_MARKER_PAGINATE,
+        "DATALAB_MARKER_STRIP_EXISTING_OCR": config.DATALAB_MARKER_STRIP_EXISTING_OCR,
+        "DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION": config.DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION,
+        "DATALAB_MARKER_FORMAT_LINES": config.DATALAB_MARKER_FORMAT_LINES,
+        "DATALAB_MARKER_USE_LLM": config.DATALAB_MARKER_USE_LLM,
+        "DATALAB_MARKER_OUTPUT_FORMAT": config.DATALAB_MARKER_OUTPUT_FORMAT,
+        "EXTERNAL_DOCUMENT_LOADER_URL": config.EXTERNAL_DOCUMENT_LOADER_URL,
+        "EXTERNAL_DOCUMENT_LOADER_API_KEY": config.EXTERNAL_DOCUMENT_LOADER_API_KEY,
+        "TIKA_SERVER_URL": config.TIKA_SERVER_URL,
+        "DOCLING_SERVER_URL": config.DOCLING_SERVER_URL,
+        "DOCLING_API_KEY": config.DOCLING_API_KEY,
+        "DOCLING_PARAMS": config.DOCLING_PARAMS,
+        "PDF_EXTRACT_IMAGES": config.PDF_EXTRACT_IMAGES,
+        "DOCUMENT_INTELLIGENCE_ENDPOINT": config.DOCUMENT_INTELLIGENCE_ENDPOINT,
+        "DOCUMENT_INTELLIGENCE_KEY": config.DOCUMENT_INTELLIGENCE_KEY,
+        "DOCUMENT_INTELLIGENCE_MODEL": config.DOCUMENT_INTELLIGENCE_MODEL,
+        "MISTRAL_OCR_API_BASE_URL": config.MISTRAL_OCR_API_BASE_URL,
+        "MISTRAL_OCR_API_KEY": config.MISTRAL_OCR_API_KEY,
+        "MINERU_API_MODE": config.MINERU_API_MODE,
+        "MINERU_API_URL": config.MINERU_API_URL,
+        "MINERU_API_KEY": config.MINERU_API_KEY,
+        "MINERU_API_TIMEOUT": config.MINERU_API_TIMEOUT,
+        "MINERU_PARAMS": config.MINERU_PARAMS,
+    }
+
+
+def iter_file_docs(
+    file: FileModel, file_path: str, loader_config: dict, user=None
+) -> Iterator[Document]:
+    """Extract a stored file into documents tagged with the file's metadata."""
+    from open_webui.retrieval.loaders.main import Loader
+
+    loader = Loader(user=user, **loader_config)
+    for doc in loader.lazy_load(
+        file.filename, file.meta.get("content_type"), file_path
+    ):
+        yield Document(
+            page_content=doc.page_content,
+            metadata={
+                **filter_metadata(doc.metadata),
+                "name": file.filename,
+                "created_by": file.user_id,
+                "file_id": file.id,
+                "source": file.filename,
+            },
+        )
+
+
+def load_file_docs(
+    file: FileModel, file_path: str, loader_config: dict, user=None
+) -> list[Document]:
+    return list(iter_file_docs(file, file_path, loader_config, user))
+
+
+class StreamedDocs:
+    """
+    Wrap a lazy stream of documents and collect their content and its hash as
+    the ingestion pipeline consumes them, so neither needs a pass of its own.
+    """
+
+    def __init__(self, docs: Iterable[Document]):
+        self.docs = docs
+        self.pages = []
+        self.done = False
+        # Same digest as calculate_sha256_string(" ".join(pages))
+        self.sha256_hash = hashlib.sha256()
+
+    def __iter__(self) -> Iterator[Document]:
+        for doc in self.docs:
+            if self.pages:
+                self.sha256_hash.update(b" ")
+            self.sha256_hash.update(doc.page_content.encode("utf-8"))
+            self.pages.append(doc.page_content)
+            yield doc
+        self.done = True
+
+    @property
+    def hash(self) -> str:
+        return self.sha256_hash.hexdigest()
+
+    def get_text(self) -> str:
+        return " ".join(self.pages)
+
+
+def save_file_docs(
+    request: Request,
+    file: FileModel,
+    docs: Iterable[Document],
+    text_content: Optional[str],
+    collection_name: str,
+    add: bool = False,
+    user=None,
+    db: Optional[Session] = None,
+) -> dict:
+    """
+    Store a file's extracted content and embed its documents into the collection.
+
+    With text_content None, docs may be a lazy iterator: it is streamed into the
+    vector database while the content and its hash are collected on the way.
+    """
+    if text_content is None and request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
+        text_content = " ".join([doc.page_content for doc in docs])
+
+    streamed_docs = None
+    if text_content is None:
+        docs = streamed_docs = StreamedDocs(docs)
+        hash = None
+    else:
+        log.debug(f"text_content: {text_content}")
+        Files.update_file_data_by_id(
+            file.id,
+            {"content": text_content},
+            db=db,
+        )
+        hash = calculate_sha256_string(text_content)
+
+    if request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
+        Files.update_file_data_by_id(file.id, {"status": "completed"}, db=db)
+        Files.update_file_hash_by_id(file.id, hash, db=db)
+        return {
+            "status": True,
+            "collection_name": None,
+            "filename": file.filename,
+            "content": text_content,
+        }
+
+    try:
+        result = save_docs_to_vector_db(
+            request,
+            docs=docs,
+            collection_name=collection_name,
+            metadata={
+                "file_id": file.id,
+                "name": file.filename,
+                **({"hash": hash} if hash else {}),
+            },
+            add=add,
+            user=user,
+            get_hash=(lambda: streamed_docs.hash) if streamed_docs else None,
+        )
+    finally:
+        # Keep the content of a fully parsed file even if embedding it failed,
+        # as when it was stored before embedding
+        if streamed_docs is not None and streamed_docs.done:
+            text_content = streamed_docs.get_text()
+            hash = streamed_docs.hash
+            log.debug(f"text_content: {text_content}")
+            Files.update_file_data_by_id(
+                file.id,
+                {"content": text_content},
+                db=db,
+            )
+    log.info(f"added {file.filename} to collection {collection_name}")
+
+    if not result:
+        raise Exception("Error saving document to vector database")
+
+    Files.update_file_metadata_by_id(
+        file.id,
+        {
+            "collection_name": collection_name,
+        },
+        db=db,
+    )
+
+    Files.update_file_data_by_id(
+        file.id,
+        {"status": "completed"},
+        db=db,
+    )
+    Files.update_file_hash_by_id(file.id, hash, db=db)
+
+    return {
+        "status": True,
+        "collection_name": collection_name,
+        "filename": file.filename,
+        "content": text_content,
+    }
+
+
 @router.post("/process/file")
 def process_file(
     request: Request,
@@ -1664,55 +1951,18 @@ def process_file(
                 file_path = file.path
                 if file_path:
                     file_path = Storage.get_file(file_path)
-                    loader = Loader(
-                        engine=request.app.state.config.CONTENT_EXTRACTION_ENGINE,
+                    return save_file_docs(
+                        request,
+                        file,
+                        iter_file_docs(
+                            file, file_path, get_loader_config(request), user
+                        ),
+                        None,
+                        collection_name=collection_name,
+                        add=(True if form_data.collection_name else False),
                         user=user,
-                        DATALAB_MARKER_API_KEY=request.app.state.config.DATALAB_MARKER_API_KEY,
-                        DATALAB_MARKER_API_BASE_URL=request.app.state.config.DATALAB_MARKER_API_BASE_URL,
-                        DATALAB_MARKER_ADDITIONAL_CONFIG=request.app.state.config.DATALAB_MARKER_ADDITIONAL_CONFIG,
-                        DATALAB_MARKER_SKIP_CACHE=request.app.state.config.DATALAB_MARKER_SKIP_CACHE,
-                        DATALAB_MARKER_FORCE_OCR=request.app.state.config.DATALAB_MARKER_FORCE_OCR,
-                        DATALAB_MARKER_PAGINATE=request.app.state.config.DATALAB_MARKER_PAGINATE,
-                        DATALAB_MARKER_STRIP_EXISTING_OCR=request.app.state.config.DATALAB_MARKER_STRIP_EXISTING_OCR,
-                        DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION=request.app.state.config.DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION,
-                        DATALAB_MARKER_FORMAT_LINES=request.app.state.config.DATALAB_MARKER_FORMAT_LINES,
-                        DATALAB_MARKER_USE_LLM=request.app.state.config.DATALAB_MARKER_USE_LLM,
-                        DATALAB_MARKER_OUTPUT_FORMAT=request.app.state.config.DATALAB_MARKER_OUTPUT_FORMAT,
-                        EXTERNAL_DOCUMENT_LOADER_URL=request.app.state.config.EXTERNAL_DOCUMENT_LOADER_URL,
-                        EXTERNAL_DOCUMENT_LOADER_API_KEY=request.app.state.config.EXTERNAL_DOCUMENT_LOADER_API_KEY,
-                        TIKA_SERVER_URL=request.app.state.config.TIKA_SERVER_URL,
-                        DOCLING_SERVER_URL=request.app.state.config.DOCLING_SERVER_URL,
-                        DOCLING_API_KEY=request.app.state.config.DOCLING_API_KEY,
-                        DOCLING_PARAMS=request.app.state.config.DOCLING_PARAMS,
-                        PDF_EXTRACT_IMAGES=request.app.state.config.PDF_EXTRACT_IMAGES,
-                        DOCUMENT_INTELLIGENCE_ENDPOINT=request.app.state.config.DOCUMENT_INTELLIGENCE_ENDPOINT,
-                        DOCUMENT_INTELLIGENCE_KEY=request.app.state.config.DOCUMENT_INTELLIGENCE_KEY,
-                        DOCUMENT_INTELLIGENCE_MODEL=request.app.state.config.DOCUMENT_INTELLIGENCE_MODEL,
-                        MISTRAL_OCR_API_BASE_URL=request.app.state.config.MISTRAL_OCR_API_BASE_URL,
-                        MISTRAL_OCR_API_KEY=request.app.state.config.MISTRAL_OCR_API_KEY,
-                        MINERU_API_MODE=request.app.state.config.MINERU_API_MODE,
-                        MINERU_API_URL=request.app.state.config.MINERU_API_URL,
-                        MINERU_API_KEY=request.app.state.config.MINERU_API_KEY,
-                        MINERU_API_TIMEOUT=request.app.state.config.MINERU_API_TIMEOUT,
-                        MINERU_PARAMS=request.app.state.config.MINERU_PARAMS,
+                        db=db,
                     )
-                    docs = loader.load(
-                        file.filename, file.meta.get("content_type"), file_path
-                    )
-
-                    docs = [
-                        Document(
-                            page_content=doc.page_content,
-                            metadata={
-                                **filter_metadata(doc.metadata),
-                                "name": file.filename,
-                                "created_by": file.user_id,
-                                "file_id": file.id,
-                                "source": file.filename,
-                            },
-                        )
-                        for doc in docs
-                    ]
                 else:
                     docs = [
                         Document(
@@ -1726,67 +1976,18 @@ def process_file(
                             },
                         )
                     ]
-                text_content = " ".join([doc.page_content for doc in docs])
+                    text_content = " ".join([doc.page_content for doc in docs])
 
-            log.debug(f"text_content: {text_content}")
-            Files.update_file_data_by_id(
-                file.id,
-                {"content": text_content},
+            return save_file_docs(
+                request,
+                file,
+                docs,
+                text_content,
+                collection_name=collection_name,
+                add=(True if form_data.collection_name else False),
+                user=user,
                 db=db,
             )
-            hash = calculate_sha256_string(text_content)
-
-            if request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
-                Files.update_file_data_by_id(file.id, {"status": "completed"}, db=db)
-                Files.update_file_hash_by_id(file.id, hash, db=db)
-                return {
-                    "status": True,
-                    "collection_name": None,
-                    "filename": file.filename,
-                    "content": text_content,
-                }
-            else:
-                try:
-                    result = save_docs_to_vector_db(
-                        request,
-                        docs=docs,
-                        collection_name=collection_name,
-                        metadata={
-                            "file_id": file.id,
-                            "name": file.filename,
-                            "hash": hash,
-                        },
-                        add=(True if form_data.collection_name else False),
-                        user=user,
-                    )
-                    log.info(f"added {len(docs)} items to collection {collection_name}")
-
-                    if result:
-                        Files.update_file_metadata_by_id(
-                            file.id,
-                            {
-                                "collection_name": collection_name,
-                            },
-                            db=db,
-                        )
-
-                        Files.update_file_data_by_id(
-                            file.id,
-                            {"status": "completed"},
-                            db=db,
-                        )
-                        Files.update_file_hash_by_id(file.id, hash, db=db)
-
-                        return {
-                            "status": True,
-                            "collection_name": collection_name,
-                            "filename": file.filename,
-                            "content": text_content,
-                        }
-                    else:
-                        raise Exception("Error saving document to vector database")
-                except Exception as e:
-                    raise e
 
         except Exception as e:
             log.exception(e)
@@ -2315,6 +2516,8 @@ async def process_web_search(
                 if hasattr(result, "snippet") and result.snippet is not None
             ]
         else:
+            from open_webui.retrieval.web.utils import get_web_loader
+
             loader = get_web_loader(
                 urls,
                 verify_ssl=request.app.state.config.ENABLE_WEB_LOADER_SSL_VERIFICATION,
@@ -2400,8 +2603,11 @@ async def query_doc_handler(
             form_data.hybrid is None or form_data.hybrid
         ):
             collection_results = {}
-            collection_results[form_data.collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=form_data.collection_name
+            # With the BM25 index, collections are searched without a full fetch
+            collection_results[form_data.collection_name] = (
+                None
+                if BM25_INDEX_STORE is not None
+                else VECTOR_DB_CLIENT.get(collection_name=form_data.collection_name)
             )
             return await query_doc_with_hybrid_search(
                 collection_name=form_data.collection_name,
@@ -29,6 +29,7 @@ from open_webui.utils.plugin import (
 from open_webui.utils.tools import get_tool_specs
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.access_index import ACCESS_INDEX
 from open_webui.utils.tools import get_tool_servers
 
 from open_webui.config import CACHE_DIR, BYPASS_ADMIN_ACCESS_CONTROL
@@ -147,9 +148,7 @@ async def get_tools(
         # Admin can see all tools
         return tools
     else:
-        user_group_ids = {
-            group.id for group in Groups.get_groups_by_member_id(user.id, db=db)
-        }
+        user_group_ids = ACCESS_INDEX.get_user_group_ids(user.id, db=db)
         tools = [
             tool
             for tool in tools
@@ -173,13 +172,13 @@ async def get_tool_list(
     else:
         tools = Tools.get_tools_by_user_id(user.id, "read", db=db)
 
+    writable_ids = ACCESS_INDEX.get_accessible_ids("tool", user.id, "write", db=db)
     return [
         ToolAccessResponse(
             **tool.model_dump(),
             write_access=(
                 (user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL)
-                or user.id == tool.user_id
-                or has_access(user.id, "write", tool.access_control, db=db)
+                or tool.id in writable_ids
             ),
         )
         for tool in tools
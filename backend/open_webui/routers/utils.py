@@ -13,7 +13,7 @@ from starlette.responses import FileResponse
 from open_webui.utils.misc import get_gravatar_url
 from open_webui.utils.pdf_generator import PDFGenerator
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.code_interpreter import execute_code_jupyter
+from open_webui.utils.code_interpreter import execute_code_jupyter, execute_code_local
 
 log = logging.getLogger(__name__)
 
@@ -62,6 +62,14 @@ async def execute_code(
         )
 
         return output
+    elif request.app.state.config.CODE_EXECUTION_ENGINE == "local":
+        # The local engine runs code on the server itself
+        if user.role != "admin":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=ERROR_MESSAGES.ACCESS_PROHIBITED,
+            )
+        return await execute_code_local(form_data.code, user.id)
     else:
         raise HTTPException(
             status_code=400,
@@ -102,6 +110,19 @@ async def download_chat_as_pdf(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/db/metrics")
+async def get_db_metrics(user=Depends(get_admin_user)):
+    from open_webui.env import ENABLE_DB_METRICS
+    from open_webui.internal.db_metrics import DB_METRICS
+
+    if not ENABLE_DB_METRICS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Database metrics are disabled (set ENABLE_DB_METRICS=true)",
+        )
+    return DB_METRICS.snapshot()
+
+
 @router.get("/db/download")
 async def download_db(user=Depends(get_admin_user)):
     if not ENABLE_ADMIN_EXPORT:
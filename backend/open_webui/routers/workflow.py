@@ -4,8 +4,10 @@ from typing import Dict, Any, List
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from open_webui.utils.auth import (
     get_verified_user,
@@ -26,10 +28,11 @@ from open_webui.models.scenarios import ScenarioAssignment, ScenarioAssignments
 from open_webui.models.workflow_draft import (
     WorkflowDraft,
     get_draft,
+    get_draft_async,
     save_draft,
     delete_draft,
 )
-from open_webui.internal.db import get_db
+from open_webui.internal.db import ASYNC_DB_ENABLED, get_async_db, get_db
 
 log = logging.getLogger(__name__)
 
@@ -72,6 +75,32 @@ def get_current_attempt_number(user_id: str) -> int:
         return computed
 
 
+async def get_current_attempt_number_async(db: AsyncSession, user_id: str) -> int:
+    """Async variant of `get_current_attempt_number` on the given async session."""
+    stored = (
+        await db.execute(select(User.current_attempt_number).where(User.id == user_id))
+    ).scalar()
+    if stored is not None:
+        return stored
+
+    max_mod, max_child, max_exit = (
+        await db.execute(
+            select(
+                select(func.max(ModerationSession.attempt_number))
+                .where(ModerationSession.user_id == user_id)
+                .scalar_subquery(),
+                select(func.max(ChildProfile.attempt_number))
+                .where(ChildProfile.user_id == user_id)
+                .scalar_subquery(),
+                select(func.max(ExitQuizResponse.attempt_number))
+                .where(ExitQuizResponse.user_id == user_id)
+                .scalar_subquery(),
+            )
+        )
+    ).one()
+    return max(max_mod or 0, max_child or 0, max_exit or 0, 1)
+
+
 class WorkflowStateResponse(BaseModel):
     next_route: str
     substep: str | None = None
@@ -90,193 +119,286 @@ def _default_progress() -> dict:
     }
 
 
-@router.get("/workflow/state")
-async def get_workflow_state(
-    child_id: str | None = Query(default=None),
-    user: UserModel = Depends(get_verified_user),
-) -> WorkflowStateResponse:
-    """
-    Compute current workflow state for the user to resume progress on login.
-    Sections: kids/profile -> moderation-scenario -> exit-survey -> completion
-    """
-    try:
-        with get_db() as db:
-            progress = _default_progress()
-
-            # Instructions completed
-            instructions_at = getattr(user, "instructions_completed_at", None)
-            progress["instructions_completed"] = instructions_at is not None
-
-            # Child profiles
-            selected_child = None
-            try:
-                latest_child = ChildProfiles.get_latest_child_profile_any(user.id)
-                if latest_child:
-                    progress["has_child_profile"] = True
-
-                if child_id:
-                    selected_child = ChildProfiles.get_child_profile_by_id(
-                        child_id, user.id
+def _load_progress(user: UserModel, child_id: str | None) -> dict:
+    """Collect per-section progress for the workflow state using the sync engine."""
+    with get_db() as db:
+        progress = _default_progress()
+
+        # Instructions completed
+        instructions_at = getattr(user, "instructions_completed_at", None)
+        progress["instructions_completed"] = instructions_at is not None
+
+        # Child profiles
+        selected_child = None
+        try:
+            latest_child = ChildProfiles.get_latest_child_profile_any(user.id)
+            if latest_child:
+                progress["has_child_profile"] = True
+
+            if child_id:
+                selected_child = ChildProfiles.get_child_profile_by_id(
+                    child_id, user.id
+                )
+
+            if selected_child is None:
+                selected_child = latest_child
+        except Exception as e:
+            log.warning(f"Failed to get child profiles for user {user.id}: {e}")
+
+        # Moderation progress: count unique scenarios that have a terminal decision
+        # Terminal = initial_decision in (accept_original, moderate, not_applicable)
+        # Exclude sessions created before last workflow reset.
+        # Filter sessions by latest_child so count and total refer to the same child.
+        try:
+            child_id_for_mod = selected_child.id if selected_child else None
+            sessions = ModerationSessions.get_sessions_by_user(
+                user.id, child_id=child_id_for_mod
+            )
+            progress["moderation_completed_count"] = _count_decided(user, sessions)
+
+            # moderation_total: use assignment count when available, else 12
+            if selected_child:
+                try:
+                    current_attempt = get_current_attempt_number(user.id)
+                    assignments = ScenarioAssignments.get_assignments_by_child(
+                        selected_child.id,
+                        attempt_number=current_attempt,
                     )
+                    if assignments:
+                        progress["moderation_total"] = len(assignments)
+                except Exception as ae:
+                    log.debug(
+                        f"Could not get assignment count for user {user.id}: {ae}"
+                    )
+        except Exception as e:
+            log.warning(f"Failed to get moderation sessions for user {user.id}: {e}")
+
+        # Check if moderation has been finalized (user clicked "Done")
+        try:
+            if selected_child:
+                draft = get_draft(user.id, selected_child.id, "moderation")
+                if draft and draft.data:
+                    progress["moderation_finalized"] = draft.data.get(
+                        "moderation_finalized", False
+                    )
+        except Exception as e:
+            log.debug(
+                f"Failed to check moderation finalized status for user {user.id}: {e}"
+            )
 
-                if selected_child is None:
-                    selected_child = latest_child
-            except Exception as e:
-                log.warning(f"Failed to get child profiles for user {user.id}: {e}")
-
-            # Moderation progress: count unique scenarios that have a terminal decision
-            # Terminal = initial_decision in (accept_original, moderate, not_applicable)
-            # Exclude sessions created before last workflow reset.
-            # Filter sessions by latest_child so count and total refer to the same child.
-            try:
-                child_id_for_mod = selected_child.id if selected_child else None
-                sessions = ModerationSessions.get_sessions_by_user(
-                    user.id, child_id=child_id_for_mod
+        # Exit survey completion: scope to current reset boundary and current attempt
+        # so historical submissions from prior sessions/studies do not unlock completion.
+        try:
+            current_attempt = get_current_attempt_number(user.id)
+            latest_exit_query = db.query(ExitQuizResponse).filter(
+                ExitQuizResponse.user_id == user.id,
+                ExitQuizResponse.attempt_number == current_attempt,
+            )
+            workflow_reset_at = getattr(user, "workflow_reset_at", None)
+            if workflow_reset_at:
+                latest_exit_query = latest_exit_query.filter(
+                    ExitQuizResponse.created_at > workflow_reset_at
                 )
-                workflow_reset_at = getattr(user, "workflow_reset_at", None)
-                if workflow_reset_at:
-                    sessions = [s for s in sessions if s.created_at > workflow_reset_at]
-                decided = set()
-                for s in sessions:
-                    if s.initial_decision in (
-                        "accept_original",
-                        "moderate",
-                        "not_applicable",
-                    ):
-                        decided.add(s.scenario_index)
-                progress["moderation_completed_count"] = len(decided)
-
-                # moderation_total: use assignment count when available, else 12
-                if selected_child:
-                    try:
-                        current_attempt = get_current_attempt_number(user.id)
-                        assignments = ScenarioAssignments.get_assignments_by_child(
-                            selected_child.id,
-                            attempt_number=current_attempt,
-                        )
-                        if assignments:
-                            progress["moderation_total"] = len(assignments)
-                    except Exception as ae:
-                        log.debug(
-                            f"Could not get assignment count for user {user.id}: {ae}"
-                        )
-            except Exception as e:
-                log.warning(
-                    f"Failed to get moderation sessions for user {user.id}: {e}"
+            latest_exit = latest_exit_query.order_by(
+                ExitQuizResponse.created_at.desc()
+            ).first()
+            progress["exit_survey_completed"] = latest_exit is not None
+        except Exception as e:
+            log.warning(f"Failed to get exit survey status for user {user.id}: {e}")
+
+        return progress
+
+
+async def _load_progress_async(user: UserModel, child_id: str | None) -> dict:
+    """
+    Async variant of `_load_progress` on the async engine. The reads share one
+    async session, except the moderation sessions, which
+    get_sessions_by_user_async reads in a session of its own.
+    """
+    async with get_async_db() as db:
+        progress = _default_progress()
+
+        instructions_at = getattr(user, "instructions_completed_at", None)
+        progress["instructions_completed"] = instructions_at is not None
+
+        selected_child = None
+        try:
+            latest_child = await ChildProfiles.get_latest_child_profile_any_async(
+                db, user.id
+            )
+            if latest_child:
+                progress["has_child_profile"] = True
+
+            if child_id:
+                selected_child = await ChildProfiles.get_child_profile_by_id_async(
+                    db, child_id, user.id
                 )
 
-            # Check if moderation has been finalized (user clicked "Done")
-            try:
-                if selected_child:
-                    from open_webui.models.workflow_draft import get_draft
-
-                    draft = get_draft(user.id, selected_child.id, "moderation")
-                    if draft and draft.data:
-                        progress["moderation_finalized"] = draft.data.get(
-                            "moderation_finalized", False
-                        )
-            except Exception as e:
-                log.debug(
-                    f"Failed to check moderation finalized status for user {user.id}: {e}"
+            if selected_child is None:
+                selected_child = latest_child
+        except Exception as e:
+            log.warning(f"Failed to get child profiles for user {user.id}: {e}")
+
+        current_attempt = None
+        try:
+            current_attempt = await get_current_attempt_number_async(db, user.id)
+        except Exception as e:
+            log.warning(f"Failed to get attempt number for user {user.id}: {e}")
+
+        try:
+            child_id_for_mod = selected_child.id if selected_child else None
+            sessions = await ModerationSessions.get_sessions_by_user_async(
+                user.id, child_id=child_id_for_mod
+            )
+            progress["moderation_completed_count"] = _count_decided(user, sessions)
+
+            if selected_child and current_attempt is not None:
+                assignments = await ScenarioAssignments.get_assignments_by_child_async(
+                    db, selected_child.id, attempt_number=current_attempt
+                )
+                if assignments:
+                    progress["moderation_total"] = len(assignments)
+        except Exception as e:
+            log.warning(f"Failed to get moderation sessions for user {user.id}: {e}")
+
+        try:
+            if selected_child:
+                draft = await get_draft_async(
+                    db, user.id, selected_child.id, "moderation"
                 )
+                if draft and draft.data:
+                    progress["moderation_finalized"] = draft.data.get(
+                        "moderation_finalized", False
+                    )
+        except Exception as e:
+            log.debug(
+                f"Failed to check moderation finalized status for user {user.id}: {e}"
+            )
 
-            # Exit survey completion: scope to current reset boundary and current attempt
-            # so historical submissions from prior sessions/studies do not unlock completion.
-            try:
-                current_attempt = get_current_attempt_number(user.id)
-                latest_exit_query = db.query(ExitQuizResponse).filter(
+        try:
+            if current_attempt is not None:
+                latest_exit_query = select(ExitQuizResponse.id).where(
                     ExitQuizResponse.user_id == user.id,
                     ExitQuizResponse.attempt_number == current_attempt,
                 )
                 workflow_reset_at = getattr(user, "workflow_reset_at", None)
                 if workflow_reset_at:
-                    latest_exit_query = latest_exit_query.filter(
+                    latest_exit_query = latest_exit_query.where(
                         ExitQuizResponse.created_at > workflow_reset_at
                     )
-                latest_exit = latest_exit_query.order_by(
-                    ExitQuizResponse.created_at.desc()
-                ).first()
+                latest_exit = (await db.execute(latest_exit_query.limit(1))).scalar()
                 progress["exit_survey_completed"] = latest_exit is not None
-            except Exception as e:
-                log.warning(f"Failed to get exit survey status for user {user.id}: {e}")
-
-            # Determine user type based on STUDY_ID whitelist
-            try:
-                study_id = getattr(user, "study_id", None)
-                user_type = get_user_type(user, study_id)
-            except Exception as e:
-                log.warning(
-                    f"get_user_type failed for user {user.id}: {e}, defaulting to interviewee"
-                )
-                user_type = "interviewee"
+        except Exception as e:
+            log.warning(f"Failed to get exit survey status for user {user.id}: {e}")
+
+        return progress
+
+
+def _count_decided(user: UserModel, sessions: list) -> int:
+    """Number of unique scenarios with a terminal decision since the last reset."""
+    workflow_reset_at = getattr(user, "workflow_reset_at", None)
+    if workflow_reset_at:
+        sessions = [s for s in sessions if s.created_at > workflow_reset_at]
+    decided = set()
+    for s in sessions:
+        if s.initial_decision in (
+            "accept_original",
+            "moderate",
+            "not_applicable",
+        ):
+            decided.add(s.scenario_index)
+    return len(decided)
+
+
+def _resolve_workflow_state(user: UserModel, progress: dict) -> WorkflowStateResponse:
+    # Determine user type based on STUDY_ID whitelist
+    try:
+        study_id = getattr(user, "study_id", None)
+        user_type = get_user_type(user, study_id)
+    except Exception as e:
+        log.warning(
+            f"get_user_type failed for user {user.id}: {e}, defaulting to interviewee"
+        )
+        user_type = "interviewee"
 
-            # Determine next route based on user type
-            # Rely on `user_type == 'prolific'` (server-derived) rather than checking prolific_pid directly
-            is_prolific = user_type == "prolific"
+    # Determine next route based on user type
+    # Rely on `user_type == 'prolific'` (server-derived) rather than checking prolific_pid directly
+    is_prolific = user_type == "prolific"
 
-            if user_type == "parent":
-                next_for_parent = (
-                    "/assignment-instructions" if is_prolific else "/parent"
-                )
-                return WorkflowStateResponse(
-                    next_route=next_for_parent,
-                    substep=None,
-                    progress_by_section=progress,
-                )
+    if user_type == "parent":
+        next_for_parent = "/assignment-instructions" if is_prolific else "/parent"
+        return WorkflowStateResponse(
+            next_route=next_for_parent,
+            substep=None,
+            progress_by_section=progress,
+        )
 
-            if user_type == "child":
-                return WorkflowStateResponse(
-                    next_route="/", substep=None, progress_by_section=progress
-                )
+    if user_type == "child":
+        return WorkflowStateResponse(
+            next_route="/", substep=None, progress_by_section=progress
+        )
 
-            # For interviewees, follow the workflow
-            # Block kids/profile until instructions completed
-            if not progress["instructions_completed"]:
-                return WorkflowStateResponse(
-                    next_route="/assignment-instructions",
-                    substep=None,
-                    progress_by_section=progress,
-                )
-            if not progress["has_child_profile"]:
-                return WorkflowStateResponse(
-                    next_route="/kids/profile",
-                    substep=None,
-                    progress_by_section=progress,
-                )
+    # For interviewees, follow the workflow
+    # Block kids/profile until instructions completed
+    if not progress["instructions_completed"]:
+        return WorkflowStateResponse(
+            next_route="/assignment-instructions",
+            substep=None,
+            progress_by_section=progress,
+        )
+    if not progress["has_child_profile"]:
+        return WorkflowStateResponse(
+            next_route="/kids/profile",
+            substep=None,
+            progress_by_section=progress,
+        )
 
-            # Only show moderation-scenario for interviewees
-            if (
-                user_type == "interviewee"
-                and progress["moderation_completed_count"]
-                < progress["moderation_total"]
-            ):
-                return WorkflowStateResponse(
-                    next_route="/moderation-scenario",
-                    substep=None,
-                    progress_by_section=progress,
-                )
+    # Only show moderation-scenario for interviewees
+    if (
+        user_type == "interviewee"
+        and progress["moderation_completed_count"] < progress["moderation_total"]
+    ):
+        return WorkflowStateResponse(
+            next_route="/moderation-scenario",
+            substep=None,
+            progress_by_section=progress,
+        )
 
-            # All scenarios completed but user hasn't clicked "Done" yet
-            if user_type == "interviewee" and not progress.get(
-                "moderation_finalized", False
-            ):
-                return WorkflowStateResponse(
-                    next_route="/moderation-scenario",
-                    substep=None,
-                    progress_by_section=progress,
-                )
+    # All scenarios completed but user hasn't clicked "Done" yet
+    if user_type == "interviewee" and not progress.get("moderation_finalized", False):
+        return WorkflowStateResponse(
+            next_route="/moderation-scenario",
+            substep=None,
+            progress_by_section=progress,
+        )
 
-            if not progress["exit_survey_completed"]:
-                return WorkflowStateResponse(
-                    next_route="/exit-survey",
-                    substep=None,
-                    progress_by_section=progress,
-                )
+    if not progress["exit_survey_completed"]:
+        return WorkflowStateResponse(
+            next_route="/exit-survey",
+            substep=None,
+            progress_by_section=progress,
+        )
+
+    return WorkflowStateResponse(
+        next_route="/completion", substep=None, progress_by_section=progress
+    )
 
-            return WorkflowStateResponse(
-                next_route="/completion", substep=None, progress_by_section=progress
-            )
 
+@router.get("/workflow/state")
+async def get_workflow_state(
+    child_id: str | None = Query(default=None),
+    user: UserModel = Depends(get_verified_user),
+) -> WorkflowStateResponse:
+    """
+    Compute current workflow state for the user to resume progress on login.
+    Sections: kids/profile -> moderation-scenario -> exit-survey -> completion
+    """
+    try:
+        if ASYNC_DB_ENABLED:
+            progress = await _load_progress_async(user, child_id)
+        else:
+            progress = await run_in_threadpool(_load_progress, user, child_id)
+        return _resolve_workflow_state(user, progress)
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the sync vs async database paths of the hot
+research endpoints (session activity writes and moderation session reads).
+
+"sync" calls the table method directly inside the event loop, which is what the
+handlers did before the async engine existed; "async" awaits the *_async
+variant. Alongside throughput it reports event-loop lag, i.e. how long other
+requests on the same worker would have been stalled.
+
+Usage:
+    python -m open_webui.scripts.benchmark_async_db [--concurrency 50] [--requests 1000]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from open_webui.internal.db import ASYNC_DB_ENABLED, async_engine, get_db
+from open_webui.models.moderation import (
+    ModerationSessionActivities,
+    ModerationSessionActivity,
+    ModerationSessionActivityForm,
+    ModerationSessions,
+)
+
+
+async def _monitor_loop_lag(stop: asyncio.Event, lags: list[float], interval=0.005):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run_benchmark(
+    mode: str, operation: str, concurrency: int, requests: int, user_id: str
+) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def call(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            if operation == "activity":
+                form = ModerationSessionActivityForm(
+                    user_id=user_id,
+                    child_id="bench-child",
+                    session_id=f"bench-{i % concurrency}",
+                    active_ms_cumulative=i,
+                )
+                if mode == "sync":
+                    ModerationSessionActivities.add_activity(form)
+                else:
+                    await ModerationSessionActivities.add_activity_async(form)
+            else:
+                if mode == "sync":
+                    ModerationSessions.get_sessions_by_user(user_id)
+                else:
+                    await ModerationSessions.get_sessions_by_user_async(user_id)
+            latencies.append(time.perf_counter() - start)
+
+    lags: list[float] = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_monitor_loop_lag(stop, lags))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await monitor
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "operation": operation,
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "max_loop_lag_ms": max(lags, default=0.0) * 1000,
+    }
+
+
+def cleanup(user_id: str):
+    with get_db() as db:
+        db.query(ModerationSessionActivity).filter(
+            ModerationSessionActivity.user_id == user_id
+        ).delete()
+        db.commit()
+
+
+async def main_async(args):
+    if not ASYNC_DB_ENABLED:
+        print("Async engine not available for this DATABASE_URL; nothing to compare.")
+        return
+
+    user_id = f"bench-{uuid.uuid4()}"
+    print(
+        f"{'operation':<10} {'mode':<6} {'req/s':>9} {'p50 ms':>9} "
+        f"{'p99 ms':>9} {'max loop lag ms':>16}"
+    )
+    try:
+        for operation in ("activity", "sessions"):
+            for mode in ("sync", "async"):
+                r = await run_benchmark(
+                    mode, operation, args.concurrency, args.requests, user_id
+                )
+                print(
+                    f"{r['operation']:<10} {r['mode']:<6} {r['rps']:>9.0f} "
+                    f"{r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} "
+                    f"{r['max_loop_lag_ms']:>16.1f}"
+                )
+    finally:
+        cleanup(user_id)
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Latency of the local code interpreter engine, cold vs. warm.
+
+"cold" starts a fresh CodeWorker for every execution, which is what running
+each code block in its own interpreter costs: process startup, the imports
+of --preload and the execution. "warm" sends the same code to a
+CodeWorkerPool whose workers were started (and imported --preload) ahead of
+time and are reused across executions.
+
+Usage:
+    python -m open_webui.scripts.benchmark_code_interpreter [--runs 20] [--preload numpy,pandas]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from open_webui.utils.code_interpreter import CodeWorker, CodeWorkerPool
+
+CODE = """
+total = sum(i * i for i in range(10_000))
+print(total)
+"""
+
+
+def get_summary(timings: list[float]) -> str:
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return f"{statistics.median(timings) * 1000:>10.1f} {p95 * 1000:>10.1f}"
+
+
+async def cold(args, code) -> list[float]:
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        worker = await CodeWorker.start(preload_modules=args.preload)
+        try:
+            await worker.execute(code, [], 60)
+        finally:
+            await worker.stop()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def warm(args, code) -> list[float]:
+    pool = CodeWorkerPool(size=1, preload_modules=args.preload)
+    try:
+        # The first execution waits for the worker to start
+        await pool.execute("pass")
+
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            await pool.execute(code)
+            timings.append(time.perf_counter() - start)
+        return timings
+    finally:
+        await pool.close()
+
+
+async def main_async(args):
+    code = "\n".join(f"import {module}" for module in args.preload) + CODE
+
+    print(
+        f"{args.runs} executions, preloaded modules: {','.join(args.preload) or 'none'}"
+    )
+    print(f"{'mode':<5} {'median ms':>10} {'p95 ms':>10}")
+    for mode, run in (("cold", cold), ("warm", warm)):
+        print(f"{mode:<5} {get_summary(await run(args, code))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument(
+        "--preload",
+        type=lambda value: [module for module in value.split(",") if module],
+        default=[],
+    )
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
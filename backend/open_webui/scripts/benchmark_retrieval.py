@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for retrieval over 1, 5 and 20 collections.
+
+"serial" is how get_sources_from_items used to work: every item embeds the
+queries itself and waits for its searches (in a fresh thread pool) before the
+next item starts. "planned" is the current get_sources_from_items, which
+embeds the queries once and searches all items concurrently in the shared
+retrieval pool. The embedding API and the vector DB are simulated with fixed
+latencies so the numbers only reflect scheduling, not a particular backend.
+
+Usage:
+    python -m open_webui.scripts.benchmark_retrieval [--embed-ms 40] [--search-ms 15]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from open_webui.retrieval import utils
+from open_webui.retrieval.vector.main import SearchResult
+
+
+def make_query_doc(search_ms: float):
+    def query_doc(collection_name, query_embedding, k, user=None):
+        time.sleep(search_ms / 1000)  # blocking, like the vector DB clients
+        return SearchResult(
+            ids=[[f"{collection_name}-{i}" for i in range(k)]],
+            documents=[[f"{collection_name} {i}" for i in range(k)]],
+            metadatas=[[{"collection": collection_name}] * k],
+            distances=[[1.0 - i / 100 for i in range(k)]],
+        )
+
+    return query_doc
+
+
+def make_embedding_function(embed_ms: float):
+    async def embedding_function(query, prefix=None):
+        await asyncio.sleep(embed_ms / 1000)
+        if isinstance(query, list):
+            return [[1.0, 0.0] for _ in query]
+        return [1.0, 0.0]
+
+    return embedding_function
+
+
+async def serial_sources(items, queries, embedding_function, k):
+    sources = []
+    for item in items:
+        query_embeddings = await embedding_function(
+            queries, prefix=utils.RAG_EMBEDDING_QUERY_PREFIX
+        )
+        with ThreadPoolExecutor() as executor:
+            futures = [
+                executor.submit(
+                    utils.query_doc,
+                    collection_name=item["collection_name"],
+                    query_embedding=query_embedding,
+                    k=k,
+                )
+                for query_embedding in query_embeddings
+            ]
+            results = [future.result().model_dump() for future in futures]
+        sources.append(utils.merge_and_sort_query_results(results, k=k))
+    return sources
+
+
+async def planned_sources(items, queries, embedding_function, k):
+    return await utils.get_sources_from_items(
+        request=SimpleNamespace(),
+        items=items,
+        queries=queries,
+        embedding_function=embedding_function,
+        k=k,
+        reranking_function=None,
+        k_reranker=0,
+        r=0.0,
+        hybrid_bm25_weight=0.0,
+        hybrid_search=False,
+    )
+
+
+async def run_benchmark(mode: str, collections: int, args) -> dict:
+    items = [{"collection_name": f"bench-{i}"} for i in range(collections)]
+    queries = [f"query {i}" for i in range(args.queries)]
+    embedding_function = make_embedding_function(args.embed_ms)
+    run = serial_sources if mode == "serial" else planned_sources
+
+    latencies = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        await run(items, queries, embedding_function, args.k)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "collections": collections,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+async def main_async(args):
+    utils.query_doc = make_query_doc(args.search_ms)
+    print(
+        f"{args.queries} queries, embedding {args.embed_ms:.0f} ms, "
+        f"search {args.search_ms:.0f} ms, "
+        f"retrieval pool {utils.RETRIEVAL_EXECUTOR._max_workers} threads"
+    )
+    print(f"{'collections':>11} {'mode':<8} {'p50 ms':>9} {'max ms':>9}")
+    for collections in (1, 5, 20):
+        for mode in ("serial", "planned"):
+            r = await run_benchmark(mode, collections, args)
+            print(
+                f"{r['collections']:>11} {r['mode']:<8} "
+                f"{r['p50_ms']:>9.1f} {r['max_ms']:>9.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=3)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--embed-ms", type=float, default=40)
+    parser.add_argument("--search-ms", type=float, default=15)
+    parser.add_argument("--repeat", type=int, default=10)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Profile backend import time (`python -X importtime`) and aggregate it per router
+and per top-level third-party package.
+
+Usage:
+    python -m open_webui.scripts.import_profile [--lazy] [--module open_webui.main] [--top 15]
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ImportProfile:
+    wall_seconds: float = 0.0
+    max_rss_mb: float = 0.0
+    total_us: int = 0
+    # Cumulative import time of each open_webui.routers.* module
+    routers: dict[str, int] = field(default_factory=dict)
+    # Self time summed per top-level package (e.g. "langchain_community")
+    packages: dict[str, int] = field(default_factory=dict)
+
+
+def parse_importtime(output: str) -> ImportProfile:
+    """
+    Parse `-X importtime` stderr lines of the form
+    `import time:   self [us] | cumulative | imported package`.
+    """
+    profile = ImportProfile()
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            # Header line
+            continue
+
+        name = parts[2].strip()
+        profile.total_us += self_us
+
+        package = name.split(".")[0]
+        profile.packages[package] = profile.packages.get(package, 0) + self_us
+
+        if name.startswith("open_webui.routers.") and name.count(".") == 2:
+            profile.routers[name.rsplit(".", 1)[1]] = cumulative_us
+
+    return profile
+
+
+def profile_import(
+    module: str = "open_webui.main", lazy: bool = False
+) -> ImportProfile:
+    """Import `module` in a fresh interpreter and profile it."""
+    env = {**os.environ, "ENABLE_LAZY_STARTUP": "true" if lazy else "false"}
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall_seconds = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-4000:]}")
+
+    profile = parse_importtime(result.stderr)
+    profile.wall_seconds = wall_seconds
+    # ru_maxrss is reported in KiB on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    profile.max_rss_mb = max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return profile
+
+
+def print_report(profile: ImportProfile, top: int = 15):
+    print(f"Wall time:   {profile.wall_seconds:.2f}s")
+    print(f"Import time: {profile.total_us / 1e6:.2f}s")
+    print(f"Max RSS:     {profile.max_rss_mb:.0f} MB")
+
+    print("\nRouters (cumulative, ms):")
+    for name, us in sorted(profile.routers.items(), key=lambda x: -x[1]):
+        print(f"  {name:<28} {us / 1000:>9.1f}")
+
+    print(f"\nTop {top} packages (self, ms):")
+    for name, us in sorted(profile.packages.items(), key=lambda x: -x[1])[:top]:
+        print(f"  {name:<28} {us / 1000:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="open_webui.main")
+    parser.add_argument(
+        "--lazy", action="store_true", help="Profile with ENABLE_LAZY_STARTUP=true"
+    )
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    print_report(profile_import(args.module, lazy=args.lazy), top=args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,11 @@ import sys
 import time
 from typing import Dict, Set
 from redis import asyncio as aioredis
-import pycrdt as Y
 
 from open_webui.models.users import Users, UserNameResponse
 from open_webui.models.channels import Channels
 from open_webui.models.chats import Chats
-from open_webui.models.notes import Notes, NoteUpdateForm
+from open_webui.models.notes import Notes
 from open_webui.utils.redis import (
     get_sentinels_from_env,
     get_sentinel_url_from_env,
@@ -39,8 +38,8 @@ from open_webui.env import (
     WEBSOCKET_SERVER_ENGINEIO_LOGGING,
 )
 from open_webui.utils.auth import decode_token
+from open_webui.socket.note_saves import NoteSaveCoordinator
 from open_webui.socket.utils import RedisDict, RedisLock, YdocManager
-from open_webui.tasks import create_task, stop_item_tasks
 from open_webui.utils.redis import get_redis_connection
 from open_webui.utils.access_control import has_access, get_users_with_access
 
@@ -54,6 +53,7 @@ log = logging.getLogger(__name__)
 
 
 REDIS = None
+YDOC_REDIS = None
 
 # Configure CORS for Socket.IO
 SOCKETIO_CORS_ORIGINS = "*" if CORS_ALLOW_ORIGIN == ["*"] else CORS_ALLOW_ORIGIN
@@ -111,6 +111,16 @@ if WEBSOCKET_MANAGER == "redis":
         redis_cluster=WEBSOCKET_REDIS_CLUSTER,
         async_mode=True,
     )
+    # Yjs document updates are stored as raw bytes
+    YDOC_REDIS = get_redis_connection(
+        redis_url=WEBSOCKET_REDIS_URL,
+        redis_sentinels=get_sentinels_from_env(
+            WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
+        ),
+        redis_cluster=WEBSOCKET_REDIS_CLUSTER,
+        async_mode=True,
+        decode_responses=False,
+    )
 
     redis_sentinels = get_sentinels_from_env(
         WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
@@ -156,10 +166,12 @@ else:
 
 
 YDOC_MANAGER = YdocManager(
-    redis=REDIS,
+    redis=YDOC_REDIS,
     redis_key_prefix=f"{REDIS_KEY_PREFIX}:ydoc:documents",
 )
 
+NOTE_SAVES = NoteSaveCoordinator(redis=REDIS)
+
 
 async def periodic_usage_pool_cleanup():
     max_retries = 2
@@ -487,14 +499,8 @@ async def ydoc_document_join(sid, data):
 
         active_session_ids = get_session_ids_from_room(f"doc_{document_id}")
 
-        # Get the Yjs document state
-        ydoc = Y.Doc()
-        updates = await YDOC_MANAGER.get_updates(document_id)
-        for update in updates:
-            ydoc.apply_update(bytes(update))
-
-        # Encode the entire document state as an update
-        state_update = ydoc.get_update()
+        # The snapshot merged with the updates made since, as a single update
+        state_update = await YDOC_MANAGER.get_state(document_id)
         await sio.emit(
             "ydoc:document:state",
             {
@@ -525,27 +531,6 @@ async def ydoc_document_join(sid, data):
         await sio.emit("error", {"message": "Failed to join document"}, room=sid)
 
 
-async def document_save_handler(document_id, data, user):
-    if document_id.startswith("note:"):
-        note_id = document_id.split(":")[1]
-        note = Notes.get_note_by_id(note_id)
-        if not note:
-            log.error(f"Note {note_id} not found")
-            return
-
-        if (
-            user.get("role") != "admin"
-            and user.get("id") != note.user_id
-            and not has_access(
-                user.get("id"), type="read", access_control=note.access_control
-            )
-        ):
-            log.error(f"User {user.get('id')} does not have access to note {note_id}")
-            return
-
-        Notes.update_note_by_id(note_id, NoteUpdateForm(data=data))
-
-
 @sio.on("ydoc:document:state")
 async def yjs_document_state(sid, data):
     """Send the current state of the Yjs document to the user"""
@@ -563,14 +548,8 @@ async def yjs_document_state(sid, data):
             log.warning(f"Document {document_id} not found")
             return
 
-        # Get the Yjs document state
-        ydoc = Y.Doc()
-        updates = await YDOC_MANAGER.get_updates(document_id)
-        for update in updates:
-            ydoc.apply_update(bytes(update))
-
-        # Encode the entire document state as an update
-        state_update = ydoc.get_update()
+        # The snapshot merged with the updates made since, as a single update
+        state_update = await YDOC_MANAGER.get_state(document_id)
 
         await sio.emit(
             "ydoc:document:state",
@@ -591,18 +570,13 @@ async def yjs_document_update(sid, data):
     try:
         document_id = data["document_id"]
 
-        try:
-            await stop_item_tasks(REDIS, document_id)
-        except:
-            pass
-
         user_id = data.get("user_id", sid)
 
         update = data["update"]  # List of bytes from frontend
 
         await YDOC_MANAGER.append_to_updates(
             document_id=document_id,
-            update=update,  # Convert list of bytes to bytes
+            update=bytes(update),
         )
 
         # Broadcast update to all other users in the document
@@ -618,14 +592,9 @@ async def yjs_document_update(sid, data):
             skip_sid=sid,
         )
 
-        async def debounced_save():
-            await asyncio.sleep(0.5)
-            await document_save_handler(
-                document_id, data.get("data", {}), SESSION_POOL.get(sid)
-            )
-
-        if data.get("data"):
-            await create_task(REDIS, debounced_save(), document_id)
+        user = SESSION_POOL.get(sid)
+        if data.get("data") and user:
+            NOTE_SAVES.schedule(document_id, data["data"], user)
 
     except Exception as e:
         log.error(f"Error in yjs_document_update: {e}")
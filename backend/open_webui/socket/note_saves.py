@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Callable, Optional
+
+from open_webui.env import (
+    NOTE_SAVE_ACCESS_TTL,
+    NOTE_SAVE_DEBOUNCE_MS,
+    NOTE_SAVE_MAX_DELAY_MS,
+    REDIS_KEY_PREFIX,
+)
+from open_webui.models.notes import NoteUpdateForm, Notes
+from open_webui.utils.access_control import has_access
+
+log = logging.getLogger(__name__)
+
+
+def get_content_hash(data: dict) -> str:
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+class NoteSaveCoordinator:
+    """
+    Coalesces the saves of collaborative notes sent by the editors of all
+    sessions on this worker.
+
+    A save is written debounce seconds after the last save of the document,
+    or max_delay seconds after the first unwritten one while edits keep
+    coming. Only the latest data is written, and only if its content hash
+    differs from the last write, which is shared through Redis when
+    available so that workers don't repeat each other's writes. Access
+    decisions are cached per (user, note) for access_ttl seconds.
+    """
+
+    def __init__(
+        self,
+        redis=None,
+        debounce: float = NOTE_SAVE_DEBOUNCE_MS / 1000,
+        max_delay: float = NOTE_SAVE_MAX_DELAY_MS / 1000,
+        access_ttl: float = NOTE_SAVE_ACCESS_TTL,
+        write: Optional[Callable[[str, dict], None]] = None,
+        redis_key_prefix: str = f"{REDIS_KEY_PREFIX}:note_saves",
+    ):
+        self.redis = redis
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.access_ttl = access_ttl
+        self.write = write or (
+            lambda note_id, data: Notes.update_note_by_id(
+                note_id, NoteUpdateForm(data=data)
+            )
+        )
+        self.redis_key_prefix = redis_key_prefix
+
+        # document_id -> (data, user, first requested at)
+        self._pending: dict[str, tuple[dict, dict, float]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._flushes: set[asyncio.Task] = set()
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._hashes: dict[str, str] = {}
+        self._access: dict[tuple[str, str], tuple[bool, float]] = {}
+
+        self.requested = 0
+        self.coalesced = 0
+        self.unchanged = 0
+        self.denied = 0
+        self.written = 0
+
+    def schedule(self, document_id: str, data: dict, user: dict) -> None:
+        """Save data as user once the document's editors pause."""
+        self.requested += 1
+        now = time.monotonic()
+        first_requested_at = now
+        if document_id in self._pending:
+            self.coalesced += 1
+            first_requested_at = self._pending[document_id][2]
+        self._pending[document_id] = (data, user, first_requested_at)
+
+        timer = self._timers.pop(document_id, None)
+        if timer:
+            timer.cancel()
+        delay = min(self.debounce, max(first_requested_at + self.max_delay - now, 0))
+        self._timers[document_id] = asyncio.get_running_loop().call_later(
+            delay, self._start_flush, document_id
+        )
+
+    def _start_flush(self, document_id: str) -> None:
+        self._timers.pop(document_id, None)
+        task = asyncio.create_task(self.flush(document_id))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def flush(self, document_id: str) -> bool:
+        """Write the pending save of document_id now. Returns whether it wrote."""
+        timer = self._timers.pop(document_id, None)
+        if timer:
+            timer.cancel()
+
+        # Writes of a document are serialized so that an older save never
+        # lands after a newer one
+        async with self._locks.setdefault(document_id, asyncio.Lock()):
+            pending = self._pending.pop(document_id, None)
+            if pending is None:
+                return False
+            return await self._write(document_id, *pending[:2])
+
+    async def _write(self, document_id: str, data: dict, user: dict) -> bool:
+        try:
+            if not document_id.startswith("note:"):
+                return False
+            note_id = document_id.split(":")[1]
+
+            content_hash = get_content_hash(data)
+            if content_hash == await self._get_hash(document_id):
+                self.unchanged += 1
+                return False
+
+            if not await asyncio.to_thread(self.can_write, user, note_id):
+                self.denied += 1
+                log.error(
+                    f"User {user.get('id')} does not have access to note {note_id}"
+                )
+                return False
+
+            await asyncio.to_thread(self.write, note_id, data)
+            await self._set_hash(document_id, content_hash)
+            self.written += 1
+            return True
+        except Exception as e:
+            log.exception(f"Error saving document {document_id}: {e}")
+            return False
+
+    def can_write(self, user: dict, note_id: str) -> bool:
+        if user.get("role") == "admin":
+            return True
+
+        key = (user.get("id"), note_id)
+        cached = self._access.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        note = Notes.get_note_by_id(note_id)
+        if not note:
+            log.error(f"Note {note_id} not found")
+            return False
+
+        allowed = user.get("id") == note.user_id or has_access(
+            user.get("id"), type="read", access_control=note.access_control
+        )
+        self._access[key] = (allowed, time.monotonic() + self.access_ttl)
+        return allowed
+
+    async def invalidate(self, note_id: str) -> None:
+        """Forget access decisions and hashes after a note was changed elsewhere."""
+        for key in [key for key in self._access if key[1] == note_id]:
+            del self._access[key]
+
+        document_id = f"note:{note_id}"
+        if self.redis:
+            await self.redis.delete(f"{self.redis_key_prefix}:{document_id}")
+        else:
+            self._hashes.pop(document_id, None)
+
+    async def _get_hash(self, document_id: str) -> Optional[str]:
+        if self.redis:
+            return await self.redis.get(f"{self.redis_key_prefix}:{document_id}")
+        return self._hashes.get(document_id)
+
+    async def _set_hash(self, document_id: str, content_hash: str) -> None:
+        if self.redis:
+            await self.redis.set(
+                f"{self.redis_key_prefix}:{document_id}", content_hash, ex=86400
+            )
+        else:
+            self._hashes[document_id] = content_hash
+
+    def stats(self) -> dict:
+        return {
+            "requested": self.requested,
+            "coalesced": self.coalesced,
+            "unchanged": self.unchanged,
+            "denied": self.denied,
+            "written": self.written,
+            "pending": len(self._pending),
+        }
@@ -1,7 +1,7 @@
 import json
 import uuid
 from open_webui.utils.redis import get_redis_connection
-from open_webui.env import REDIS_KEY_PREFIX
+from open_webui.env import REDIS_KEY_PREFIX, YDOC_COMPACTION_THRESHOLD
 from typing import Optional, List, Tuple
 import pycrdt as Y
 
@@ -118,52 +118,161 @@ class RedisDict:
 
 
 class YdocManager:
+    """
+    Stores the Yjs updates of collaborative documents, in Redis when given a
+    connection (created with decode_responses=False, as updates are binary)
+    and in memory otherwise.
+
+    Once a document has compaction_threshold updates they are merged into a
+    single binary snapshot and dropped, so joining clients receive a bounded
+    amount of history.
+    """
+
     def __init__(
         self,
         redis=None,
         redis_key_prefix: str = f"{REDIS_KEY_PREFIX}:ydoc:documents",
+        compaction_threshold: int = YDOC_COMPACTION_THRESHOLD,
     ):
         self._updates = {}
+        self._snapshots = {}
         self._users = {}
         self._redis = redis
         self._redis_key_prefix = redis_key_prefix
+        self._compaction_threshold = compaction_threshold
+
+    # Delete the compaction lock only while it still holds our token, not once
+    # it has expired and been taken by another worker
+    _RELEASE_LOCK_SCRIPT = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+        return redis.call("del", KEYS[1])
+    end
+    return 0
+    """
+
+    def _key(self, document_id: str, name: str) -> str:
+        # The {document_id} hash tag keeps all keys of a document in one Redis
+        # Cluster slot, as transactions and multi-key commands require
+        return f"{self._redis_key_prefix}:{{{document_id}}}:{name}"
+
+    @staticmethod
+    def _decode_update(update: bytes) -> bytes:
+        # Updates stored before compaction was added are JSON lists of ints
+        if update[:1] == b"[":
+            try:
+                return bytes(json.loads(update))
+            except ValueError:
+                pass
+        return update
+
+    @staticmethod
+    def _merge(updates: List[bytes]) -> bytes:
+        ydoc = Y.Doc()
+        for update in updates:
+            ydoc.apply_update(update)
+        return ydoc.get_update()
+
+    async def _get_redis_snapshot_and_updates(
+        self, document_id: str
+    ) -> Tuple[Optional[bytes], List[bytes]]:
+        # Read in one transaction, so that a compaction between the two reads
+        # cannot drop the updates it merged from both of them
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.get(self._key(document_id, "snapshot"))
+            pipe.lrange(self._key(document_id, "updates"), 0, -1)
+            snapshot, updates = await pipe.execute()
+        return snapshot, [self._decode_update(update) for update in updates]
 
     async def append_to_updates(self, document_id: str, update: bytes):
         document_id = document_id.replace(":", "_")
+        update = bytes(update)
+
         if self._redis:
-            redis_key = f"{self._redis_key_prefix}:{document_id}:updates"
-            await self._redis.rpush(redis_key, json.dumps(list(update)))
+            length = await self._redis.rpush(self._key(document_id, "updates"), update)
         else:
-            if document_id not in self._updates:
-                self._updates[document_id] = []
-            self._updates[document_id].append(update)
+            self._updates.setdefault(document_id, []).append(update)
+            length = len(self._updates[document_id])
+
+        if self._compaction_threshold and length >= self._compaction_threshold:
+            await self.compact(document_id)
+
+    async def compact(self, document_id: str):
+        """Merge the snapshot and all updates into a new snapshot."""
+        document_id = document_id.replace(":", "_")
+
+        if self._redis:
+            # Only one worker compacts a document at a time. Updates are only
+            # ever appended, so trimming the ones merged never loses others.
+            lock_key = self._key(document_id, "compaction_lock")
+            lock_id = str(uuid.uuid4())
+            if not await self._redis.set(lock_key, lock_id, nx=True, ex=30):
+                return
+            try:
+                snapshot, updates = await self._get_redis_snapshot_and_updates(
+                    document_id
+                )
+                if not updates:
+                    return
+
+                merged = self._merge(([snapshot] if snapshot else []) + updates)
+                async with self._redis.pipeline(transaction=True) as pipe:
+                    pipe.set(self._key(document_id, "snapshot"), merged)
+                    pipe.ltrim(self._key(document_id, "updates"), len(updates), -1)
+                    await pipe.execute()
+            finally:
+                await self._redis.eval(self._RELEASE_LOCK_SCRIPT, 1, lock_key, lock_id)
+        else:
+            updates = self._updates.get(document_id)
+            if not updates:
+                return
+            snapshot = self._snapshots.get(document_id)
+            self._snapshots[document_id] = self._merge(
+                ([snapshot] if snapshot else []) + updates
+            )
+            self._updates[document_id] = []
 
     async def get_updates(self, document_id: str) -> List[bytes]:
+        """Return the snapshot, if any, followed by the updates made since."""
         document_id = document_id.replace(":", "_")
 
         if self._redis:
-            redis_key = f"{self._redis_key_prefix}:{document_id}:updates"
-            updates = await self._redis.lrange(redis_key, 0, -1)
-            return [bytes(json.loads(update)) for update in updates]
+            snapshot, updates = await self._get_redis_snapshot_and_updates(document_id)
         else:
-            return self._updates.get(document_id, [])
+            snapshot = self._snapshots.get(document_id)
+            updates = self._updates.get(document_id, [])
+
+        return ([snapshot] if snapshot else []) + updates
+
+    async def get_state(self, document_id: str) -> bytes:
+        """Return the whole document state as a single Yjs update."""
+        updates = await self.get_updates(document_id)
+        if len(updates) == 1:
+            return updates[0]
+        return self._merge(updates)
 
     async def document_exists(self, document_id: str) -> bool:
         document_id = document_id.replace(":", "_")
 
         if self._redis:
-            redis_key = f"{self._redis_key_prefix}:{document_id}:updates"
-            return await self._redis.exists(redis_key) > 0
+            return (
+                await self._redis.exists(
+                    self._key(document_id, "updates"),
+                    self._key(document_id, "snapshot"),
+                )
+                > 0
+            )
         else:
-            return document_id in self._updates
+            return document_id in self._updates or document_id in self._snapshots
 
     async def get_users(self, document_id: str) -> List[str]:
         document_id = document_id.replace(":", "_")
 
         if self._redis:
-            redis_key = f"{self._redis_key_prefix}:{document_id}:users"
+            redis_key = self._key(document_id, "users")
             users = await self._redis.smembers(redis_key)
-            return list(users)
+            return [
+                user.decode() if isinstance(user, bytes) else user for user in users
+            ]
         else:
             return self._users.get(document_id, [])
 
@@ -171,7 +280,7 @@ class YdocManager:
         document_id = document_id.replace(":", "_")
 
         if self._redis:
-            redis_key = f"{self._redis_key_prefix}:{document_id}:users"
+            redis_key = self._key(document_id, "users")
             await self._redis.sadd(redis_key, user_id)
         else:
             if document_id not in self._users:
@@ -182,7 +291,7 @@ class YdocManager:
         document_id = document_id.replace(":", "_")
 
         if self._redis:
-            redis_key = f"{self._redis_key_prefix}:{document_id}:users"
+            redis_key = self._key(document_id, "users")
             await self._redis.srem(redis_key, user_id)
         else:
             if document_id in self._users and user_id in self._users[document_id]:
@@ -196,10 +305,12 @@ class YdocManager:
             ):
                 keys.append(key)
             for key in keys:
+                if isinstance(key, bytes):
+                    key = key.decode()
                 if key.endswith(":users"):
                     await self._redis.srem(key, user_id)
 
-                    document_id = key.split(":")[-2]
+                    document_id = key.split(":")[-2].strip("{}")
                     if len(await self.get_users(document_id)) == 0:
                         await self.clear_document(document_id)
 
@@ -216,12 +327,15 @@ class YdocManager:
         document_id = document_id.replace(":", "_")
 
         if self._redis:
-            redis_key = f"{self._redis_key_prefix}:{document_id}:updates"
-            await self._redis.delete(redis_key)
-            redis_users_key = f"{self._redis_key_prefix}:{document_id}:users"
-            await self._redis.delete(redis_users_key)
+            await self._redis.delete(
+                self._key(document_id, "updates"),
+                self._key(document_id, "snapshot"),
+                self._key(document_id, "users"),
+            )
         else:
             if document_id in self._updates:
                 del self._updates[document_id]
+            if document_id in self._snapshots:
+                del self._snapshots[document_id]
             if document_id in self._users:
                 del self._users[document_id]
@@ -0,0 +1,245 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+from open_webui.config import (
+    CACHE_DIR,
+    STORAGE_CACHE_MAX_SIZE_MB,
+    STORAGE_CACHE_TTL,
+    STORAGE_PROVIDER,
+)
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    key TEXT PRIMARY KEY,
+    local_path TEXT NOT NULL,
+    etag TEXT,
+    size INTEGER NOT NULL,
+    validated_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_last_used ON files (last_used);
+"""
+
+
+class FileCache:
+    """
+    Size-bounded LRU index of object-store files downloaded to local disk.
+
+    Each entry records the ETag (S3, Azure) or generation (GCS) of the object
+    it was downloaded from. A copy is served without contacting the object
+    store for ttl seconds after it was last validated, and afterwards only
+    while the object's ETag still matches. Concurrent requests for the same
+    file in a process share one download; downloads land in a temporary file
+    and are renamed into place, so other workers never see partial files.
+    The index is a SQLite file shared by all workers.
+    """
+
+    def __init__(self, path: str, max_size_bytes: int, ttl: float = 0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_bytes
+        self.ttl = ttl
+
+        self._locks: dict[str, tuple[threading.Lock, int]] = {}
+        self._locks_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(SCHEMA)
+            conn.commit()
+
+    @contextmanager
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _single_flight(self, key: str):
+        with self._locks_lock:
+            lock, waiters = self._locks.get(key, (threading.Lock(), 0))
+            self._locks[key] = (lock, waiters + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._locks_lock:
+                lock, waiters = self._locks[key]
+                if waiters == 1:
+                    del self._locks[key]
+                else:
+                    self._locks[key] = (lock, waiters - 1)
+
+    def is_downloading(self, key: str) -> bool:
+        """Whether a request in this process is fetching or validating key."""
+        with self._locks_lock:
+            return key in self._locks
+
+    def _validate(
+        self, key: str, local_path: str, get_etag: Callable[[], Optional[str]]
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Check whether local_path is a current copy of the object key. Returns
+        the verdict and the object's ETag if it had to be fetched.
+        """
+        with self.connect() as conn:
+            entry = conn.execute(
+                "SELECT local_path, etag, size, validated_at FROM files WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+        if (
+            entry is None
+            or entry[0] != local_path
+            or not os.path.isfile(local_path)
+            or os.path.getsize(local_path) != entry[2]
+        ):
+            return False, None
+
+        now = time.time()
+        if now - entry[3] < self.ttl:
+            self._touch(key, validated_at=entry[3])
+            return True, None
+
+        etag = get_etag()
+        if etag is not None and etag == entry[1]:
+            self._touch(key, validated_at=now)
+            return True, etag
+        return False, etag
+
+    def get_cached_file(
+        self, key: str, local_path: str, get_etag: Callable[[], Optional[str]]
+    ) -> Optional[str]:
+        """Return local_path if it holds the current content of key, else None."""
+        valid, _ = self._validate(key, local_path, get_etag)
+        if valid:
+            self.hits += 1
+            return local_path
+        return None
+
+    def get_file(
+        self,
+        key: str,
+        local_path: str,
+        get_etag: Callable[[], Optional[str]],
+        download: Callable[[str], None],
+    ) -> str:
+        """
+        Return local_path holding the current content of the object key,
+        downloading it with download(path) unless the cached copy is valid.
+        """
+        with self._single_flight(key):
+            valid, etag = self._validate(key, local_path, get_etag)
+            if valid:
+                self.hits += 1
+                return local_path
+
+            self.misses += 1
+            if etag is None:
+                etag = get_etag()
+
+            temp_path = f"{local_path}.{uuid.uuid4().hex}.part"
+            try:
+                download(temp_path)
+                os.replace(temp_path, local_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+            self.put(key, local_path, etag)
+            return local_path
+
+    def _touch(self, key: str, validated_at: float) -> None:
+        with self.connect() as conn:
+            conn.execute(
+                "UPDATE files SET last_used = ?, validated_at = ? WHERE key = ?",
+                (time.time(), validated_at, key),
+            )
+            conn.commit()
+
+    def put(self, key: str, local_path: str, etag: Optional[str]) -> None:
+        """Record a local copy, e.g. the file that was just uploaded."""
+        now = time.time()
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO files "
+                "(key, local_path, etag, size, validated_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, local_path, etag, os.path.getsize(local_path), now, now),
+            )
+            conn.commit()
+            self._evict(conn, keep=key)
+
+    def _evict(self, conn: sqlite3.Connection, keep: str) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM files").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+
+        evicted = []
+        for key, local_path, size in conn.execute(
+            "SELECT key, local_path, size FROM files WHERE key != ? ORDER BY last_used",
+            (keep,),
+        ).fetchall():
+            if total <= self.max_size_bytes:
+                break
+            try:
+                if os.path.isfile(local_path):
+                    os.remove(local_path)
+            except OSError as e:
+                log.warning(f"Failed to evict cached file {local_path}: {e}")
+                continue
+            evicted.append((key,))
+            total -= size
+
+        conn.executemany("DELETE FROM files WHERE key = ?", evicted)
+        conn.commit()
+        log.debug(f"Evicted {len(evicted)} files from the storage cache")
+
+    def remove(self, key: str) -> None:
+        with self.connect() as conn:
+            conn.execute("DELETE FROM files WHERE key = ?", (key,))
+            conn.commit()
+
+    def clear(self) -> None:
+        with self.connect() as conn:
+            conn.execute("DELETE FROM files")
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self.connect() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "size_bytes": size,
+            "max_size_bytes": self.max_size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+STORAGE_FILE_CACHE = (
+    FileCache(
+        f"{CACHE_DIR}/storage/files.sqlite",
+        max_size_bytes=STORAGE_CACHE_MAX_SIZE_MB * 1024 * 1024,
+        ttl=STORAGE_CACHE_TTL,
+    )
+    if STORAGE_CACHE_MAX_SIZE_MB > 0 and STORAGE_PROVIDER != "local"
+    else None
+)
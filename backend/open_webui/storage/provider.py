@@ -4,7 +4,7 @@ import json
 import logging
 import re
 from abc import ABC, abstractmethod
-from typing import BinaryIO, Tuple, Dict
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
 
 from open_webui.config import (
     S3_ACCESS_KEY_ID,
@@ -25,9 +25,35 @@ from open_webui.config import (
     UPLOAD_DIR,
 )
 from open_webui.constants import ERROR_MESSAGES
+from open_webui.storage.cache import STORAGE_FILE_CACHE
 
 log = logging.getLogger(__name__)
 
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+def _iter_reader(
+    reader: BinaryIO, start: int = 0, end: Optional[int] = None
+) -> Iterator[bytes]:
+    """Yield bytes start..end (inclusive) of a seekable file object, then close it."""
+    try:
+        reader.seek(start)
+        remaining = None if end is None else end - start + 1
+        while remaining is None or remaining > 0:
+            size = (
+                STREAM_CHUNK_SIZE
+                if remaining is None
+                else min(STREAM_CHUNK_SIZE, remaining)
+            )
+            chunk = reader.read(size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+    finally:
+        reader.close()
+
 
 class StorageProvider(ABC):
     @abstractmethod
@@ -37,7 +63,8 @@ class StorageProvider(ABC):
     @abstractmethod
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str]:
+        """Store the file and return its size in bytes and storage path."""
         pass
 
     @abstractmethod
@@ -48,25 +75,58 @@ class StorageProvider(ABC):
     def delete_file(self, file_path: str) -> None:
         pass
 
+    @abstractmethod
+    def get_file_size(self, file_path: str) -> int:
+        pass
+
+    @abstractmethod
+    def iter_file(
+        self, file_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """
+        Open the stored file and return an iterator over its bytes start..end
+        (inclusive, to the end of the file by default) as they are read.
+        """
+        pass
+
+    def get_cached_file(self, file_path: str) -> Optional[str]:
+        """Return a current local copy of the file if there is one, without downloading."""
+        return None
+
 
 class LocalStorageProvider(StorageProvider):
     @staticmethod
     def upload_file(
         file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
-        contents = file.read()
-        if not contents:
-            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    ) -> Tuple[int, str]:
         file_path = f"{UPLOAD_DIR}/{filename}"
         with open(file_path, "wb") as f:
-            f.write(contents)
-        return contents, file_path
+            shutil.copyfileobj(file, f)
+            size = f.tell()
+        if not size:
+            os.remove(file_path)
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        return size, file_path
 
     @staticmethod
     def get_file(file_path: str) -> str:
         """Handles downloading of the file from local storage."""
         return file_path
 
+    @staticmethod
+    def get_cached_file(file_path: str) -> Optional[str]:
+        return file_path
+
+    @staticmethod
+    def get_file_size(file_path: str) -> int:
+        return os.path.getsize(file_path)
+
+    @staticmethod
+    def iter_file(
+        file_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        return _iter_reader(open(file_path, "rb"), start, end)
+
     @staticmethod
     def delete_file(file_path: str) -> None:
         """Handles deletion of the file from local storage."""
@@ -131,6 +191,7 @@ class S3StorageProvider(StorageProvider):
 
         self.bucket_name = S3_BUCKET_NAME
         self.key_prefix = S3_KEY_PREFIX if S3_KEY_PREFIX else ""
+        self.cache = STORAGE_FILE_CACHE
 
     @staticmethod
     def sanitize_tag_value(s: str) -> str:
@@ -139,9 +200,9 @@ class S3StorageProvider(StorageProvider):
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str]:
         """Handles uploading of the file to S3 storage."""
-        _, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        size, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         s3_key = os.path.join(self.key_prefix, filename)
         try:
             self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
@@ -160,10 +221,10 @@ class S3StorageProvider(StorageProvider):
                     Key=s3_key,
                     Tagging=tagging,
                 )
-            return (
-                open(file_path, "rb").read(),
-                f"s3://{self.bucket_name}/{s3_key}",
-            )
+            s3_file_path = f"s3://{self.bucket_name}/{s3_key}"
+            if self.cache is not None:
+                self.cache.put(s3_file_path, file_path, self._get_etag(s3_key))
+            return size, s3_file_path
         except Exception as e:
             from botocore.exceptions import ClientError
 
@@ -176,6 +237,15 @@ class S3StorageProvider(StorageProvider):
         try:
             s3_key = self._extract_s3_key(file_path)
             local_file_path = self._get_local_file_path(s3_key)
+            if self.cache is not None:
+                return self.cache.get_file(
+                    file_path,
+                    local_file_path,
+                    get_etag=lambda: self._get_etag(s3_key),
+                    download=lambda path: self.s3_client.download_file(
+                        self.bucket_name, s3_key, path
+                    ),
+                )
             self.s3_client.download_file(self.bucket_name, s3_key, local_file_path)
             return local_file_path
         except Exception as e:
@@ -185,6 +255,55 @@ class S3StorageProvider(StorageProvider):
                 raise RuntimeError(f"Error downloading file from S3: {e}")
             raise
 
+    def get_cached_file(self, file_path: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        s3_key = self._extract_s3_key(file_path)
+        return self.cache.get_cached_file(
+            file_path,
+            self._get_local_file_path(s3_key),
+            get_etag=lambda: self._get_etag(s3_key),
+        )
+
+    def get_file_size(self, file_path: str) -> int:
+        try:
+            s3_key = self._extract_s3_key(file_path)
+            response = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+            return response["ContentLength"]
+        except Exception as e:
+            from botocore.exceptions import ClientError
+
+            if isinstance(e, ClientError):
+                raise RuntimeError(f"Error reading file from S3: {e}")
+            raise
+
+    def iter_file(
+        self, file_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Streams the file from S3 storage, fetching only the requested range."""
+        try:
+            s3_key = self._extract_s3_key(file_path)
+            kwargs = {}
+            if start or end is not None:
+                kwargs["Range"] = f"bytes={start}-{'' if end is None else end}"
+            body = self.s3_client.get_object(
+                Bucket=self.bucket_name, Key=s3_key, **kwargs
+            )["Body"]
+        except Exception as e:
+            from botocore.exceptions import ClientError
+
+            if isinstance(e, ClientError):
+                raise RuntimeError(f"Error downloading file from S3: {e}")
+            raise
+
+        def iter_body():
+            try:
+                yield from body.iter_chunks(STREAM_CHUNK_SIZE)
+            finally:
+                body.close()
+
+        return iter_body()
+
     def delete_file(self, file_path: str) -> None:
         """Handles deletion of the file from S3 storage."""
         try:
@@ -198,6 +317,8 @@ class S3StorageProvider(StorageProvider):
             raise
 
         # Always delete from local storage
+        if self.cache is not None:
+            self.cache.remove(file_path)
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -221,6 +342,8 @@ class S3StorageProvider(StorageProvider):
             raise
 
         # Always delete from local storage
+        if self.cache is not None:
+            self.cache.clear()
         LocalStorageProvider.delete_all_files()
 
     # The s3 key is the name assigned to an object. It excludes the bucket name, but includes the internal path and the file name.
@@ -230,6 +353,9 @@ class S3StorageProvider(StorageProvider):
     def _get_local_file_path(self, s3_key: str) -> str:
         return f"{UPLOAD_DIR}/{s3_key.split('/')[-1]}"
 
+    def _get_etag(self, s3_key: str) -> str:
+        return self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)["ETag"]
+
 
 class GCSStorageProvider(StorageProvider):
     def __init__(self):
@@ -247,16 +373,20 @@ class GCSStorageProvider(StorageProvider):
             # if running on a Compute Engine instance, credentials would be from Google Metadata server
             self.gcs_client = storage.Client()
         self.bucket = self.gcs_client.bucket(GCS_BUCKET_NAME)
+        self.cache = STORAGE_FILE_CACHE
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str]:
         """Handles uploading of the file to GCS storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        size, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         try:
             blob = self.bucket.blob(filename)
             blob.upload_from_filename(file_path)
-            return contents, "gs://" + self.bucket_name + "/" + filename
+            gcs_file_path = "gs://" + self.bucket_name + "/" + filename
+            if self.cache is not None and blob.generation is not None:
+                self.cache.put(gcs_file_path, file_path, str(blob.generation))
+            return size, gcs_file_path
         except Exception as e:
             from google.cloud.exceptions import GoogleCloudError
 
@@ -269,6 +399,15 @@ class GCSStorageProvider(StorageProvider):
         try:
             filename = file_path.removeprefix("gs://").split("/")[1]
             local_file_path = f"{UPLOAD_DIR}/{filename}"
+            if self.cache is not None:
+                return self.cache.get_file(
+                    file_path,
+                    local_file_path,
+                    get_etag=lambda: self._get_generation(filename),
+                    download=lambda path: self.bucket.blob(
+                        filename
+                    ).download_to_filename(path),
+                )
             blob = self.bucket.get_blob(filename)
             blob.download_to_filename(local_file_path)
 
@@ -280,6 +419,32 @@ class GCSStorageProvider(StorageProvider):
                 raise RuntimeError(f"Error downloading file from GCS: {e}")
             raise
 
+    def get_cached_file(self, file_path: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        filename = file_path.removeprefix("gs://").split("/")[1]
+        return self.cache.get_cached_file(
+            file_path,
+            f"{UPLOAD_DIR}/{filename}",
+            get_etag=lambda: self._get_generation(filename),
+        )
+
+    def get_file_size(self, file_path: str) -> int:
+        filename = file_path.removeprefix("gs://").split("/")[1]
+        blob = self.bucket.get_blob(filename)
+        if blob is None:
+            raise RuntimeError(f"Error reading file from GCS: {filename} not found")
+        return blob.size
+
+    def iter_file(
+        self, file_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Streams the file from GCS storage, fetching only the requested range."""
+        filename = file_path.removeprefix("gs://").split("/")[1]
+        # The reader fetches ranges of chunk_size on demand (40 MiB by default)
+        reader = self.bucket.blob(filename).open("rb", chunk_size=8 * STREAM_CHUNK_SIZE)
+        return _iter_reader(reader, start, end)
+
     def delete_file(self, file_path: str) -> None:
         """Handles deletion of the file from GCS storage."""
         try:
@@ -294,6 +459,8 @@ class GCSStorageProvider(StorageProvider):
             raise
 
         # Always delete from local storage
+        if self.cache is not None:
+            self.cache.remove(file_path)
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -312,8 +479,14 @@ class GCSStorageProvider(StorageProvider):
             raise
 
         # Always delete from local storage
+        if self.cache is not None:
+            self.cache.clear()
         LocalStorageProvider.delete_all_files()
 
+    def _get_generation(self, filename: str) -> Optional[str]:
+        blob = self.bucket.get_blob(filename)
+        return str(blob.generation) if blob is not None else None
+
 
 class AzureStorageProvider(StorageProvider):
     def __init__(self):
@@ -338,16 +511,21 @@ class AzureStorageProvider(StorageProvider):
         self.container_client = self.blob_service_client.get_container_client(
             self.container_name
         )
+        self.cache = STORAGE_FILE_CACHE
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str]:
         """Handles uploading of the file to Azure Blob Storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        size, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         try:
             blob_client = self.container_client.get_blob_client(filename)
-            blob_client.upload_blob(contents, overwrite=True)
-            return contents, f"{self.endpoint}/{self.container_name}/{filename}"
+            with open(file_path, "rb") as f:
+                result = blob_client.upload_blob(f, overwrite=True)
+            azure_file_path = f"{self.endpoint}/{self.container_name}/{filename}"
+            if self.cache is not None:
+                self.cache.put(azure_file_path, file_path, result.get("etag"))
+            return size, azure_file_path
         except Exception as e:
             raise RuntimeError(f"Error uploading file to Azure Blob Storage: {e}")
 
@@ -357,8 +535,19 @@ class AzureStorageProvider(StorageProvider):
             filename = file_path.split("/")[-1]
             local_file_path = f"{UPLOAD_DIR}/{filename}"
             blob_client = self.container_client.get_blob_client(filename)
-            with open(local_file_path, "wb") as download_file:
-                download_file.write(blob_client.download_blob().readall())
+
+            def download(path: str) -> None:
+                with open(path, "wb") as download_file:
+                    blob_client.download_blob().readinto(download_file)
+
+            if self.cache is not None:
+                return self.cache.get_file(
+                    file_path,
+                    local_file_path,
+                    get_etag=lambda: blob_client.get_blob_properties().etag,
+                    download=download,
+                )
+            download(local_file_path)
             return local_file_path
         except Exception as e:
             from azure.core.exceptions import ResourceNotFoundError
@@ -369,6 +558,49 @@ class AzureStorageProvider(StorageProvider):
                 )
             raise
 
+    def get_cached_file(self, file_path: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        filename = file_path.split("/")[-1]
+        blob_client = self.container_client.get_blob_client(filename)
+        return self.cache.get_cached_file(
+            file_path,
+            f"{UPLOAD_DIR}/{filename}",
+            get_etag=lambda: blob_client.get_blob_properties().etag,
+        )
+
+    def get_file_size(self, file_path: str) -> int:
+        try:
+            filename = file_path.split("/")[-1]
+            blob_client = self.container_client.get_blob_client(filename)
+            return blob_client.get_blob_properties().size
+        except Exception as e:
+            from azure.core.exceptions import ResourceNotFoundError
+
+            if isinstance(e, ResourceNotFoundError):
+                raise RuntimeError(f"Error reading file from Azure Blob Storage: {e}")
+            raise
+
+    def iter_file(
+        self, file_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Streams the file from Azure Blob Storage, fetching only the requested range."""
+        try:
+            filename = file_path.split("/")[-1]
+            blob_client = self.container_client.get_blob_client(filename)
+            downloader = blob_client.download_blob(
+                offset=start, length=None if end is None else end - start + 1
+            )
+            return downloader.chunks()
+        except Exception as e:
+            from azure.core.exceptions import ResourceNotFoundError
+
+            if isinstance(e, ResourceNotFoundError):
+                raise RuntimeError(
+                    f"Error downloading file from Azure Blob Storage: {e}"
+                )
+            raise
+
     def delete_file(self, file_path: str) -> None:
         """Handles deletion of the file from Azure Blob Storage."""
         try:
@@ -383,6 +615,8 @@ class AzureStorageProvider(StorageProvider):
             raise
 
         # Always delete from local storage
+        if self.cache is not None:
+            self.cache.remove(file_path)
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -395,6 +629,8 @@ class AzureStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from Azure Blob Storage: {e}")
 
         # Always delete from local storage
+        if self.cache is not None:
+            self.cache.clear()
         LocalStorageProvider.delete_all_files()
 
 
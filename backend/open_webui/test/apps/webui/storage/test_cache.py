@@ -0,0 +1,103 @@
+import threading
+
+from open_webui.storage.cache import FileCache
+
+
+class FakeObjectStore:
+    def __init__(self, content=b"v1", etag="e1"):
+        self.content = content
+        self.etag = etag
+        self.downloads = 0
+        self.head_requests = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def get_etag(self):
+        self.head_requests += 1
+        return self.etag
+
+    def download(self, path):
+        self.gate.wait()
+        self.downloads += 1
+        with open(path, "wb") as f:
+            f.write(self.content)
+
+
+def get_file(cache, store, tmp_path, name="a.txt"):
+    return cache.get_file(
+        f"s3://bucket/{name}",
+        str(tmp_path / name),
+        get_etag=store.get_etag,
+        download=store.download,
+    )
+
+
+class TestFileCache:
+    def test_cached_copy_is_revalidated_by_etag(self, tmp_path):
+        cache = FileCache(tmp_path / "files.sqlite", max_size_bytes=1 << 20, ttl=0)
+        store = FakeObjectStore()
+
+        path = get_file(cache, store, tmp_path)
+        get_file(cache, store, tmp_path)
+        assert store.downloads == 1
+        assert open(path, "rb").read() == b"v1"
+
+        store.content, store.etag = b"v2", "e2"
+        get_file(cache, store, tmp_path)
+        assert store.downloads == 2
+        assert open(path, "rb").read() == b"v2"
+
+    def test_fresh_copy_skips_the_object_store(self, tmp_path):
+        cache = FileCache(tmp_path / "files.sqlite", max_size_bytes=1 << 20, ttl=60)
+        store = FakeObjectStore()
+
+        get_file(cache, store, tmp_path)
+        requests = store.head_requests
+        get_file(cache, store, tmp_path)
+        assert store.head_requests == requests
+        assert store.downloads == 1
+
+    def test_concurrent_requests_share_one_download(self, tmp_path):
+        cache = FileCache(tmp_path / "files.sqlite", max_size_bytes=1 << 20, ttl=60)
+        store = FakeObjectStore()
+        store.gate.clear()
+
+        threads = [
+            threading.Thread(target=get_file, args=(cache, store, tmp_path))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        store.gate.set()
+        for thread in threads:
+            thread.join()
+
+        assert store.downloads == 1
+
+    def test_running_download_is_visible(self, tmp_path):
+        cache = FileCache(tmp_path / "files.sqlite", max_size_bytes=1 << 20, ttl=60)
+        store = FakeObjectStore()
+        store.gate.clear()
+
+        thread = threading.Thread(target=get_file, args=(cache, store, tmp_path))
+        thread.start()
+        while store.head_requests == 0:
+            pass
+        assert cache.is_downloading("s3://bucket/a.txt")
+        assert not cache.is_downloading("s3://bucket/b.txt")
+
+        store.gate.set()
+        thread.join()
+        assert not cache.is_downloading("s3://bucket/a.txt")
+
+    def test_least_recently_used_files_are_evicted(self, tmp_path):
+        cache = FileCache(tmp_path / "files.sqlite", max_size_bytes=5, ttl=60)
+        store = FakeObjectStore(content=b"abc")
+
+        first = get_file(cache, store, tmp_path, "a.txt")
+        second = get_file(cache, store, tmp_path, "b.txt")
+
+        assert not (tmp_path / "a.txt").exists()
+        assert (tmp_path / "b.txt").exists()
+        assert cache.stats()["entries"] == 1
+        assert first != second
@@ -0,0 +1,23 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import open_webui.internal.db
+
+
+@pytest.fixture
+def make_session(monkeypatch):
+    """
+    Return a factory for sessions on a private in-memory database holding the
+    tables of the given models, so table methods can run against it.
+    """
+    monkeypatch.setattr(open_webui.internal.db, "DATABASE_ENABLE_SESSION_SHARING", True)
+
+    def make(*models):
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        for model in models:
+            model.__table__.create(engine)
+        return sessionmaker(bind=engine)()
+
+    return make
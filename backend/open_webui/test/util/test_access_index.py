@@ -0,0 +1,90 @@
+import contextlib
+
+from open_webui.utils import access_index
+from open_webui.utils.access_control import has_access
+from open_webui.utils.access_index import AccessIndex, AccessSnapshot
+
+
+ROWS = [
+    ("public", "owner", None),
+    ("private", "owner", {}),
+    (
+        "shared",
+        "owner",
+        {
+            "read": {"group_ids": ["g1"], "user_ids": ["alice"]},
+            "write": {"group_ids": [], "user_ids": ["bob"]},
+        },
+    ),
+    ("bobs", "bob", {"read": {"group_ids": [], "user_ids": []}}),
+]
+
+
+class TestAccessSnapshot:
+    """Test the inverted access snapshot against has_access"""
+
+    def test_matches_has_access(self):
+        """Test that snapshot lookups agree with per-row has_access checks"""
+        snapshot = AccessSnapshot(ROWS)
+
+        for user_id, group_ids in [
+            ("alice", set()),
+            ("bob", set()),
+            ("carol", {"g1"}),
+            ("owner", set()),
+            ("dave", {"g2"}),
+        ]:
+            for permission in ("read", "write"):
+                expected = {
+                    resource_id
+                    for resource_id, owner_id, access_control in ROWS
+                    if owner_id == user_id
+                    or has_access(user_id, permission, access_control, group_ids)
+                }
+                assert (
+                    snapshot.get_accessible_ids(user_id, group_ids, permission)
+                    == expected
+                )
+
+    def test_ids(self):
+        """Test that every resource id is recorded"""
+        snapshot = AccessSnapshot(ROWS)
+        assert snapshot.ids == {"public", "private", "shared", "bobs"}
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return self.values[key]
+
+
+class TestAccessIndex:
+    """Test invalidation of the per-worker access index"""
+
+    def test_writes_invalidate_other_workers(self, monkeypatch):
+        """Test that a revocation is seen by another worker before the TTL"""
+        monkeypatch.setattr(
+            access_index, "get_db_context", lambda db=None: contextlib.nullcontext(db)
+        )
+        rows = list(ROWS)
+        redis = FakeRedis()
+        workers = [AccessIndex(ttl=3600, redis=redis) for _ in range(2)]
+        for worker in workers:
+            worker.register("model", lambda db: list(rows))
+
+        assert "shared" in workers[1].get_accessible_ids(
+            "model", "alice", user_group_ids=[]
+        )
+
+        rows[2] = ("shared", "owner", {})
+        workers[0].invalidate_resource("model")
+
+        assert "shared" not in workers[1].get_accessible_ids(
+            "model", "alice", user_group_ids=[]
+        )
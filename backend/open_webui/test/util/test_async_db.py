@@ -0,0 +1,117 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from open_webui.models import moderation
+from open_webui.models.child_profiles import ChildProfile
+from open_webui.models.exit_quiz import ExitQuizResponse
+from open_webui.models.moderation import ModerationSession
+from open_webui.models.scenarios import ScenarioAssignment
+from open_webui.models.users import User
+from open_webui.models.workflow_draft import WorkflowDraft
+from open_webui.routers import workflow
+
+TABLES = (
+    User,
+    ChildProfile,
+    ModerationSession,
+    ScenarioAssignment,
+    WorkflowDraft,
+    ExitQuizResponse,
+)
+
+
+def add_rows(db):
+    now = time.time_ns()
+    db.add(ChildProfile(id="c", user_id="u", name="Sam", created_at=0, updated_at=0))
+    for idx, decision in enumerate(["accept_original", "moderate", None]):
+        db.add(
+            ModerationSession(
+                id=f"s{idx}",
+                user_id="u",
+                child_id="c",
+                scenario_index=idx,
+                attempt_number=2,
+                scenario_prompt="",
+                original_response="",
+                initial_decision=decision,
+                created_at=now,
+                updated_at=now,
+            )
+        )
+    for idx in range(4):
+        db.add(
+            ScenarioAssignment(
+                assignment_id=f"a{idx}",
+                participant_id="u",
+                scenario_id=f"scenario{idx}",
+                child_profile_id="c",
+                attempt_number=2,
+                status="assigned",
+                assigned_at=now,
+            )
+        )
+    db.add(
+        WorkflowDraft(
+            id="d",
+            user_id="u",
+            child_id="c",
+            draft_type="moderation",
+            data={"moderation_finalized": True},
+            updated_at=now,
+        )
+    )
+    db.commit()
+
+
+class TestAsyncDB:
+    """Test the async engine path of the hot research endpoints"""
+
+    def test_workflow_progress_on_the_async_engine(self, monkeypatch, tmp_path):
+        """Test that /workflow/state progress is read through aiosqlite"""
+        path = tmp_path / "webui.db"
+        engine = create_engine(f"sqlite:///{path}")
+        for table in TABLES:
+            table.__table__.create(engine)
+        add_rows(sessionmaker(bind=engine)())
+
+        async def run():
+            async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+            AsyncSessionLocal = async_sessionmaker(
+                bind=async_engine, expire_on_commit=False
+            )
+            sessions = []
+
+            @asynccontextmanager
+            async def get_async_db():
+                async with AsyncSessionLocal() as db:
+                    sessions.append(db)
+                    yield db
+
+            monkeypatch.setattr(workflow, "get_async_db", get_async_db)
+            monkeypatch.setattr(moderation, "get_async_db", get_async_db)
+            monkeypatch.setattr(moderation, "ASYNC_DB_ENABLED", True)
+            try:
+                user = SimpleNamespace(
+                    id="u", instructions_completed_at=1, workflow_reset_at=None
+                )
+                return await workflow._load_progress_async(user, None), sessions
+            finally:
+                await async_engine.dispose()
+
+        progress, sessions = asyncio.run(run())
+        assert progress == {
+            "instructions_completed": True,
+            "has_child_profile": True,
+            "moderation_completed_count": 2,
+            "moderation_total": 4,
+            "moderation_finalized": True,
+            "exit_survey_completed": False,
+        }
+        # One session for the reads, one of get_sessions_by_user_async
+        assert len(sessions) == 2
@@ -0,0 +1,148 @@
+import pytest
+
+from open_webui.retrieval.bm25_index import (
+    BM25IndexedVectorDB,
+    BM25IndexStore,
+    InMemoryBM25Index,
+)
+from open_webui.retrieval.vector.main import GetResult
+from open_webui.retrieval.versions import CollectionVersions
+
+
+class FakeVectorDB:
+    def __init__(self):
+        self.collections = {}
+
+    def has_collection(self, collection_name):
+        return collection_name in self.collections
+
+    def insert(self, collection_name, items):
+        self.collections.setdefault(collection_name, {}).update(
+            {item["id"]: item for item in items}
+        )
+
+    upsert = insert
+
+    def delete(self, collection_name, ids=None, filter=None):
+        for doc_id in ids or []:
+            self.collections[collection_name].pop(doc_id, None)
+
+    def delete_collection(self, collection_name):
+        self.collections.pop(collection_name, None)
+
+
+def make_items(*rows):
+    return [
+        {"id": doc_id, "text": text, "vector": [0.0], "metadata": metadata}
+        for doc_id, text, metadata in rows
+    ]
+
+
+class TestBM25Index:
+    """Test the persistent BM25 index and its vector client mirror"""
+
+    def test_build_and_search(self, tmp_path):
+        """Test ranking, enriched metadata terms and incremental updates"""
+        store = BM25IndexStore(tmp_path, CollectionVersions(tmp_path / "versions.db"))
+        index = store.build(
+            "docs",
+            GetResult(
+                ids=[["a", "b", "c"]],
+                documents=[
+                    [
+                        "The quick brown fox jumps",
+                        "A lazy dog sleeps all day",
+                        "Foxes and dogs are not friends",
+                    ]
+                ],
+                metadatas=[[{"name": "animals.txt"}, {"name": "dog_report.pdf"}, {}]],
+            ),
+            store.versions.get("docs"),
+        )
+
+        assert index.count() == 3
+        assert [hit["id"] for hit in index.search("quick fox", 2)] == ["a"]
+        assert index.search("report", 3) == []
+        hits = index.search("report", 3, enriched=True)
+        assert [hit["id"] for hit in hits] == ["b"]
+        assert hits[0]["metadata"] == {"name": "dog_report.pdf"}
+
+        index.add(make_items(("a", "Nothing to see here", {})))
+        assert index.count() == 3
+        assert index.search("fox", 3) == []
+
+        assert index.delete(filter={"name": "dog_report.pdf"})
+        assert index.count() == 2
+        assert not index.delete(filter={"name": {"$in": ["x"]}})
+
+    def test_in_memory_search_matches_the_index(self, tmp_path):
+        """Test that collections without an index are ranked the same way"""
+        store = BM25IndexStore(tmp_path, CollectionVersions(tmp_path / "versions.db"))
+        result = GetResult(
+            ids=[["a", "b", "c", "d"]],
+            documents=[
+                [
+                    "The Quick brown fox, the fox!",
+                    "A lazy dog sleeps all day",
+                    "Foxes and dogs are not friends",
+                    "the the the",
+                ]
+            ],
+            metadatas=[
+                [{"name": "fox_report.pdf"}, {"title": "Dogs"}, {}, {"source": "x"}]
+            ],
+        )
+        index = store.build("docs", result, store.versions.get("docs"))
+        in_memory = InMemoryBM25Index(result)
+
+        for query in ("the fox", "FOX report", "dogs day", "the", "missing"):
+            for enriched in (False, True):
+                expected = index.search(query, 3, enriched=enriched)
+                hits = in_memory.search(query, 3, enriched=enriched)
+                assert [(h["id"], h["metadata"]) for h in hits] == [
+                    (h["id"], h["metadata"]) for h in expected
+                ]
+                assert [h["score"] for h in hits] == pytest.approx(
+                    [h["score"] for h in expected]
+                )
+
+    def test_indexed_client_mirrors_writes(self, tmp_path):
+        """Test that only new collections are indexed and that writes are mirrored"""
+        client = FakeVectorDB()
+        client.insert("legacy", make_items(("x", "old content", {})))
+        store = BM25IndexStore(tmp_path, CollectionVersions(tmp_path / "versions.db"))
+        wrapped = BM25IndexedVectorDB(client, store)
+
+        wrapped.insert("legacy", make_items(("y", "more content", {})))
+        assert store.get("legacy") is None
+
+        wrapped.insert("fresh", make_items(("1", "alpha beta", {}), ("2", "gamma", {})))
+        assert store.get("fresh").count() == 2
+        wrapped.delete("fresh", ids=["1"])
+        assert store.get("fresh").count() == 1
+        assert wrapped.collections is client.collections
+
+        wrapped.delete_collection("fresh")
+        assert store.get("fresh") is None
+        assert "fresh" not in client.collections
+
+    def test_writes_from_other_hosts_outdate_the_index(self, tmp_path):
+        """Test that an index is not served once another host wrote to its collection"""
+        client = FakeVectorDB()
+        versions = CollectionVersions(tmp_path / "versions.db")
+        hosts = [BM25IndexStore(tmp_path / f"host{idx}", versions) for idx in range(2)]
+        wrapped = [BM25IndexedVectorDB(client, store) for store in hosts]
+
+        wrapped[0].insert("docs", make_items(("1", "alpha", {})))
+        assert hosts[0].get("docs").count() == 1
+
+        result = GetResult(ids=[["1"]], documents=[["alpha"]], metadatas=[[{}]])
+        hosts[1].build("docs", result, versions.get("docs"))
+        wrapped[1].insert("docs", make_items(("2", "beta", {})))
+        assert hosts[1].get("docs").count() == 2
+
+        # Host 0 missed the second write
+        assert hosts[0].get("docs") is None
+        wrapped[0].delete("docs", ids=["1"])
+        assert hosts[0].get("docs") is None
+        assert hosts[1].get("docs") is None
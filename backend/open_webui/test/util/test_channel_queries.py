@@ -0,0 +1,141 @@
+import time
+
+from sqlalchemy import event
+
+from open_webui.models.channels import ChannelMember, ChannelWebhook
+from open_webui.models.messages import Message, MessageReaction, Messages
+from open_webui.models.users import User
+
+
+def collect_statements(db):
+    statements = []
+    event.listen(
+        db.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    return statements
+
+
+def add_channel(db, channel_id, num_messages):
+    now = time.time_ns()
+    for user_id in ("alice", "bob"):
+        if db.get(User, user_id) is None:
+            db.add(
+                User(
+                    id=user_id,
+                    name=user_id,
+                    email=f"{user_id}@example.com",
+                    profile_image_url="",
+                    role="user",
+                    last_active_at=int(time.time()),
+                    created_at=0,
+                    updated_at=0,
+                )
+            )
+        db.add(
+            ChannelMember(
+                id=f"{channel_id}-{user_id}",
+                channel_id=channel_id,
+                user_id=user_id,
+                last_read_at=now if user_id == "alice" else None,
+            )
+        )
+    db.add(
+        ChannelWebhook(
+            id=f"{channel_id}-hook",
+            channel_id=channel_id,
+            user_id="alice",
+            name="CI",
+            token="t",
+            created_at=0,
+            updated_at=0,
+        )
+    )
+
+    for idx in range(num_messages):
+        id = f"{channel_id}-{idx}"
+        message = {"channel_id": channel_id, "content": "", "updated_at": 0}
+        db.add(
+            Message(
+                id=id,
+                user_id="bob",
+                reply_to_id=f"{channel_id}-{idx - 1}" if idx else None,
+                meta={"webhook": {"id": f"{channel_id}-hook"}} if idx % 2 else None,
+                created_at=now + idx + 1,
+                **message,
+            )
+        )
+        db.add(
+            Message(
+                id=f"{id}-reply",
+                user_id="alice",
+                parent_id=id,
+                created_at=now + idx + 1,
+                **message,
+            )
+        )
+        db.add(
+            MessageReaction(
+                id=f"{id}-reaction", user_id="alice", message_id=id, name="+1"
+            )
+        )
+    db.commit()
+
+
+def load_page(db, channel_id):
+    messages = Messages.get_messages_by_channel_id(channel_id, db=db)
+    ids = [message.id for message in messages]
+    return (
+        messages,
+        Messages.get_thread_reply_stats_by_message_ids(ids, db=db),
+        Messages.get_reactions_by_message_ids(ids, db=db),
+    )
+
+
+class TestChannelQueries:
+    """Test that channel pages are loaded in a constant number of queries"""
+
+    def test_message_page_query_count(self, make_session):
+        """Test that the queries of a message page don't grow with its size"""
+        db = make_session(Message, MessageReaction, ChannelMember, ChannelWebhook, User)
+        statements = collect_statements(db)
+        add_channel(db, "small", 2)
+        add_channel(db, "large", 10)
+
+        counts = {}
+        for channel_id in ("small", "large"):
+            statements.clear()
+            messages, thread_stats, reactions = load_page(db, channel_id)
+            counts[channel_id] = len(statements)
+
+        assert counts["small"] == counts["large"]
+
+        by_id = {message.id: message for message in messages}
+        assert len(by_id) == 10
+        assert by_id["large-1"].user.name == "CI"
+        assert by_id["large-1"].reply_to_message.user.name == "bob"
+        assert by_id["large-2"].reply_to_message.user.name == "CI"
+        assert thread_stats["large-3"]["reply_count"] == 1
+        assert reactions["large-3"][0].count == 1
+
+    def test_channel_aggregates(self, make_session):
+        """Test last message and unread counts of many channels at once"""
+        db = make_session(Message, MessageReaction, ChannelMember, ChannelWebhook, User)
+        add_channel(db, "b", 1)
+        add_channel(db, "a", 3)
+
+        last_message_at = Messages.get_last_message_at_by_channel_ids(
+            ["a", "b", "empty"], db=db
+        )
+        assert last_message_at["a"] > last_message_at["b"]
+        assert "empty" not in last_message_at
+
+        assert Messages.get_unread_message_counts_by_channel_ids(
+            ["a", "b"], "alice", db=db
+        ) == {"a": 3, "b": 1}
+        # Thread replies and the user's own messages are not unread
+        assert (
+            Messages.get_unread_message_counts_by_channel_ids(["a", "b"], "bob", db=db)
+            == {}
+        )
@@ -0,0 +1,148 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from open_webui.routers import utils as utils_router
+from open_webui.utils import code_interpreter
+from open_webui.utils.code_interpreter import (
+    CODE_WORKER_PATH,
+    CodeWorkerPool,
+    get_local_engine_error,
+    get_sandbox_command,
+)
+
+
+def run(pool, coroutine):
+    async def main():
+        try:
+            return await coroutine()
+        finally:
+            await pool.close()
+
+    return asyncio.run(main())
+
+
+class TestCodeWorkerPool:
+    """Test the pre-warmed workers of the local code interpreter"""
+
+    def test_workers_are_reset_between_executions(self):
+        """Test that a reused worker keeps no state of the previous execution"""
+        pool = CodeWorkerPool(size=1, timeout=5, sandbox="none")
+
+        async def executions():
+            first = await pool.execute(
+                "import builtins, os\n"
+                "x = 1\n"
+                "builtins.print = None\n"
+                "os.environ['SECRET'] = 'value'\n"
+                "open('file.txt', 'w').close()\n"
+                "print is None\n"
+            )
+            second = await pool.execute(
+                "import os\n"
+                "print('x' in globals(), os.environ.get('SECRET'), os.listdir('.'))\n"
+                "6 * 7"
+            )
+            blocked = await pool.execute("import json", blocked_modules=["json"])
+            timed_out = await pool.execute("while True: pass", timeout=1)
+            after_timeout = await pool.execute("'still working'")
+            return first, second, blocked, timed_out, after_timeout
+
+        first, second, blocked, timed_out, after_timeout = run(pool, executions)
+        assert first["result"] == "True"
+        assert second == {"stdout": "False None []", "stderr": "", "result": "42"}
+        assert "Direct import of module json is restricted." in blocked["stderr"]
+        assert timed_out["stderr"] == "Execution timed out."
+        assert after_timeout["result"] == "'still working'"
+
+    def test_users_take_turns(self):
+        """Test that a user's queued executions don't hold back other users"""
+        pool = CodeWorkerPool(size=1, timeout=5, max_queued_per_user=3, sandbox="none")
+        order = []
+
+        async def execute(user_id, idx):
+            await pool.execute("pass", user_id=user_id)
+            order.append(f"{user_id}{idx}")
+
+        async def executions():
+            # Queued while the worker is still starting
+            await asyncio.gather(
+                *[execute("a", idx) for idx in range(3)], execute("b", 0)
+            )
+            # One runs right away, three wait and the fifth is turned away
+            return await asyncio.gather(
+                *[pool.execute("pass", user_id="c") for _ in range(5)]
+            )
+
+        results = run(pool, executions)
+        assert order == ["a0", "b0", "a1", "a2"]
+        assert [result["stderr"] for result in results[:4]] == [""] * 4
+        assert results[4]["stderr"].startswith("Too many executions")
+
+    def test_workers_are_not_shared_between_users(self):
+        """Test that state outside of what is reset never reaches another user"""
+        pool = CodeWorkerPool(size=1, timeout=5, sandbox="none")
+        leak = "import json\ngetattr(json, 'leak', None)"
+
+        async def executions():
+            await pool.execute("import json\njson.leak = 'a'", user_id="a")
+            same_user = await pool.execute(leak, user_id="a")
+            other_user = await pool.execute(leak, user_id="b")
+            return same_user, other_user
+
+        same_user, other_user = run(pool, executions)
+        assert same_user["result"] == "'a'"
+        assert other_user == {"stdout": "", "stderr": "", "result": ""}
+
+
+class TestLocalEngineSafety:
+    """Test the opt-in, sandbox and access checks of the local engine"""
+
+    def test_engine_is_opt_in(self, monkeypatch):
+        monkeypatch.setattr(
+            code_interpreter, "ENABLE_CODE_INTERPRETER_LOCAL_ENGINE", False
+        )
+        assert "disabled" in get_local_engine_error("none")
+        result = asyncio.run(code_interpreter.execute_code_local("1"))
+        assert "ENABLE_CODE_INTERPRETER_LOCAL_ENGINE" in result["stderr"]
+
+        monkeypatch.setattr(
+            code_interpreter, "ENABLE_CODE_INTERPRETER_LOCAL_ENGINE", True
+        )
+        assert get_local_engine_error("none") == ""
+        monkeypatch.setattr(code_interpreter.shutil, "which", lambda name: None)
+        assert "bubblewrap" in get_local_engine_error("bwrap")
+
+    def test_sandbox_hides_the_server(self, tmp_path):
+        command = get_sandbox_command(str(tmp_path))
+        assert command[0] == "bwrap" and "--unshare-all" in command
+        assert command[-3:] == ["--chdir", str(tmp_path), "--"]
+
+        # DATA_DIR is hidden even when it is inside a mounted installation
+        data_dir = command.index(str(code_interpreter.DATA_DIR))
+        assert command[data_dir - 1] == "--tmpfs"
+        assert all(
+            arg != "--ro-bind-try" for arg in command[data_dir:]
+        ), "mounted over DATA_DIR"
+        assert ["--ro-bind", CODE_WORKER_PATH, CODE_WORKER_PATH] == command[
+            data_dir + 1 : data_dir + 4
+        ]
+
+    def test_execute_route_is_admin_only(self):
+        request = SimpleNamespace(
+            app=SimpleNamespace(
+                state=SimpleNamespace(
+                    config=SimpleNamespace(CODE_EXECUTION_ENGINE="local")
+                )
+            )
+        )
+        user = SimpleNamespace(id="u", role="user")
+        with pytest.raises(HTTPException) as e:
+            asyncio.run(
+                utils_router.execute_code(
+                    request, utils_router.CodeForm(code="1"), user=user
+                )
+            )
+        assert e.value.status_code == 403
@@ -0,0 +1,68 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from open_webui.internal.db_metrics import DBMetrics, Histogram, PoolTuner
+
+
+def make_engine():
+    return create_engine("sqlite://", poolclass=QueuePool, pool_size=2, max_overflow=1)
+
+
+class TestDBMetrics:
+    """Test query attribution, N+1 detection and pool tuning"""
+
+    def test_request_attribution(self):
+        """Test that queries run inside a request are counted for its endpoint"""
+        metrics = DBMetrics(slow_query_ms=10_000, n_plus_one_threshold=3)
+        engine = make_engine()
+        metrics.instrument(engine, "test")
+
+        token = metrics.start_request()
+        with engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        metrics.finish_request(token, "GET /items")
+
+        snapshot = metrics.snapshot()
+        endpoint = snapshot["endpoints"]["GET /items"]
+        assert endpoint["requests"] == 1
+        assert endpoint["queries"] == 4
+        assert endpoint["n_plus_one"] == 1
+        assert snapshot["n_plus_one"][0]["statement"] == "SELECT 1"
+        assert snapshot["pools"]["test"]["wait"]["count"] == 1
+
+        # Queries outside a request are not attributed to any endpoint
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert metrics.snapshot()["endpoints"]["GET /items"]["queries"] == 4
+
+    def test_histogram_quantile(self):
+        """Test bucketed quantiles"""
+        histogram = Histogram((1, 10, 100))
+        for value in (0.5, 5, 5, 50, 500):
+            histogram.observe(value)
+        assert histogram.counts == [1, 2, 1, 1]
+        assert histogram.quantile(0.5) == 10
+        assert histogram.quantile(1.0) == float("inf")
+
+    def test_pool_tuner(self):
+        """Test that the tuner grows overflow under wait and shrinks it when idle"""
+        metrics = DBMetrics()
+        engine = make_engine()
+        metrics.instrument(engine, "test")
+        pool = engine.pool
+
+        tuner = PoolTuner(metrics, "test", target_wait_ms=50, max_overflow=4)
+        for _ in range(10):
+            metrics.record_pool_wait("test", 200)
+        assert tuner.step() == 2
+        assert pool._max_overflow == 2
+
+        # No new checkouts: nothing to learn from
+        assert tuner.step() is None
+
+        for _ in range(10):
+            metrics.record_pool_wait("test", 0.1)
+        assert tuner.step() == 1
+        assert pool._max_overflow == 1
@@ -0,0 +1,88 @@
+import asyncio
+
+from open_webui.retrieval.embedding_cache import (
+    EmbeddingCache,
+    get_cached_embedding_function,
+)
+
+
+class TestEmbeddingCache:
+    """Test the content-hash embedding cache"""
+
+    def test_only_new_chunks_are_embedded(self, tmp_path):
+        """Test that cached chunks skip the embedding engine"""
+        cache = EmbeddingCache(tmp_path / "cache.sqlite", max_size_bytes=1 << 20)
+        calls = []
+
+        async def embed(texts, prefix=None, user=None):
+            calls.append(list(texts))
+            return [[float(len(text)), 0.5] for text in texts]
+
+        cached = get_cached_embedding_function(embed, "openai", "m", cache=cache)
+
+        assert asyncio.run(cached(["a", "bb", "a"])) == [
+            [1.0, 0.5],
+            [2.0, 0.5],
+            [1.0, 0.5],
+        ]
+        assert calls == [["a", "bb"]]
+
+        assert asyncio.run(cached(["bb", "ccc"])) == [[2.0, 0.5], [3.0, 0.5]]
+        assert calls[-1] == ["ccc"]
+
+        # A different model or prefix is a different key
+        other = get_cached_embedding_function(embed, "openai", "m2", cache=cache)
+        asyncio.run(other(["a"]))
+        assert calls[-1] == ["a"]
+
+        stats = cache.stats()
+        assert stats["entries"] == 4
+        assert stats["hits"] == 1
+
+    def test_float16_layout_and_lru_eviction(self, tmp_path):
+        """Test compact storage and least-recently-used eviction"""
+        # Each 4-dim float16 vector takes 8 bytes
+        cache = EmbeddingCache(
+            tmp_path / "cache.sqlite", max_size_bytes=24, dtype="float16"
+        )
+        cache.set_many({b"a": [0.5] * 4, b"b": [1.0] * 4, b"c": [2.0] * 4})
+        assert cache.stats()["size_bytes"] == 24
+
+        cache.get_many([b"a"])
+        cache.set_many({b"d": [3.0] * 4})
+
+        assert set(cache.get_many([b"a", b"b", b"c", b"d"])) == {b"a", b"d"}
+        assert cache.get_many([b"a"])[b"a"] == [0.5] * 4
+        assert cache.stats()["evictions"] == 2
+
+    def test_tracked_size_follows_writes(self, tmp_path):
+        """Test that the stored size stays exact across replaces and evictions"""
+        cache = EmbeddingCache(
+            tmp_path / "cache.sqlite", max_size_bytes=64, dtype="float32"
+        )
+        cache.set_many({b"a": [0.5] * 4, b"b": [1.0] * 4})
+        cache.set_many({b"a": [0.5] * 2})
+        cache.set_many({str(idx).encode(): [1.0] * 4 for idx in range(4)})
+
+        with cache.connect() as conn:
+            actual = conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()[0]
+        assert cache.stats()["size_bytes"] == actual
+        assert actual <= 64
+
+    def test_endpoint_is_part_of_the_key(self, tmp_path):
+        """Test that the same model name behind another base URL is not reused"""
+        cache = EmbeddingCache(tmp_path / "cache.sqlite", max_size_bytes=1 << 20)
+        calls = []
+
+        async def embed(texts, prefix=None, user=None):
+            calls.append(list(texts))
+            return [[1.0] for _ in texts]
+
+        for url in ("http://a/v1", "http://b/v1", "http://a/v1"):
+            cached = get_cached_embedding_function(
+                embed, "openai", "m", url=url, cache=cache
+            )
+            asyncio.run(cached(["text"]))
+        assert len(calls) == 2
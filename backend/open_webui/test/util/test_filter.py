@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+
+from pydantic import BaseModel
+
+from open_webui.utils import filter as filter_utils
+
+
+class StreamFilter:
+    class Valves(BaseModel):
+        suffix: str = ""
+
+    class UserValves(BaseModel):
+        enabled: bool = True
+
+    def __init__(self):
+        self.valves = self.Valves()
+
+    def stream(self, event: dict, __user__: dict) -> dict:
+        return {**event, "text": event["text"] + self.valves.suffix}
+
+
+class InletFilter:
+    def inlet(self, body: dict) -> dict:
+        return body
+
+
+def make_request(modules):
+    return SimpleNamespace(
+        app=SimpleNamespace(state=SimpleNamespace(FUNCTIONS=modules))
+    )
+
+
+class TestCompiledFilters:
+    """Test resolving the stream filter chain once per response"""
+
+    def test_chain_is_resolved_once(self, monkeypatch):
+        lookups = []
+        monkeypatch.setattr(
+            filter_utils,
+            "Functions",
+            SimpleNamespace(
+                get_function_valves_by_id=lambda id: lookups.append(id)
+                or {"suffix": "!"},
+                get_user_valves_by_id_and_user_id=lambda id, user_id: {},
+            ),
+        )
+        request = make_request({"a": StreamFilter(), "b": InletFilter()})
+        user = {"id": "u"}
+
+        compiled = filter_utils.compile_filter_functions(
+            request,
+            [SimpleNamespace(id="a"), SimpleNamespace(id="b")],
+            "stream",
+            {"__user__": user},
+        )
+
+        # Only the filter with a stream hook is kept
+        assert [compiled_filter.id for compiled_filter in compiled] == ["a"]
+        # User valves are bound per filter, not written into the shared user
+        assert "valves" in compiled[0].params["__user__"] and "valves" not in user
+
+        for idx in range(3):
+            event = asyncio.run(
+                filter_utils.run_filter_functions(
+                    compiled, "stream", {"text": str(idx)}
+                )
+            )
+            assert event == {"text": f"{idx}!"}
+        assert lookups == ["a"]
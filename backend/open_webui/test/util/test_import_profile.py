@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from open_webui.scripts.import_profile import parse_importtime, profile_import
+
+# Budgets for a lazy cold start; override on slower CI machines
+STARTUP_TIME_LIMIT_SECONDS = float(os.environ.get("STARTUP_TIME_LIMIT_SECONDS", "30"))
+STARTUP_RSS_LIMIT_MB = float(os.environ.get("STARTUP_RSS_LIMIT_MB", "1024"))
+
+# Importing open_webui.main runs migrations and loads every router, so the
+# startup budget test only runs when asked for
+RUN_STARTUP_PROFILE = os.environ.get("RUN_STARTUP_PROFILE", "False").lower() == "true"
+
+SAMPLE_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       5000 |     langchain_core.documents
+import time:       300 |       5300 |   open_webui.routers.retrieval
+import time:       100 |        100 |     open_webui.routers.audio.helpers
+import time:       400 |        500 |   open_webui.routers.audio
+"""
+
+
+class TestImportProfile:
+    """Test import-time profiling and lazy startup budgets"""
+
+    def test_parse_importtime(self):
+        """Test aggregation per router and per top-level package"""
+        profile = parse_importtime(SAMPLE_OUTPUT)
+
+        assert profile.total_us == 2920
+        assert profile.routers == {"retrieval": 5300, "audio": 500}
+        assert profile.packages["open_webui"] == 800
+        assert profile.packages["langchain_core"] == 2000
+
+    @pytest.mark.skipif(
+        not RUN_STARTUP_PROFILE, reason="set RUN_STARTUP_PROFILE=true to run"
+    )
+    def test_lazy_startup_budget(self):
+        """Test that a lazy cold start stays within its time and memory budget"""
+        profile = profile_import("open_webui.main", lazy=True)
+
+        assert profile.wall_seconds < STARTUP_TIME_LIMIT_SECONDS
+        assert profile.max_rss_mb < STARTUP_RSS_LIMIT_MB
@@ -0,0 +1,81 @@
+import time
+
+from open_webui.models.ingestion_jobs import IngestionJob, IngestionJobTable
+
+
+class TestIngestionJobs:
+    """Test claiming, fairness and retries of the ingestion queue"""
+
+    def test_fair_claiming(self, make_session):
+        """Test that priorities go first and users take turns within a priority"""
+        db = make_session(IngestionJob)
+        jobs = IngestionJobTable()
+        for idx in range(3):
+            jobs.enqueue(f"bulk-{idx}", "alice", max_attempts=3, db=db)
+        jobs.enqueue("single", "bob", max_attempts=3, db=db)
+        jobs.enqueue("urgent", "carol", max_attempts=3, priority=5, db=db)
+
+        claimed = [jobs.claim_next("w1", db=db).file_id for _ in range(3)]
+        assert claimed[0] == "urgent"
+        assert set(claimed[1:]) == {"bulk-0", "single"}
+
+        job = jobs.claim_next("w1", db=db)
+        assert job.file_id == "bulk-1"
+        assert job.status == "running" and job.attempts == 1
+
+    def test_retry_and_stale_requeue(self, make_session):
+        """Test exponential backoff, final failure and requeue of dead workers"""
+        db = make_session(IngestionJob)
+        jobs = IngestionJobTable()
+        job = jobs.enqueue("f", "alice", max_attempts=2, db=db)
+
+        job = jobs.claim_next("w1", db=db)
+        retried = jobs.fail(job.id, "w1", "boom", retry_delay=30, db=db)
+        assert retried.status == "queued"
+        assert retried.available_at >= int(time.time()) + 29
+        assert jobs.claim_next("w1", db=db) is None
+
+        db.query(IngestionJob).update({"available_at": 0})
+        db.commit()
+        job = jobs.claim_next("w1", db=db)
+        assert job.attempts == 2
+
+        # Worker died mid-job with no attempts left
+        assert jobs.requeue_stale(timeout=-1, db=db) == (0, ["f"])
+        assert jobs.get_job_by_id(job.id, db=db).status == "failed"
+        assert jobs.get_progress_by_file_id("f", db=db).status == "failed"
+
+    def test_heartbeat(self, make_session):
+        """Test that only the worker holding a running job can keep it alive"""
+        db = make_session(IngestionJob)
+        jobs = IngestionJobTable()
+        jobs.enqueue("f", "alice", max_attempts=3, db=db)
+        job = jobs.claim_next("w1", db=db)
+
+        db.query(IngestionJob).update({"locked_at": 0})
+        db.commit()
+        assert jobs.heartbeat(job.id, "w1", db=db)
+        assert jobs.requeue_stale(timeout=60, db=db) == (0, [])
+
+        assert jobs.requeue_stale(timeout=-1, db=db) == (1, [])
+        assert not jobs.heartbeat(job.id, "w1", db=db)
+
+    def test_only_the_lock_holder_finishes_a_job(self, make_session):
+        """Test that a worker cannot complete or fail a job it lost"""
+        db = make_session(IngestionJob)
+        jobs = IngestionJobTable()
+        jobs.enqueue("f", "alice", max_attempts=3, db=db)
+        job = jobs.claim_next("w1", db=db)
+
+        # Requeued as stale and claimed by another worker
+        assert jobs.requeue_stale(timeout=-1, db=db) == (1, [])
+        db.query(IngestionJob).update({"available_at": 0})
+        db.commit()
+        assert jobs.claim_next("w2", db=db).id == job.id
+
+        assert not jobs.complete(job.id, "w1", db=db)
+        assert jobs.fail(job.id, "w1", "boom", retry_delay=30, db=db) is None
+        assert jobs.get_job_by_id(job.id, db=db).status == "running"
+
+        assert jobs.complete(job.id, "w2", db=db)
+        assert jobs.get_job_by_id(job.id, db=db).status == "completed"
@@ -0,0 +1,173 @@
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+
+from open_webui.retrieval.pipeline import run_ingestion_pipeline
+
+
+class TestIngestionPipeline:
+    """Test the streaming split -> embed -> write pipeline"""
+
+    def test_chunks_are_written_in_order_and_batches(self):
+        """Test that every chunk is embedded and written once, in order"""
+        docs = (Document(page_content=f"page {i}") for i in range(5))
+        written = []
+
+        async def embed(chunks):
+            return [[float(len(chunk.page_content))] for chunk in chunks]
+
+        def write(chunks, embeddings):
+            written.append([(c.page_content, e) for c, e in zip(chunks, embeddings)])
+
+        count = asyncio.run(
+            run_ingestion_pipeline(
+                docs,
+                embed=embed,
+                write=write,
+                split=lambda doc: [
+                    Document(page_content=part) for part in doc.page_content.split()
+                ],
+                batch_size=4,
+            )
+        )
+
+        assert count == 10
+        assert [len(batch) for batch in written] == [4, 4, 2]
+        assert [text for batch in written for text, _ in batch][:4] == [
+            "page",
+            "0",
+            "page",
+            "1",
+        ]
+
+    def test_parsing_does_not_run_ahead_of_writes(self):
+        """Test that the bounded queues keep only a few batches in flight"""
+        parsed = 0
+        max_in_flight = 0
+        written = 0
+
+        def docs():
+            nonlocal parsed
+            for i in range(50):
+                parsed += 1
+                yield Document(page_content=str(i))
+
+        async def embed(chunks):
+            return [[0.0] for _ in chunks]
+
+        def write(chunks, embeddings):
+            nonlocal written, max_in_flight
+            max_in_flight = max(max_in_flight, parsed - written)
+            written += len(chunks)
+
+        asyncio.run(
+            run_ingestion_pipeline(
+                docs(), embed=embed, write=write, batch_size=1, queue_size=1
+            )
+        )
+
+        assert written == 50
+        # One batch per queue plus one held by each stage
+        assert max_in_flight <= 6
+
+    def test_stage_failure_is_raised(self):
+        """Test that a failing stage stops the pipeline instead of hanging"""
+        docs = (Document(page_content=str(i)) for i in range(100))
+
+        async def embed(chunks):
+            raise RuntimeError("embedding engine down")
+
+        with pytest.raises(RuntimeError, match="embedding engine down"):
+            asyncio.run(
+                run_ingestion_pipeline(
+                    docs,
+                    embed=embed,
+                    write=lambda chunks, embeddings: None,
+                    batch_size=1,
+                    queue_size=1,
+                )
+            )
+
+    def test_streamed_docs_hash_the_content(self):
+        """Test that streamed pages pass through unchanged and are hashed on the way"""
+        from open_webui.routers.retrieval import StreamedDocs
+        from open_webui.utils.misc import calculate_sha256_string
+
+        pages = ["first page", "second page", ""]
+        docs = StreamedDocs(Document(page_content=page) for page in pages)
+        assert [doc.page_content for doc in docs] == pages
+        assert docs.done
+        assert docs.hash == calculate_sha256_string(" ".join(pages))
+        assert docs.get_text() == " ".join(pages)
+
+    def test_duplicate_stream_is_removed_after_the_write(self, monkeypatch):
+        """Test that a stream found to duplicate a document is not left behind"""
+        pytest.importorskip("tiktoken")
+        pytest.importorskip("langchain_text_splitters")
+        from types import SimpleNamespace
+
+        from open_webui.routers import retrieval
+
+        class Config:
+            def __getattr__(self, name):
+                return ""
+
+        class VectorDB:
+            collections = {"knowledge": [{"id": "old", "metadata": {"hash": "h"}}]}
+
+            def has_collection(self, collection_name):
+                return collection_name in self.collections
+
+            def insert(self, collection_name, items):
+                self.collections.setdefault(collection_name, []).extend(items)
+
+            def query(self, collection_name, filter):
+                ids = [
+                    item["id"]
+                    for item in self.collections.get(collection_name, [])
+                    if all(item["metadata"].get(k) == v for k, v in filter.items())
+                ]
+                return SimpleNamespace(ids=[ids])
+
+            def delete(self, collection_name, ids):
+                self.collections[collection_name] = [
+                    item
+                    for item in self.collections[collection_name]
+                    if item["id"] not in ids
+                ]
+
+            def delete_collection(self, collection_name):
+                del self.collections[collection_name]
+
+        async def embedding_function(texts, prefix=None, user=None):
+            return [[0.0] for _ in texts]
+
+        vector_db = VectorDB()
+        monkeypatch.setattr(retrieval, "VECTOR_DB_CLIENT", vector_db)
+        monkeypatch.setattr(
+            retrieval, "get_embedding_function", lambda *args, **kwargs: None
+        )
+        monkeypatch.setattr(
+            retrieval,
+            "get_cached_embedding_function",
+            lambda *args, **kwargs: embedding_function,
+        )
+        request = SimpleNamespace(
+            app=SimpleNamespace(state=SimpleNamespace(config=Config(), ef=None))
+        )
+
+        docs = (Document(page_content=str(i)) for i in range(3))
+        with pytest.raises(ValueError):
+            retrieval.save_docs_to_vector_db(
+                request,
+                docs,
+                "knowledge",
+                metadata={"file_id": "f"},
+                split=False,
+                add=True,
+                get_hash=lambda: "h",
+            )
+
+        # Only the earlier document is left
+        assert [item["id"] for item in vector_db.collections["knowledge"]] == ["old"]
@@ -0,0 +1,111 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+
+from open_webui.models.feedbacks import Feedback, FeedbackForm, Feedbacks
+from open_webui.routers import evaluations
+from open_webui.routers.evaluations import Leaderboard
+
+
+def add_feedback(db, winner, loser, rating=1, tags=()):
+    form = FeedbackForm(
+        type="rating",
+        data={
+            "rating": rating,
+            "model_id": winner,
+            "sibling_model_ids": [loser],
+            "tags": list(tags),
+        },
+    )
+    return Feedbacks.insert_new_feedback(user_id="u", form_data=form, db=db)
+
+
+def fresh_stats(db, query=None):
+    leaderboard = Leaderboard()
+    leaderboard.sync(db=db)
+    return leaderboard.get_stats(query)
+
+
+class FakeEmbeddingModel:
+    VECTORS = {"code": [1.0, 0.0], "python": [0.9, 0.1], "cooking": [0.0, 1.0]}
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return np.array([self.VECTORS[text] for text in texts])
+
+
+class TestLeaderboard:
+    """Test incremental Elo updates and similarity-weighted queries"""
+
+    def test_incremental_updates_match_a_rebuild(self, make_session):
+        """Test that new, edited and deleted feedback give the rebuilt ratings"""
+        db = make_session(Feedback)
+        leaderboard = Leaderboard()
+        first = add_feedback(db, "a", "b")
+        leaderboard.sync(db=db)
+
+        # Created in this worker, and in another one
+        leaderboard.add_feedback(add_feedback(db, "b", "a", tags=["code"]))
+        add_feedback(db, "a", "c", rating=-1)
+        leaderboard.sync(db=db)
+        assert leaderboard.get_stats() == fresh_stats(db)
+        assert leaderboard.get_stats()[0]["a"]["won"] == 1
+
+        Feedbacks.delete_feedback_by_id(first.id, db=db)
+        leaderboard.sync(db=db)
+        assert leaderboard.get_stats() == fresh_stats(db)
+        assert leaderboard.get_stats()[0]["a"]["won"] == 0
+
+    def test_edit_and_delete_handlers_invalidate(self, make_session, monkeypatch):
+        """Test that edits the sync cannot see (same second, same count) apply"""
+        db = make_session(Feedback)
+        leaderboard = Leaderboard()
+        monkeypatch.setattr(evaluations, "LEADERBOARD", leaderboard)
+        admin = SimpleNamespace(id="admin", role="admin")
+
+        feedback = add_feedback(db, "a", "b")
+        leaderboard.sync(db=db)
+
+        form = FeedbackForm(
+            type="rating",
+            data={"rating": -1, "model_id": "a", "sibling_model_ids": ["b"]},
+        )
+        asyncio.run(
+            evaluations.update_feedback_by_id(feedback.id, form, user=admin, db=db)
+        )
+        leaderboard.sync(db=db)
+        assert leaderboard.get_stats()[0]["a"]["lost"] == 1
+
+        asyncio.run(evaluations.delete_feedback_by_id(feedback.id, user=admin, db=db))
+        add_feedback(db, "b", "a")
+        leaderboard.sync(db=db)
+        assert leaderboard.get_stats() == fresh_stats(db)
+
+        asyncio.run(evaluations.delete_feedbacks(user=SimpleNamespace(id="u"), db=db))
+        leaderboard.sync(db=db)
+        assert leaderboard.get_stats() == ({}, {})
+
+    def test_tags_are_embedded_once(self, make_session, monkeypatch):
+        """Test that queries only embed the query and tags not seen before"""
+        db = make_session(Feedback)
+        model = FakeEmbeddingModel()
+        monkeypatch.setattr(evaluations, "_get_embedding_model", lambda: model)
+
+        add_feedback(db, "a", "b", tags=["code", "python"])
+        add_feedback(db, "b", "a", tags=["cooking"])
+        add_feedback(db, "b", "a")
+        leaderboard = Leaderboard()
+        leaderboard.sync(db=db)
+
+        model_stats, _ = leaderboard.get_stats("code")
+        assert sorted(model.encoded) == ["code", "code", "cooking", "python"]
+        # Only the coding feedback counts, "a" won it
+        assert model_stats["a"]["rating"] > 1000 > model_stats["b"]["rating"]
+
+        model.encoded.clear()
+        leaderboard.get_stats("cooking")
+        assert model.encoded == ["cooking"]
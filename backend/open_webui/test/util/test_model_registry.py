@@ -0,0 +1,73 @@
+import asyncio
+
+from open_webui.utils.model_registry import ConnectionModelsCache
+
+
+def make_fetch(responses, calls):
+    async def fetch():
+        calls.append(1)
+        return responses.pop(0)
+
+    return fetch
+
+
+class TestConnectionModelsCache:
+    """Test the per-connection `/models` response cache"""
+
+    def test_fresh_entries_are_served_from_cache(self):
+        cache = ConnectionModelsCache(ttl=60, stale_ttl=600)
+        calls = []
+        fetch = make_fetch([{"data": [1]}, {"data": [2]}], calls)
+
+        async def run():
+            first = await cache.get("a", fetch)
+            second = await cache.get("a", fetch)
+            refreshed = await cache.get("a", fetch, refresh=True)
+            return first, second, refreshed
+
+        first, second, refreshed = asyncio.run(run())
+        assert first == second == {"data": [1]}
+        assert refreshed == {"data": [2]}
+        assert len(calls) == 2
+
+    def test_stale_entries_are_served_while_refreshing(self):
+        cache = ConnectionModelsCache(ttl=0, stale_ttl=600)
+        calls = []
+        fetch = make_fetch([{"data": [1]}, {"data": [2]}], calls)
+
+        async def run():
+            await cache.get("a", fetch)
+            stale = await cache.get("a", fetch)
+            await asyncio.sleep(0)
+            return stale, cache._entries["a"][1]
+
+        stale, current = asyncio.run(run())
+        assert stale == {"data": [1]}
+        assert current == {"data": [2]}
+        assert len(calls) == 2
+
+    def test_last_known_response_survives_a_failed_fetch(self):
+        cache = ConnectionModelsCache(ttl=60, stale_ttl=600)
+        fetch = make_fetch([{"data": [1]}, None], [])
+
+        async def run():
+            await cache.get("a", fetch)
+            return await cache.get("a", fetch, refresh=True)
+
+        assert asyncio.run(run()) == {"data": [1]}
+
+    def test_least_recently_used_entries_are_dropped(self):
+        cache = ConnectionModelsCache(ttl=60, stale_ttl=600, max_entries=2)
+
+        async def response(value):
+            return {"data": [value]}
+
+        async def run():
+            await cache.get("a", lambda: response("a"))
+            await cache.get("b", lambda: response("b"))
+            # Reading "a" makes "b" the least recently used entry
+            await cache.get("a", lambda: response("a"))
+            await cache.get("c", lambda: response("c"))
+
+        asyncio.run(run())
+        assert list(cache._entries) == ["a", "c"]
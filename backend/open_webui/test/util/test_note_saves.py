@@ -0,0 +1,76 @@
+import asyncio
+
+from open_webui.socket.note_saves import NoteSaveCoordinator
+
+ADMIN = {"id": "a", "role": "admin"}
+
+
+def make_coordinator(**kwargs):
+    writes = []
+    coordinator = NoteSaveCoordinator(
+        write=lambda note_id, data: writes.append((note_id, data)), **kwargs
+    )
+    return coordinator, writes
+
+
+class TestNoteSaveCoordinator:
+    """Test debouncing and deduplication of collaborative note saves"""
+
+    def test_saves_are_coalesced_and_deduplicated(self):
+        """Test that a burst is written once and unchanged content not at all"""
+        coordinator, writes = make_coordinator(debounce=0.02, max_delay=1)
+
+        async def run():
+            for idx in range(5):
+                coordinator.schedule("note:n1", {"content": f"v{idx}"}, ADMIN)
+            await asyncio.sleep(0.1)
+            coordinator.schedule("note:n1", {"content": "v4"}, ADMIN)
+            await asyncio.sleep(0.1)
+
+        asyncio.run(run())
+        assert writes == [("n1", {"content": "v4"})]
+        stats = coordinator.stats()
+        assert stats["requested"] == 6
+        assert stats["coalesced"] == 4
+        assert stats["unchanged"] == 1
+        assert stats["written"] == 1
+
+    def test_continuous_edits_are_written_after_max_delay(self):
+        """Test that saves are not postponed forever while edits keep coming"""
+        coordinator, writes = make_coordinator(debounce=0.05, max_delay=0.1)
+
+        async def run():
+            for idx in range(12):
+                coordinator.schedule("note:n1", {"content": f"v{idx}"}, ADMIN)
+                await asyncio.sleep(0.02)
+            await asyncio.sleep(0.1)
+
+        asyncio.run(run())
+        assert len(writes) >= 2
+        assert writes[-1] == ("n1", {"content": "v11"})
+
+    def test_access_decisions_are_cached(self, monkeypatch):
+        """Test that the note is looked up once per user within the TTL"""
+        import open_webui.socket.note_saves as note_saves
+
+        lookups = []
+
+        class Note:
+            user_id = "owner"
+            access_control = {}
+
+        def get_note_by_id(note_id):
+            lookups.append(note_id)
+            return Note()
+
+        monkeypatch.setattr(note_saves.Notes, "get_note_by_id", get_note_by_id)
+        coordinator, _ = make_coordinator(access_ttl=60)
+        owner = {"id": "owner", "role": "user"}
+
+        assert coordinator.can_write(owner, "n1")
+        assert coordinator.can_write(owner, "n1")
+        assert lookups == ["n1"]
+
+        asyncio.run(coordinator.invalidate("n1"))
+        assert coordinator.can_write(owner, "n1")
+        assert lookups == ["n1", "n1"]
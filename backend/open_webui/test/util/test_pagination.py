@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import text
+
+from open_webui.models.knowledge import Knowledge, Knowledges
+from open_webui.models.messages import Message, Messages
+from open_webui.models.users import User
+from open_webui.utils.pagination import decode_cursor, encode_cursor, get_next_cursor
+
+
+class TestKeysetPagination:
+    """Test cursor encoding and keyset pages"""
+
+    def test_cursor_round_trip(self):
+        """Test that cursors decode to the values they were built from"""
+        cursor = encode_cursor(1700000000, "abc")
+        assert decode_cursor(cursor, 2) == (1700000000, "abc")
+
+        for invalid in ("not a cursor", encode_cursor(1)):
+            with pytest.raises(ValueError):
+                decode_cursor(invalid, 2)
+
+    def test_pages_cover_ties_exactly_once(self, make_session):
+        """Test that walking the cursors returns every message once, in order"""
+        db = make_session(Message, Knowledge, User)
+        for idx in range(25):
+            db.add(
+                Message(
+                    id=f"m{idx:02d}",
+                    user_id="u",
+                    channel_id="c",
+                    content="",
+                    # Groups of three messages share a timestamp
+                    created_at=idx // 3,
+                    updated_at=0,
+                )
+            )
+        db.commit()
+
+        ids, cursor = [], None
+        while True:
+            page = Messages.get_messages_by_channel_id(
+                "c", limit=4, cursor=cursor, db=db
+            )
+            ids += [message.id for message in page]
+            cursor = get_next_cursor(page, ["created_at", "id"], 4)
+            if cursor is None:
+                break
+
+        assert ids == [f"m{idx:02d}" for idx in reversed(range(25))]
+        assert ids[:4] == [
+            m.id for m in Messages.get_messages_by_channel_id("c", 0, 4, db=db)
+        ]
+
+        # Deep pages seek through the index instead of skipping rows
+        plan = db.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT id FROM message "
+                "WHERE channel_id = 'c' AND parent_id IS NULL "
+                "AND (created_at < 2 OR (created_at = 2 AND id < 'm07')) "
+                "ORDER BY created_at DESC, id DESC LIMIT 4"
+            )
+        ).fetchall()
+        assert "message_channel_parent_created_at_id_idx" in str(plan)
+
+    def test_invalid_knowledge_cursor_is_not_swallowed(self, make_session):
+        """Test that a bad cursor raises instead of returning an empty page"""
+        db = make_session(Message, Knowledge, User)
+        with pytest.raises(ValueError):
+            Knowledges.search_knowledge_bases(
+                "u", filter={}, limit=30, cursor="not a cursor", db=db
+            )
+        assert Knowledges.search_knowledge_bases("u", filter={}, db=db).total == 0
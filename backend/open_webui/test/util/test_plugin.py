@@ -0,0 +1,45 @@
+import builtins
+
+import open_webui.utils.plugin as plugin
+
+
+class TestPluginCode:
+    """Test the on-disk cache of compiled plugin code"""
+
+    def test_code_is_compiled_once_per_content(self, monkeypatch, tmp_path):
+        """Test that a cache hit skips compilation and keeps tracebacks readable"""
+        monkeypatch.setattr(plugin, "PLUGIN_CACHE_DIR", str(tmp_path))
+        content = "def double(x):\n    return 2 * x\n"
+
+        source_path, code = plugin.get_plugin_code(content)
+        assert open(source_path, encoding="utf-8").read() == content
+
+        compiles = []
+        monkeypatch.setattr(
+            plugin, "compile", lambda *args: compiles.append(args), raising=False
+        )
+        cached_path, cached_code = plugin.get_plugin_code(content)
+        assert compiles == []
+        assert cached_path == source_path
+
+        namespace = {}
+        exec(cached_code, namespace)
+        assert namespace["double"](21) == 42
+        assert namespace["double"].__code__.co_filename == source_path
+
+        # A different version of the plugin gets its own entry
+        monkeypatch.setattr(plugin, "compile", builtins.compile)
+        other_path, _ = plugin.get_plugin_code(content + "\n")
+        assert other_path != source_path
+
+    def test_missing_requirements(self):
+        """Test that only unsatisfied requirements are passed on to pip"""
+        assert plugin.get_missing_requirements(
+            [
+                "pytest",
+                "pytest>=0.1",
+                "pytest<0.1",
+                "open-webui-no-such-package",
+                "pytest; python_version < '3'",
+            ]
+        ) == ["pytest<0.1", "open-webui-no-such-package"]
@@ -0,0 +1,129 @@
+import asyncio
+
+from open_webui.retrieval.query_cache import (
+    LRUCache,
+    QueryCache,
+    VersionedVectorDB,
+    get_query_cached_embedding_function,
+)
+from open_webui.retrieval.vector.main import GetResult
+from open_webui.retrieval.versions import CollectionVersions
+
+
+class FakeVectorDB:
+    def insert(self, collection_name, items):
+        pass
+
+    def delete(self, collection_name, ids=None, filter=None):
+        pass
+
+    def reset(self):
+        pass
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def mget(self, *keys):
+        return [self.values.get(key) for key in keys]
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key) or 0) + 1)
+        return int(self.values[key])
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def get(self, key):
+        self.calls.append((self.redis.get, key))
+
+    def incr(self, key):
+        self.calls.append((self.redis.incr, key))
+
+    def execute(self):
+        return [call(key) for call, key in self.calls]
+
+
+class TestQueryCache:
+    """Test query embedding caching and version-based result invalidation"""
+
+    def test_query_embeddings_are_reused(self, tmp_path):
+        """Test that repeated query texts are embedded once"""
+        cache = QueryCache(CollectionVersions(tmp_path / "v.sqlite"), 16, 16)
+        calls = []
+
+        async def embed(query, prefix=None, user=None):
+            calls.append(query)
+            return [[float(len(text))] for text in query]
+
+        cached = get_query_cached_embedding_function(embed, "", "m", cache=cache)
+        assert asyncio.run(cached(["a", "bb"])) == [[1.0], [2.0]]
+        assert asyncio.run(cached("bb")) == [2.0]
+        assert asyncio.run(cached(["a", "ccc", "ccc"])) == [[1.0], [3.0], [3.0]]
+        assert calls == [["a", "bb"], ["ccc"]]
+
+    def test_writes_invalidate_results(self, tmp_path):
+        """Test that every write bumps the collection version in the result key"""
+        versions = CollectionVersions(tmp_path / "v.sqlite")
+        cache = QueryCache(versions, 16, 16)
+        client = VersionedVectorDB(FakeVectorDB(), versions)
+
+        key = cache.get_result_key("c", [0.1, 0.2], 5)
+        assert cache.get_result_key("c", [0.1, 0.2], 5) == key
+
+        client.insert("c", [])
+        inserted_key = cache.get_result_key("c", [0.1, 0.2], 5)
+        assert inserted_key != key
+
+        client.delete("other", ids=["x"])
+        assert cache.get_result_key("c", [0.1, 0.2], 5) == inserted_key
+
+        client.reset()
+        assert cache.get_result_key("c", [0.1, 0.2], 5) not in (key, inserted_key)
+
+    def test_cached_results_are_copies(self, tmp_path):
+        """Test that callers modifying a result do not modify the cached one"""
+        cache = QueryCache(CollectionVersions(tmp_path / "v.sqlite"), 16, 16)
+        key = cache.get_result_key("c", [0.1], 1)
+        result = GetResult(ids=[["a"]], documents=[["text"]], metadatas=[[{"k": 1}]])
+        cache.set_result(key, result)
+        result.metadatas[0][0]["k"] = 2
+
+        cached = cache.get_result(key)
+        cached.documents[0].append("other")
+        assert cache.get_result(key) == GetResult(
+            ids=[["a"]], documents=[["text"]], metadatas=[[{"k": 1}]]
+        )
+
+    def test_versions_are_shared_through_redis(self, tmp_path):
+        """Test that a write on one host invalidates results cached on another"""
+        redis = FakeRedis()
+        hosts = [
+            CollectionVersions(tmp_path / f"host{idx}.sqlite", redis=redis)
+            for idx in range(2)
+        ]
+        cache = QueryCache(hosts[1], 16, 16)
+        key = cache.get_result_key("c", [0.1], 1)
+
+        VersionedVectorDB(FakeVectorDB(), hosts[0]).insert("c", [])
+        assert cache.get_result_key("c", [0.1], 1) != key
+
+    def test_lru_eviction(self):
+        """Test least-recently-used eviction and hit counting"""
+        lru = LRUCache(2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        assert lru.get("a") == 1
+        lru.set("c", 3)
+        assert lru.get("b") is None
+        assert lru.stats()["hits"] == 1
@@ -0,0 +1,33 @@
+import pytest
+
+from open_webui.utils.misc import parse_range_header
+
+
+class TestParseRangeHeader:
+    """Test parsing of single-range HTTP Range headers"""
+
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            ("bytes=0-99", (0, 99)),
+            ("bytes=100-", (100, 999)),
+            ("bytes=-100", (900, 999)),
+            ("bytes=-5000", (0, 999)),
+            ("bytes=990-5000", (990, 999)),
+        ],
+    )
+    def test_single_range(self, header, expected):
+        assert parse_range_header(header, 1000) == expected
+
+    @pytest.mark.parametrize(
+        "header",
+        [None, "", "bytes=", "bytes=-", "bytes=9-1", "items=0-1", "bytes=0-1,5-9"],
+    )
+    def test_whole_file_is_served(self, header):
+        """Test that missing, malformed and multi-range headers serve everything"""
+        assert parse_range_header(header, 1000) is None
+
+    @pytest.mark.parametrize("header", ["bytes=1000-", "bytes=2000-3000", "bytes=-0"])
+    def test_unsatisfiable_range(self, header):
+        with pytest.raises(ValueError):
+            parse_range_header(header, 1000)
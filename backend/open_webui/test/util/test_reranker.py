@@ -0,0 +1,75 @@
+import asyncio
+
+from langchain_core.documents import Document
+
+from open_webui.retrieval.query_cache import LRUCache
+from open_webui.retrieval.reranker import RerankService
+
+
+class FakeReranker:
+    def __init__(self, listwise=False):
+        self.listwise = listwise
+        self.calls = []
+
+    def predict(self, pairs, user=None):
+        self.calls.append(list(pairs))
+        return [float(len(text)) for _, text in pairs]
+
+
+def docs(*texts):
+    return [Document(page_content=text) for text in texts]
+
+
+class TestRerankService:
+    """Test batching, deduplication and caching of reranking scores"""
+
+    def test_concurrent_calls_share_deduplicated_batches(self):
+        """Test that pairs of concurrent calls are scored together and once"""
+        model = FakeReranker()
+        service = RerankService(
+            model, "", "m", batch_size=3, batch_wait_ms=1, cache=LRUCache(100)
+        )
+
+        async def run():
+            return await asyncio.gather(
+                service.rerank("q1", docs("a", "bb")),
+                service.rerank("q1", docs("bb", "ccc")),
+                service.rerank("q2", docs("a")),
+            )
+
+        assert asyncio.run(run()) == [[1.0, 2.0], [2.0, 3.0], [1.0]]
+        # 4 unique pairs in model calls of at most 3
+        assert [len(call) for call in model.calls] == [3, 1]
+
+        # Cached pairs never reach the model again
+        assert asyncio.run(service.rerank("q2", docs("a"))) == [1.0]
+        assert len(model.calls) == 2
+
+    def test_external_reranker_gets_one_query_per_call(self):
+        """Test that the rerank API is called per query"""
+        model = FakeReranker()
+        service = RerankService(model, "external", "m", batch_wait_ms=1, cache=None)
+
+        async def run():
+            return await asyncio.gather(
+                service.rerank("q1", docs("a", "bb")),
+                service.rerank("q2", docs("a")),
+            )
+
+        asyncio.run(run())
+        assert sorted({query for query, _ in call} for call in model.calls) == [
+            {"q1"},
+            {"q2"},
+        ]
+
+    def test_listwise_models_are_scored_per_call(self):
+        """Test that listwise scores are neither batched nor cached"""
+        model = FakeReranker(listwise=True)
+        cache = LRUCache(100)
+        service = RerankService(model, "", "m", batch_wait_ms=1, cache=cache)
+
+        asyncio.run(service.rerank("q", docs("a", "bb")))
+        asyncio.run(service.rerank("q", docs("a", "bb")))
+
+        assert len(model.calls) == 2
+        assert cache.stats()["entries"] == 0
@@ -0,0 +1,73 @@
+import asyncio
+from types import SimpleNamespace
+
+from open_webui.retrieval import utils
+from open_webui.retrieval.vector.main import SearchResult
+
+
+def fake_query_doc(collection_name, query_embedding, k, user=None):
+    return SearchResult(
+        ids=[[f"{collection_name}-{i}" for i in range(k)]],
+        documents=[[f"{collection_name} doc {i}" for i in range(k)]],
+        metadatas=[[{"collection": collection_name} for _ in range(k)]],
+        distances=[[query_embedding[0] - i / 10 for i in range(k)]],
+    )
+
+
+class TestRetrievalPlanner:
+    """Test batched query embedding and merging across items"""
+
+    def test_merge_keeps_best_distance_per_document(self):
+        """Test that duplicates keep their best score and only top k remain"""
+        merged = utils.merge_and_sort_query_results(
+            [
+                {
+                    "distances": [[0.2, 0.9]],
+                    "documents": [["a", "b"]],
+                    "metadatas": [[{"n": 1}, {"n": 2}]],
+                },
+                {
+                    "distances": [[0.7, 0.1]],
+                    "documents": [["a", "c"]],
+                    "metadatas": [[{"n": 3}, {"n": 4}]],
+                },
+            ],
+            k=2,
+        )
+
+        assert merged["documents"] == [["b", "a"]]
+        assert merged["distances"] == [[0.9, 0.7]]
+        assert merged["metadatas"] == [[{"n": 2}, {"n": 3}]]
+
+    def test_queries_are_embedded_once_for_all_items(self, monkeypatch):
+        """Test that all items share one embedding call and keep their order"""
+        monkeypatch.setattr(utils, "query_doc", fake_query_doc)
+        calls = []
+
+        async def embedding_function(query, prefix=None):
+            calls.append(query)
+            return [[1.0, float(i)] for i in range(len(query))]
+
+        items = [{"collection_name": f"c{i}"} for i in range(3)]
+        sources = asyncio.run(
+            utils.get_sources_from_items(
+                request=SimpleNamespace(),
+                items=items,
+                queries=["q1", "q2"],
+                embedding_function=embedding_function,
+                k=2,
+                reranking_function=None,
+                k_reranker=0,
+                r=0.0,
+                hybrid_bm25_weight=0.0,
+                hybrid_search=False,
+            )
+        )
+
+        assert calls == [["q1", "q2"]]
+        assert [source["source"]["collection_name"] for source in sources] == [
+            "c0",
+            "c1",
+            "c2",
+        ]
+        assert sources[1]["document"] == ["c1 doc 0", "c1 doc 1"]
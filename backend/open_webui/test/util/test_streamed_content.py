@@ -0,0 +1,86 @@
+from open_webui.utils.middleware import (
+    StreamedContentSerializer,
+    serialize_content_blocks,
+)
+
+
+def stream_steps():
+    """
+    Yield the content blocks after each step of a streamed response. Blocks are
+    mutated in place and appended to, as the response handler does.
+    """
+    blocks = [{"type": "text", "content": ""}]
+    for token in ["Let ", "me ", "think."]:
+        blocks[-1]["content"] += token
+        yield blocks
+
+    reasoning = {
+        "type": "reasoning",
+        "start_tag": "<think>",
+        "end_tag": "</think>",
+        "content": "",
+    }
+    blocks.append(reasoning)
+    for token in ["First,\n", "> quoted ", "then <b>done</b>"]:
+        reasoning["content"] += token
+        yield blocks
+
+    # The reasoning closes in place while it is still the last block
+    reasoning["duration"] = 3
+    yield blocks
+
+    tool_calls = {
+        "type": "tool_calls",
+        "content": [
+            {
+                "id": "call_1",
+                "function": {"name": "search", "arguments": '{"q": "x"}'},
+            }
+        ],
+    }
+    blocks.append(tool_calls)
+    yield blocks
+    blocks.append({"type": "text", "content": ""})
+    yield blocks
+
+    # A result arrives for a block that is no longer the last one
+    tool_calls["results"] = [{"tool_call_id": "call_1", "content": "found"}]
+    yield blocks
+
+    for token in ["The ", "answer ", "is 42."]:
+        blocks[-1]["content"] += token
+        yield blocks
+
+    code = {"type": "code_interpreter", "attributes": {"lang": "python"}}
+    code["content"] = "print(1)"
+    blocks[-1]["content"] += "\n```"
+    blocks.append(code)
+    yield blocks
+    code["output"] = {"stdout": "1"}
+    yield blocks
+    blocks.append({"type": "text", "content": "Done."})
+    yield blocks
+
+
+class TestStreamedContentSerializer:
+    """Test that incremental serialization matches a full serialization"""
+
+    def test_matches_full_serialization_at_every_step(self):
+        serializer = StreamedContentSerializer()
+        for step, blocks in enumerate(stream_steps()):
+            assert serializer.serialize(blocks) == serialize_content_blocks(
+                blocks
+            ), f"step {step}"
+
+    def test_replaced_blocks_are_rendered_again(self):
+        serializer = StreamedContentSerializer()
+        blocks = [
+            {"type": "text", "content": "one"},
+            {"type": "text", "content": "two"},
+        ]
+        serializer.serialize(blocks)
+
+        # Same length content, different block object
+        blocks[0] = {"type": "text", "content": "uno"}
+        assert serializer.serialize(blocks) == serialize_content_blocks(blocks)
+        assert serializer.serialize([]) == serialize_content_blocks([]) == ""
@@ -0,0 +1,122 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import open_webui.utils.tools as tools
+
+SPEC = {
+    "openapi": "3.1.0",
+    "info": {"title": "Weather"},
+    "paths": {
+        "/forecast": {
+            "get": {
+                "operationId": "get_forecast",
+                "parameters": [
+                    {"name": "city", "in": "query", "schema": {"type": "string"}}
+                ],
+            }
+        }
+    },
+}
+
+
+def make_app(connections):
+    config = SimpleNamespace(TOOL_SERVER_CONNECTIONS=connections)
+    return SimpleNamespace(state=SimpleNamespace(config=config, redis=None))
+
+
+class TestToolServerSpecCache:
+    """Test that tool server specs are fetched and converted once"""
+
+    def test_unchanged_specs_are_not_converted_again(self, monkeypatch):
+        """Test ETag revalidation and reuse of the converted function specs"""
+        monkeypatch.setattr(tools, "TOOL_SERVER_SPEC_CACHE", {})
+        fetches = []
+
+        async def fetch_tool_server_spec(url, headers, etag=None):
+            fetches.append(etag)
+            if etag == '"v1"':
+                return None, etag
+            return SPEC, '"v1"'
+
+        monkeypatch.setattr(tools, "fetch_tool_server_spec", fetch_tool_server_spec)
+        conversions = []
+        convert = tools.convert_openapi_to_tool_payload
+        monkeypatch.setattr(
+            tools,
+            "convert_openapi_to_tool_payload",
+            lambda spec: conversions.append(spec) or convert(spec),
+        )
+
+        servers = [
+            {
+                "url": "http://weather",
+                "config": {"enable": True},
+                "info": {"id": "weather", "name": "Forecasts"},
+            },
+            {
+                "url": "http://inline",
+                "spec_type": "json",
+                "spec": json.dumps(SPEC),
+                "config": {"enable": True},
+            },
+        ]
+        first = asyncio.run(tools.get_tool_servers_data(servers))
+        second = asyncio.run(tools.get_tool_servers_data(servers))
+
+        assert fetches == [None, '"v1"']
+        assert len(conversions) == 2
+        assert second == first
+        assert first[0]["specs"][0]["name"] == "get_forecast"
+        assert first[0]["info"]["title"] == "Forecasts"
+        # The server's own info is kept for the next revalidation
+        assert first[1]["info"]["title"] == "Weather"
+
+    def test_failed_refresh_keeps_the_last_spec(self, monkeypatch):
+        """Test that unreachable servers are served stale until they are removed"""
+        monkeypatch.setattr(tools, "TOOL_SERVER_SPEC_CACHE", {})
+        reachable = True
+
+        async def fetch_tool_server_spec(url, headers, etag=None):
+            if not reachable:
+                raise Exception("Connection refused")
+            return SPEC, '"v1"'
+
+        monkeypatch.setattr(tools, "fetch_tool_server_spec", fetch_tool_server_spec)
+        servers = [{"url": "http://weather", "config": {"enable": True}}]
+
+        first = asyncio.run(tools.get_tool_servers_data(servers))
+        reachable = False
+        assert asyncio.run(tools.get_tool_servers_data(servers)) == first
+        assert asyncio.run(tools.get_tool_servers_data(servers)) == first
+
+        assert asyncio.run(tools.get_tool_servers_data([])) == []
+        assert asyncio.run(tools.get_tool_servers_data(servers)) == []
+
+    def test_requests_do_not_wait_for_stale_specs(self, monkeypatch):
+        """Test that stale specs are served while they are refreshed"""
+        refreshes = []
+
+        async def get_tool_servers_data(servers):
+            refreshes.append(servers)
+            await asyncio.sleep(0)
+            return [{"id": str(len(refreshes))}]
+
+        monkeypatch.setattr(tools, "get_tool_servers_data", get_tool_servers_data)
+        monkeypatch.setattr(tools, "TOOL_SERVER_SPEC_CACHE_TTL", 60)
+        request = SimpleNamespace(app=make_app([]))
+
+        async def run():
+            cold = await tools.get_tool_servers(request)
+            warm = await tools.get_tool_servers(request)
+
+            request.app.state.TOOL_SERVERS_UPDATED_AT -= 120
+            stale = await tools.get_tool_servers(request)
+            await request.app.state.TOOL_SERVERS_REFRESH
+            fresh = await tools.get_tool_servers(request)
+            return cold, warm, stale, fresh
+
+        cold, warm, stale, fresh = asyncio.run(run())
+        assert cold == warm == stale == [{"id": "1"}]
+        assert fresh == [{"id": "2"}]
+        assert len(refreshes) == 2
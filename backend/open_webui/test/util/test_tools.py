@@ -0,0 +1,46 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from open_webui.utils.tools import get_async_tool_function_and_apply_extra_params
+
+
+class TestToolFunctions:
+    """Test the coroutine wrappers of tool functions"""
+
+    def test_sync_tools_do_not_block_the_event_loop(self):
+        """Test that sync tools run concurrently and can time out"""
+
+        def lookup(city: str, __user__: dict) -> str:
+            time.sleep(0.3)
+            return f"{city} for {__user__['name']}"
+
+        tool = get_async_tool_function_and_apply_extra_params(
+            lookup, {"__user__": {"name": "alice"}}
+        )
+
+        async def run():
+            start = time.perf_counter()
+            results = await asyncio.gather(tool(city="Paris"), tool(city="Rome"))
+            return results, time.perf_counter() - start
+
+        results, duration = asyncio.run(run())
+        assert results == ["Paris for alice", "Rome for alice"]
+        assert duration < 0.5
+
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(asyncio.wait_for(tool(city="Oslo"), timeout=0.05))
+
+    def test_sync_tools_run_off_the_event_loop_thread(self):
+        """Test that the wrapper of a sync tool calls it in another thread"""
+        tool = get_async_tool_function_and_apply_extra_params(
+            lambda: threading.get_ident(), {}
+        )
+
+        async def run():
+            return threading.get_ident(), await tool()
+
+        loop_thread, tool_thread = asyncio.run(run())
+        assert tool_thread != loop_thread
@@ -0,0 +1,163 @@
+import asyncio
+import json
+
+import pycrdt as Y
+
+from open_webui.socket.utils import YdocManager
+
+
+def make_edits(count):
+    """Return the incremental update of each of count edits to a note"""
+    updates = []
+    ydoc = Y.Doc()
+    ydoc["text"] = text = Y.Text()
+    ydoc.observe(lambda event: updates.append(event.update))
+    for idx in range(count):
+        text += f"{idx} "
+    return updates
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self):
+        self.redis.transactions.append([name for name, _, _ in self.commands])
+        return [
+            await getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.commands
+        ]
+
+
+class FakeRedis:
+    """The async Redis commands used by YdocManager"""
+
+    def __init__(self):
+        self.data = {}
+        self.transactions = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def eval(self, script, numkeys, key, value):
+        # YdocManager only evaluates its compare-and-delete script
+        if self.data.get(key) == value:
+            del self.data[key]
+            return 1
+        return 0
+
+    async def rpush(self, key, value):
+        self.data.setdefault(key, []).append(value)
+        return len(self.data[key])
+
+    async def lrange(self, key, start, end):
+        return list(self.data.get(key, []))
+
+    async def ltrim(self, key, start, end):
+        self.data[key] = self.data.get(key, [])[start:]
+
+
+def read_text(state: bytes) -> str:
+    ydoc = Y.Doc()
+    ydoc["text"] = text = Y.Text()
+    ydoc.apply_update(state)
+    return str(text)
+
+
+class TestYdocManager:
+    """Test snapshot compaction of collaborative documents"""
+
+    def test_updates_are_compacted_into_a_snapshot(self):
+        """Test that history stays bounded and the state is preserved"""
+        manager = YdocManager(compaction_threshold=10)
+        updates = make_edits(25)
+
+        async def run():
+            for update in updates:
+                await manager.append_to_updates("note:1", update)
+            return (
+                await manager.get_updates("note:1"),
+                await manager.get_state("note:1"),
+            )
+
+        stored, state = asyncio.run(run())
+        # The snapshot of the first 20 edits and the 5 made since
+        assert len(stored) == 6
+        assert read_text(state) == "".join(f"{idx} " for idx in range(25))
+
+    def test_legacy_json_updates_are_decoded(self):
+        """Test that updates stored as JSON lists of ints are still readable"""
+        update = make_edits(1)[0]
+        assert YdocManager._decode_update(json.dumps(list(update)).encode()) == update
+        assert YdocManager._decode_update(update) == update
+
+    def test_redis_snapshot_and_updates_are_read_together(self):
+        """Test that GET and LRANGE run in one transaction with Redis"""
+        redis = FakeRedis()
+        manager = YdocManager(redis=redis, compaction_threshold=10)
+        updates = make_edits(25)
+
+        async def run():
+            for update in updates:
+                await manager.append_to_updates("note:1", update)
+            return await manager.get_state("note:1")
+
+        state = asyncio.run(run())
+        assert read_text(state) == "".join(f"{idx} " for idx in range(25))
+        assert redis.transactions.count(["get", "lrange"]) == 3
+        assert ["set", "ltrim"] in redis.transactions
+
+    def test_redis_keys_share_the_document_hash_tag(self):
+        """Test that every key of a document maps to one Redis Cluster slot"""
+        redis = FakeRedis()
+        manager = YdocManager(redis=redis, compaction_threshold=2)
+
+        async def run():
+            for update in make_edits(2):
+                await manager.append_to_updates("note:1", update)
+
+        asyncio.run(run())
+        assert redis.data and all("{note_1}" in key for key in redis.data)
+
+    def test_compaction_lock_of_another_worker_is_kept(self):
+        """Test that an expired lock taken over meanwhile is not released"""
+
+        class SlowRedis(FakeRedis):
+            async def ltrim(self, key, start, end):
+                await super().ltrim(key, start, end)
+                # The lock expired mid-compaction and another worker took it
+                self.data[lock_key] = "other"
+
+        redis = SlowRedis()
+        manager = YdocManager(redis=redis, compaction_threshold=0)
+        lock_key = manager._key("note_1", "compaction_lock")
+
+        async def run():
+            for update in make_edits(3):
+                await manager.append_to_updates("note:1", update)
+            await manager.compact("note:1")
+
+        asyncio.run(run())
+        assert redis.data[lock_key] == "other"
@@ -0,0 +1,207 @@
+import logging
+import sys
+import threading
+import time
+from typing import Any, Callable, Iterable, Optional
+
+from open_webui.env import ACCESS_INDEX_TTL, GLOBAL_LOG_LEVEL, REDIS_KEY_PREFIX
+from open_webui.internal.db import get_db_context
+from open_webui.utils.redis import get_redis_client
+
+logging.basicConfig(stream=sys.stdout, level=GLOBAL_LOG_LEVEL)
+log = logging.getLogger(__name__)
+
+
+# A loader returns (resource_id, owner_user_id, access_control) rows for every
+# resource of one type, using the given session.
+AccessLoader = Callable[[Any], Iterable[tuple[str, Optional[str], Optional[dict]]]]
+
+
+class AccessSnapshot:
+    """
+    Inverted view of every resource's `access_control` for one resource type.
+
+    Built once per load so that listing the resources a user can read or write
+    is a handful of set unions rather than a JSON walk per row.
+    """
+
+    def __init__(self, rows: Iterable[tuple[str, Optional[str], Optional[dict]]]):
+        self.ids: set[str] = set()
+        self.owned: dict[str, set[str]] = {}
+        self.public: set[str] = set()
+        self.user_grants: dict[str, dict[str, set[str]]] = {"read": {}, "write": {}}
+        self.group_grants: dict[str, dict[str, set[str]]] = {"read": {}, "write": {}}
+
+        for resource_id, owner_id, access_control in rows:
+            self.ids.add(resource_id)
+            if owner_id:
+                self.owned.setdefault(owner_id, set()).add(resource_id)
+
+            if access_control is None:
+                # Matches has_access(strict=True): public for read only
+                self.public.add(resource_id)
+                continue
+
+            for permission in ("read", "write"):
+                permitted = access_control.get(permission, {}) or {}
+                for user_id in permitted.get("user_ids", []) or []:
+                    self.user_grants[permission].setdefault(user_id, set()).add(
+                        resource_id
+                    )
+                for group_id in permitted.get("group_ids", []) or []:
+                    self.group_grants[permission].setdefault(group_id, set()).add(
+                        resource_id
+                    )
+
+    def get_accessible_ids(
+        self, user_id: str, group_ids: Iterable[str], permission: str = "read"
+    ) -> set[str]:
+        accessible = set(self.owned.get(user_id, ()))
+        if permission == "read":
+            accessible |= self.public
+
+        accessible |= self.user_grants.get(permission, {}).get(user_id, set())
+        group_grants = self.group_grants.get(permission, {})
+        for group_id in group_ids:
+            accessible |= group_grants.get(group_id, set())
+        return accessible
+
+
+class AccessIndex:
+    """
+    Per-worker index of user -> group ids -> accessible resource ids.
+
+    Group memberships are cached per user and access snapshots per resource
+    type. Table writes invalidate the affected entries in this worker. With
+    Redis configured they also bump a shared version that every worker checks
+    before trusting its cached entries, so revocations are seen everywhere on
+    the next lookup. Without Redis, the TTL bounds how long a write made by
+    another worker can go unseen.
+    """
+
+    def __init__(self, ttl: int = ACCESS_INDEX_TTL, redis=None):
+        self.ttl = ttl
+        self.redis = redis
+        self._lock = threading.Lock()
+        self._loaders: dict[str, AccessLoader] = {}
+        self._snapshots: dict[str, tuple[float, AccessSnapshot, Any]] = {}
+        self._snapshot_versions: dict[str, int] = {}
+        self._user_group_ids: dict[str, tuple[float, frozenset[str], Any]] = {}
+        self._groups_version = 0
+
+    def register(self, resource_type: str, loader: AccessLoader) -> None:
+        self._loaders[resource_type] = loader
+
+    ####################
+    # Shared versions
+    ####################
+
+    def _get_shared_version(self, name: str) -> Any:
+        if self.redis is None:
+            return None
+        try:
+            return self.redis.get(f"{REDIS_KEY_PREFIX}:access_index:{name}")
+        except Exception as e:
+            log.debug(f"Failed to read access index version {name}: {e}")
+            return None
+
+    def _bump_shared_version(self, name: str) -> None:
+        if self.redis is None:
+            return
+        try:
+            self.redis.incr(f"{REDIS_KEY_PREFIX}:access_index:{name}")
+        except Exception as e:
+            log.warning(f"Failed to broadcast access index invalidation: {e}")
+
+    def _is_fresh(self, entry, shared_version) -> bool:
+        return (
+            entry is not None
+            and time.monotonic() - entry[0] < self.ttl
+            and entry[2] == shared_version
+        )
+
+    ####################
+    # Group membership
+    ####################
+
+    def get_user_group_ids(self, user_id: str, db=None) -> frozenset[str]:
+        shared_version = self._get_shared_version("groups")
+        entry = self._user_group_ids.get(user_id)
+        if self._is_fresh(entry, shared_version):
+            return entry[1]
+
+        from open_webui.models.groups import Groups
+
+        version = self._groups_version
+        group_ids = frozenset(Groups.get_group_ids_by_member_id(user_id, db=db))
+        with self._lock:
+            # Drop the result if membership changed while it was being loaded
+            if version == self._groups_version:
+                self._user_group_ids[user_id] = (
+                    time.monotonic(),
+                    group_ids,
+                    shared_version,
+                )
+        return group_ids
+
+    def invalidate_user_groups(self, user_ids: Optional[Iterable[str]] = None) -> None:
+        with self._lock:
+            self._groups_version += 1
+            if user_ids is None:
+                self._user_group_ids = {}
+            else:
+                for user_id in user_ids:
+                    self._user_group_ids.pop(user_id, None)
+        # Other workers cannot tell which users changed, they reload them all
+        self._bump_shared_version("groups")
+
+    ####################
+    # Resource access
+    ####################
+
+    def get_snapshot(self, resource_type: str, db=None) -> AccessSnapshot:
+        shared_version = self._get_shared_version(resource_type)
+        entry = self._snapshots.get(resource_type)
+        if self._is_fresh(entry, shared_version):
+            return entry[1]
+
+        version = self._snapshot_versions.get(resource_type, 0)
+        with get_db_context(db) as db:
+            snapshot = AccessSnapshot(self._loaders[resource_type](db))
+        with self._lock:
+            if version == self._snapshot_versions.get(resource_type, 0):
+                self._snapshots[resource_type] = (
+                    time.monotonic(),
+                    snapshot,
+                    shared_version,
+                )
+        return snapshot
+
+    def invalidate_resource(self, resource_type: str) -> None:
+        with self._lock:
+            self._snapshot_versions[resource_type] = (
+                self._snapshot_versions.get(resource_type, 0) + 1
+            )
+            self._snapshots.pop(resource_type, None)
+        self._bump_shared_version(resource_type)
+
+    def get_resource_ids(self, resource_type: str, db=None) -> set[str]:
+        return self.get_snapshot(resource_type, db=db).ids
+
+    def get_accessible_ids(
+        self,
+        resource_type: str,
+        user_id: str,
+        permission: str = "read",
+        user_group_ids: Optional[Iterable[str]] = None,
+        db=None,
+    ) -> set[str]:
+        """Ids of `resource_type` the user owns or is granted `permission` on."""
+        if user_group_ids is None:
+            user_group_ids = self.get_user_group_ids(user_id, db=db)
+        return self.get_snapshot(resource_type, db=db).get_accessible_ids(
+            user_id, user_group_ids, permission
+        )
+
+
+ACCESS_INDEX = AccessIndex(redis=get_redis_client())
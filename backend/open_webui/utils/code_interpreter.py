@@ -1,15 +1,38 @@
 import asyncio
 import json
 import logging
+import os
+import shutil
+import signal
+import struct
+import sys
+import tempfile
+import textwrap
 import uuid
+from collections import OrderedDict, deque
+from functools import lru_cache
 from typing import Optional
 
 import aiohttp
 import websockets
 from pydantic import BaseModel
 
+from open_webui.env import (
+    CODE_INTERPRETER_LOCAL_MAX_JOBS_PER_WORKER,
+    CODE_INTERPRETER_LOCAL_SANDBOX,
+    CODE_INTERPRETER_LOCAL_MAX_QUEUED_PER_USER,
+    CODE_INTERPRETER_LOCAL_MEMORY_LIMIT_MB,
+    CODE_INTERPRETER_LOCAL_PRELOAD_MODULES,
+    CODE_INTERPRETER_LOCAL_TIMEOUT,
+    CODE_INTERPRETER_LOCAL_WORKERS,
+    DATA_DIR,
+    ENABLE_CODE_INTERPRETER_LOCAL_ENGINE,
+)
+
 logger = logging.getLogger(__name__)
 
+CODE_WORKER_PATH = os.path.join(os.path.dirname(__file__), "code_worker.py")
+
 
 class ResultModel(BaseModel):
     """
@@ -205,3 +228,415 @@ async def execute_code_jupyter(
     ) as executor:
         result = await executor.run()
         return result.model_dump()
+
+
+@lru_cache(maxsize=8)
+def get_restricted_import_code(blocked_modules: tuple[str, ...]) -> str:
+    """
+    Code that makes importing blocked_modules from the executed code fail, to be
+    prepended to code sent to engines that don't run in a CodeWorker.
+    """
+    return textwrap.dedent(
+        f"""
+        import builtins
+
+        BLOCKED_MODULES = {list(blocked_modules)}
+
+        _real_import = builtins.__import__
+        def restricted_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if name.split('.')[0] in BLOCKED_MODULES:
+                importer_name = globals.get('__name__') if globals else None
+                if importer_name == '__main__':
+                    raise ImportError(
+                        f"Direct import of module {{name}} is restricted."
+                    )
+            return _real_import(name, globals, locals, fromlist, level)
+
+        builtins.__import__ = restricted_import
+    """
+    )
+
+
+def get_sandbox_command(directory: str) -> list[str]:
+    """
+    The bubblewrap command a worker runs under with the "bwrap" sandbox.
+
+    The worker gets new user, PID, network, IPC and UTS namespaces, so it runs
+    as nobody, sees only its own processes and has no network. Its file system
+    holds the system libraries and the Python installation read-only, and its
+    working directory. The server's code, DATA_DIR and /proc of the host are
+    not mounted. No seccomp filter is applied.
+    """
+    command = [
+        "bwrap",
+        "--unshare-all",
+        "--die-with-parent",
+        "--new-session",
+        "--uid",
+        "65534",
+        "--gid",
+        "65534",
+        "--proc",
+        "/proc",
+        "--dev",
+        "/dev",
+        "--tmpfs",
+        "/tmp",
+    ]
+    paths = [
+        "/usr",
+        "/bin",
+        "/lib",
+        "/lib64",
+        "/etc/ld.so.cache",
+        "/etc/alternatives",
+        "/etc/fonts",
+        sys.base_prefix,
+        sys.base_exec_prefix,
+        sys.prefix,
+        sys.exec_prefix,
+    ]
+    for path in dict.fromkeys(paths):
+        if path and path != "/":
+            command += ["--ro-bind-try", path, path]
+    command += [
+        # DATA_DIR is inside the Python installation when installed with pip
+        "--tmpfs",
+        str(DATA_DIR),
+        "--ro-bind",
+        CODE_WORKER_PATH,
+        CODE_WORKER_PATH,
+        "--bind",
+        directory,
+        directory,
+        "--chdir",
+        directory,
+        "--",
+    ]
+    return command
+
+
+def get_local_engine_error(sandbox: str = CODE_INTERPRETER_LOCAL_SANDBOX) -> str:
+    """Why the local engine can't run code on this server, or "" if it can."""
+    if not ENABLE_CODE_INTERPRETER_LOCAL_ENGINE:
+        return "The local code execution engine is disabled on this server (ENABLE_CODE_INTERPRETER_LOCAL_ENGINE)."
+    if sandbox == "bwrap" and not shutil.which("bwrap"):
+        return "The local code execution engine needs bubblewrap (bwrap), which is not installed."
+    if sandbox not in ("bwrap", "none"):
+        return f"Unknown CODE_INTERPRETER_LOCAL_SANDBOX: {sandbox}"
+    return ""
+
+
+class CodeWorker:
+    """
+    A Python process of code_worker.py that executes code for the local engine.
+
+    The process runs in its own session and an empty temporary directory, with
+    an address space limit and a CPU time limit per execution. Its environment
+    is minimal, which only keeps the server's environment variables out of
+    os.environ.
+
+    With the "bwrap" sandbox that is all the process can see, see
+    get_sandbox_command. With "none" it is no security boundary: the process
+    runs as the server's user, so code can use the network, read DATA_DIR
+    (the database and uploads) and read /proc of the server, including its
+    environment and secrets.
+
+    A worker only ever runs code of one user, see CodeWorkerPool.
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process, directory: str):
+        self.process = process
+        self.directory = directory
+        self.jobs = 0
+        self.user_id: Optional[str] = None
+
+    @classmethod
+    async def start(
+        cls,
+        memory_limit_mb: int = CODE_INTERPRETER_LOCAL_MEMORY_LIMIT_MB,
+        preload_modules: Optional[list[str]] = None,
+        sandbox: str = CODE_INTERPRETER_LOCAL_SANDBOX,
+    ) -> "CodeWorker":
+        directory = tempfile.mkdtemp(prefix="open-webui-code-")
+        config = {
+            "memory_limit_mb": memory_limit_mb,
+            "preload_modules": preload_modules or [],
+        }
+        env = {
+            "PATH": os.environ.get("PATH", ""),
+            "HOME": directory,
+            "TMPDIR": directory,
+            "LANG": os.environ.get("LANG", "C.UTF-8"),
+            "MPLBACKEND": "Agg",
+            "PYTHONIOENCODING": "utf-8",
+        }
+
+        command = get_sandbox_command(directory) if sandbox == "bwrap" else []
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                sys.executable,
+                "-I",
+                CODE_WORKER_PATH,
+                json.dumps(config),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                cwd=directory,
+                env=env,
+                start_new_session=os.name == "posix",
+            )
+        except BaseException:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+
+        worker = cls(process, directory)
+        try:
+            await worker.read()
+        except BaseException:
+            await worker.stop()
+            raise
+        return worker
+
+    async def read(self) -> dict:
+        header = await self.process.stdout.readexactly(4)
+        (length,) = struct.unpack(">I", header)
+        return json.loads(await self.process.stdout.readexactly(length))
+
+    async def execute(
+        self, code: str, blocked_modules: list[str], timeout: int
+    ) -> dict:
+        self.jobs += 1
+        data = json.dumps(
+            {"code": code, "blocked_modules": blocked_modules, "cpu_limit": timeout}
+        ).encode()
+        self.process.stdin.write(struct.pack(">I", len(data)) + data)
+        await self.process.stdin.drain()
+        return await asyncio.wait_for(self.read(), timeout)
+
+    async def stop(self):
+        if self.process.returncode is None:
+            try:
+                if os.name == "posix":
+                    # Along with any process the code started
+                    os.killpg(self.process.pid, signal.SIGKILL)
+                else:
+                    self.process.kill()
+            except ProcessLookupError:
+                pass
+        await self.process.wait()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class CodeWorkerPool:
+    """
+    Pre-warmed CodeWorkers for the local code execution engine.
+
+    Executions wait in one queue per user and are handed to idle workers
+    round-robin across users, so a user with many executions can't starve
+    the others. A worker is reused until it has served max_jobs_per_worker
+    executions, timed out or died, and is then replaced in the background.
+
+    The state a worker resets between executions doesn't cover everything
+    code can leave behind (modules, threads, files outside its directory),
+    so a worker is bound to the first user it runs code for. Executions of
+    that user prefer it; another user only gets it after it was replaced.
+    """
+
+    def __init__(
+        self,
+        size: int = CODE_INTERPRETER_LOCAL_WORKERS,
+        timeout: int = CODE_INTERPRETER_LOCAL_TIMEOUT,
+        memory_limit_mb: int = CODE_INTERPRETER_LOCAL_MEMORY_LIMIT_MB,
+        max_jobs_per_worker: int = CODE_INTERPRETER_LOCAL_MAX_JOBS_PER_WORKER,
+        max_queued_per_user: int = CODE_INTERPRETER_LOCAL_MAX_QUEUED_PER_USER,
+        preload_modules: Optional[list[str]] = None,
+        sandbox: str = CODE_INTERPRETER_LOCAL_SANDBOX,
+    ):
+        self.size = size
+        self.sandbox = sandbox
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_queued_per_user = max_queued_per_user
+        self.preload_modules = (
+            CODE_INTERPRETER_LOCAL_PRELOAD_MODULES
+            if preload_modules is None
+            else preload_modules
+        )
+
+        self._idle: list[CodeWorker] = []
+        self._busy: set[CodeWorker] = set()
+        self._starting = 0
+        # user_id -> executions waiting for a worker, in round-robin order
+        self._queues: OrderedDict[str, deque] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+
+    def start(self):
+        """Start workers until the pool is full."""
+        while len(self._idle) + len(self._busy) + self._starting < self.size:
+            self._starting += 1
+            self._spawn(self._start_worker())
+
+    async def execute(
+        self,
+        code: str,
+        user_id: str = "",
+        blocked_modules: Optional[list[str]] = None,
+        timeout: Optional[int] = None,
+    ) -> dict:
+        """Execute code in a worker, returning its stdout, stderr and result."""
+        queue = self._queues.get(user_id)
+        if queue and len(queue) >= self.max_queued_per_user:
+            return {
+                "stdout": "",
+                "stderr": "Too many executions are waiting, try again later.",
+                "result": "",
+            }
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(user_id, deque()).append(
+            (future, code, blocked_modules or [], timeout or self.timeout)
+        )
+        self.start()
+        self._dispatch()
+        return await future
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _dispatch(self):
+        while self._idle and self._queues:
+            user_id, queue = next(iter(self._queues.items()))
+            job = queue.popleft()
+            if queue:
+                self._queues.move_to_end(user_id)
+            else:
+                del self._queues[user_id]
+
+            if job[0].done():
+                # Cancelled while waiting
+                continue
+
+            worker = self._get_idle_worker(user_id)
+            self._busy.add(worker)
+            self._spawn(self._run(worker, user_id, *job))
+
+    def _get_idle_worker(self, user_id: str) -> CodeWorker:
+        """Take the user's own idle worker, else a fresh one, else any."""
+        for bound_user_id in (user_id, None):
+            for idx, worker in enumerate(self._idle):
+                if worker.user_id == bound_user_id:
+                    return self._idle.pop(idx)
+        return self._idle.pop()
+
+    async def _replace_worker(self, worker: CodeWorker) -> CodeWorker:
+        await worker.stop()
+        new_worker = await CodeWorker.start(
+            self.memory_limit_mb, self.preload_modules, self.sandbox
+        )
+        self._busy.discard(worker)
+        self._busy.add(new_worker)
+        return new_worker
+
+    async def _start_worker(self):
+        try:
+            worker = await CodeWorker.start(
+                self.memory_limit_mb, self.preload_modules, self.sandbox
+            )
+        except Exception as e:
+            logger.exception(f"Failed to start code worker: {e}")
+            if not self._idle and not self._busy and self._starting == 1:
+                # Nothing could take the waiting executions
+                for queue in self._queues.values():
+                    for future, *_ in queue:
+                        if not future.done():
+                            future.set_exception(e)
+                self._queues.clear()
+            return
+        finally:
+            self._starting -= 1
+
+        self._idle.append(worker)
+        self._dispatch()
+
+    async def _run(self, worker, user_id, future, code, blocked_modules, timeout):
+        reusable = False
+        try:
+            if worker.user_id not in (None, user_id):
+                # Bound to another user, start over in a fresh process
+                worker = await self._replace_worker(worker)
+            worker.user_id = user_id
+            result = await worker.execute(code, blocked_modules, timeout)
+            reusable = worker.jobs < self.max_jobs_per_worker
+        except asyncio.TimeoutError:
+            result = {"stdout": "", "stderr": "Execution timed out.", "result": ""}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            # Killed for exceeding its CPU or memory limit, or exited
+            result = {
+                "stdout": "",
+                "stderr": "Execution stopped: the code exceeded its resource limits or exited the interpreter.",
+                "result": "",
+            }
+        except Exception as e:
+            result = e
+        finally:
+            self._busy.discard(worker)
+            if reusable:
+                self._idle.append(worker)
+            else:
+                self.start()
+
+        if not future.done():
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        self._dispatch()
+
+        if not reusable:
+            await worker.stop()
+
+    async def close(self):
+        workers = [*self._idle, *self._busy]
+        self._idle.clear()
+        self._busy.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(
+            *[worker.stop() for worker in workers], return_exceptions=True
+        )
+
+
+CODE_WORKER_POOL: Optional[CodeWorkerPool] = None
+
+
+def get_code_worker_pool() -> CodeWorkerPool:
+    """Return the pool of this process, starting its workers on first use."""
+    global CODE_WORKER_POOL
+    if CODE_WORKER_POOL is None:
+        CODE_WORKER_POOL = CodeWorkerPool()
+        CODE_WORKER_POOL.start()
+    return CODE_WORKER_POOL
+
+
+async def close_code_worker_pool():
+    global CODE_WORKER_POOL
+    if CODE_WORKER_POOL is not None:
+        await CODE_WORKER_POOL.close()
+        CODE_WORKER_POOL = None
+
+
+async def execute_code_local(
+    code: str,
+    user_id: str = "",
+    blocked_modules: Optional[list[str]] = None,
+    timeout: Optional[int] = None,
+) -> dict:
+    error = get_local_engine_error()
+    if error:
+        return {"stdout": "", "stderr": error, "result": ""}
+    return await get_code_worker_pool().execute(code, user_id, blocked_modules, timeout)
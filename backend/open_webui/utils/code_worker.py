@@ -0,0 +1,192 @@
+"""
+Python worker process of the local code interpreter, see CodeWorkerPool in
+code_interpreter.py.
+
+It runs as a standalone script, outside of the open_webui package, and
+executes one piece of code at a time. Requests arrive on stdin and responses
+leave on stdout, each as a 4-byte big-endian length followed by JSON. Between
+executions the worker resets the interpreter state that code commonly
+changes, so that it can be reused by the next request of the same user.
+"""
+
+import ast
+import base64
+import builtins
+import contextlib
+import importlib
+import io
+import json
+import os
+import shutil
+import struct
+import sys
+import traceback
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+MAX_OUTPUT_LENGTH = 1_000_000
+
+
+def read_message(stream):
+    header = stream.read(4)
+    if len(header) < 4:
+        return None
+    (length,) = struct.unpack(">I", header)
+    return json.loads(stream.read(length))
+
+
+def write_message(stream, message):
+    data = json.dumps(message).encode()
+    stream.write(struct.pack(">I", len(data)) + data)
+    stream.flush()
+
+
+def restrict_imports(blocked_modules):
+    real_import = builtins.__import__
+
+    def restricted_import(name, globals=None, locals=None, fromlist=(), level=0):
+        if name.split(".")[0] in blocked_modules:
+            importer_name = globals.get("__name__") if globals else None
+            if importer_name == "__main__":
+                raise ImportError(f"Direct import of module {name} is restricted.")
+        return real_import(name, globals, locals, fromlist, level)
+
+    builtins.__import__ = restricted_import
+
+
+def get_figure_images():
+    """Render and close the open matplotlib figures, as Jupyter would show them."""
+    pyplot = sys.modules.get("matplotlib.pyplot")
+    if pyplot is None:
+        return []
+
+    images = []
+    for number in pyplot.get_fignums():
+        buffer = io.BytesIO()
+        pyplot.figure(number).savefig(buffer, format="png")
+        images.append(
+            f"data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode()}"
+        )
+    pyplot.close("all")
+    return images
+
+
+def limit_cpu_time(seconds):
+    """Let the process use seconds more of CPU time before it is killed."""
+    if resource is None or not seconds:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = int(usage.ru_utime + usage.ru_stime) + seconds + 1
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def execute(code, blocked_modules, cpu_limit):
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    result = ""
+
+    if blocked_modules:
+        restrict_imports(set(blocked_modules))
+    limit_cpu_time(cpu_limit)
+
+    namespace = {"__name__": "__main__", "__builtins__": builtins}
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            # Like a notebook cell, the value of a trailing expression is the result
+            tree = ast.parse(code, "<code>")
+            expression = None
+            if tree.body and isinstance(tree.body[-1], ast.Expr):
+                expression = ast.Expression(tree.body.pop().value)
+
+            exec(compile(tree, "<code>", "exec"), namespace)
+            if expression is not None:
+                value = eval(compile(expression, "<code>", "eval"), namespace)
+                if value is not None:
+                    result = repr(value)
+
+            for image in get_figure_images():
+                print(image)
+        except BaseException:
+            error_type, error, tb = sys.exc_info()
+            # Leave this function's frame out of the traceback
+            print(
+                "".join(traceback.format_exception(error_type, error, tb.tb_next)),
+                file=sys.stderr,
+            )
+
+    return {
+        "stdout": stdout.getvalue()[:MAX_OUTPUT_LENGTH].strip(),
+        "stderr": stderr.getvalue()[:MAX_OUTPUT_LENGTH].strip(),
+        "result": result[:MAX_OUTPUT_LENGTH].strip(),
+    }
+
+
+def get_state():
+    return {
+        "builtins": dict(builtins.__dict__),
+        "environ": dict(os.environ),
+        "path": list(sys.path),
+        "cwd": os.getcwd(),
+    }
+
+
+def reset_state(state):
+    builtins.__dict__.clear()
+    builtins.__dict__.update(state["builtins"])
+    os.environ.clear()
+    os.environ.update(state["environ"])
+    sys.path[:] = state["path"]
+
+    os.chdir(state["cwd"])
+    for name in os.listdir(state["cwd"]):
+        path = os.path.join(state["cwd"], name)
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+
+def main():
+    config = json.loads(sys.argv[1])
+
+    # Keep the protocol streams to ourselves, so that code writing to the
+    # standard file descriptors (or processes it starts) cannot corrupt them
+    requests = os.fdopen(os.dup(0), "rb")
+    responses = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+
+    for module in config.get("preload_modules", []):
+        try:
+            importlib.import_module(module)
+        except Exception:
+            pass
+
+    memory_limit = config.get("memory_limit_mb")
+    if resource is not None and memory_limit:
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    state = get_state()
+    write_message(responses, {"ready": True})
+
+    while (request := read_message(requests)) is not None:
+        response = execute(
+            request["code"],
+            request.get("blocked_modules", []),
+            request.get("cpu_limit"),
+        )
+        reset_state(state)
+        write_message(responses, response)
+
+
+if __name__ == "__main__":
+    main()
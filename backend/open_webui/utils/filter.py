@@ -1,5 +1,7 @@
 import inspect
 import logging
+from dataclasses import dataclass
+from typing import Any, Callable
 
 from open_webui.utils.plugin import (
     load_function_module_by_id,
@@ -55,16 +57,29 @@ def get_sorted_filter_ids(request, model: dict, enabled_filter_ids: list = None)
     return filter_ids
 
 
-async def process_filter_functions(
-    request, filter_functions, filter_type, form_data, extra_params
-):
-    skip_files = None
+@dataclass
+class CompiledFilter:
+    id: str
+    module: Any
+    handler: Callable
+    params: dict
+    is_coroutine: bool
+
+
+def compile_filter_functions(
+    request, filter_functions, filter_type, extra_params
+) -> list[CompiledFilter]:
+    """
+    Resolve which filter functions implement the filter_type hook, apply their
+    valves and bind their parameters once, so that the chain can be run on
+    every event of a response (the "stream" hook) without redoing that work.
+    """
+    compiled = []
 
     for function in filter_functions:
-        filter = function
-        filter_id = function.id
-        if not filter:
+        if not function:
             continue
+        filter_id = function.id
 
         function_module = get_function_module(
             request, filter_id, load_from_db=(filter_type != "stream")
@@ -74,10 +89,6 @@ async def process_filter_functions(
         if not handler:
             continue
 
-        # Check if the function has a file_handler variable
-        if filter_type == "inlet" and hasattr(function_module, "file_handler"):
-            skip_files = function_module.file_handler
-
         # Apply valves to the function
         if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
             valves = Functions.get_function_valves_by_id(filter_id)
@@ -85,45 +96,83 @@ async def process_filter_functions(
                 **(valves if valves else {})
             )
 
-        try:
-            # Prepare parameters
-            sig = inspect.signature(handler)
-
-            params = {"body": form_data}
-            if filter_type == "stream":
-                params = {"event": form_data}
-
-            params = params | {
-                k: v
-                for k, v in {
-                    **extra_params,
-                    "__id__": filter_id,
-                }.items()
-                if k in sig.parameters
-            }
-
-            # Handle user parameters
-            if "__user__" in sig.parameters:
-                if hasattr(function_module, "UserValves"):
-                    try:
-                        params["__user__"]["valves"] = function_module.UserValves(
-                            **Functions.get_user_valves_by_id_and_user_id(
-                                filter_id, params["__user__"]["id"]
-                            )
+        # Prepare parameters
+        sig = inspect.signature(handler)
+        params = {
+            k: v
+            for k, v in {
+                **extra_params,
+                "__id__": filter_id,
+            }.items()
+            if k in sig.parameters
+        }
+
+        # Handle user parameters
+        if "__user__" in sig.parameters and hasattr(function_module, "UserValves"):
+            try:
+                params["__user__"] = {
+                    **params["__user__"],
+                    "valves": function_module.UserValves(
+                        **Functions.get_user_valves_by_id_and_user_id(
+                            filter_id, params["__user__"]["id"]
                         )
-                    except Exception as e:
-                        log.exception(f"Failed to get user values: {e}")
+                    ),
+                }
+            except Exception as e:
+                log.exception(f"Failed to get user values: {e}")
+
+        compiled.append(
+            CompiledFilter(
+                id=filter_id,
+                module=function_module,
+                handler=handler,
+                params=params,
+                is_coroutine=inspect.iscoroutinefunction(handler),
+            )
+        )
 
+    return compiled
+
+
+async def run_filter_functions(compiled_filters, filter_type, form_data):
+    """Run form_data through filters compiled by compile_filter_functions."""
+    body_key = "event" if filter_type == "stream" else "body"
+
+    for compiled_filter in compiled_filters:
+        try:
             # Execute handler
-            if inspect.iscoroutinefunction(handler):
-                form_data = await handler(**params)
+            if compiled_filter.is_coroutine:
+                form_data = await compiled_filter.handler(
+                    **{body_key: form_data}, **compiled_filter.params
+                )
             else:
-                form_data = handler(**params)
+                form_data = compiled_filter.handler(
+                    **{body_key: form_data}, **compiled_filter.params
+                )
 
         except Exception as e:
-            log.debug(f"Error in {filter_type} handler {filter_id}: {e}")
+            log.debug(f"Error in {filter_type} handler {compiled_filter.id}: {e}")
             raise e
 
+    return form_data
+
+
+async def process_filter_functions(
+    request, filter_functions, filter_type, form_data, extra_params
+):
+    compiled_filters = compile_filter_functions(
+        request, filter_functions, filter_type, extra_params
+    )
+
+    # Check if the function has a file_handler variable
+    skip_files = None
+    if filter_type == "inlet":
+        for compiled_filter in compiled_filters:
+            if hasattr(compiled_filter.module, "file_handler"):
+                skip_files = compiled_filter.module.file_handler
+
+    form_data = await run_filter_functions(compiled_filters, filter_type, form_data)
+
     # Handle file cleanup for inlet
     if skip_files:
         if "files" in form_data.get("metadata", {}):
@@ -0,0 +1,45 @@
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+log = logging.getLogger(__name__)
+
+
+class LazyObject:
+    """
+    Proxy that builds the wrapped object on first attribute access.
+
+    Used for heavy singletons (vector DB clients, local embedding and
+    reranking models) so importing the module that owns them stays cheap.
+    """
+
+    def __init__(self, factory: Callable[[], Any], name: str = ""):
+        object.__setattr__(self, "_lazy_factory", factory)
+        object.__setattr__(self, "_lazy_name", name or repr(factory))
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+        object.__setattr__(self, "_lazy_loaded", False)
+        object.__setattr__(self, "_lazy_object", None)
+
+    def _lazy_resolve(self):
+        if not self._lazy_loaded:
+            with self._lazy_lock:
+                if not self._lazy_loaded:
+                    start = time.perf_counter()
+                    object.__setattr__(self, "_lazy_object", self._lazy_factory())
+                    object.__setattr__(self, "_lazy_loaded", True)
+                    log.info(
+                        f"Lazily loaded {self._lazy_name} in "
+                        f"{(time.perf_counter() - start) * 1000:.0f}ms"
+                    )
+        return self._lazy_object
+
+    def __getattr__(self, name):
+        return getattr(self._lazy_resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._lazy_resolve(), name, value)
+
+    def __repr__(self):
+        state = "loaded" if self._lazy_loaded else "deferred"
+        return f"<LazyObject {self._lazy_name} ({state})>"
@@ -4,7 +4,6 @@ import sys
 import os
 import traceback
 import base64
-import textwrap
 
 import asyncio
 from aiocache import cached
@@ -101,10 +100,16 @@ from open_webui.utils.tools import (
 )
 from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.filter import (
+    compile_filter_functions,
     get_sorted_filter_ids,
     process_filter_functions,
+    run_filter_functions,
+)
+from open_webui.utils.code_interpreter import (
+    execute_code_jupyter,
+    execute_code_local,
+    get_restricted_import_code,
 )
-from open_webui.utils.code_interpreter import execute_code_jupyter
 from open_webui.utils.payload import apply_system_prompt_to_body
 from open_webui.utils.mcp.client import MCPClient
 
@@ -120,7 +125,10 @@ from open_webui.env import (
     GLOBAL_LOG_LEVEL,
     ENABLE_CHAT_RESPONSE_BASE64_IMAGE_URL_CONVERSION,
     CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE,
+    CHAT_RESPONSE_STREAM_CHECKPOINT_INTERVAL,
     CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES,
+    CHAT_RESPONSE_TOOL_CALL_CONCURRENCY,
+    CHAT_RESPONSE_TOOL_CALL_TIMEOUT,
     BYPASS_MODEL_ACCESS_CONTROL,
     ENABLE_REALTIME_CHAT_SAVE,
     ENABLE_QUERIES_CACHE,
@@ -2052,6 +2060,189 @@ async def process_chat_payload(request, form_data, user, metadata, model):
     return form_data, metadata, events
 
 
+def split_content_and_whitespace(content):
+    content_stripped = content.rstrip()
+    original_whitespace = (
+        content[len(content_stripped) :] if len(content) > len(content_stripped) else ""
+    )
+    return content_stripped, original_whitespace
+
+
+def is_opening_code_block(content):
+    backtick_segments = content.split("```")
+    # Even number of segments means the last backticks are opening a new block
+    return len(backtick_segments) > 1 and len(backtick_segments) % 2 == 0
+
+
+def serialize_content_block(content, block, raw=False):
+    """Append the rendering of a content block to content."""
+    if block["type"] == "text":
+        block_content = block["content"].strip()
+        if block_content:
+            content = f"{content}{block_content}\n"
+    elif block["type"] == "tool_calls":
+        attributes = block.get("attributes", {})
+
+        tool_calls = block.get("content", [])
+        results = block.get("results", [])
+
+        if content and not content.endswith("\n"):
+            content += "\n"
+
+        if results:
+
+            tool_calls_display_content = ""
+            for tool_call in tool_calls:
+
+                tool_call_id = tool_call.get("id", "")
+                tool_name = tool_call.get("function", {}).get("name", "")
+                tool_arguments = tool_call.get("function", {}).get("arguments", "")
+
+                tool_result = None
+                tool_result_files = None
+                for result in results:
+                    if tool_call_id == result.get("tool_call_id", ""):
+                        tool_result = result.get("content", None)
+                        tool_result_files = result.get("files", None)
+                        break
+
+                if tool_result is not None:
+                    tool_result_embeds = result.get("embeds", "")
+                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="true" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}" result="{html.escape(json.dumps(tool_result, ensure_ascii=False))}" files="{html.escape(json.dumps(tool_result_files)) if tool_result_files else ""}" embeds="{html.escape(json.dumps(tool_result_embeds))}">\n<summary>Tool Executed</summary>\n</details>\n'
+                else:
+                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
+
+            if not raw:
+                content = f"{content}{tool_calls_display_content}"
+        else:
+            tool_calls_display_content = ""
+
+            for tool_call in tool_calls:
+                tool_call_id = tool_call.get("id", "")
+                tool_name = tool_call.get("function", {}).get("name", "")
+                tool_arguments = tool_call.get("function", {}).get("arguments", "")
+
+                tool_calls_display_content = f'{tool_calls_display_content}\n<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
+
+            if not raw:
+                content = f"{content}{tool_calls_display_content}"
+
+    elif block["type"] == "reasoning":
+        reasoning_display_content = html.escape(
+            "\n".join(
+                (f"> {line}" if not line.startswith(">") else line)
+                for line in block["content"].splitlines()
+            )
+        )
+
+        reasoning_duration = block.get("duration", None)
+
+        start_tag = block.get("start_tag", "")
+        end_tag = block.get("end_tag", "")
+
+        if content and not content.endswith("\n"):
+            content += "\n"
+
+        if reasoning_duration is not None:
+            if raw:
+                content = f'{content}{start_tag}{block["content"]}{end_tag}\n'
+            else:
+                content = f'{content}<details type="reasoning" done="true" duration="{reasoning_duration}">\n<summary>Thought for {reasoning_duration} seconds</summary>\n{reasoning_display_content}\n</details>\n'
+        else:
+            if raw:
+                content = f'{content}{start_tag}{block["content"]}{end_tag}\n'
+            else:
+                content = f'{content}<details type="reasoning" done="false">\n<summary>Thinking…</summary>\n{reasoning_display_content}\n</details>\n'
+
+    elif block["type"] == "code_interpreter":
+        attributes = block.get("attributes", {})
+        output = block.get("output", None)
+        lang = attributes.get("lang", "")
+
+        content_stripped, original_whitespace = split_content_and_whitespace(content)
+        if is_opening_code_block(content_stripped):
+            # Remove trailing backticks that would open a new block
+            content = content_stripped.rstrip("`").rstrip() + original_whitespace
+        else:
+            # Keep content as is - either closing backticks or no backticks
+            content = content_stripped + original_whitespace
+
+        if content and not content.endswith("\n"):
+            content += "\n"
+
+        if output:
+            output = html.escape(json.dumps(output))
+
+            if raw:
+                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n```output\n{output}\n```\n'
+            else:
+                content = f'{content}<details type="code_interpreter" done="true" output="{output}">\n<summary>Analyzed</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+        else:
+            if raw:
+                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n'
+            else:
+                content = f'{content}<details type="code_interpreter" done="false">\n<summary>Analyzing...</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+
+    else:
+        block_content = str(block["content"]).strip()
+        if block_content:
+            content = f"{content}{block['type']}: {block_content}\n"
+
+    return content
+
+
+def serialize_content_blocks(content_blocks, raw=False):
+    content = ""
+    for block in content_blocks:
+        content = serialize_content_block(content, block, raw)
+    return content.strip()
+
+
+def get_content_block_signature(block):
+    return (
+        block["type"],
+        len(block.get("content") or ""),
+        len(block.get("results") or []),
+        block.get("output") is not None,
+        block.get("duration"),
+    )
+
+
+class StreamedContentSerializer:
+    """
+    serialize_content_blocks for a response that is being streamed.
+
+    Chunks only change the last block, so the rendering of the blocks before
+    it is kept while they are the same, unchanged blocks and each chunk only
+    renders the open tail block.
+    """
+
+    def __init__(self):
+        self.blocks = []  # (block, signature) of the blocks rendered in content
+        self.content = ""
+
+    def serialize(self, content_blocks):
+        blocks = [
+            (block, get_content_block_signature(block)) for block in content_blocks[:-1]
+        ]
+        if len(blocks) != len(self.blocks) or any(
+            block is not cached_block or signature != cached_signature
+            for (block, signature), (cached_block, cached_signature) in zip(
+                blocks, self.blocks
+            )
+        ):
+            content = ""
+            for block, _ in blocks:
+                content = serialize_content_block(content, block)
+            self.blocks = blocks
+            self.content = content
+
+        content = self.content
+        if content_blocks:
+            content = serialize_content_block(content, content_blocks[-1])
+        return content.strip()
+
+
 async def process_chat_response(
     request, response, form_data, user, metadata, model, events, tasks
 ):
@@ -2478,156 +2669,54 @@ async def process_chat_response(
         task_id = str(uuid4())  # Create a unique task ID.
         model_id = form_data.get("model", "")
 
-        def split_content_and_whitespace(content):
-            content_stripped = content.rstrip()
-            original_whitespace = (
-                content[len(content_stripped) :]
-                if len(content) > len(content_stripped)
-                else ""
-            )
-            return content_stripped, original_whitespace
-
-        def is_opening_code_block(content):
-            backtick_segments = content.split("```")
-            # Even number of segments means the last backticks are opening a new block
-            return len(backtick_segments) > 1 and len(backtick_segments) % 2 == 0
-
         # Handle as a background task
         async def response_handler(response, events):
-            def serialize_content_blocks(content_blocks, raw=False):
-                content = ""
-
-                for block in content_blocks:
-                    if block["type"] == "text":
-                        block_content = block["content"].strip()
-                        if block_content:
-                            content = f"{content}{block_content}\n"
-                    elif block["type"] == "tool_calls":
-                        attributes = block.get("attributes", {})
+            # Keeps the rendering of all but the open block between chunks
+            streamed_content_serializer = StreamedContentSerializer()
+
+            # What the client has been sent of the message content
+            client_content = {"content": None, "events": 0}
+
+            async def emit_content(data):
+                """
+                Send a chat:completion payload. While the content only grows, the
+                client is sent the appended text as content_delta. The full content
+                is sent when earlier content changed and, as a checkpoint for
+                clients that missed events, every
+                CHAT_RESPONSE_STREAM_CHECKPOINT_INTERVAL events.
+                """
+                content = data.get("content")
+                if "choices" in data:
+                    # Raw chunks are appended by the client as they are
+                    client_content["content"] = None
+                elif isinstance(content, str) and not data.get("done"):
+                    previous = client_content["content"]
+                    client_content["content"] = content
+                    client_content["events"] += 1
 
-                        tool_calls = block.get("content", [])
-                        results = block.get("results", [])
-
-                        if content and not content.endswith("\n"):
-                            content += "\n"
-
-                        if results:
-
-                            tool_calls_display_content = ""
-                            for tool_call in tool_calls:
-
-                                tool_call_id = tool_call.get("id", "")
-                                tool_name = tool_call.get("function", {}).get(
-                                    "name", ""
-                                )
-                                tool_arguments = tool_call.get("function", {}).get(
-                                    "arguments", ""
-                                )
-
-                                tool_result = None
-                                tool_result_files = None
-                                for result in results:
-                                    if tool_call_id == result.get("tool_call_id", ""):
-                                        tool_result = result.get("content", None)
-                                        tool_result_files = result.get("files", None)
-                                        break
-
-                                if tool_result is not None:
-                                    tool_result_embeds = result.get("embeds", "")
-                                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="true" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}" result="{html.escape(json.dumps(tool_result, ensure_ascii=False))}" files="{html.escape(json.dumps(tool_result_files)) if tool_result_files else ""}" embeds="{html.escape(json.dumps(tool_result_embeds))}">\n<summary>Tool Executed</summary>\n</details>\n'
-                                else:
-                                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
-
-                            if not raw:
-                                content = f"{content}{tool_calls_display_content}"
-                        else:
-                            tool_calls_display_content = ""
-
-                            for tool_call in tool_calls:
-                                tool_call_id = tool_call.get("id", "")
-                                tool_name = tool_call.get("function", {}).get(
-                                    "name", ""
-                                )
-                                tool_arguments = tool_call.get("function", {}).get(
-                                    "arguments", ""
-                                )
-
-                                tool_calls_display_content = f'{tool_calls_display_content}\n<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
-
-                            if not raw:
-                                content = f"{content}{tool_calls_display_content}"
-
-                    elif block["type"] == "reasoning":
-                        reasoning_display_content = html.escape(
-                            "\n".join(
-                                (f"> {line}" if not line.startswith(">") else line)
-                                for line in block["content"].splitlines()
-                            )
-                        )
-
-                        reasoning_duration = block.get("duration", None)
-
-                        start_tag = block.get("start_tag", "")
-                        end_tag = block.get("end_tag", "")
-
-                        if content and not content.endswith("\n"):
-                            content += "\n"
-
-                        if reasoning_duration is not None:
-                            if raw:
-                                content = (
-                                    f'{content}{start_tag}{block["content"]}{end_tag}\n'
-                                )
-                            else:
-                                content = f'{content}<details type="reasoning" done="true" duration="{reasoning_duration}">\n<summary>Thought for {reasoning_duration} seconds</summary>\n{reasoning_display_content}\n</details>\n'
-                        else:
-                            if raw:
-                                content = (
-                                    f'{content}{start_tag}{block["content"]}{end_tag}\n'
-                                )
-                            else:
-                                content = f'{content}<details type="reasoning" done="false">\n<summary>Thinking…</summary>\n{reasoning_display_content}\n</details>\n'
-
-                    elif block["type"] == "code_interpreter":
-                        attributes = block.get("attributes", {})
-                        output = block.get("output", None)
-                        lang = attributes.get("lang", "")
-
-                        content_stripped, original_whitespace = (
-                            split_content_and_whitespace(content)
-                        )
-                        if is_opening_code_block(content_stripped):
-                            # Remove trailing backticks that would open a new block
-                            content = (
-                                content_stripped.rstrip("`").rstrip()
-                                + original_whitespace
-                            )
-                        else:
-                            # Keep content as is - either closing backticks or no backticks
-                            content = content_stripped + original_whitespace
-
-                        if content and not content.endswith("\n"):
-                            content += "\n"
-
-                        if output:
-                            output = html.escape(json.dumps(output))
-
-                            if raw:
-                                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n```output\n{output}\n```\n'
-                            else:
-                                content = f'{content}<details type="code_interpreter" done="true" output="{output}">\n<summary>Analyzed</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
-                        else:
-                            if raw:
-                                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n'
-                            else:
-                                content = f'{content}<details type="code_interpreter" done="false">\n<summary>Analyzing...</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
-
-                    else:
-                        block_content = str(block["content"]).strip()
-                        if block_content:
-                            content = f"{content}{block['type']}: {block_content}\n"
+                    if (
+                        previous is not None
+                        and content.startswith(previous)
+                        and CHAT_RESPONSE_STREAM_CHECKPOINT_INTERVAL > 0
+                        and client_content["events"]
+                        % CHAT_RESPONSE_STREAM_CHECKPOINT_INTERVAL
+                    ):
+                        data = {
+                            key: value
+                            for key, value in data.items()
+                            if key != "content"
+                        }
+                        if len(content) > len(previous):
+                            data["content_delta"] = content[len(previous) :]
+                        if not data:
+                            return
 
-                return content.strip()
+                await event_emitter(
+                    {
+                        "type": "chat:completion",
+                        "data": data,
+                    }
+                )
 
             def convert_content_blocks_to_messages(content_blocks, raw=False):
                 messages = []
@@ -2915,6 +3004,13 @@ async def process_chat_response(
 
                     response_tool_calls = []
 
+                    stream_filters = compile_filter_functions(
+                        request,
+                        filter_functions,
+                        "stream",
+                        {"__body__": form_data, **extra_params},
+                    )
+
                     delta_count = 0
                     delta_chunk_size = max(
                         CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE,
@@ -2930,12 +3026,7 @@ async def process_chat_response(
                         nonlocal last_delta_data
 
                         if delta_count >= threshold and last_delta_data:
-                            await event_emitter(
-                                {
-                                    "type": "chat:completion",
-                                    "data": last_delta_data,
-                                }
-                            )
+                            await emit_content(last_delta_data)
                             delta_count = 0
                             last_delta_data = None
 
@@ -2961,13 +3052,10 @@ async def process_chat_response(
                         try:
                             data = json.loads(data)
 
-                            data, _ = await process_filter_functions(
-                                request=request,
-                                filter_functions=filter_functions,
-                                filter_type="stream",
-                                form_data=data,
-                                extra_params={"__body__": form_data, **extra_params},
-                            )
+                            if stream_filters:
+                                data = await run_filter_functions(
+                                    stream_filters, "stream", data
+                                )
 
                             if data:
                                 if "event" in data and not getattr(
@@ -2984,12 +3072,7 @@ async def process_chat_response(
                                             "selectedModelId": model_id,
                                         },
                                     )
-                                    await event_emitter(
-                                        {
-                                            "type": "chat:completion",
-                                            "data": data,
-                                        }
-                                    )
+                                    await emit_content(data)
                                 else:
                                     choices = data.get("choices", [])
 
@@ -3126,14 +3209,11 @@ async def process_chat_response(
                                                     "pending": True,
                                                 }
                                             ]
-                                            await event_emitter(
+                                            await emit_content(
                                                 {
-                                                    "type": "chat:completion",
-                                                    "data": {
-                                                        "content": serialize_content_blocks(
-                                                            pending_content_blocks
-                                                        ),
-                                                    },
+                                                    "content": serialize_content_blocks(
+                                                        pending_content_blocks
+                                                    )
                                                 }
                                             )
 
@@ -3186,7 +3266,7 @@ async def process_chat_response(
                                         reasoning_block["content"] += reasoning_content
 
                                         data = {
-                                            "content": serialize_content_blocks(
+                                            "content": streamed_content_serializer.serialize(
                                                 content_blocks
                                             )
                                         }
@@ -3281,14 +3361,14 @@ async def process_chat_response(
                                                 metadata["chat_id"],
                                                 metadata["message_id"],
                                                 {
-                                                    "content": serialize_content_blocks(
+                                                    "content": streamed_content_serializer.serialize(
                                                         content_blocks
                                                     ),
                                                 },
                                             )
                                         else:
                                             data = {
-                                                "content": serialize_content_blocks(
+                                                "content": streamed_content_serializer.serialize(
                                                     content_blocks
                                                 ),
                                             }
@@ -3299,12 +3379,7 @@ async def process_chat_response(
                                     if delta_count >= delta_chunk_size:
                                         await flush_pending_delta_data(delta_chunk_size)
                                 else:
-                                    await event_emitter(
-                                        {
-                                            "type": "chat:completion",
-                                            "data": data,
-                                        }
-                                    )
+                                    await emit_content(data)
                         except Exception as e:
                             done = "data: [DONE]" in line
                             if done:
@@ -3351,6 +3426,7 @@ async def process_chat_response(
 
                 tool_call_retries = 0
                 tool_call_sources = []  # Track citation sources from tool results
+                tool_call_timings = []  # Latency of each tool call, across turns
 
                 while (
                     len(tool_calls) > 0
@@ -3368,146 +3444,174 @@ async def process_chat_response(
                         }
                     )
 
-                    await event_emitter(
-                        {
-                            "type": "chat:completion",
-                            "data": {
-                                "content": serialize_content_blocks(content_blocks),
-                            },
-                        }
+                    await emit_content(
+                        {"content": serialize_content_blocks(content_blocks)}
                     )
 
                     tools = metadata.get("tools", {})
 
-                    results = []
-
-                    for tool_call in response_tool_calls:
-                        tool_call_id = tool_call.get("id", "")
-                        tool_function_name = tool_call.get("function", {}).get(
-                            "name", ""
-                        )
-                        tool_args = tool_call.get("function", {}).get("arguments", "{}")
+                    results = [None] * len(response_tool_calls)
+                    content_blocks[-1]["results"] = []
+                    semaphore = asyncio.Semaphore(CHAT_RESPONSE_TOOL_CALL_CONCURRENCY)
+
+                    async def execute_tool_call(idx, tool_call):
+                        """
+                        Run a tool call of the turn, at most
+                        CHAT_RESPONSE_TOOL_CALL_CONCURRENCY at a time. Returns the
+                        index of the call, its result, its citation sources and
+                        how long it waited, ran and was processed for.
+                        """
+                        queued_at = time.perf_counter()
+                        async with semaphore:
+                            started_at = time.perf_counter()
+
+                            tool_call_id = tool_call.get("id", "")
+                            tool_function_name = tool_call.get("function", {}).get(
+                                "name", ""
+                            )
+                            tool_args = tool_call.get("function", {}).get(
+                                "arguments", "{}"
+                            )
 
-                        tool_function_params = {}
-                        try:
-                            # json.loads cannot be used because some models do not produce valid JSON
-                            tool_function_params = ast.literal_eval(tool_args)
-                        except Exception as e:
-                            log.debug(e)
-                            # Fallback to JSON parsing
+                            tool_function_params = {}
                             try:
-                                tool_function_params = json.loads(tool_args)
+                                # json.loads cannot be used because some models do not produce valid JSON
+                                tool_function_params = ast.literal_eval(tool_args)
                             except Exception as e:
-                                log.error(
-                                    f"Error parsing tool call arguments: {tool_args}"
-                                )
+                                log.debug(e)
+                                # Fallback to JSON parsing
+                                try:
+                                    tool_function_params = json.loads(tool_args)
+                                except Exception as e:
+                                    log.error(
+                                        f"Error parsing tool call arguments: {tool_args}"
+                                    )
 
-                        # Mutate the original tool call response params as they are passed back to the passed
-                        # back to the LLM via the content blocks. If they are in a json block and are invalid json,
-                        # this can cause downstream LLM integrations to fail (e.g. bedrock gateway) where response
-                        # params are not valid json.
-                        # Main case so far is no args = "" = invalid json.
-                        log.debug(
-                            f"Parsed args from {tool_args} to {tool_function_params}"
-                        )
-                        tool_call.setdefault("function", {})["arguments"] = json.dumps(
-                            tool_function_params
-                        )
+                            # Mutate the original tool call response params as they are passed back to the passed
+                            # back to the LLM via the content blocks. If they are in a json block and are invalid json,
+                            # this can cause downstream LLM integrations to fail (e.g. bedrock gateway) where response
+                            # params are not valid json.
+                            # Main case so far is no args = "" = invalid json.
+                            log.debug(
+                                f"Parsed args from {tool_args} to {tool_function_params}"
+                            )
+                            tool_call.setdefault("function", {})["arguments"] = (
+                                json.dumps(tool_function_params)
+                            )
 
-                        tool_result = None
-                        tool = None
-                        tool_type = None
-                        direct_tool = False
+                            tool_result = None
+                            tool = None
+                            tool_type = None
+                            direct_tool = False
+                            status = "success"
 
-                        if tool_function_name in tools:
-                            tool = tools[tool_function_name]
-                            spec = tool.get("spec", {})
+                            if tool_function_name in tools:
+                                tool = tools[tool_function_name]
+                                spec = tool.get("spec", {})
 
-                            tool_type = tool.get("type", "")
-                            direct_tool = tool.get("direct", False)
+                                tool_type = tool.get("type", "")
+                                direct_tool = tool.get("direct", False)
 
-                            try:
-                                allowed_params = (
-                                    spec.get("parameters", {})
-                                    .get("properties", {})
-                                    .keys()
-                                )
+                                try:
+                                    allowed_params = (
+                                        spec.get("parameters", {})
+                                        .get("properties", {})
+                                        .keys()
+                                    )
 
-                                tool_function_params = {
-                                    k: v
-                                    for k, v in tool_function_params.items()
-                                    if k in allowed_params
-                                }
+                                    tool_function_params = {
+                                        k: v
+                                        for k, v in tool_function_params.items()
+                                        if k in allowed_params
+                                    }
 
-                                if direct_tool:
-                                    tool_result = await event_caller(
-                                        {
-                                            "type": "execute:tool",
-                                            "data": {
-                                                "id": str(uuid4()),
-                                                "name": tool_function_name,
-                                                "params": tool_function_params,
-                                                "server": tool.get("server", {}),
-                                                "session_id": metadata.get(
-                                                    "session_id", None
+                                    if direct_tool:
+                                        tool_call_coroutine = event_caller(
+                                            {
+                                                "type": "execute:tool",
+                                                "data": {
+                                                    "id": str(uuid4()),
+                                                    "name": tool_function_name,
+                                                    "params": tool_function_params,
+                                                    "server": tool.get("server", {}),
+                                                    "session_id": metadata.get(
+                                                        "session_id", None
+                                                    ),
+                                                },
+                                            }
+                                        )
+
+                                    else:
+                                        tool_function = get_updated_tool_function(
+                                            function=tool["callable"],
+                                            extra_params={
+                                                "__messages__": form_data.get(
+                                                    "messages", []
                                                 ),
+                                                "__files__": metadata.get("files", []),
                                             },
-                                        }
-                                    )
+                                        )
 
-                                else:
-                                    tool_function = get_updated_tool_function(
-                                        function=tool["callable"],
-                                        extra_params={
-                                            "__messages__": form_data.get(
-                                                "messages", []
-                                            ),
-                                            "__files__": metadata.get("files", []),
-                                        },
-                                    )
+                                        tool_call_coroutine = tool_function(
+                                            **tool_function_params
+                                        )
 
-                                    tool_result = await tool_function(
-                                        **tool_function_params
+                                    tool_result = await asyncio.wait_for(
+                                        tool_call_coroutine,
+                                        timeout=CHAT_RESPONSE_TOOL_CALL_TIMEOUT,
                                     )
 
-                            except Exception as e:
-                                tool_result = str(e)
-
-                        tool_result, tool_result_files, tool_result_embeds = (
-                            process_tool_result(
-                                request,
-                                tool_function_name,
-                                tool_result,
-                                tool_type,
-                                direct_tool,
-                                metadata,
-                                user,
+                                except asyncio.TimeoutError:
+                                    status = "timeout"
+                                    tool_result = f"{tool_function_name}: Tool call timed out after {CHAT_RESPONSE_TOOL_CALL_TIMEOUT} seconds."
+                                except Exception as e:
+                                    status = "error"
+                                    tool_result = str(e)
+                            else:
+                                status = "error"
+
+                            executed_at = time.perf_counter()
+
+                            tool_result, tool_result_files, tool_result_embeds = (
+                                process_tool_result(
+                                    request,
+                                    tool_function_name,
+                                    tool_result,
+                                    tool_type,
+                                    direct_tool,
+                                    metadata,
+                                    user,
+                                )
                             )
-                        )
 
-                        # Extract citation sources from tool results
-                        if (
-                            tool_function_name
-                            in [
-                                "search_web",
-                                "view_knowledge_file",
-                                "query_knowledge_files",
-                            ]
-                            and tool_result
-                        ):
-                            try:
-                                citation_sources = get_citation_source_from_tool_result(
-                                    tool_name=tool_function_name,
-                                    tool_params=tool_function_params,
-                                    tool_result=tool_result,
-                                    tool_id=tool.get("tool_id", "") if tool else "",
-                                )
-                                tool_call_sources.extend(citation_sources)
-                            except Exception as e:
-                                log.exception(f"Error extracting citation source: {e}")
+                            # Extract citation sources from tool results
+                            citation_sources = []
+                            if (
+                                tool_function_name
+                                in [
+                                    "search_web",
+                                    "view_knowledge_file",
+                                    "query_knowledge_files",
+                                ]
+                                and tool_result
+                            ):
+                                try:
+                                    citation_sources = (
+                                        get_citation_source_from_tool_result(
+                                            tool_name=tool_function_name,
+                                            tool_params=tool_function_params,
+                                            tool_result=tool_result,
+                                            tool_id=(
+                                                tool.get("tool_id", "") if tool else ""
+                                            ),
+                                        )
+                                    )
+                                except Exception as e:
+                                    log.exception(
+                                        f"Error extracting citation source: {e}"
+                                    )
 
-                        results.append(
-                            {
+                            result = {
                                 "tool_call_id": tool_call_id,
                                 "content": tool_result or "",
                                 **(
@@ -3521,9 +3625,57 @@ async def process_chat_response(
                                     else {}
                                 ),
                             }
-                        )
 
-                    content_blocks[-1]["results"] = results
+                        finished_at = time.perf_counter()
+                        timing = {
+                            "id": tool_call_id,
+                            "name": tool_function_name,
+                            "status": status,
+                            "queued_ms": round((started_at - queued_at) * 1000),
+                            "execution_ms": round((executed_at - started_at) * 1000),
+                            "processing_ms": round((finished_at - executed_at) * 1000),
+                        }
+                        return idx, result, citation_sources, timing
+
+                    # The calls of a turn are independent of each other, so they
+                    # run concurrently and each result is shown as soon as it is in
+                    tool_call_tasks = [
+                        asyncio.create_task(execute_tool_call(idx, tool_call))
+                        for idx, tool_call in enumerate(response_tool_calls)
+                    ]
+                    turn_sources = [[] for _ in response_tool_calls]
+                    try:
+                        for tool_call_task in asyncio.as_completed(tool_call_tasks):
+                            idx, result, citation_sources, timing = await tool_call_task
+                            results[idx] = result
+                            turn_sources[idx] = citation_sources
+                            tool_call_timings.append(timing)
+
+                            content_blocks[-1]["results"] = [
+                                result for result in results if result is not None
+                            ]
+                            await emit_content(
+                                {"content": serialize_content_blocks(content_blocks)}
+                            )
+                    finally:
+                        for tool_call_task in tool_call_tasks:
+                            tool_call_task.cancel()
+
+                    for citation_sources in turn_sources:
+                        tool_call_sources.extend(citation_sources)
+
+                    await event_emitter(
+                        {
+                            "type": "chat:completion",
+                            "data": {"tool_call_timings": tool_call_timings},
+                        }
+                    )
+                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                        metadata["chat_id"],
+                        metadata["message_id"],
+                        {"tool_call_timings": tool_call_timings},
+                    )
+
                     content_blocks.append(
                         {
                             "type": "text",
@@ -3547,13 +3699,8 @@ async def process_chat_response(
                             )
                         tool_call_sources.clear()
 
-                    await event_emitter(
-                        {
-                            "type": "chat:completion",
-                            "data": {
-                                "content": serialize_content_blocks(content_blocks),
-                            },
-                        }
+                    await emit_content(
+                        {"content": serialize_content_blocks(content_blocks)}
                     )
 
                     try:
@@ -3593,13 +3740,8 @@ async def process_chat_response(
                         and retries < MAX_RETRIES
                     ):
 
-                        await event_emitter(
-                            {
-                                "type": "chat:completion",
-                                "data": {
-                                    "content": serialize_content_blocks(content_blocks),
-                                },
-                            }
+                        await emit_content(
+                            {"content": serialize_content_blocks(content_blocks)}
                         )
 
                         retries += 1
@@ -3609,27 +3751,21 @@ async def process_chat_response(
                         try:
                             if content_blocks[-1]["attributes"].get("type") == "code":
                                 code = content_blocks[-1]["content"]
-                                if CODE_INTERPRETER_BLOCKED_MODULES:
-                                    blocking_code = textwrap.dedent(
-                                        f"""
-                                        import builtins
-
-                                        BLOCKED_MODULES = {CODE_INTERPRETER_BLOCKED_MODULES}
-
-                                        _real_import = builtins.__import__
-                                        def restricted_import(name, globals=None, locals=None, fromlist=(), level=0):
-                                            if name.split('.')[0] in BLOCKED_MODULES:
-                                                importer_name = globals.get('__name__') if globals else None
-                                                if importer_name == '__main__':
-                                                    raise ImportError(
-                                                        f"Direct import of module {{name}} is restricted."
-                                                    )
-                                            return _real_import(name, globals, locals, fromlist, level)
-
-                                        builtins.__import__ = restricted_import
-                                    """
+                                engine = (
+                                    request.app.state.config.CODE_INTERPRETER_ENGINE
+                                )
+                                # Local workers apply the blocked modules themselves
+                                if (
+                                    CODE_INTERPRETER_BLOCKED_MODULES
+                                    and engine != "local"
+                                ):
+                                    code = (
+                                        get_restricted_import_code(
+                                            tuple(CODE_INTERPRETER_BLOCKED_MODULES)
+                                        )
+                                        + "\n"
+                                        + code
                                     )
-                                    code = blocking_code + "\n" + code
 
                                 if (
                                     request.app.state.config.CODE_INTERPRETER_ENGINE
@@ -3668,6 +3804,12 @@ async def process_chat_response(
                                         ),
                                         request.app.state.config.CODE_INTERPRETER_JUPYTER_TIMEOUT,
                                     )
+                                elif engine == "local":
+                                    output = await execute_code_local(
+                                        code,
+                                        user.id,
+                                        CODE_INTERPRETER_BLOCKED_MODULES,
+                                    )
                                 else:
                                     output = {
                                         "stdout": "Code interpreter engine not configured."
@@ -3724,13 +3866,8 @@ async def process_chat_response(
                             }
                         )
 
-                        await event_emitter(
-                            {
-                                "type": "chat:completion",
-                                "data": {
-                                    "content": serialize_content_blocks(content_blocks),
-                                },
-                            }
+                        await emit_content(
+                            {"content": serialize_content_blocks(content_blocks)}
                         )
 
                         try:
@@ -3797,12 +3934,7 @@ async def process_chat_response(
                             },
                         )
 
-                await event_emitter(
-                    {
-                        "type": "chat:completion",
-                        "data": data,
-                    }
-                )
+                await emit_content(data)
 
                 await background_tasks_handler()
             except asyncio.CancelledError:
@@ -3830,26 +3962,20 @@ async def process_chat_response(
             def wrap_item(item):
                 return f"data: {item}\n\n"
 
+            stream_filters = compile_filter_functions(
+                request, filter_functions, "stream", extra_params
+            )
+
             for event in events:
-                event, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=event,
-                    extra_params=extra_params,
-                )
+                if stream_filters:
+                    event = await run_filter_functions(stream_filters, "stream", event)
 
                 if event:
                     yield wrap_item(json.dumps(event))
 
             async for data in original_generator:
-                data, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=data,
-                    extra_params=extra_params,
-                )
+                if stream_filters:
+                    data = await run_filter_functions(stream_filters, "stream", data)
 
                 if data:
                     yield data
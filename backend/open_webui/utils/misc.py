@@ -456,6 +456,37 @@ def parse_duration(duration: str) -> Optional[timedelta]:
     return total_duration
 
 
+def parse_range_header(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single-range HTTP Range header ("bytes=0-99", "bytes=100-" or
+    "bytes=-100") into inclusive (start, end) offsets of a file of the given size.
+
+    Returns None when the whole file should be sent: no header, an empty file,
+    a malformed header or several ranges (which the file routes don't serve).
+    Raises ValueError when the range lies outside the file.
+    """
+    if not header or size <= 0:
+        return None
+
+    match = re.fullmatch(r"\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*", header)
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+
+    first, last = match.groups()
+    if first == "":
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, min(int(last), size - 1) if last else size - 1
+
+
 def parse_ollama_modelfile(model_text):
     parameters_meta = {
         "mirostat": int,
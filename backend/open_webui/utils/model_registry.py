@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import logging
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from open_webui.env import (
+    ENABLE_FORWARD_USER_INFO_HEADERS,
+    GLOBAL_LOG_LEVEL,
+    MODELS_CONNECTION_CACHE_MAX_ENTRIES,
+    MODELS_CONNECTION_CACHE_STALE_TTL,
+    MODELS_CONNECTION_CACHE_TTL,
+)
+
+logging.basicConfig(stream=sys.stdout, level=GLOBAL_LOG_LEVEL)
+log = logging.getLogger(__name__)
+
+
+####################
+# Per-connection model list cache
+####################
+
+
+class ConnectionModelsCache:
+    """
+    Caches the raw `/models` response of each direct connection separately.
+
+    Fresh entries are returned as-is. Entries past `ttl` but within `stale_ttl`
+    are returned immediately while a single background task refreshes them, so
+    one slow provider never holds up the merged model list. Only a cold or
+    expired entry is fetched inline. At most `max_entries` responses are kept,
+    the least recently used ones are dropped first.
+    """
+
+    def __init__(
+        self,
+        ttl: int = MODELS_CONNECTION_CACHE_TTL,
+        stale_ttl: int = MODELS_CONNECTION_CACHE_STALE_TTL,
+        max_entries: int = MODELS_CONNECTION_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.max_entries = max(max_entries, 1)
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._refreshing: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def get_key(url: str, key: Optional[str], user=None) -> str:
+        key_hash = hashlib.sha256((key or "").encode()).hexdigest()[:16]
+        cache_key = f"{url}|{key_hash}"
+        if ENABLE_FORWARD_USER_INFO_HEADERS and user is not None:
+            # Responses may vary per user when user info headers are forwarded
+            cache_key = f"{cache_key}|{user.id}"
+        return cache_key
+
+    async def _fetch(self, cache_key: str, fetch: Callable[[], Awaitable[Any]]):
+        response = await fetch()
+        if response is not None:
+            self._entries[cache_key] = (time.monotonic(), response)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return response
+
+    def _schedule_refresh(self, cache_key: str, fetch: Callable[[], Awaitable[Any]]):
+        task = self._refreshing.get(cache_key)
+        if task is not None and not task.done():
+            return
+
+        async def refresh():
+            try:
+                await self._fetch(cache_key, fetch)
+            except Exception as e:
+                log.warning(f"Background model list refresh failed: {e}")
+            finally:
+                self._refreshing.pop(cache_key, None)
+
+        self._refreshing[cache_key] = asyncio.create_task(refresh())
+
+    async def get(
+        self,
+        cache_key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        refresh: bool = False,
+    ):
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            self._entries.move_to_end(cache_key)
+        if entry is not None and not refresh:
+            fetched_at, response = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                return response
+            if age < self.stale_ttl:
+                self._schedule_refresh(cache_key, fetch)
+                return response
+
+        response = await self._fetch(cache_key, fetch)
+        if response is None and entry is not None:
+            # Keep serving the last known list if the provider is unreachable
+            return entry[1]
+        return response
+
+    def clear(self):
+        self._entries.clear()
+
+
+CONNECTION_MODELS_CACHE = ConnectionModelsCache()
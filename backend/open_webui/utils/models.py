@@ -21,6 +21,8 @@ from open_webui.utils.plugin import (
     get_function_module_from_cache,
 )
 from open_webui.utils.access_control import has_access
+from open_webui.utils.access_index import ACCESS_INDEX
+from open_webui.utils.model_registry import CONNECTION_MODELS_CACHE
 
 
 from open_webui.config import (
@@ -84,6 +86,74 @@ async def get_all_base_models(request: Request, user: UserModel = None):
     return base_models
 
 
+def get_direct_model_item(model_id, name, idx, api_config, prefix_id=None):
+    return {
+        "id": f"{prefix_id}.{model_id}" if prefix_id else model_id,
+        "name": name,
+        "object": "model",
+        "created": int(time.time()),
+        "owned_by": "openai",
+        "openai": {"id": model_id},
+        "urlIdx": idx,
+        "connection_type": api_config.get("connection_type", "external"),
+        "tags": api_config.get("tags", []),
+    }
+
+
+async def get_direct_models(request, refresh: bool = False, user: UserModel = None):
+    from open_webui.routers.openai import send_get_request
+
+    async def get_connection_models(idx, url, api_config):
+        prefix_id = api_config.get("prefix_id", None)
+        model_ids = api_config.get("model_ids", [])
+
+        if model_ids:
+            # Use configured model IDs
+            return [
+                get_direct_model_item(model_id, model_id, idx, api_config, prefix_id)
+                for model_id in model_ids
+            ]
+
+        # Fetch models dynamically, served from the per-connection cache
+        try:
+            key = request.app.state.config.OPENAI_API_KEYS[idx]
+            response = await CONNECTION_MODELS_CACHE.get(
+                CONNECTION_MODELS_CACHE.get_key(url, key, user),
+                lambda: send_get_request(f"{url}/models", key, user),
+                refresh=refresh,
+            )
+
+            if response and "data" in response:
+                return [
+                    get_direct_model_item(
+                        model["id"],
+                        model.get("name", model["id"]),
+                        idx,
+                        api_config,
+                        prefix_id,
+                    )
+                    for model in response["data"]
+                ]
+        except Exception as e:
+            log.warning(f"Failed to fetch direct models from {url}: {e}")
+        return []
+
+    tasks = []
+    for idx, url in enumerate(request.app.state.config.OPENAI_API_BASE_URLS):
+        api_config = request.app.state.config.OPENAI_API_CONFIGS.get(
+            str(idx),
+            request.app.state.config.OPENAI_API_CONFIGS.get(url, {}),  # Legacy support
+        )
+
+        if api_config.get("enable", True):
+            tasks.append(get_connection_models(idx, url, api_config))
+
+    direct_models = []
+    for connection_models in await asyncio.gather(*tasks):
+        direct_models.extend(connection_models)
+    return direct_models
+
+
 async def get_all_models(request, refresh: bool = False, user: UserModel = None):
     if (
         request.app.state.MODELS
@@ -139,76 +209,7 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
 
     # Add direct models for base_model_id resolution
     if request.app.state.config.ENABLE_OPENAI_API:
-        direct_models = []
-        for idx, url in enumerate(request.app.state.config.OPENAI_API_BASE_URLS):
-            api_config = request.app.state.config.OPENAI_API_CONFIGS.get(
-                str(idx),
-                request.app.state.config.OPENAI_API_CONFIGS.get(
-                    url, {}
-                ),  # Legacy support
-            )
-
-            enable = api_config.get("enable", True)
-            model_ids = api_config.get("model_ids", [])
-
-            if enable:
-                prefix_id = api_config.get("prefix_id", None)
-
-                if model_ids:
-                    # Use configured model IDs
-                    for model_id in model_ids:
-                        model_name = model_id
-                        if prefix_id:
-                            model_name = f"{prefix_id}.{model_id}"
-
-                        direct_models.append(
-                            {
-                                "id": model_name,
-                                "name": model_id,
-                                "object": "model",
-                                "created": int(time.time()),
-                                "owned_by": "openai",
-                                "openai": {"id": model_id},
-                                "urlIdx": idx,
-                                "connection_type": api_config.get(
-                                    "connection_type", "external"
-                                ),
-                                "tags": api_config.get("tags", []),
-                            }
-                        )
-                else:
-                    # Fetch models dynamically
-                    try:
-                        from open_webui.routers.openai import send_get_request
-
-                        key = request.app.state.config.OPENAI_API_KEYS[idx]
-                        response = await send_get_request(f"{url}/models", key, user)
-
-                        if response and "data" in response:
-                            for model in response["data"]:
-                                model_name = model["id"]
-                                if prefix_id:
-                                    model_name = f"{prefix_id}.{model['id']}"
-
-                                direct_models.append(
-                                    {
-                                        "id": model_name,
-                                        "name": model.get("name", model["id"]),
-                                        "object": "model",
-                                        "created": int(time.time()),
-                                        "owned_by": "openai",
-                                        "openai": {"id": model["id"]},
-                                        "urlIdx": idx,
-                                        "connection_type": api_config.get(
-                                            "connection_type", "external"
-                                        ),
-                                        "tags": api_config.get("tags", []),
-                                    }
-                                )
-                    except Exception as e:
-                        log.warning(f"Failed to fetch direct models from {url}: {e}")
-
-        models = models + direct_models
+        models = models + await get_direct_models(request, refresh=refresh, user=user)
 
     global_action_ids = [
         function.id for function in Functions.get_global_action_functions()
@@ -449,16 +450,15 @@ def get_filtered_models(models, user, db=None):
         user.role == "user"
         or (user.role == "admin" and not BYPASS_ADMIN_ACCESS_CONTROL)
     ) and not BYPASS_MODEL_ACCESS_CONTROL:
-        model_ids = [model["id"] for model in models if not model.get("arena")]
-        model_infos = {
-            model_info.id: model_info
-            for model_info in Models.get_models_by_ids(model_ids)
-        }
+        # Access is resolved from the precomputed index: models without a
+        # database entry are hidden, the rest are checked by set membership.
+        user_group_ids = ACCESS_INDEX.get_user_group_ids(user.id, db=db)
+        model_ids = ACCESS_INDEX.get_resource_ids("model", db=db)
+        accessible_ids = ACCESS_INDEX.get_accessible_ids(
+            "model", user.id, "read", user_group_ids=user_group_ids, db=db
+        )
 
         filtered_models = []
-        user_group_ids = {
-            group.id for group in Groups.get_groups_by_member_id(user.id, db=db)
-        }
         for model in models:
             if model.get("arena"):
                 if has_access(
@@ -472,19 +472,11 @@ def get_filtered_models(models, user, db=None):
                     filtered_models.append(model)
                 continue
 
-            model_info = model_infos.get(model["id"], None)
-            if model_info:
-                if (
-                    (user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL)
-                    or user.id == model_info.user_id
-                    or has_access(
-                        user.id,
-                        type="read",
-                        access_control=model_info.access_control,
-                        user_group_ids=user_group_ids,
-                    )
-                ):
-                    filtered_models.append(model)
+            if model["id"] in model_ids and (
+                (user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL)
+                or model["id"] in accessible_ids
+            ):
+                filtered_models.append(model)
 
         return filtered_models
     else:
@@ -0,0 +1,61 @@
+import base64
+import json
+from typing import Any, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last item of a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> tuple:
+    """Decode a cursor from encode_cursor; raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError("Invalid cursor")
+    return tuple(values)
+
+
+def apply_cursor(query: Query, columns: list, cursor: Optional[str]) -> Query:
+    """
+    Order query by columns, newest first, and keep only the rows after
+    cursor. The last column must be unique (e.g. the id) so that rows with
+    equal timestamps are neither skipped nor repeated across pages. Unlike
+    OFFSET, the database seeks straight to the cursor through an index on
+    the same columns, so every page costs the same.
+    """
+    query = query.order_by(*[column.desc() for column in columns])
+    if not cursor:
+        return query
+
+    values = decode_cursor(cursor, len(columns))
+    # (a, b) < (x, y) expanded, as row values are not supported everywhere
+    return query.filter(
+        or_(
+            *[
+                and_(
+                    *[column == value for column, value in zip(columns, values[:idx])],
+                    columns[idx] < values[idx],
+                )
+                for idx in range(len(columns))
+            ]
+        )
+    )
+
+
+def get_next_cursor(
+    items: list, fields: list[str], limit: Optional[int]
+) -> Optional[str]:
+    """Return the cursor of the page after items, or None if it was the last."""
+    if not items or not limit or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(*[getattr(last, field) for field in fields])
@@ -1,18 +1,28 @@
 import os
 import re
+import hashlib
+import marshal
 import subprocess
 import sys
-from importlib import util
+from importlib import metadata, util
 import types
 import tempfile
 import logging
 
+from packaging.requirements import Requirement
+
+from open_webui.config import CACHE_DIR
 from open_webui.env import PIP_OPTIONS, PIP_PACKAGE_INDEX_OPTIONS, OFFLINE_MODE
 from open_webui.models.functions import Functions
 from open_webui.models.tools import Tools
 
 log = logging.getLogger(__name__)
 
+PLUGIN_CACHE_DIR = f"{CACHE_DIR}/plugins"
+
+# Hashes of the requirement lists that are known to be installed
+RESOLVED_REQUIREMENTS = set()
+
 
 def extract_frontmatter(content):
     """
@@ -76,28 +86,27 @@ def load_tool_module_by_id(tool_id, content=None):
 
         content = tool.content
 
-        content = replace_imports(content)
-        Tools.update_tool_by_id(tool_id, {"content": content})
-    else:
-        frontmatter = extract_frontmatter(content)
-        # Install required packages found within the frontmatter
-        install_frontmatter_requirements(frontmatter.get("requirements", ""))
+        new_content = replace_imports(content)
+        if new_content != content:
+            content = new_content
+            Tools.update_tool_by_id(tool_id, {"content": content})
+
+    frontmatter = extract_frontmatter(content)
+    # Install required packages found within the frontmatter
+    install_frontmatter_requirements(frontmatter.get("requirements", ""))
 
     module_name = f"tool_{tool_id}"
     module = types.ModuleType(module_name)
     sys.modules[module_name] = module
 
-    # Create a temporary file and use it to define `__file__` so
-    # that it works as expected from the module's perspective.
-    temp_file = tempfile.NamedTemporaryFile(delete=False)
-    temp_file.close()
     try:
-        with open(temp_file.name, "w", encoding="utf-8") as f:
-            f.write(content)
-        module.__dict__["__file__"] = temp_file.name
+        # The cached source file defines `__file__` so that it works
+        # as expected from the module's perspective.
+        source_path, code = get_plugin_code(content)
+        module.__dict__["__file__"] = source_path
 
         # Executing the modified content in the created module's namespace
-        exec(content, module.__dict__)
+        exec(code, module.__dict__)
         frontmatter = extract_frontmatter(content)
         log.info(f"Loaded module: {module.__name__}")
 
@@ -110,8 +119,6 @@ def load_tool_module_by_id(tool_id, content=None):
         log.error(f"Error loading module: {tool_id}: {e}")
         del sys.modules[module_name]  # Clean up
         raise e
-    finally:
-        os.unlink(temp_file.name)
 
 
 def load_function_module_by_id(function_id: str, content: str | None = None):
@@ -121,27 +128,26 @@ def load_function_module_by_id(function_id: str, content: str | None = None):
             raise Exception(f"Function not found: {function_id}")
         content = function.content
 
-        content = replace_imports(content)
-        Functions.update_function_by_id(function_id, {"content": content})
-    else:
-        frontmatter = extract_frontmatter(content)
-        install_frontmatter_requirements(frontmatter.get("requirements", ""))
+        new_content = replace_imports(content)
+        if new_content != content:
+            content = new_content
+            Functions.update_function_by_id(function_id, {"content": content})
+
+    frontmatter = extract_frontmatter(content)
+    install_frontmatter_requirements(frontmatter.get("requirements", ""))
 
     module_name = f"function_{function_id}"
     module = types.ModuleType(module_name)
     sys.modules[module_name] = module
 
-    # Create a temporary file and use it to define `__file__` so
-    # that it works as expected from the module's perspective.
-    temp_file = tempfile.NamedTemporaryFile(delete=False)
-    temp_file.close()
     try:
-        with open(temp_file.name, "w", encoding="utf-8") as f:
-            f.write(content)
-        module.__dict__["__file__"] = temp_file.name
+        # The cached source file defines `__file__` so that it works
+        # as expected from the module's perspective.
+        source_path, code = get_plugin_code(content)
+        module.__dict__["__file__"] = source_path
 
         # Execute the modified content in the created module's namespace
-        exec(content, module.__dict__)
+        exec(code, module.__dict__)
         frontmatter = extract_frontmatter(content)
         log.info(f"Loaded module: {module.__name__}")
 
@@ -161,8 +167,52 @@ def load_function_module_by_id(function_id: str, content: str | None = None):
 
         Functions.update_function_by_id(function_id, {"is_active": False})
         raise e
-    finally:
-        os.unlink(temp_file.name)
+
+
+def get_plugin_code(content: str) -> tuple[str, types.CodeType]:
+    """
+    Compile plugin content, reusing the code object cached on disk under the
+    hash of the content. The cache is shared by all workers and survives
+    restarts, so a plugin is only compiled once per version. Returns the path
+    of the cached source file, which the code refers to in tracebacks, and the
+    code object.
+    """
+    content_hash = hashlib.sha256(content.encode()).hexdigest()
+    source_path = os.path.join(PLUGIN_CACHE_DIR, f"{content_hash}.py")
+    code_path = os.path.join(
+        PLUGIN_CACHE_DIR, f"{content_hash}.{sys.implementation.cache_tag}.pyc"
+    )
+
+    try:
+        with open(code_path, "rb") as f:
+            # Bytecode is only valid for the interpreter that wrote it
+            if f.read(len(util.MAGIC_NUMBER)) == util.MAGIC_NUMBER:
+                code = marshal.load(f)
+                if os.path.exists(source_path):
+                    return source_path, code
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        log.warning(f"Ignoring invalid plugin cache {code_path}: {e}")
+
+    code = compile(content, source_path, "exec")
+    try:
+        os.makedirs(PLUGIN_CACHE_DIR, exist_ok=True)
+        write_cache_file(source_path, content.encode("utf-8"))
+        write_cache_file(code_path, util.MAGIC_NUMBER + marshal.dumps(code))
+    except Exception as e:
+        log.warning(f"Failed to cache plugin code: {e}")
+    return source_path, code
+
+
+def write_cache_file(path: str, data: bytes):
+    # Write to a temporary file first so that other workers never read a
+    # partially written file
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(path), delete=False
+    ) as temp_file:
+        temp_file.write(data)
+    os.replace(temp_file.name, path)
 
 
 def get_tool_module_from_cache(request, tool_id, load_from_db=True):
@@ -268,9 +318,21 @@ def install_frontmatter_requirements(requirements: str):
         log.info("Offline mode enabled, skipping installation of requirements.")
         return
 
-    if requirements:
+    req_list = [req.strip() for req in requirements.split(",") if req.strip()]
+    if req_list:
+        requirements_hash = hashlib.sha256(
+            ",".join(sorted(req_list)).encode()
+        ).hexdigest()
+        if requirements_hash in RESOLVED_REQUIREMENTS:
+            return
+
+        req_list = get_missing_requirements(req_list)
+        if not req_list:
+            RESOLVED_REQUIREMENTS.add(requirements_hash)
+            log.debug("Requirements from frontmatter are already installed.")
+            return
+
         try:
-            req_list = [req.strip() for req in requirements.split(",")]
             log.info(f"Installing requirements: {' '.join(req_list)}")
             subprocess.check_call(
                 [sys.executable, "-m", "pip", "install"]
@@ -278,12 +340,35 @@ def install_frontmatter_requirements(requirements: str):
                 + req_list
                 + PIP_PACKAGE_INDEX_OPTIONS
             )
+            RESOLVED_REQUIREMENTS.add(requirements_hash)
         except Exception as e:
             log.error(f"Error installing packages: {' '.join(req_list)}")
             raise e
 
     else:
-        log.info("No requirements found in frontmatter.")
+        log.debug("No requirements found in frontmatter.")
+
+
+def get_missing_requirements(req_list: list[str]) -> list[str]:
+    """
+    Return the requirements that are not satisfied by the installed
+    distributions, so that pip is only run when something is missing.
+    """
+    missing = []
+    for req in req_list:
+        try:
+            requirement = Requirement(req)
+            if requirement.marker and not requirement.marker.evaluate():
+                continue
+            version = metadata.version(requirement.name)
+            if requirement.url or not requirement.specifier.contains(
+                version, prereleases=True
+            ):
+                missing.append(req)
+        except Exception:
+            # Not installed, or a requirement pip understands but we don't
+            missing.append(req)
+    return missing
 
 
 def install_tool_and_function_dependencies():
@@ -8,6 +8,7 @@ Metrics collected:
 
 * http.server.requests (counter)
 * http.server.duration (histogram, milliseconds)
+* db.client.* query, pool and per-request DB metrics (when ENABLE_DB_METRICS)
 
 Attributes used: http.method, http.route, http.status_code
 
@@ -44,6 +45,7 @@ from open_webui.env import (
     OTEL_METRICS_BASIC_AUTH_PASSWORD,
     OTEL_METRICS_OTLP_SPAN_EXPORTER,
     OTEL_METRICS_EXPORTER_OTLP_INSECURE,
+    ENABLE_DB_METRICS,
 )
 from open_webui.models.users import Users
 
@@ -176,6 +178,11 @@ def setup_metrics(app: FastAPI, resource: Resource) -> None:
         callbacks=[observe_users_active_today],
     )
 
+    if ENABLE_DB_METRICS:
+        from open_webui.internal.db_metrics import DB_METRICS
+
+        DB_METRICS.bind_meter(meter)
+
     # FastAPI middleware
     @app.middleware("http")
     async def _metrics_middleware(request: Request, call_next):
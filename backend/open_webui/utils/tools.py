@@ -4,6 +4,8 @@ import re
 import inspect
 import aiohttp
 import asyncio
+import hashlib
+import time
 import yaml
 import json
 
@@ -50,6 +52,7 @@ from open_webui.env import (
     AIOHTTP_CLIENT_TIMEOUT,
     AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA,
     AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL,
+    TOOL_SERVER_SPEC_CACHE_TTL,
 )
 from open_webui.tools.builtin import (
     search_web,
@@ -83,6 +86,9 @@ import copy
 
 log = logging.getLogger(__name__)
 
+# Validator, spec and function specs of the last response of each tool server
+TOOL_SERVER_SPEC_CACHE: dict[str, dict] = {}
+
 
 def get_async_tool_function_and_apply_extra_params(
     function: Callable, extra_params: dict
@@ -112,9 +118,11 @@ def get_async_tool_function_and_apply_extra_params(
             return await partial_func(*args, **kwargs)
 
     else:
-        # Make it a coroutine function when it is not already
+        # Make it a coroutine function when it is not already. Run it in a
+        # thread, so a blocking tool neither stalls the event loop nor the
+        # concurrent tool calls and their timeouts
         async def new_function(*args, **kwargs):
-            return partial_func(*args, **kwargs)
+            return await asyncio.to_thread(partial_func, *args, **kwargs)
 
     update_wrapper(new_function, function)
     new_function.__signature__ = new_sig
@@ -736,34 +744,95 @@ def convert_openapi_to_tool_payload(openapi_spec):
 
 
 async def set_tool_servers(request: Request):
-    request.app.state.TOOL_SERVERS = await get_tool_servers_data(
-        request.app.state.config.TOOL_SERVER_CONNECTIONS
+    return await refresh_tool_servers(request.app)
+
+
+async def refresh_tool_servers(app) -> List[Dict[str, Any]]:
+    """
+    Revalidate the specs of the configured tool servers and publish them to
+    the other workers through Redis.
+    """
+    app.state.TOOL_SERVERS = await get_tool_servers_data(
+        app.state.config.TOOL_SERVER_CONNECTIONS
     )
+    app.state.TOOL_SERVERS_UPDATED_AT = time.time()
 
-    if request.app.state.redis is not None:
-        await request.app.state.redis.set(
-            "tool_servers", json.dumps(request.app.state.TOOL_SERVERS)
-        )
+    redis = getattr(app.state, "redis", None)
+    if redis is not None:
+        try:
+            await redis.set("tool_servers", json.dumps(app.state.TOOL_SERVERS))
+            await redis.set(
+                "tool_servers:updated_at", app.state.TOOL_SERVERS_UPDATED_AT
+            )
+        except Exception as e:
+            log.error(f"Error saving tool_servers to Redis: {e}")
+
+    return app.state.TOOL_SERVERS
 
-    return request.app.state.TOOL_SERVERS
+
+def schedule_tool_servers_refresh(app) -> asyncio.Task:
+    """Start a refresh of the tool servers unless one is already running."""
+    task = getattr(app.state, "TOOL_SERVERS_REFRESH", None)
+    if task is None or task.done():
+        task = asyncio.create_task(refresh_tool_servers(app))
+        app.state.TOOL_SERVERS_REFRESH = task
+    return task
+
+
+async def periodic_tool_servers_refresh(app):
+    """Keep the tool server specs fresh so that requests never wait on them."""
+    while True:
+        try:
+            await schedule_tool_servers_refresh(app)
+        except Exception as e:
+            log.error(f"Error refreshing tool servers: {e}")
+
+        if TOOL_SERVER_SPEC_CACHE_TTL <= 0:
+            break
+        await asyncio.sleep(TOOL_SERVER_SPEC_CACHE_TTL)
 
 
 async def get_tool_servers(request: Request):
-    tool_servers = []
-    if request.app.state.redis is not None:
+    """
+    Return the tool servers with their specs as last fetched. Only the first
+    call waits for the specs; once they are older than
+    TOOL_SERVER_SPEC_CACHE_TTL they are served as they are while being
+    revalidated in the background.
+    """
+    app = request.app
+    updated_at = getattr(app.state, "TOOL_SERVERS_UPDATED_AT", None)
+
+    redis = getattr(app.state, "redis", None)
+    if redis is not None:
         try:
-            tool_servers = json.loads(await request.app.state.redis.get("tool_servers"))
-            request.app.state.TOOL_SERVERS = tool_servers
+            # Pick up the specs refreshed by another worker, e.g. after the
+            # connections were changed there
+            shared_updated_at = await redis.get("tool_servers:updated_at")
+            if shared_updated_at and float(shared_updated_at) != updated_at:
+                app.state.TOOL_SERVERS = json.loads(await redis.get("tool_servers"))
+                app.state.TOOL_SERVERS_UPDATED_AT = updated_at = float(
+                    shared_updated_at
+                )
         except Exception as e:
             log.error(f"Error fetching tool_servers from Redis: {e}")
 
-    if not tool_servers:
-        tool_servers = await set_tool_servers(request)
+    if updated_at is None:
+        return await asyncio.shield(schedule_tool_servers_refresh(app))
 
-    return tool_servers
+    if 0 < TOOL_SERVER_SPEC_CACHE_TTL < time.time() - updated_at:
+        schedule_tool_servers_refresh(app)
 
+    return app.state.TOOL_SERVERS
 
-async def get_tool_server_data(url: str, headers: Optional[dict]) -> Dict[str, Any]:
+
+async def fetch_tool_server_spec(
+    url: str, headers: Optional[dict], etag: Optional[str] = None
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch the OpenAPI spec at url. Given the ETag of a previous response, the
+    spec is None if the server answered that it was not modified. Returns the
+    spec and its ETag.
+    """
     _headers = {
         "Accept": "application/json",
         "Content-Type": "application/json",
@@ -772,6 +841,9 @@ async def get_tool_server_data(url: str, headers: Optional[dict]) -> Dict[str, A
     if headers:
         _headers.update(headers)
 
+    if etag:
+        _headers["If-None-Match"] = etag
+
     error = None
     try:
         timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA)
@@ -779,6 +851,9 @@ async def get_tool_server_data(url: str, headers: Optional[dict]) -> Dict[str, A
             async with session.get(
                 url, headers=_headers, ssl=AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL
             ) as response:
+                if etag and response.status == 304:
+                    return None, etag
+
                 if response.status != 200:
                     error_body = await response.json()
                     raise Exception(error_body)
@@ -800,6 +875,8 @@ async def get_tool_server_data(url: str, headers: Optional[dict]) -> Dict[str, A
                     except Exception as e:
                         raise e
 
+                etag = response.headers.get("ETag")
+
     except Exception as err:
         log.exception(f"Could not fetch tool server spec from {url}")
         if isinstance(err, dict) and "detail" in err:
@@ -809,10 +886,22 @@ async def get_tool_server_data(url: str, headers: Optional[dict]) -> Dict[str, A
         raise Exception(error)
 
     log.debug(f"Fetched data: {res}")
+    return res, etag
+
+
+async def get_tool_server_data(url: str, headers: Optional[dict]) -> Dict[str, Any]:
+    res, _ = await fetch_tool_server_spec(url, headers)
     return res
 
 
 async def get_tool_servers_data(servers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Fetch and convert the specs of the enabled OpenAPI tool servers. Specs
+    are revalidated with the ETag of the last response, and the function
+    specs of an unchanged spec are reused from TOOL_SERVER_SPEC_CACHE instead
+    of being converted again. A server that cannot be reached keeps its last
+    spec until it can.
+    """
     # Prepare list of enabled servers along with their original index
 
     tasks = []
@@ -842,52 +931,78 @@ async def get_tool_servers_data(servers: List[Dict[str, Any]]) -> List[Dict[str,
 
             # Create async tasks to fetch data
             task = None
+            cache_key = None
             if spec_type == "url":
                 # Path (to OpenAPI spec URL) can be either a full URL or a path to append to the base URL
                 openapi_path = server.get("path", "openapi.json")
                 spec_url = get_tool_server_url(server_url, openapi_path)
+                cache_key = hashlib.sha256(f"{spec_url}|{token}".encode()).hexdigest()
                 # Fetch from URL
-                task = get_tool_server_data(
+                task = fetch_tool_server_spec(
                     spec_url,
                     {"Authorization": f"Bearer {token}"} if token else None,
+                    TOOL_SERVER_SPEC_CACHE.get(cache_key, {}).get("etag"),
                 )
             elif spec_type == "json" and server.get("spec", ""):
-                # Use provided JSON spec
-                spec_json = None
-                try:
-                    spec_json = json.loads(server.get("spec", ""))
-                except Exception as e:
-                    log.error(f"Error parsing JSON spec for tool server {id}: {e}")
-
-                if spec_json:
-                    task = asyncio.sleep(
-                        0,
-                        result=spec_json,
-                    )
+                cache_key = hashlib.sha256(server.get("spec", "").encode()).hexdigest()
+                if cache_key in TOOL_SERVER_SPEC_CACHE:
+                    # Unchanged since it was last converted
+                    task = asyncio.sleep(0, result=(None, None))
+                else:
+                    # Use provided JSON spec
+                    spec_json = None
+                    try:
+                        spec_json = json.loads(server.get("spec", ""))
+                    except Exception as e:
+                        log.error(f"Error parsing JSON spec for tool server {id}: {e}")
+
+                    if spec_json:
+                        task = asyncio.sleep(
+                            0,
+                            result=(spec_json, None),
+                        )
 
             if task:
                 tasks.append(task)
-                server_entries.append((id, idx, server, server_url, info, token))
+                server_entries.append(
+                    (id, idx, server, server_url, info, token, cache_key)
+                )
 
     # Execute tasks concurrently
     responses = await asyncio.gather(*tasks, return_exceptions=True)
 
     # Build final results with index and server metadata
     results = []
-    for (id, idx, server, url, info, _), response in zip(server_entries, responses):
+    cache = {}
+    for (id, idx, server, url, info, _, cache_key), response in zip(
+        server_entries, responses
+    ):
         if isinstance(response, Exception):
-            log.error(f"Failed to connect to {url} OpenAPI tool server")
-            continue
-
-        response = {
-            "openapi": response,
-            "info": response.get("info", {}),
-            "specs": convert_openapi_to_tool_payload(response),
-        }
+            if cache_key not in TOOL_SERVER_SPEC_CACHE:
+                log.error(f"Failed to connect to {url} OpenAPI tool server")
+                continue
+            # Keep serving the last spec until the server can be reached again
+            log.warning(
+                f"Failed to connect to {url} OpenAPI tool server, using its last spec"
+            )
+            cache[cache_key] = TOOL_SERVER_SPEC_CACHE[cache_key]
+        elif response[0] is None:
+            # Not modified
+            if cache_key not in TOOL_SERVER_SPEC_CACHE:
+                continue
+            cache[cache_key] = TOOL_SERVER_SPEC_CACHE[cache_key]
+        else:
+            spec, etag = response
+            cache[cache_key] = {
+                "etag": etag,
+                "openapi": spec,
+                "specs": convert_openapi_to_tool_payload(spec),
+            }
 
-        openapi_data = response.get("openapi", {})
+        openapi_data = cache[cache_key]["openapi"]
         if info and isinstance(openapi_data, dict):
-            openapi_data["info"] = openapi_data.get("info", {})
+            # Copied so that the cached spec keeps the server's own info
+            openapi_data = {**openapi_data, "info": {**openapi_data.get("info", {})}}
 
             if "name" in info:
                 openapi_data["info"]["title"] = info.get("name", "Tool Server")
@@ -901,11 +1016,15 @@ async def get_tool_servers_data(servers: List[Dict[str, Any]]) -> List[Dict[str,
                 "idx": idx,
                 "url": server.get("url"),
                 "openapi": openapi_data,
-                "info": response.get("info"),
-                "specs": response.get("specs"),
+                "info": openapi_data.get("info", {}),
+                "specs": cache[cache_key]["specs"],
             }
         )
 
+    # Forget the servers that were removed or never fetched
+    TOOL_SERVER_SPEC_CACHE.clear()
+    TOOL_SERVER_SPEC_CACHE.update(cache)
+
     return results
 
 